@@ -87,6 +87,28 @@ INSTALLED_APPS = [
 ]
 ASGI_APPLICATION = "backend.asgi.application"
 
+# Cache (Redis wenn REDIS_URL gesetzt, sonst prozesslokal)
+_redis_cache_url = get_env("CACHE_REDIS_URL") or get_env("REDIS_URL")
+if _redis_cache_url:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": _redis_cache_url,
+            "KEY_PREFIX": "unyq",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+# Zähler mit gleitendem Fenster (Vote-Limits); ohne URL prozesslokal
+COUNTER_REDIS_URL = get_env("COUNTER_REDIS_URL") or _redis_cache_url
+# Sekunden, die /summary-Antworten pro Profil gecacht werden (0 = aus).
+# Ohne gemeinsamen Cache würden die Versionszähler nicht prozessübergreifend greifen.
+SUMMARY_CACHE_TTL = get_env("SUMMARY_CACHE_TTL", 30 if _redis_cache_url else 0, cast_type=int)
+
 # Channel Layer (dev: InMemory; prod: Redis via CHANNEL_REDIS_URL/REDIS_URL)
 _redis_channel_url = get_env("CHANNEL_REDIS_URL") or get_env("REDIS_URL")
 _channel_capacity = max(10, get_env("CHANNEL_LAYER_CAPACITY", 50, cast_type=int))
@@ -256,11 +278,47 @@ SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Side-Effects nach Commit (thread | inline | outbox), siehe core/side_effects.py
+SIDE_EFFECTS_MODE = get_env("SIDE_EFFECTS_MODE", "thread")
+SIDE_EFFECTS_WORKERS = get_env("SIDE_EFFECTS_WORKERS", 4, cast_type=int)
+# Outbox-Modus: Basis des exponentiellen Backoffs für fehlgeschlagene Jobs (Sekunden)
+SIDE_EFFECTS_RETRY_BASE_SECONDS = get_env("SIDE_EFFECTS_RETRY_BASE_SECONDS", 30, cast_type=int)
+
+# In-App-Notifications: Chunkgröße für bulk_create beim Fan-out
+NOTIFICATION_BULK_BATCH_SIZE = get_env("NOTIFICATION_BULK_BATCH_SIZE", 500, cast_type=int)
+# Zeilen pro DB-Roundtrip bei Streaming-Exporten (CSV/ICS)
+EXPORT_CHUNK_SIZE = get_env("EXPORT_CHUNK_SIZE", 2000, cast_type=int)
+# GrowPro-Rebalancing: Aufrufe innerhalb dieses Fensters werden zu einem Lauf zusammengefasst
+GROWPRO_REBALANCE_DEBOUNCE_SECONDS = get_env("GROWPRO_REBALANCE_DEBOUNCE_SECONDS", 300, cast_type=int)
+# Ranked-Ladder: neue Votes eines Profils werden in diesem Fenster zu einer Neuberechnung gebündelt
+RANKED_REFRESH_DEBOUNCE_SECONDS = get_env("RANKED_REFRESH_DEBOUNCE_SECONDS", 60, cast_type=int)
+# Höchstdauer der Vote-Regeln einer Battle im Cache (höchstens bis zum Battle-Ende).
+# Ohne gemeinsamen Cache erreicht die Invalidierung andere Worker nicht – daher kurz.
+VOTE_CONFIG_CACHE_SECONDS = get_env("VOTE_CONFIG_CACHE_SECONDS", 300 if _redis_cache_url else 5, cast_type=int)
+# Live-Stand einer Battle: höchstens ein Push an ``battle_<id>`` je Intervall
+VOTE_TALLY_PUSH_INTERVAL_MS = get_env("VOTE_TALLY_PUSH_INTERVAL_MS", 250, cast_type=int)
+# Realtime-Events je Entität in diesem Fenster bündeln (0 = bis Transaktionsende)
+REALTIME_COALESCE_MS = get_env("REALTIME_COALESCE_MS", 100, cast_type=int)
+# Replay-Puffer für Reconnects mit ?since=<seq>: Frames je Gruppe, Redis-Stream wie der Channel Layer
+REALTIME_REPLAY_SIZE = get_env("REALTIME_REPLAY_SIZE", 1000, cast_type=int)
+REALTIME_REPLAY_REDIS_URL = get_env("REALTIME_REPLAY_REDIS_URL") or _redis_channel_url
+# Websocket-Principal (User, Profil, Rollen) prozesslokal cachen; zusätzlich begrenzt durch den Token-Ablauf
+WS_PRINCIPAL_CACHE_SECONDS = get_env("WS_PRINCIPAL_CACHE_SECONDS", 300, cast_type=int)
+
 # Email (Gmail SMTP via App-Passwort)
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# EMAIL_BACKEND per ENV überschreibbar, z.B. console/filebased als lokaler Stand-in
+EMAIL_BACKEND = get_env('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = get_env('EMAIL_FILE_PATH', str(BASE_DIR / "tmp" / "emails"))
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_HOST_USER = get_env('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = get_env('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = get_env('EMAIL_HOST_USER', 'noreply@proartist.app')
+
+# E-Mail-Outbox (core/email_outbox.py): thread | inline | command
+EMAIL_DELIVERY_MODE = get_env("EMAIL_DELIVERY_MODE", "thread")
+EMAIL_BATCH_SIZE = get_env("EMAIL_BATCH_SIZE", 50, cast_type=int)
+EMAIL_RATE_PER_MINUTE = get_env("EMAIL_RATE_PER_MINUTE", 120, cast_type=int)
+EMAIL_MAX_ATTEMPTS = get_env("EMAIL_MAX_ATTEMPTS", 5, cast_type=int)
+EMAIL_RETRY_BASE_SECONDS = get_env("EMAIL_RETRY_BASE_SECONDS", 60, cast_type=int)
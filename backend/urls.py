@@ -64,6 +64,7 @@ from core.views import (
     api_center_status,
     send_test_email,
     dashboard_layouts,
+    dashboard_bundle,
 )
 
 router = routers.DefaultRouter()
@@ -123,6 +124,7 @@ urlpatterns = [
     path("api/analytics/summary/", analytics_summary),
     path("api/api-center/status/", api_center_status),
     path("api/dashboard/layouts/", dashboard_layouts),
+    path("api/dashboard/bundle/", dashboard_bundle),
     path("api/automation/task-reminders/", run_task_reminders),
     path("api/testing/send-email/", send_test_email),
     path("api/search/", SearchView.as_view(), name="search"),
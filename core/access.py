@@ -1,130 +1,270 @@
 """
 Zentrale Project Access Validator
 Verhindert Duplikation von Permission-Logik
+
+Alle Rollen- und Projekt-Checks laufen über einen ``AccessContext``, der die
+Rollen-Keys sowie eigene/teilnehmende Projekt-IDs eines Profils einmalig lädt
+und danach aus dem Speicher beantwortet. Der Context hängt an der
+Profil-Instanz (``request.user.profile`` lebt genau einen Request lang) und
+wird bei Änderungen an Rollen oder Projekt-Mitgliedschaften über eine
+Generationsnummer verworfen (siehe ``core.signals``).
 """
 
-from .models import Profile, ProjectParticipant
+import itertools
+
+from django.db.models import Exists, OuterRef, Q
+
+from .models import Profile, Project, Task, TaskVisibility
+
+TEAM_ROLE_KEYS = ("TEAM", "ADMIN")
+
+_generation_counter = itertools.count(1)
+_generation = 0
+
+
+def invalidate_access_contexts():
+    """Markiert alle bestehenden AccessContexts als veraltet."""
+    global _generation
+    _generation = next(_generation_counter)
+
+
+class AccessContext:
+    """
+    Snapshot der Berechtigungsdaten eines Profils.
+
+    Rollen, eigene Projekte und Teilnehmer-Projekte werden lazy geladen
+    (je max. eine Query), Team-Profile brauchen die Projekt-Sets nie.
+    """
+
+    def __init__(self, profile):
+        self.profile_id = profile.id
+        self.generation = _generation
+        self._role_keys = None
+        self._owned_project_ids = None
+        self._participant_access = None
+
+    @property
+    def is_stale(self):
+        return self.generation != _generation
+
+    @property
+    def role_keys(self):
+        if self._role_keys is None:
+            self._role_keys = frozenset(
+                Profile.roles.through.objects.filter(profile_id=self.profile_id).values_list("role__key", flat=True)
+            )
+        return self._role_keys
+
+    def has_role(self, *role_keys):
+        return bool(self.role_keys.intersection(role_keys))
+
+    @property
+    def is_team(self):
+        return self.has_role(*TEAM_ROLE_KEYS)
+
+    @property
+    def owned_project_ids(self):
+        if self._owned_project_ids is None:
+            self._owned_project_ids = frozenset(
+                Project.owners.through.objects.filter(profile_id=self.profile_id).values_list("project_id", flat=True)
+            )
+        return self._owned_project_ids
+
+    @property
+    def participant_access(self):
+        """Mapping ``project_id -> participant_task_access`` aller Teilnehmer-Projekte."""
+        if self._participant_access is None:
+            self._participant_access = dict(
+                Project.participants.through.objects.filter(profile_id=self.profile_id).values_list(
+                    "project_id", "project__participant_task_access"
+                )
+            )
+        return self._participant_access
+
+    @property
+    def visible_project_ids(self):
+        return self.owned_project_ids | frozenset(self.participant_access)
+
+    def owns(self, project_id):
+        return project_id in self.owned_project_ids
+
+    def participates(self, project_id):
+        return project_id in self.participant_access
+
+
+def get_access_context(profile):
+    """Liefert den (gecachten) AccessContext eines Profils oder None."""
+    if profile is None or getattr(profile, "pk", None) is None:
+        return None
+    context = profile.__dict__.get("_access_context")
+    if context is None or context.is_stale or context.profile_id != profile.pk:
+        context = AccessContext(profile)
+        profile.__dict__["_access_context"] = context
+    return context
+
+
+def project_visibility_q(profile):
+    """
+    Sichtbarkeit von Projekten als ``Exists``-Bedingung – ohne M2M-Joins
+    und damit ohne ``DISTINCT`` auf dem Ergebnis.
+    """
+    return Q(
+        Exists(Project.owners.through.objects.filter(project_id=OuterRef("pk"), profile_id=profile.id))
+    ) | Q(
+        Exists(Project.participants.through.objects.filter(project_id=OuterRef("pk"), profile_id=profile.id))
+    )
+
+
+def task_visibility_q(profile):
+    """
+    Sichtbarkeit von Tasks: Projekt-Mitgliedschaft (``project_id IN``
+    Subquery) oder direkte Zuordnung als Assignee/Stakeholder (``Exists``).
+
+    Referenz-Definition der Regeln; Listen-Views nutzen die materialisierte
+    Variante ``materialized_task_visibility_q``.
+    """
+    return (
+        Q(project_id__in=Project.owners.through.objects.filter(profile_id=profile.id).values("project_id"))
+        | Q(project_id__in=Project.participants.through.objects.filter(profile_id=profile.id).values("project_id"))
+        | Q(Exists(Task.assignees.through.objects.filter(task_id=OuterRef("pk"), profile_id=profile.id)))
+        | Q(Exists(Task.stakeholders.through.objects.filter(task_id=OuterRef("pk"), profile_id=profile.id)))
+    )
+
+
+def materialized_task_visibility_q(profile):
+    """Sichtbarkeit über die gepflegte ``TaskVisibility``-Tabelle (ein indizierter Join)."""
+    return Q(id__in=TaskVisibility.objects.filter(profile_id=profile.id).values("task_id"))
+
+
+def visible_projects(profile, queryset=None):
+    """Schränkt ``queryset`` auf die für ``profile`` sichtbaren Projekte ein."""
+    qs = queryset if queryset is not None else Project.objects.all()
+    context = get_access_context(profile)
+    if context is None:
+        return qs.none()
+    if context.is_team:
+        return qs
+    return qs.filter(project_visibility_q(profile))
+
+
+def visible_tasks(profile, queryset=None):
+    """Schränkt ``queryset`` auf die für ``profile`` sichtbaren Tasks ein."""
+    qs = queryset if queryset is not None else Task.objects.all()
+    context = get_access_context(profile)
+    if context is None:
+        return qs.none()
+    if context.is_team:
+        return qs
+    return qs.filter(materialized_task_visibility_q(profile))
 
 
 class ProjectAccessValidator:
     """
     Zentrale Autorisierer für Projekt-Zugriffe
-    
+
     Definiert konsistente Zugriffs-Level:
     - view: Kann Projekt ansehen
     - manage: Kann Projekt konfigurieren
     - manage_tasks: Kann Tasks erstellen/editieren
     - delete: Kann Projekt löschen
+
+    Dünne Fassade über ``AccessContext`` – es werden keine eigenen Queries
+    abgesetzt.
     """
-    
+
     LEVELS = {
         'view': 1,
         'manage': 2,
         'manage_tasks': 2,
         'delete': 3,
     }
-    
+
     @staticmethod
     def _is_team_profile(profile):
         """Prüft ob Profile ein Team-Profile ist"""
-        if profile is None:
-            return False
-        return profile.roles.filter(key__in=['TEAM', 'ADMIN']).exists()
-    
+        context = get_access_context(profile)
+        return bool(context and context.is_team)
+
     @staticmethod
     def _is_project_owner(profile, project):
         """Prüft ob Profile der Projekt-Owner ist"""
-        return project.owners.filter(id=profile.id).exists()
-    
+        context = get_access_context(profile)
+        return bool(context and project is not None and context.owns(project.id))
+
     @staticmethod
     def _is_project_participant(profile, project):
         """Prüft ob Profile ein Projekt-Teilnehmer ist"""
-        return ProjectParticipant.objects.filter(
-            profile=profile,
-            project=project,
-            can_view=True
-        ).exists()
-    
+        context = get_access_context(profile)
+        return bool(context and project is not None and context.participates(project.id))
+
     @staticmethod
     def validate_access(profile, project, required_level='view'):
         """
         Validiert Zugriff auf Projekt
-        
+
         Args:
             profile: User Profile Object
-            project: Project Object  
+            project: Project Object
             required_level: 'view', 'manage', 'manage_tasks', 'delete'
-        
+
         Returns:
             bool: True wenn Zugriff erlaubt, False sonst
         """
         if profile is None or project is None:
             return False
-        
-        level = ProjectAccessValidator.LEVELS.get(required_level, 1)
-        
+
         # Team Profiles haben vollen Zugriff
         if ProjectAccessValidator._is_team_profile(profile):
             return True
-        
+
         # Project Owners
         if ProjectAccessValidator._is_project_owner(profile, project):
-            if level <= 2:
-                return True
-            if level == 3:
-                return True
-        
+            return True
+
         # Projekt Participants
         if ProjectAccessValidator._is_project_participant(profile, project):
             if required_level == 'view':
                 return True
-            
-            # Manage/Edit Berechtigungen für Participants
-            participant = ProjectParticipant.objects.get(
-                profile=profile,
-                project=project
-            )
-            if required_level == 'manage' and participant.can_manage:
-                return True
-            if required_level == 'manage_tasks' and participant.can_edit_tasks:
-                return True
-        
+            # Participants dürfen Tasks nur mit EDIT-Recht verwalten, das Projekt selbst nie
+            if required_level == 'manage_tasks':
+                return project.participant_task_access == "EDIT"
+
         return False
-    
+
     @staticmethod
     def can_view(profile, project):
         """Shorthand: Kann Projekt angesehen werden?"""
         return ProjectAccessValidator.validate_access(profile, project, 'view')
-    
+
     @staticmethod
     def can_manage(profile, project):
         """Shorthand: Kann Projekt verwaltet werden?"""
         return ProjectAccessValidator.validate_access(profile, project, 'manage')
-    
+
     @staticmethod
     def can_manage_tasks(profile, project):
         """Shorthand: Können Projekt-Tasks verwaltet werden?"""
         return ProjectAccessValidator.validate_access(profile, project, 'manage_tasks')
-    
+
     @staticmethod
     def can_delete(profile, project):
         """Shorthand: Kann Projekt gelöscht werden?"""
         return ProjectAccessValidator.validate_access(profile, project, 'delete')
-    
+
     @staticmethod
     def get_access_level(profile, project):
         """
         Bestimmt das Zugriffs-Level eines Profiles auf ein Projekt
-        
+
         Returns: 'admin', 'owner', 'participant', 'none'
         """
         if ProjectAccessValidator._is_team_profile(profile):
             return 'admin'
-        
+
         if ProjectAccessValidator._is_project_owner(profile, project):
             return 'owner'
-        
+
         if ProjectAccessValidator._is_project_participant(profile, project):
             return 'participant'
-        
+
         return 'none'
@@ -1,16 +1,32 @@
+import heapq
+from collections import defaultdict
 from datetime import date, timedelta
 
+from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
 from django.utils import timezone
 
-from .models import GrowProGoal, Profile, Project, Task
-
-TASK_PRIORITY_SCORE = {
-    "LOW": 1,
-    "MEDIUM": 1,
-    "HIGH": 2,
-    "CRITICAL": 3,
+from .models import GrowProGoal, Profile, Project, Task, TeamScore
+from .side_effects import dispatch, on_commit_batch
+from .team_scores import (
+    ACTIVE_GOAL_STATUSES,
+    GOAL_POINTS,
+    PROJECT_POINTS,
+    TASK_PRIORITY_SCORE,
+    compute_scores,
+    refresh_team_scores,
+    task_points_expression,
+)
+
+TEAM_POINTS_RULES = {
+    "tasks": dict(TASK_PRIORITY_SCORE),
+    "project_participation": PROJECT_POINTS,
+    "growpro_assignment": GOAL_POINTS,
 }
+REBALANCE_PENDING_KEY = "growpro-rebalance-pending"
 
 
 def _team_profiles():
@@ -32,29 +48,17 @@ def _resolve_member_point_cap(profile):
 
 
 def compute_team_scores(team_profiles=None):
+    """
+    Auslastung (offene Tasks + aktive Projekte) je Team-Profil aus dem
+    ``TeamScore``-Ledger – eine Query über die Teamgröße.
+    """
     team_profiles = list(team_profiles) if team_profiles is not None else list(_team_profiles())
     scores = {profile.id: 0 for profile in team_profiles}
     if not scores:
         return scores
-
-    tasks = (
-        Task.objects.filter(is_archived=False)
-        .exclude(status="DONE")
-        .prefetch_related("assignees")
-    )
-    for task in tasks:
-        points = TASK_PRIORITY_SCORE.get(task.priority, 1)
-        for assignee in task.assignees.all():
-            if assignee.id in scores:
-                scores[assignee.id] += points
-
-    projects = Project.objects.filter(is_archived=False).prefetch_related("participants", "owners")
-    for project in projects:
-        members = {p.id for p in project.participants.all()} | {p.id for p in project.owners.all()}
-        for member_id in members:
-            if member_id in scores:
-                scores[member_id] += 2
-
+    rows = TeamScore.objects.filter(profile_id__in=scores).values_list("profile_id", "task_points", "project_points")
+    for profile_id, task_points, project_points in rows:
+        scores[profile_id] = task_points + project_points
     return scores
 
 
@@ -87,219 +91,343 @@ def assign_task_for_review(task):
     return target_id
 
 
-def rebalance_growpro_assignments():
-    team_profiles = list(_team_profiles())
-    if not team_profiles:
-        return {"assigned": 0, "rebalanced": 0}
+def _goal_order(goal):
+    return (goal.due_date or date.max, goal.created_at)
 
-    team_ids = {profile.id for profile in team_profiles}
-    scores = compute_team_scores(team_profiles)
 
-    goals = list(
-        GrowProGoal.objects.filter(status__in=["ACTIVE", "ON_HOLD"]).select_related("assigned_team")
-    )
+def _latest_first(goal):
+    """Heap-Schlüssel, unter dem das späteste Ziel zuerst kommt."""
+    due_date, created_at = _goal_order(goal)
+    return (-due_date.toordinal(), -created_at.timestamp())
+
+
+def plan_growpro_assignments(goals, scores, team_ids, max_spread=2):
+    """
+    Berechnet die Zuweisung der GrowPro-Ziele rein im Speicher.
+
+    Unzugewiesene Ziele gehen (nach Fälligkeit) an das Mitglied mit der
+    geringsten Last (Min-Heap). Danach wird das jeweils späteste Ziel des
+    am stärksten belasteten Mitglieds an das am schwächsten belastete
+    verschoben, bis die Spanne ``max_spread`` nicht mehr übersteigt
+    (Min-/Max-Heap mit Lazy Deletion, Ziele pro Mitglied als Heap).
+    Laufzeit O(n log m) für n Ziele und m Mitglieder.
+
+    Returns:
+        tuple: ``(targets, assigned, rebalanced)`` mit ``targets`` als
+        Mapping ``goal_id -> member_id`` für alle geänderten Ziele
+    """
+    scores = dict(scores)
+    current = {goal.id: goal.assigned_team_id for goal in goals}
     for goal in goals:
         if goal.assigned_team_id in team_ids:
             scores[goal.assigned_team_id] += 1
 
-    unassigned = [goal for goal in goals if goal.assigned_team_id not in team_ids]
-    assigned_count = 0
+    low_heap = [(points, member_id) for member_id, points in scores.items()]
+    heapq.heapify(low_heap)
+
+    def push_low(member_id):
+        heapq.heappush(low_heap, (scores[member_id], member_id))
 
-    with transaction.atomic():
-        for goal in sorted(unassigned, key=lambda g: (g.due_date or date.max, g.created_at)):
-            target_id = pick_lowest_score_member(scores)
-            if not target_id:
+    def lowest():
+        while low_heap:
+            points, member_id = low_heap[0]
+            if scores[member_id] == points:
+                return member_id
+            heapq.heappop(low_heap)
+        return None
+
+    assigned = 0
+    unassigned = sorted((goal for goal in goals if goal.assigned_team_id not in team_ids), key=_goal_order)
+    for goal in unassigned:
+        target_id = lowest()
+        if target_id is None:
+            break
+        current[goal.id] = target_id
+        scores[target_id] += 1
+        push_low(target_id)
+        assigned += 1
+
+    rebalanced = 0
+    if len(scores) > 1 and goals:
+        buckets = defaultdict(list)
+        for goal in goals:
+            if current[goal.id] in scores:
+                buckets[current[goal.id]].append((_latest_first(goal), goal.id))
+        for bucket in buckets.values():
+            heapq.heapify(bucket)
+        high_heap = [(-points, member_id) for member_id, points in scores.items()]
+        heapq.heapify(high_heap)
+
+        def highest():
+            while high_heap:
+                points, member_id = high_heap[0]
+                if scores[member_id] == -points:
+                    return member_id
+                heapq.heappop(high_heap)
+            return None
+
+        for _ in range(len(goals) * 2):
+            high_id = highest()
+            low_id = lowest()
+            if high_id is None or low_id is None or scores[high_id] - scores[low_id] <= max_spread:
+                break
+            if not buckets[high_id]:
                 break
-            goal.assigned_team_id = target_id
-            goal.save(update_fields=["assigned_team"])
-            scores[target_id] += 1
-            assigned_count += 1
-
-        rebalanced = 0
-        if len(team_profiles) > 1 and goals:
-            max_moves = len(goals) * 2
-            for _ in range(max_moves):
-                high_id = max(scores, key=scores.get)
-                low_id = min(scores, key=scores.get)
-                if scores[high_id] - scores[low_id] <= 2:
-                    break
-                candidates = [goal for goal in goals if goal.assigned_team_id == high_id]
-                if not candidates:
-                    break
-                candidates.sort(key=lambda g: (g.due_date or date.max, g.created_at), reverse=True)
-                move_goal = candidates[0]
-                move_goal.assigned_team_id = low_id
-                move_goal.save(update_fields=["assigned_team"])
-                scores[high_id] -= 1
-                scores[low_id] += 1
-                rebalanced += 1
-
-    return {"assigned": assigned_count, "rebalanced": rebalanced}
+            rank, goal_id = heapq.heappop(buckets[high_id])
+            heapq.heappush(buckets[low_id], (rank, goal_id))
+            current[goal_id] = low_id
+            scores[high_id] -= 1
+            scores[low_id] += 1
+            heapq.heappush(high_heap, (-scores[high_id], high_id))
+            heapq.heappush(high_heap, (-scores[low_id], low_id))
+            push_low(high_id)
+            push_low(low_id)
+            rebalanced += 1
+
+    targets = {goal.id: current[goal.id] for goal in goals if current[goal.id] != goal.assigned_team_id}
+    return targets, assigned, rebalanced
+
+
+def rebalance_growpro_assignments(dry_run=False):
+    """
+    Weist GrowPro-Ziele neu zu und schreibt alle Änderungen mit einem
+    ``bulk_update``. Mit ``dry_run=True`` wird nur der Plan geliefert.
+    """
+    team_profiles = list(_team_profiles())
+    if not team_profiles:
+        return {"assigned": 0, "rebalanced": 0, "plan": []}
+
+    team_ids = {profile.id for profile in team_profiles}
+    scores = compute_team_scores(team_profiles)
+    goals = list(
+        GrowProGoal.objects.filter(status__in=["ACTIVE", "ON_HOLD"]).only("id", "assigned_team", "due_date", "created_at")
+    )
+    targets, assigned, rebalanced = plan_growpro_assignments(goals, scores, team_ids)
+    plan = [
+        {"goal_id": goal.id, "from": goal.assigned_team_id, "to": targets[goal.id]}
+        for goal in goals
+        if goal.id in targets
+    ]
+    if not dry_run and plan:
+        changed = [goal for goal in goals if goal.id in targets]
+        affected = {goal.assigned_team_id for goal in changed} | set(targets.values())
+        for goal in changed:
+            goal.assigned_team_id = targets[goal.id]
+        with transaction.atomic():
+            GrowProGoal.objects.bulk_update(changed, ["assigned_team"], batch_size=500)
+            # bulk_update löst keine Signale aus
+            refresh_team_scores(affected)
+    return {"assigned": assigned, "rebalanced": rebalanced, "plan": plan}
+
+
+def schedule_growpro_rebalance():
+    """
+    Plant einen Rebalance-Lauf nach dem Commit. Solange ein Lauf aussteht,
+    werden weitere Aufrufe zusammengefasst; der Handler gibt die Sperre vor
+    dem Lauf frei, spätere Änderungen planen also einen neuen Lauf.
+    """
+    on_commit_batch(_claim_growpro_rebalance)
+
+
+def _claim_growpro_rebalance(_items):
+    # Sperre erst nach dem Commit: ein Rollback blockiert sonst spätere Läufe
+    timeout = max(1, int(getattr(settings, "GROWPRO_REBALANCE_DEBOUNCE_SECONDS", 300)))
+    if cache.add(REBALANCE_PENDING_KEY, 1, timeout=timeout):
+        dispatch("growpro_rebalance", {})
+
+
+def _member_profile_payload(profile):
+    return {
+        "id": profile.id,
+        "name": profile.name or getattr(profile.user, "username", "unbekannt"),
+        "username": getattr(profile.user, "username", "unbekannt"),
+        "max_task_points": _resolve_member_point_cap(profile),
+    }
 
 
 def build_team_points_breakdown(team_profiles=None):
+    """
+    Punktestand je Team-Mitglied, getrennt nach Tasks, Projekten und
+    GrowPro-Zielen. Die Summen kommen gruppiert aus der Datenbank
+    (``compute_scores``); die Einzelposten liefert
+    ``build_team_points_member_detail``.
+    """
     team_profiles = list(team_profiles) if team_profiles is not None else list(_team_profiles())
-    members = {
-        profile.id: {
-            "profile": {
-                "id": profile.id,
-                "name": profile.name or getattr(profile.user, "username", "unbekannt"),
-                "username": getattr(profile.user, "username", "unbekannt"),
-            },
-            "total": 0,
-            "tasks": [],
-            "projects": [],
-            "growpro": [],
-        }
-        for profile in team_profiles
-    }
-    if not members:
+    if not team_profiles:
         return []
-
-    tasks = (
-        Task.objects.filter(is_archived=False)
-        .exclude(status="DONE")
-        .prefetch_related("assignees")
-    )
-    for task in tasks:
-        points = TASK_PRIORITY_SCORE.get(task.priority, 1)
-        for assignee in task.assignees.all():
-            if assignee.id not in members:
-                continue
-            entry = {
-                "id": task.id,
-                "title": task.title,
-                "priority": task.priority,
-                "points": points,
-                "project_id": task.project_id,
+    scores = compute_scores([profile.id for profile in team_profiles])
+    members = []
+    for profile in team_profiles:
+        values = scores[profile.id]
+        members.append(
+            {
+                "profile": _member_profile_payload(profile),
+                "total": values["task_points"] + values["project_points"] + values["goal_points"],
+                "task_points": values["task_points"],
+                "project_points": values["project_points"],
+                "goal_points": values["goal_points"],
             }
-            members[assignee.id]["tasks"].append(entry)
-            members[assignee.id]["total"] += points
+        )
+    return sorted(members, key=lambda item: (-item["total"], item["profile"]["name"]))
 
-    for profile in team_profiles:
-        members[profile.id]["profile"]["max_task_points"] = _resolve_member_point_cap(profile)
-
-    projects = Project.objects.filter(is_archived=False).prefetch_related("participants", "owners")
-    for project in projects:
-        participants = {p.id: p for p in project.participants.all()}
-        owners = {p.id: p for p in project.owners.all()}
-        for member_id in {**participants, **owners}:
-            if member_id not in members:
-                continue
-            entry = {"id": project.id, "title": project.title, "points": 2}
-            members[member_id]["projects"].append(entry)
-            members[member_id]["total"] += 2
-
-    goals = GrowProGoal.objects.filter(status__in=["ACTIVE", "ON_HOLD"]).select_related("assigned_team")
-    for goal in goals:
-        if goal.assigned_team_id not in members:
-            continue
-        entry = {
-            "id": goal.id,
-            "title": goal.title,
-            "status": goal.status,
-            "points": 1,
-            "due_date": goal.due_date,
-        }
-        members[goal.assigned_team_id]["growpro"].append(entry)
-        members[goal.assigned_team_id]["total"] += 1
 
-    return sorted(members.values(), key=lambda item: (-item["total"], item["profile"]["name"]))
+def _daily_buckets(team_ids, start, today):
+    """Plus-/Minus-Punkte je Mitglied und Tag, gruppiert per ``TruncDate``."""
+    plus = defaultdict(lambda: defaultdict(int))
+    minus = defaultdict(lambda: defaultdict(int))
+    assignments = Task.assignees.through.objects.filter(profile_id__in=team_ids)
+
+    created = (
+        assignments.filter(task__created_at__date__range=(start, today), task__is_archived=False)
+        .annotate(day=TruncDate("task__created_at"))
+        .values("profile_id", "day")
+        .annotate(points=Sum(task_points_expression("task__")))
+    )
+    for row in created:
+        plus[row["profile_id"]][row["day"]] += row["points"] or 0
+
+    completed = (
+        assignments.filter(task__completed_at__date__range=(start, today))
+        .annotate(day=TruncDate("task__completed_at"))
+        .values("profile_id", "day")
+        .annotate(points=Sum(task_points_expression("task__")))
+    )
+    for row in completed:
+        minus[row["profile_id"]][row["day"]] += row["points"] or 0
+
+    # Owner und Teilnehmer zählen pro Projekt nur einmal
+    memberships = set()
+    for through in (Project.owners.through, Project.participants.through):
+        rows = (
+            through.objects.filter(
+                profile_id__in=team_ids,
+                project__created_at__date__range=(start, today),
+                project__is_archived=False,
+            )
+            .annotate(day=TruncDate("project__created_at"))
+            .values_list("profile_id", "project_id", "day")
+        )
+        memberships.update(rows)
+    for profile_id, _, day in memberships:
+        plus[profile_id][day] += PROJECT_POINTS
+
+    goals = (
+        GrowProGoal.objects.filter(assigned_team_id__in=team_ids, created_at__date__range=(start, today))
+        .annotate(day=TruncDate("created_at"))
+        .values("assigned_team_id", "day")
+        .annotate(c=Count("id"))
+    )
+    for row in goals:
+        plus[row["assigned_team_id"]][row["day"]] += row["c"] * GOAL_POINTS
+    return plus, minus
 
 
 def build_team_points_daily(team_profiles=None, days=7):
+    """Tageswerte (heute und Durchschnitt über ``days`` Tage) je Mitglied."""
     team_profiles = list(team_profiles) if team_profiles is not None else list(_team_profiles())
-    today = timezone.now().date()
-    start = today - timedelta(days=max(days, 1) - 1)
-    days_list = [start + timedelta(days=offset) for offset in range((today - start).days + 1)]
-
-    stats = {
-        profile.id: {
-            "daily": {day: {"plus": 0, "minus": 0} for day in days_list},
-            "today_plus_details": [],
-            "today_minus_details": [],
-        }
-        for profile in team_profiles
-    }
-    if not stats:
+    if not team_profiles:
         return {}
-
-    tasks_created = (
-        Task.objects.filter(created_at__date__range=(start, today), is_archived=False)
-        .prefetch_related("assignees")
-    )
-    for task in tasks_created:
-        points = TASK_PRIORITY_SCORE.get(task.priority, 1)
-        day = task.created_at.date()
-        for assignee in task.assignees.all():
-            if assignee.id not in stats:
-                continue
-            stats[assignee.id]["daily"][day]["plus"] += points
-            if day == today:
-                stats[assignee.id]["today_plus_details"].append(
-                    {"title": task.title, "points": points, "type": "task_created"}
-                )
-
-    tasks_completed = (
-        Task.objects.filter(completed_at__date__range=(start, today))
-        .prefetch_related("assignees")
-    )
-    for task in tasks_completed:
-        points = TASK_PRIORITY_SCORE.get(task.priority, 1)
-        day = task.completed_at.date()
-        for assignee in task.assignees.all():
-            if assignee.id not in stats:
-                continue
-            stats[assignee.id]["daily"][day]["minus"] += points
-            if day == today:
-                stats[assignee.id]["today_minus_details"].append(
-                    {"title": task.title, "points": points, "type": "task_completed"}
-                )
-
-    projects_created = Project.objects.filter(created_at__date__range=(start, today), is_archived=False).prefetch_related(
-        "participants", "owners"
-    )
-    for project in projects_created:
-        day = project.created_at.date()
-        members = {p.id for p in project.participants.all()} | {p.id for p in project.owners.all()}
-        for member_id in members:
-            if member_id not in stats:
-                continue
-            stats[member_id]["daily"][day]["plus"] += 2
-            if day == today:
-                stats[member_id]["today_plus_details"].append(
-                    {"title": project.title, "points": 2, "type": "project_created"}
-                )
-
-    goals_created = GrowProGoal.objects.filter(
-        created_at__date__range=(start, today),
-        assigned_team__isnull=False,
-    ).select_related("assigned_team")
-    for goal in goals_created:
-        member_id = goal.assigned_team_id
-        if member_id not in stats:
-            continue
-        day = goal.created_at.date()
-        stats[member_id]["daily"][day]["plus"] += 1
-        if day == today:
-            stats[member_id]["today_plus_details"].append(
-                {"title": goal.title, "points": 1, "type": "growpro_created"}
-            )
+    today = timezone.localdate()
+    days_count = max(days, 1)
+    start = today - timedelta(days=days_count - 1)
+    plus, minus = _daily_buckets([profile.id for profile in team_profiles], start, today)
 
     summary = {}
-    for member_id, data in stats.items():
-        total_plus = sum(entry["plus"] for entry in data["daily"].values())
-        total_minus = sum(entry["minus"] for entry in data["daily"].values())
-        days_count = len(data["daily"]) or 1
-        today_stats = data["daily"].get(today, {"plus": 0, "minus": 0})
-        summary[member_id] = {
-            "today_plus": today_stats["plus"],
-            "today_minus": today_stats["minus"],
-            "today_net": today_stats["plus"] - today_stats["minus"],
+    for profile in team_profiles:
+        member_plus = plus.get(profile.id, {})
+        member_minus = minus.get(profile.id, {})
+        total_plus = sum(member_plus.values())
+        total_minus = sum(member_minus.values())
+        today_plus = member_plus.get(today, 0)
+        today_minus = member_minus.get(today, 0)
+        summary[profile.id] = {
+            "today_plus": today_plus,
+            "today_minus": today_minus,
+            "today_net": today_plus - today_minus,
             "avg_daily_plus": round(total_plus / days_count, 2),
             "avg_daily_minus": round(total_minus / days_count, 2),
             "avg_daily_net": round((total_plus - total_minus) / days_count, 2),
-            "today_plus_details": data["today_plus_details"],
-            "today_minus_details": data["today_minus_details"],
         }
     return summary
+
+
+def build_team_points_member_detail(profile):
+    """
+    Einzelposten eines Mitglieds für ``/api/team-points/?member=<id>``:
+    offene Tasks, aktive Projekte, GrowPro-Ziele und die heutigen
+    Zu-/Abgänge.
+    """
+    today = timezone.localdate()
+    tasks = (
+        Task.objects.filter(assignees=profile, is_archived=False)
+        .exclude(status="DONE")
+        .order_by("id")
+        .values("id", "title", "priority", "project_id")
+    )
+    task_entries = [{**task, "points": TASK_PRIORITY_SCORE.get(task["priority"], 1)} for task in tasks]
+
+    projects = (
+        Project.objects.filter(Q(owners=profile) | Q(participants=profile), is_archived=False)
+        .distinct()
+        .order_by("id")
+        .values("id", "title", "created_at")
+    )
+    project_entries = [
+        {"id": project["id"], "title": project["title"], "points": PROJECT_POINTS} for project in projects
+    ]
+
+    goals = (
+        GrowProGoal.objects.filter(assigned_team=profile)
+        .order_by("id")
+        .values("id", "title", "status", "due_date", "created_at")
+    )
+    goal_entries = [
+        {
+            "id": goal["id"],
+            "title": goal["title"],
+            "status": goal["status"],
+            "points": GOAL_POINTS,
+            "due_date": goal["due_date"],
+        }
+        for goal in goals
+        if goal["status"] in ACTIVE_GOAL_STATUSES
+    ]
+
+    today_plus = [
+        {"title": task.title, "points": TASK_PRIORITY_SCORE.get(task.priority, 1), "type": "task_created"}
+        for task in Task.objects.filter(assignees=profile, created_at__date=today, is_archived=False).only(
+            "title", "priority"
+        )
+    ]
+    today_plus += [
+        {"title": project["title"], "points": PROJECT_POINTS, "type": "project_created"}
+        for project in projects
+        if timezone.localtime(project["created_at"]).date() == today
+    ]
+    today_plus += [
+        {"title": goal["title"], "points": GOAL_POINTS, "type": "growpro_created"}
+        for goal in goals
+        if timezone.localtime(goal["created_at"]).date() == today
+    ]
+    today_minus = [
+        {"title": task.title, "points": TASK_PRIORITY_SCORE.get(task.priority, 1), "type": "task_completed"}
+        for task in Task.objects.filter(assignees=profile, completed_at__date=today).only("title", "priority")
+    ]
+    return {
+        "profile": _member_profile_payload(profile),
+        "tasks": task_entries,
+        "projects": project_entries,
+        "growpro": goal_entries,
+        "today_plus_details": today_plus,
+        "today_minus_details": today_minus,
+    }
+
+
+def build_team_points_payload(team_profiles=None):
+    """Punkte-Übersicht inkl. Tageswerten, wie sie ``/api/team-points/`` liefert."""
+    team_profiles = list(team_profiles) if team_profiles is not None else list(_team_profiles().select_related("user"))
+    members = build_team_points_breakdown(team_profiles)
+    daily = build_team_points_daily(team_profiles)
+    for member in members:
+        member["daily"] = daily.get(member["profile"]["id"], {})
+    return {"members": members, "rules": TEAM_POINTS_RULES}
@@ -1,15 +1,29 @@
 from datetime import datetime, time, timedelta
 
+from django.db.models import Exists, OuterRef
 from django.utils import timezone
-
-from .models import ActivityEntry, AutomationRule, GrowProGoal, Profile, Project, Task
+from django.utils.dateparse import parse_date
+
+from .models import (
+    ActivityEntry,
+    AutomationRule,
+    GrowProGoal,
+    JobCheckpoint,
+    Profile,
+    Project,
+    ReminderLedger,
+    Task,
+)
 from .notifications import notify_profiles, send_notification_email
 from .utils import log_activity
 
 
-def _profile_emails(profiles):
+def _profile_emails(profiles, exclude_ids=None):
     emails = []
+    exclude_ids = set(exclude_ids or [])
     for profile in profiles:
+        if profile.id in exclude_ids:
+            continue
         user = getattr(profile, "user", None)
         email = getattr(user, "email", None)
         if email:
@@ -28,18 +42,34 @@ def _dedupe_profiles(profiles):
     return unique
 
 
-def _already_reminded(task, event_type):
-    return ActivityEntry.objects.filter(
-        event_type=event_type,
-        task=task,
-        metadata__due_date=str(task.due_date),
-    ).exists()
+def exclude_reminded_tasks(queryset, event_type):
+    """
+    Filtert Tasks heraus, für deren aktuelles Fälligkeitsdatum bereits ein
+    ``event_type``-Eintrag im ReminderLedger existiert (ein Set-Query).
+    """
+    return queryset.annotate(
+        _already_reminded=Exists(
+            ReminderLedger.objects.filter(
+                task=OuterRef("pk"),
+                event_type=event_type,
+                due_date=OuterRef("due_date"),
+            )
+        )
+    ).filter(_already_reminded=False)
+
+
+def record_task_reminders(tasks, event_type):
+    entries = [
+        ReminderLedger(task_id=task.id, event_type=event_type, due_date=task.due_date)
+        for task in tasks
+        if task.due_date
+    ]
+    if entries:
+        ReminderLedger.objects.bulk_create(entries, batch_size=500, ignore_conflicts=True)
 
 
 def _notify_task(task, subject, message, event_type, severity, days, dry_run):
-    if _already_reminded(task, event_type):
-        return {"skipped": 1}
-    assignees = list(task.assignees.select_related("user"))
+    assignees = list(task.assignees.all())
     recipients = _profile_emails(assignees)
     if not recipients:
         return {"no_recipients": 1}
@@ -68,6 +98,21 @@ def _notify_task(task, subject, message, event_type, severity, days, dry_run):
     return {"tasks_notified": 1, "emails_sent": len(recipients)}
 
 
+def _send_reminder_batch(queryset, event_type, build_message, severity, days, dry_run, summary):
+    total = queryset.count()
+    pending = list(exclude_reminded_tasks(queryset, event_type))
+    summary["skipped"] += total - len(pending)
+    for task in pending:
+        subject, message = build_message(task)
+        result = _notify_task(task, subject, message, event_type, severity, days, dry_run)
+        for key, value in result.items():
+            summary[key] += value
+        # Ledger direkt nach dem Versand: bricht der Lauf ab, wird nichts doppelt erinnert
+        if result.get("tasks_notified") and not dry_run:
+            record_task_reminders([task], event_type)
+    return total
+
+
 def send_task_reminders(days=3, include_overdue=True, include_due_soon=True, dry_run=False):
     today = timezone.now().date()
     end = today + timedelta(days=days)
@@ -88,40 +133,96 @@ def send_task_reminders(days=3, include_overdue=True, include_due_soon=True, dry
     )
 
     if include_due_soon and days > 0:
-        due_soon = base_qs.filter(due_date__isnull=False, due_date__gte=today, due_date__lte=end)
-        summary["tasks_due_soon"] = due_soon.count()
-        for task in due_soon:
-            result = _notify_task(
-                task,
-                f"Task reminder: {task.title}",
-                f"Task is due on {task.due_date}.",
-                "task_reminder_due_soon",
-                "WARNING",
-                days,
-                dry_run,
-            )
-            for key, value in result.items():
-                summary[key] += value
+        summary["tasks_due_soon"] = _send_reminder_batch(
+            base_qs.filter(due_date__isnull=False, due_date__gte=today, due_date__lte=end),
+            "task_reminder_due_soon",
+            lambda task: (f"Task reminder: {task.title}", f"Task is due on {task.due_date}."),
+            "WARNING",
+            days,
+            dry_run,
+            summary,
+        )
 
     if include_overdue:
-        overdue = base_qs.filter(due_date__isnull=False, due_date__lt=today)
-        summary["tasks_overdue"] = overdue.count()
-        for task in overdue:
-            result = _notify_task(
-                task,
+        summary["tasks_overdue"] = _send_reminder_batch(
+            base_qs.filter(due_date__isnull=False, due_date__lt=today),
+            "task_reminder_overdue",
+            lambda task: (
                 f"Task overdue: {task.title}",
                 f"Task was due on {task.due_date}. Please update the status.",
-                "task_reminder_overdue",
-                "DANGER",
-                days,
-                dry_run,
-            )
-            for key, value in result.items():
-                summary[key] += value
+            ),
+            "DANGER",
+            days,
+            dry_run,
+            summary,
+        )
 
     return summary
 
 
+def _overdue_activity_entry(task):
+    return ActivityEntry(
+        event_type="task_overdue",
+        title=f"Deadline verpasst: {task.title}",
+        description=f"Fällig am {task.due_date}",
+        severity="DANGER",
+        task=task,
+        project=task.project,
+        metadata={"due_date": str(task.due_date)},
+    )
+
+
+def log_overdue_tasks(queryset=None, today=None):
+    """
+    Schreibt ``task_overdue``-Activity-Einträge für alle überfälligen Tasks,
+    die für ihr aktuelles Fälligkeitsdatum noch keinen Ledger-Eintrag haben.
+    """
+    today = today or timezone.now().date()
+    if queryset is None:
+        queryset = Task.objects.all()
+    pending = list(
+        exclude_reminded_tasks(
+            queryset.select_related("project")
+            .filter(is_archived=False, due_date__lt=today)
+            .exclude(status="DONE"),
+            "task_overdue",
+        )
+    )
+    if not pending:
+        return 0
+    ActivityEntry.objects.bulk_create([_overdue_activity_entry(task) for task in pending], batch_size=500)
+    record_task_reminders(pending, "task_overdue")
+    return len(pending)
+
+
+OVERDUE_SCAN_CHECKPOINT = "overdue-scan"
+
+
+def scan_overdue_tasks(today=None):
+    """
+    Inkrementeller Overdue-Scan: verarbeitet nur Tasks, deren Fälligkeit
+    seit dem letzten Lauf überschritten wurde (``last_scanned <= due_date <
+    today``). Nachträglich in die Vergangenheit verschobene Tasks deckt der
+    ``task_updated``-Side-Effect ab.
+    """
+    today = today or timezone.now().date()
+    checkpoint = JobCheckpoint.objects.filter(key=OVERDUE_SCAN_CHECKPOINT).first()
+    last_scanned = parse_date(checkpoint.value) if checkpoint and checkpoint.value else None
+    queryset = Task.objects.filter(due_date__lt=today)
+    if last_scanned:
+        queryset = queryset.filter(due_date__gte=last_scanned)
+    logged = log_overdue_tasks(queryset, today=today)
+    JobCheckpoint.objects.update_or_create(
+        key=OVERDUE_SCAN_CHECKPOINT,
+        defaults={"value": today.isoformat()},
+    )
+    return {
+        "scanned_from": last_scanned.isoformat() if last_scanned else None,
+        "scanned_until": today.isoformat(),
+        "logged": logged,
+    }
+
+
 def _growpro_due_at(goal):
     # Prefer explicit due_at datetime if set
     if getattr(goal, "due_at", None):
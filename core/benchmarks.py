@@ -0,0 +1,459 @@
+"""
+Benchmark-Szenarien für ``manage.py benchmark``.
+
+Jedes Szenario seedet seine Daten selbst und läuft in einer Transaktion,
+die am Ende zurückgerollt wird – die Datenbank bleibt unverändert.
+Neue Szenarien werden per ``@benchmark("name")`` registriert und liefern
+ein dict mit Messwerten (Millisekunden) zurück.
+"""
+
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from asgiref.sync import async_to_sync
+from channels.layers import InMemoryChannelLayer, get_channel_layer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .access import materialized_task_visibility_q, task_visibility_q
+from .assignment import build_team_points_breakdown, build_team_points_daily
+from .coalescer import RealtimeCoalescer
+from .models import ChatThread, GrowProGoal, Profile, Project, Role, Task, Tournament, TournamentBattle, TournamentSubmission
+from .team_scores import TASK_PRIORITY_SCORE
+from .visibility import rebuild_visibility
+from .ws_auth import JWTAuthMiddleware, invalidate_ws_principals
+
+BENCHMARKS = {}
+
+
+def benchmark(name, description=""):
+    def decorator(func):
+        func.description = description
+        BENCHMARKS[name] = func
+        return func
+
+    return decorator
+
+
+def run_benchmark(name, **options):
+    func = BENCHMARKS.get(name)
+    if func is None:
+        raise KeyError(f"Unbekanntes Benchmark-Szenario: {name}")
+    with transaction.atomic():
+        try:
+            return func(**options)
+        finally:
+            transaction.set_rollback(True)
+
+
+def measure(fn, repeat=5):
+    """Führt ``fn`` ``repeat``-mal aus und liefert Median/Min/Max in ms."""
+    timings = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": round(statistics.median(timings), 2),
+        "min_ms": round(min(timings), 2),
+        "max_ms": round(max(timings), 2),
+    }
+
+
+def percentiles(timings):
+    """p50/p95/p99/Max einer Liste von Einzelmessungen in ms."""
+    ordered = sorted(timings)
+    if not ordered:
+        return {}
+
+    def pick(quantile):
+        return round(ordered[min(len(ordered) - 1, int(quantile * len(ordered)))], 2)
+
+    return {"p50_ms": pick(0.5), "p95_ms": pick(0.95), "p99_ms": pick(0.99), "max_ms": round(ordered[-1], 2)}
+
+
+def seed_profiles(count, prefix="bench"):
+    stamp = int(time.time() * 1000)
+    users = User.objects.bulk_create(
+        [User(username=f"{prefix}-{stamp}-{idx}") for idx in range(count)],
+        batch_size=1000,
+    )
+    return Profile.objects.bulk_create(
+        [Profile(user=user, name=f"{prefix} {idx}") for idx, user in enumerate(users)],
+        batch_size=1000,
+    )
+
+
+def seed_tasks(size, *, projects=1000, members=50, seed=42):
+    """
+    Seedet ``size`` Tasks über ``projects`` Projekte mit zufälligen
+    Teilnehmern/Owners/Assignees/Stakeholders aus ``members`` Profilen.
+    """
+    rng = random.Random(seed)
+    profiles = seed_profiles(members)
+    project_rows = Project.objects.bulk_create(
+        [Project(title=f"Bench {idx}") for idx in range(projects)],
+        batch_size=1000,
+    )
+    Project.participants.through.objects.bulk_create(
+        [
+            Project.participants.through(project_id=project.id, profile_id=profile.id)
+            for project in project_rows
+            for profile in rng.sample(profiles, 3)
+        ],
+        batch_size=2000,
+    )
+    Project.owners.through.objects.bulk_create(
+        [
+            Project.owners.through(project_id=project.id, profile_id=rng.choice(profiles).id)
+            for project in project_rows
+        ],
+        batch_size=2000,
+    )
+    today = timezone.now().date()
+    statuses = ["OPEN", "IN_PROGRESS", "REVIEW", "DONE"]
+    tasks = Task.objects.bulk_create(
+        [
+            Task(
+                title=f"Bench task {idx}",
+                project=rng.choice(project_rows),
+                status=rng.choice(statuses),
+                due_date=today + timedelta(days=rng.randint(-30, 60)),
+                is_archived=rng.random() < 0.05,
+            )
+            for idx in range(size)
+        ],
+        batch_size=2000,
+    )
+    Task.assignees.through.objects.bulk_create(
+        [
+            Task.assignees.through(task_id=task.id, profile_id=profile.id)
+            for task in tasks
+            for profile in rng.sample(profiles, 2)
+        ],
+        batch_size=5000,
+    )
+    Task.stakeholders.through.objects.bulk_create(
+        [Task.stakeholders.through(task_id=task.id, profile_id=rng.choice(profiles).id) for task in tasks],
+        batch_size=5000,
+    )
+    return profiles, project_rows, tasks
+
+
+def _legacy_task_visibility(profile):
+    return Task.objects.filter(
+        Q(project__participants=profile)
+        | Q(project__owners=profile)
+        | Q(assignees=profile)
+        | Q(stakeholders=profile)
+    ).distinct()
+
+
+@benchmark("task_visibility", "Task-Liste/Count für ein Nicht-Team-Profil (OR+DISTINCT vs. Subqueries vs. TaskVisibility)")
+def task_visibility_benchmark(size=100_000, repeat=5, page_size=10):
+    profiles, _, _ = seed_tasks(size)
+    profile = profiles[0]
+    # bulk_create löst keine Signale aus – Tabelle einmal komplett aufbauen
+    rebuild = measure(rebuild_visibility, 1)
+    variants = {
+        "or_distinct": lambda: _legacy_task_visibility(profile),
+        "subquery": lambda: Task.objects.filter(task_visibility_q(profile)),
+        "materialized": lambda: Task.objects.filter(materialized_task_visibility_q(profile)),
+    }
+    results = {"tasks": size, "rebuild_visibility": rebuild}
+    for label, build in variants.items():
+        results[label] = {
+            "count": measure(lambda: build().filter(is_archived=False).count(), repeat),
+            "first_page": measure(
+                lambda: list(build().filter(is_archived=False).order_by("-created_at")[:page_size]),
+                repeat,
+            ),
+            "rows": build().count(),
+        }
+    return results
+
+
+def _legacy_team_points(team_profiles):
+    """Bisherige Variante: alle offenen Tasks/Projekte/Ziele in Python summieren."""
+    totals = {profile.id: 0 for profile in team_profiles}
+    for task in Task.objects.filter(is_archived=False).exclude(status="DONE").prefetch_related("assignees"):
+        for assignee in task.assignees.all():
+            if assignee.id in totals:
+                totals[assignee.id] += TASK_PRIORITY_SCORE.get(task.priority, 1)
+    for project in Project.objects.filter(is_archived=False).prefetch_related("participants", "owners"):
+        members = {p.id for p in project.participants.all()} | {p.id for p in project.owners.all()}
+        for member_id in members & totals.keys():
+            totals[member_id] += 2
+    for goal in GrowProGoal.objects.filter(status__in=["ACTIVE", "ON_HOLD"]):
+        if goal.assigned_team_id in totals:
+            totals[goal.assigned_team_id] += 1
+    return totals
+
+
+@benchmark("team_points", "Team-Punkte (Python-Schleife vs. gruppierte Aggregation) für 50 Mitglieder")
+def team_points_benchmark(size=20_000, repeat=5, members=50):
+    profiles, _, tasks = seed_tasks(size, projects=max(size // 20, 1), members=members)
+    Task.objects.filter(id__in=[task.id for task in tasks]).update(status="OPEN", is_archived=False)
+    team_role, _ = Role.objects.get_or_create(key="TEAM")
+    Profile.roles.through.objects.bulk_create(
+        [Profile.roles.through(profile_id=profile.id, role_id=team_role.id) for profile in profiles],
+        ignore_conflicts=True,
+    )
+    team_profiles = list(Profile.objects.filter(id__in=[p.id for p in profiles]).select_related("user"))
+    return {
+        "tasks": size,
+        "members": len(team_profiles),
+        "legacy": measure(lambda: _legacy_team_points(team_profiles), repeat),
+        "breakdown": measure(lambda: build_team_points_breakdown(team_profiles), repeat),
+        "daily": measure(lambda: build_team_points_daily(team_profiles), repeat),
+    }
+
+
+@benchmark("vote_spike", "Live-Battle: tausende Voter stimmen über den Vote-Endpoint für eine Battle ab")
+def vote_spike_benchmark(size=2_000, repeat=2):
+    """
+    ``size`` Voter stimmen nacheinander über den kompletten View-Pfad ab;
+    ab der zweiten Runde (``repeat``) wechseln alle die Seite (Upsert-Update).
+    Post-Commit-Effekte (Ranked-Refresh, Live-Push) laufen wegen des
+    Rollbacks nicht mit.
+    """
+    from rest_framework.test import APIClient
+
+    owner, left_profile, right_profile = seed_profiles(3, prefix="vote-owner")
+    tournament = Tournament.objects.create(
+        created_by=owner, title="Vote Spike", status="BATTLES", max_votes_per_ip_per_hour=0
+    )
+    left = TournamentSubmission.objects.create(tournament=tournament, profile=left_profile, status="APPROVED")
+    right = TournamentSubmission.objects.create(tournament=tournament, profile=right_profile, status="APPROVED")
+    battle = TournamentBattle.objects.create(
+        tournament=tournament, left_submission=left, right_submission=right, status="LIVE"
+    )
+    voter_ids = [profile.id for profile in seed_profiles(size, prefix="voter")]
+    # Etablierte Accounts mit Rolle, damit die Votes nicht in die Moderation laufen
+    User.objects.filter(profile__id__in=voter_ids).update(date_joined=timezone.now() - timedelta(days=30))
+    artist_role, _ = Role.objects.get_or_create(key="ARTIST")
+    Profile.roles.through.objects.bulk_create(
+        [Profile.roles.through(profile_id=profile_id, role_id=artist_role.id) for profile_id in voter_ids],
+        batch_size=1000,
+    )
+    voters = list(Profile.objects.filter(id__in=voter_ids).select_related("user"))
+    client = APIClient()
+
+    rounds = []
+    for round_idx in range(max(1, repeat)):
+        submission = (left, right)[round_idx % 2]
+        timings = []
+        start = time.perf_counter()
+        for idx, voter in enumerate(voters):
+            client.force_authenticate(user=voter.user)
+            # Adressen aus 198.18.0.0/15 (Benchmark-Netz), damit reale IP-Zähler unberührt bleiben
+            ip = f"198.18.{idx // 250}.{idx % 250 + 1}"
+            vote_start = time.perf_counter()
+            response = client.post(
+                "/api/tournament-votes/",
+                {"battle": battle.id, "selected_submission": submission.id},
+                format="json",
+                REMOTE_ADDR=ip,
+            )
+            timings.append((time.perf_counter() - vote_start) * 1000)
+            if response.status_code not in (200, 201):
+                raise RuntimeError(f"Vote fehlgeschlagen: {response.status_code} {response.content[:200]!r}")
+        elapsed = time.perf_counter() - start
+        timings.sort()
+        rounds.append(
+            {
+                "votes": len(voters),
+                "votes_per_second": round(len(voters) / elapsed, 1) if elapsed else None,
+                "median_ms": round(statistics.median(timings), 2),
+                "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 2),
+                "max_ms": round(timings[-1], 2),
+            }
+        )
+    client.force_authenticate(user=None)
+    battle.refresh_from_db()
+    return {
+        "voters": len(voters),
+        "rounds": rounds,
+        "tally": [battle.votes_left_approved, battle.votes_right_approved],
+    }
+
+
+@benchmark("realtime_burst", "Realtime-Events einer Bulk-Operation: Einzelversand vs. Coalescer")
+def realtime_burst_benchmark(size=5_000, repeat=5, tasks=200):
+    """``size`` Task-Updates über ``tasks`` Tasks in 10 Projekten gegen einen In-Memory-Layer."""
+    events = []
+    for idx in range(size):
+        task_id = idx % tasks + 1
+        revision = idx // tasks + 1
+        events.append(
+            (
+                ["tasks_all", f"project_{task_id % 10}"],
+                {
+                    "entity": "task",
+                    "action": "updated",
+                    "id": task_id,
+                    "project": task_id % 10,
+                    "revision": revision,
+                    "base_revision": revision - 1,
+                    "changes": {"status": ("OPEN", "IN_PROGRESS", "DONE")[idx % 3]},
+                },
+            )
+        )
+    layer = InMemoryChannelLayer()
+    group_send = async_to_sync(layer.group_send)
+
+    def legacy():
+        for groups, event in events:
+            for group in groups:
+                group_send(group, {"type": "updates.message", "payload": event})
+
+    metrics = {}
+
+    def coalesced():
+        # window_ms=0: der Flush hinge am Commit – hier wird direkt geflusht
+        coalescer = RealtimeCoalescer(
+            lambda group, batch: group_send(group, {"type": "updates.batch", "events": batch}), window_ms=0
+        )
+        for groups, event in events:
+            coalescer.add(groups, event)
+        coalescer.flush()
+        metrics.update(coalescer.snapshot())
+
+    return {
+        "events": size,
+        "tasks": tasks,
+        "legacy": measure(legacy, repeat),
+        "coalesced": measure(coalesced, repeat),
+        "metrics": metrics,
+    }
+
+
+@benchmark("ws_reconnect_storm", "Reconnect-Sturm: tausende Sockets verbinden gleichzeitig auf /ws/updates/ (In-Memory-Layer)")
+def ws_reconnect_storm_benchmark(size=2_000, repeat=2, users=200):
+    """
+    ``size`` Sockets von ``users`` Team-Profilen verbinden gleichzeitig über
+    ``JWTAuthMiddleware``. Runde 1 startet mit leerem Principal-Cache, jede
+    weitere Runde ist ein Reconnect-Sturm mit warmem Cache.
+    """
+    from .routing import websocket_urlpatterns
+
+    team_role, _ = Role.objects.get_or_create(key="TEAM")
+    profiles = seed_profiles(users, prefix="storm")
+    Profile.roles.through.objects.bulk_create(
+        [Profile.roles.through(profile_id=profile.id, role_id=team_role.id) for profile in profiles]
+    )
+    tokens = [str(AccessToken.for_user(profile.user)) for profile in profiles]
+    application = JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+
+    async def connect(token):
+        communicator = WebsocketCommunicator(application, f"/ws/updates/?token={token}")
+        start = time.perf_counter()
+        connected, _ = await communicator.connect(timeout=60)
+        return communicator, connected, (time.perf_counter() - start) * 1000
+
+    async def storm():
+        results = await asyncio.gather(*(connect(tokens[idx % len(tokens)]) for idx in range(size)))
+        await asyncio.gather(*(communicator.disconnect(timeout=60) for communicator, _, _ in results))
+        return results
+
+    rounds = []
+    invalidate_ws_principals()
+    try:
+        with override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}):
+            for round_idx in range(max(1, repeat)):
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    results = async_to_sync(storm)()
+                    total_ms = (time.perf_counter() - start) * 1000
+                timings = [elapsed for _, connected, elapsed in results if connected]
+                rounds.append(
+                    {
+                        "cache": "cold" if round_idx == 0 else "warm",
+                        "connected": len(timings),
+                        "queries": len(queries),
+                        "total_ms": round(total_ms, 2),
+                        **percentiles(timings),
+                    }
+                )
+    finally:
+        invalidate_ws_principals()
+    return {"sockets": size, "users": users, "rounds": rounds}
+
+
+@benchmark("chat_throughput", "Chat: Nachrichten/Sekunde eines Workers über ChatConsumer (In-Memory-Layer)")
+def chat_throughput_benchmark(size=2_000, repeat=3):
+    """
+    Beide Mitglieder eines Threads sind verbunden; der Sender schickt
+    ``size`` Nachrichten am Stück, gemessen wird, bis der Empfänger alle
+    erhalten hat. Gezählt werden Queries und ``group_send`` je Nachricht.
+    """
+    from .routing import websocket_urlpatterns
+
+    sender, receiver = seed_profiles(2, prefix="chat")
+    thread = ChatThread.objects.create(a=sender, b=receiver)
+    tokens = [str(AccessToken.for_user(profile.user)) for profile in (sender, receiver)]
+    application = JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+    group_sends = []
+
+    async def run_round():
+        sockets = [WebsocketCommunicator(application, f"/ws/chat/{thread.id}/?token={token}") for token in tokens]
+        for socket in sockets:
+            connected, _ = await socket.connect(timeout=10)
+            if not connected:
+                raise RuntimeError("Chat-Socket wurde abgelehnt")
+        sending, receiving = sockets
+        group_sends.clear()
+        start = time.perf_counter()
+        for idx in range(size):
+            await sending.send_to(text_data=json.dumps({"text": f"Nachricht {idx}"}))
+        for _ in range(size):
+            await receiving.receive_from(timeout=60)
+        elapsed = time.perf_counter() - start
+        for socket in sockets:
+            await socket.disconnect(timeout=10)
+        return elapsed
+
+    rounds = []
+    invalidate_ws_principals()
+    # close_old_connections würde die zurückgerollte Benchmark-Transaktion abbrechen
+    with mock.patch("channels.db.close_old_connections"), override_settings(
+        CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer", "CONFIG": {"capacity": size + 100}}}
+    ):
+        layer = get_channel_layer()
+        original_group_send = layer.group_send
+
+        async def counting_group_send(group, message):
+            group_sends.append(message["type"])
+            await original_group_send(group, message)
+
+        layer.group_send = counting_group_send
+        try:
+            for _ in range(max(1, repeat)):
+                with CaptureQueriesContext(connection) as queries:
+                    elapsed = async_to_sync(run_round)()
+                inserts = [q for q in queries.captured_queries if q["sql"].startswith('INSERT INTO "core_chatmessage"')]
+                rounds.append(
+                    {
+                        "messages": size,
+                        "messages_per_sec": round(size / elapsed, 1),
+                        "ms_per_message": round(elapsed * 1000 / size, 3),
+                        "inserts": len(inserts),
+                        "connect_queries": len(queries) - len(inserts),
+                        "group_sends": group_sends.count("chat.message"),
+                    }
+                )
+        finally:
+            invalidate_ws_principals()
+    return {"thread": thread.id, "rounds": rounds}
@@ -0,0 +1,144 @@
+"""
+Bündelt Realtime-Events vor dem Versand.
+
+Bulk-Operationen (Archivieren aller Tasks eines Projekts, ``ASSIGN``-
+Automationen, wiederkehrende Tasks) erzeugen viele Events kurz
+hintereinander. Der Coalescer sammelt sie je Gruppe und Entität, führt
+mehrere Events derselben Entität zu einem zusammen und sendet je Gruppe
+einen ``updates.batch``-Frame.
+
+Zeitfenster: ``REALTIME_COALESCE_MS`` (Default 100). ``0`` heißt "bis zum
+Ende der aktuellen Transaktion" – außerhalb von ``atomic`` also sofort.
+``metrics`` zählt eingehende Events gegen ausgehende Frames.
+"""
+
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def _base_revision(event):
+    return event.get("base_revision", event["revision"] - 1)
+
+
+def merge_events(earlier, later):
+    """
+    Fasst zwei Events derselben Entität zusammen. Die Revision stammt vom
+    späteren, ``base_revision`` vom früheren Event – Clients auf genau
+    diesem Stand können das zusammengeführte Delta anwenden.
+    """
+    merged = dict(later, base_revision=_base_revision(earlier))
+    if later["action"] == "deleted" or earlier["action"] == "deleted":
+        return merged
+    later_changes = later.get("changes")
+    if earlier["action"] == "created":
+        merged["action"] = "created"
+        merged.pop("changes", None)
+        if earlier.get("data") is not None and later_changes is not None:
+            merged["data"] = dict(earlier["data"], **later_changes, revision=later["revision"])
+        else:
+            merged["data"] = None
+        return merged
+    earlier_changes = earlier.get("changes")
+    if earlier_changes is None or later_changes is None:
+        merged["changes"] = None
+    else:
+        merged["changes"] = dict(earlier_changes, **later_changes)
+    return merged
+
+
+class RealtimeCoalescer:
+    def __init__(self, send_batch, window_ms=None):
+        self._send_batch = send_batch
+        self._window_ms = window_ms
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._scheduled = False
+        self.metrics = {"events_in": 0, "events_merged": 0, "events_out": 0, "frames_out": 0, "flushes": 0}
+
+    def window_ms(self):
+        if self._window_ms is not None:
+            return self._window_ms
+        return max(0, int(getattr(settings, "REALTIME_COALESCE_MS", 100)))
+
+    def add(self, groups, event):
+        key = (event["entity"], event["id"])
+        window = self.window_ms()
+        with self._lock:
+            self.metrics["events_in"] += 1
+            merged = False
+            for group in groups:
+                bucket = self._pending.setdefault(group, {})
+                if key in bucket:
+                    bucket[key] = merge_events(bucket[key], event)
+                    merged = True
+                else:
+                    bucket[key] = event
+            if merged:
+                self.metrics["events_merged"] += 1
+            # Ohne Zeitfenster je Event ein on_commit: nach einem Rollback
+            # bliebe sonst ein nie ausgelöster Flush "geplant" stehen
+            schedule = window <= 0 or not self._scheduled
+            if window > 0:
+                self._scheduled = True
+        if schedule:
+            self._schedule(window)
+
+    def _schedule(self, window):
+        if window <= 0:
+            transaction.on_commit(self.flush)
+            return
+        timer = threading.Timer(window / 1000, self.flush)
+        timer.daemon = True
+        timer.start()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._scheduled = False
+        frames = 0
+        events = 0
+        for group, bucket in pending.items():
+            batch = list(bucket.values())
+            try:
+                self._send_batch(group, batch)
+            except Exception:
+                logger.exception("Realtime-Batch an %s fehlgeschlagen", group)
+                continue
+            frames += 1
+            events += len(batch)
+        with self._lock:
+            self.metrics["frames_out"] += frames
+            self.metrics["events_out"] += events
+            self.metrics["flushes"] += 1
+        if frames:
+            logger.debug("Realtime-Flush: %s Events in %s Frames", events, frames)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.metrics)
+
+    def reset_metrics(self):
+        with self._lock:
+            for key in self.metrics:
+                self.metrics[key] = 0
+
+
+_coalescer = None
+_coalescer_lock = threading.Lock()
+
+
+def get_coalescer(send_batch):
+    """Prozessweiter Coalescer; ausstehende Events werden beim Beenden noch gesendet."""
+    global _coalescer
+    if _coalescer is None:
+        with _coalescer_lock:
+            if _coalescer is None:
+                _coalescer = RealtimeCoalescer(send_batch)
+                atexit.register(_coalescer.flush)
+    return _coalescer
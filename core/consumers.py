@@ -1,12 +1,23 @@
 import json
+import time
+from urllib.parse import parse_qs
 from channels.generic.websocket import AsyncWebsocketConsumer, AsyncJsonWebsocketConsumer
 from channels.db import database_sync_to_async
+from asgiref.sync import sync_to_async
 from .serializers import ChatMessageSerializer
-from .models import ChatMessage, Profile
+from .models import ChatMessage, ChatThread
+from .realtime import battle_group, chat_group, project_group
+from .replay import get_replay_buffer, missed_frames
+from .ws_auth import scope_principal
 
 # Constants
 MAX_CHAT_MESSAGE_LENGTH = 1200
 MAX_TYPING_FREQUENCY = 1  # max 1 typing event per second
+MAX_PROJECT_SUBSCRIPTIONS = 50
+
+@database_sync_to_async
+def _thread_members(thread_id):
+    return ChatThread.objects.filter(id=thread_id).values_list("a_id", "b_id").first()
 
 @database_sync_to_async
 def _save_msg(thread_id, sender_profile, text):
@@ -18,10 +29,6 @@ def _save_msg(thread_id, sender_profile, text):
     )
     return ChatMessageSerializer(m).data
 
-@database_sync_to_async
-def _resolve_profile(user):
-    return user.profile
-
 @database_sync_to_async
 def _mark_thread_read(thread_id, reader):
     qs = (ChatMessage.objects
@@ -32,20 +39,57 @@ def _mark_thread_read(thread_id, reader):
         qs.update(read=True)
     return ids
 
-@database_sync_to_async
-def _profile_is_team(profile_id):
-    return Profile.objects.filter(id=profile_id, roles__key__in=["TEAM", "ADMIN"]).exists()
+def _parse_project_ids(values):
+    ids = []
+    for value in values:
+        try:
+            project_id = int(value)
+        except (TypeError, ValueError):
+            continue
+        if project_id > 0 and project_id not in ids:
+            ids.append(project_id)
+    return ids[:MAX_PROJECT_SUBSCRIPTIONS]
+
+def _parse_since(value):
+    try:
+        since = int(value)
+    except (TypeError, ValueError):
+        return None
+    return since if since >= 0 else None
+
+def _replay_state(groups, since):
+    buffer = get_replay_buffer()
+    current = buffer.current()
+    if since is None:
+        return current, []
+    return current, missed_frames(groups, since)
 
 class ChatConsumer(AsyncWebsocketConsumer):
+    """
+    Chat eines Threads. Die Mitgliedschaft (``a_id``/``b_id``) wird einmal
+    beim Connect geprüft; danach kostet eine Nachricht genau ein INSERT und
+    ein ``group_send``. Typing- und Read-Frames ohne Wirkung werden im
+    Speicher verworfen.
+    """
+
     async def connect(self):
-        self.thread_id = self.scope["url_route"]["kwargs"]["thread_id"]
-        self.group = f"chat_{self.thread_id}"
+        self.thread_id = int(self.scope["url_route"]["kwargs"]["thread_id"])
+        self.group = chat_group(self.thread_id)
         self.user = self.scope.get("user")
         self.last_typing_time = 0  # Rate limiting für typing events
-        
+        self.last_typing_state = False
+        # Unbekannt bis zum ersten Read: es könnten ungelesene Nachrichten existieren
+        self.unread_pending = True
+
         if not self.user or not self.user.is_authenticated:
             await self.close(); return
-        profile = await _resolve_profile(self.user)
+        principal = await scope_principal(self.scope)
+        profile = principal.profile if principal else None
+        if profile is None:
+            await self.close(); return
+        members = await _thread_members(self.thread_id)
+        if not members or profile.id not in members:
+            await self.close(code=4403); return
         self.profile = profile
         self.profile_id = profile.id
         await self.channel_layer.group_add(self.group, self.channel_name)
@@ -57,20 +101,16 @@ class ChatConsumer(AsyncWebsocketConsumer):
     async def receive(self, text_data=None, bytes_data=None):
         data = json.loads(text_data or "{}")
         action = data.get("type", "message")
-        profile = getattr(self, "profile", None)
-        if profile is None:
-            profile = await _resolve_profile(self.user)
-            self.profile = profile
+        profile = self.profile
 
         if action == "typing":
-            # Rate limiting für typing events
-            import time
+            is_typing = bool(data.get("is_typing"))
             current_time = time.time()
-            if current_time - self.last_typing_time < MAX_TYPING_FREQUENCY:
+            # Rate limiting nur für Wiederholungen; ein Zustandswechsel geht immer raus
+            if is_typing == self.last_typing_state and current_time - self.last_typing_time < MAX_TYPING_FREQUENCY:
                 return
             self.last_typing_time = current_time
-            
-            is_typing = bool(data.get("is_typing"))
+            self.last_typing_state = is_typing
             await self.channel_layer.group_send(
                 self.group,
                 {"type": "chat.typing", "profile": profile.id, "is_typing": is_typing}
@@ -78,6 +118,10 @@ class ChatConsumer(AsyncWebsocketConsumer):
             return
 
         if action == "read":
+            if not self.unread_pending:
+                return
+            # Vor dem Query zurücksetzen: Nachrichten währenddessen setzen es erneut
+            self.unread_pending = False
             updated = await _mark_thread_read(self.thread_id, profile)
             if updated:
                 await self.channel_layer.group_send(
@@ -102,6 +146,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
         await self.channel_layer.group_send(self.group, {"type": "chat.message", "message": msg})
 
     async def chat_message(self, event):
+        if event["message"].get("sender") != self.profile_id:
+            self.unread_pending = True
         await self.send(text_data=json.dumps({"event": "message", "message": event["message"]}))
 
     async def chat_typing(self, event):
@@ -110,31 +156,115 @@ class ChatConsumer(AsyncWebsocketConsumer):
         payload = {"event": "typing", "profile": event["profile"], "is_typing": event["is_typing"]}
         await self.send(text_data=json.dumps(payload))
 
+    async def chat_unread(self, event):
+        # Nachricht kam per REST (z.B. Anhang) und nicht über den Socket
+        if event["profile"] != self.profile_id:
+            self.unread_pending = True
+
     async def chat_read(self, event):
         payload = {"event": "read", "profile": event["profile"], "message_ids": event["message_ids"]}
         await self.send(text_data=json.dumps(payload))
 
 
 class UpdatesConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Task-/Projekt-Events. Ohne Parameter alle Events (``projects_all`` und
+    ``tasks_all``); mit ``?projects=1,2`` bzw. ``subscribe``/``unsubscribe``-
+    Frames nur die Gruppen ``project_<id>`` der gewählten Projekte.
+
+    Nach dem Verbinden kommt ``ready`` mit der aktuellen Sequenz. Mit
+    ``?since=<seq>`` werden zuerst die verpassten Frames nachgeliefert;
+    reicht der Replay-Puffer nicht, kommt ``resync`` und der Client lädt
+    seine Listen neu.
+    """
+
     async def connect(self):
         self.user = self.scope.get("user")
         if not self.user or not self.user.is_authenticated:
             await self.close()
             return
-        profile = await _resolve_profile(self.user)
-        is_team = await _profile_is_team(profile.id)
-        if not is_team:
+        principal = await scope_principal(self.scope)
+        if principal is None or principal.profile is None or not principal.is_team:
             await self.close(code=4403)
             return
-        self.profile = profile
-        self.groups = ["projects_all", "tasks_all"]
+        self.profile = principal.profile
+        params = parse_qs((self.scope.get("query_string") or b"").decode())
+        project_ids = _parse_project_ids((params.get("projects") or [""])[0].split(","))
+        if project_ids:
+            self.groups = [project_group(project_id) for project_id in project_ids]
+        else:
+            self.groups = ["projects_all", "tasks_all"]
         for group in self.groups:
             await self.channel_layer.group_add(group, self.channel_name)
         await self.accept()
+        await self._replay(_parse_since((params.get("since") or [""])[0]))
+
+    async def _replay(self, since):
+        # Gruppen sind schon abonniert: Frames, die währenddessen live
+        # eintreffen, werden anhand der Sequenz nicht doppelt gesendet
+        current, frames = await sync_to_async(_replay_state)(list(self.groups), since)
+        if frames is None:
+            self.replayed = set()
+            await self.send_json({"event": "resync", "seq": current})
+            return
+        self.replayed = {seq for seq, _ in frames}
+        for seq, events in frames:
+            await self.send_json({"event": "batch", "seq": seq, "events": events})
+        await self.send_json({"event": "ready", "seq": max([current, *self.replayed])})
 
     async def disconnect(self, code):
         for group in getattr(self, "groups", []):
             await self.channel_layer.group_discard(group, self.channel_name)
 
+    async def receive_json(self, content, **kwargs):
+        action = content.get("action") if isinstance(content, dict) else None
+        project_ids = _parse_project_ids([content.get("project")]) if action else []
+        if action not in ("subscribe", "unsubscribe") or not project_ids:
+            return
+        group = project_group(project_ids[0])
+        if action == "subscribe" and "tasks_all" in self.groups:
+            # Erstes Projekt-Abo verlässt den Alles-Modus, sonst kämen Events doppelt
+            for all_group in ("projects_all", "tasks_all"):
+                await self.channel_layer.group_discard(all_group, self.channel_name)
+            self.groups = []
+        if action == "subscribe" and group not in self.groups:
+            if len(self.groups) >= MAX_PROJECT_SUBSCRIPTIONS:
+                await self.send_json({"event": "error", "error": "Zu viele Projekt-Abos."})
+                return
+            self.groups.append(group)
+            await self.channel_layer.group_add(group, self.channel_name)
+        elif action == "unsubscribe" and group in self.groups:
+            self.groups.remove(group)
+            await self.channel_layer.group_discard(group, self.channel_name)
+
+    async def updates_message(self, event):
+        await self.send_json(event.get("payload", {}))
+
+    async def updates_batch(self, event):
+        seq = event.get("seq")
+        replayed = getattr(self, "replayed", ())
+        if seq is not None and seq in replayed:
+            replayed.discard(seq)
+            return
+        await self.send_json({"event": "batch", "seq": seq, "events": event.get("events", [])})
+
+
+class BattleTallyConsumer(AsyncJsonWebsocketConsumer):
+    """Live-Stand einer Battle; gesendet wird gebündelt aus ``core.vote_ingest``."""
+
+    async def connect(self):
+        self.user = self.scope.get("user")
+        if not self.user or not self.user.is_authenticated:
+            await self.close()
+            return
+        self.group = battle_group(self.scope["url_route"]["kwargs"]["battle_id"])
+        await self.channel_layer.group_add(self.group, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        group = getattr(self, "group", None)
+        if group:
+            await self.channel_layer.group_discard(group, self.channel_name)
+
     async def updates_message(self, event):
         await self.send_json(event.get("payload", {}))
@@ -0,0 +1,128 @@
+"""
+Gemeinsame Zähler mit gleitendem Zeitfenster.
+
+Ein Zähler besteht aus zwei festen Buckets (aktuelles und vorheriges
+Fenster); der Wert ist ``current + previous * (1 - elapsed / window)``.
+So braucht ein Treffer nur ``INCR`` + ``EXPIRE`` auf einem Key und ist
+über alle Worker atomar, ohne ein Log je Ereignis zu halten.
+
+- ``RedisCounterBackend``: Redis unter ``COUNTER_REDIS_URL`` (Default: die
+  Cache-/Redis-URL), prozessübergreifend.
+- ``LocalCounterBackend``: prozesslokal mit Lock, für Tests und lokale
+  Entwicklung ohne Redis.
+
+``get_counter_backend`` liefert die konfigurierte Instanz;
+``reset_counter_backend`` verwirft sie (Tests).
+"""
+
+import threading
+import time
+
+from django.conf import settings
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+class BaseCounterBackend:
+    def _buckets(self, key, window, now):
+        bucket = int(now // window)
+        return f"{key}:{bucket}", f"{key}:{bucket - 1}", (now % window) / window
+
+    @staticmethod
+    def _estimate(current, previous, elapsed):
+        return int(current or 0) + int(previous or 0) * (1 - elapsed)
+
+    def hit(self, key, window, amount=1):
+        """Zählt ``amount`` Treffer und liefert den neuen Fensterwert."""
+        current_key, previous_key, elapsed = self._buckets(key, window, time.time())
+        current, previous = self._incr(current_key, previous_key, amount, window * 2)
+        return self._estimate(current, previous, elapsed)
+
+    def peek(self, key, window):
+        """Aktueller Fensterwert ohne zu zählen."""
+        current_key, previous_key, elapsed = self._buckets(key, window, time.time())
+        current, previous = self._get(current_key, previous_key)
+        return self._estimate(current, previous, elapsed)
+
+    def _incr(self, current_key, previous_key, amount, ttl):
+        raise NotImplementedError
+
+    def _get(self, current_key, previous_key):
+        raise NotImplementedError
+
+
+class RedisCounterBackend(BaseCounterBackend):
+    def __init__(self, url, prefix="counter"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _key(self, key):
+        return f"{self.prefix}:{key}"
+
+    def _incr(self, current_key, previous_key, amount, ttl):
+        pipe = self.client.pipeline()
+        pipe.incrby(self._key(current_key), amount)
+        pipe.expire(self._key(current_key), ttl)
+        pipe.get(self._key(previous_key))
+        current, _, previous = pipe.execute()
+        return current, previous
+
+    def _get(self, current_key, previous_key):
+        return self.client.mget(self._key(current_key), self._key(previous_key))
+
+
+class LocalCounterBackend(BaseCounterBackend):
+    # Abgelaufene Buckets verschwinden sonst nur beim Lesen: alle N Treffer aufräumen
+    PRUNE_EVERY = 1000
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+
+    def _read(self, key, now):
+        value, expires_at = self._values.get(key, (0, None))
+        if expires_at is not None and expires_at <= now:
+            self._values.pop(key, None)
+            return 0
+        return value
+
+    def _incr(self, current_key, previous_key, amount, ttl):
+        now = time.time()
+        with self._lock:
+            self._hits += 1
+            if self._hits % self.PRUNE_EVERY == 0:
+                self._prune(now)
+            current = self._read(current_key, now) + amount
+            expires_at = self._values.get(current_key, (0, now + ttl))[1]
+            self._values[current_key] = (current, expires_at)
+            return current, self._read(previous_key, now)
+
+    def _prune(self, now):
+        expired = [key for key, (_, expires_at) in self._values.items() if expires_at <= now]
+        for key in expired:
+            del self._values[key]
+
+    def _get(self, current_key, previous_key):
+        now = time.time()
+        with self._lock:
+            return self._read(current_key, now), self._read(previous_key, now)
+
+
+def get_counter_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                url = getattr(settings, "COUNTER_REDIS_URL", None)
+                _backend = RedisCounterBackend(url) if url else LocalCounterBackend()
+    return _backend
+
+
+def reset_counter_backend():
+    global _backend
+    with _backend_lock:
+        _backend = None
@@ -0,0 +1,310 @@
+"""
+Dashboard-Widgets und ``/api/dashboard/bundle/``.
+
+Jedes Widget eines gespeicherten Layouts (``dashboard_layouts`` in den
+Profil-Settings) ist hier per ``@dashboard_widget("id")`` registriert.
+``build_dashboard_bundle`` berechnet alle Widgets eines Layouts in einem
+Request mit einem gemeinsamen ``DashboardContext`` (Profil, AccessContext,
+sichtbare Querysets) und liefert pro Widget Daten bzw. Fehler und die
+Laufzeit in Millisekunden.
+
+Die Payload-Builder (``stats_payload``, ``analytics_summary_payload``)
+werden auch von den Einzel-Endpunkten genutzt, damit Bundle und
+Einzelabruf dieselben Zahlen liefern.
+"""
+
+import logging
+import time
+from datetime import timedelta
+from functools import cached_property
+
+from django.db.models import Count, Q, prefetch_related_objects
+from django.http import QueryDict
+from django.utils import timezone
+
+from .access import get_access_context, visible_projects, visible_tasks
+from .assignment import build_team_points_payload
+from .models import ROLE_CHOICES, Contract, Example, GrowProGoal, Notification, Payment, Profile, Request, Role, Task
+from .permissions import is_admin_profile
+from .serializers import TaskSerializer
+from .summaries import aggregate_summary, cached_summary
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_WIDGETS = {}
+
+DEFAULT_DASHBOARD_WIDGETS = [
+    "tasks_summary",
+    "tasks_overdue",
+    "tasks_upcoming",
+    "projects_summary",
+    "notifications_unread",
+    "stats",
+]
+
+OVERDUE_LIMIT = 15
+UPCOMING_DAYS = 7
+UPCOMING_LIMIT = 8
+
+
+def dashboard_widget(widget_id, requires=None):
+    """
+    Registriert ein Widget. ``requires`` ist ``None``, ``"TEAM"`` oder
+    ``"ADMIN"`` – entspricht den Permissions des Einzel-Endpunkts.
+    """
+
+    def decorator(func):
+        func.requires = requires
+        DASHBOARD_WIDGETS[widget_id] = func
+        return func
+
+    return decorator
+
+
+class DashboardContext:
+    """Gemeinsamer Zustand aller Widgets eines Bundle-Requests."""
+
+    def __init__(self, request):
+        self.request = request
+        self.profile = getattr(request.user, "profile", None)
+        self.access = get_access_context(self.profile)
+        self.today = timezone.now().date()
+
+    @property
+    def is_team(self):
+        return bool(self.access and self.access.is_team)
+
+    @property
+    def is_admin(self):
+        return is_admin_profile(self.profile)
+
+    def allows(self, requires):
+        if requires == "ADMIN":
+            return self.is_admin
+        if requires == "TEAM":
+            return self.is_team
+        return self.profile is not None
+
+    @cached_property
+    def tasks(self):
+        return visible_tasks(self.profile, Task.objects.all())
+
+    @cached_property
+    def open_tasks(self):
+        return self.tasks.filter(is_archived=False).exclude(status="DONE")
+
+    @cached_property
+    def projects(self):
+        return visible_projects(self.profile)
+
+    @cached_property
+    def task_lists(self):
+        """Überfällige und anstehende Tasks – Prefetch für beide Listen gemeinsam."""
+        base = self.open_tasks.select_related("project", "created_by__user", "updated_by__user")
+        overdue = list(base.filter(due_date__lt=self.today).order_by("due_date")[:OVERDUE_LIMIT])
+        upcoming = list(
+            base.filter(due_date__gte=self.today, due_date__lte=self.today + timedelta(days=UPCOMING_DAYS)).order_by(
+                "due_date", "priority"
+            )[:UPCOMING_LIMIT]
+        )
+        prefetch_related_objects(overdue + upcoming, "stakeholders__user", "assignees__user")
+        return {"overdue": overdue, "upcoming": upcoming}
+
+    def serialize_tasks(self, tasks):
+        return TaskSerializer(tasks, many=True, context={"request": self.request}).data
+
+
+def resolve_layout(profile, layout_id=None):
+    """
+    Liefert ``(layout, widget_ids)`` für das angefragte bzw. aktive Layout.
+    Ohne gespeicherte Layouts wird ``DEFAULT_DASHBOARD_WIDGETS`` genutzt.
+
+    Raises:
+        LookupError: wenn ``layout_id`` nicht existiert
+    """
+    settings_payload = (profile.notification_settings or {}) if profile else {}
+    layouts = settings_payload.get("dashboard_layouts") or []
+    if not isinstance(layouts, list):
+        layouts = []
+    wanted = layout_id or settings_payload.get("dashboard_active_layout_id")
+    layout = next((row for row in layouts if str(row.get("id")) == str(wanted)), None) if wanted else None
+    if layout is None and layout_id:
+        raise LookupError(layout_id)
+    if layout is None and layouts:
+        layout = layouts[0]
+    if layout is None:
+        return None, [{"id": widget_id, "size": "m"} for widget_id in DEFAULT_DASHBOARD_WIDGETS]
+    return {"id": layout.get("id"), "name": layout.get("name")}, list(layout.get("widgets") or [])
+
+
+def build_dashboard_bundle(request, layout_id=None):
+    started = time.perf_counter()
+    context = DashboardContext(request)
+    layout, widgets = resolve_layout(context.profile, layout_id)
+    computed = {}
+    results = []
+    for widget in widgets:
+        widget_id = str(widget.get("id") or "")
+        if widget_id not in computed:
+            computed[widget_id] = _run_widget(context, widget_id)
+        results.append({"id": widget_id, "size": widget.get("size", "m"), **computed[widget_id]})
+    return {
+        "layout": layout,
+        "widgets": results,
+        "total_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def _run_widget(context, widget_id):
+    func = DASHBOARD_WIDGETS.get(widget_id)
+    if func is None:
+        return {"error": "unknown_widget", "ms": 0}
+    if not context.allows(func.requires):
+        return {"error": "forbidden", "ms": 0}
+    started = time.perf_counter()
+    try:
+        payload = {"data": func(context)}
+    except Exception:
+        logger.exception("Dashboard-Widget %s fehlgeschlagen", widget_id)
+        payload = {"error": "failed"}
+    payload["ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return payload
+
+
+# --- Payload-Builder (auch von den Einzel-Endpunkten genutzt) -----------------
+
+
+def stats_payload(profile):
+    counts = {key: 0 for key, _ in ROLE_CHOICES}
+    for row in Role.objects.annotate(c=Count("profile")).values("key", "c"):
+        counts[row["key"]] = row["c"]
+    context = get_access_context(profile)
+    if context and context.is_team:
+        open_requests = Request.objects.filter(status="OPEN").count()
+        active_contracts = Contract.objects.filter(status="ACTIVE").count()
+        due_payments = Payment.objects.filter(status="DUE").count()
+    else:
+        open_requests = Request.objects.filter(Q(sender=profile) | Q(receiver=profile), status="OPEN").count()
+        active_contracts = Contract.objects.filter(profile=profile, status="ACTIVE").count()
+        due_payments = Payment.objects.filter(profile=profile, status="DUE").count()
+    return {
+        "roles": counts,
+        "open_requests": open_requests,
+        "active_contracts": active_contracts,
+        "due_payments": due_payments,
+    }
+
+
+def analytics_summary_payload(soon_days=7):
+    today = timezone.now().date()
+    task_counts = (
+        Task.objects.filter(is_archived=False)
+        .exclude(status="DONE")
+        .aggregate(
+            active=Count("id"),
+            overdue=Count("id", filter=Q(due_date__lt=today)),
+            due_soon=Count("id", filter=Q(due_date__gte=today, due_date__lte=today + timedelta(days=soon_days))),
+        )
+    )
+    payment_counts = Payment.objects.aggregate(
+        due=Count("id", filter=Q(status="DUE")),
+        paid=Count("id", filter=Q(status="PAID")),
+    )
+    return {
+        "active_tasks": task_counts["active"],
+        "overdue_tasks": task_counts["overdue"],
+        "due_soon_tasks": task_counts["due_soon"],
+        "completed_last_7_days": Task.objects.filter(
+            completed_at__isnull=False,
+            completed_at__gte=timezone.now() - timedelta(days=7),
+        ).count(),
+        "active_contracts": Contract.objects.filter(status="ACTIVE").count(),
+        "due_payments": payment_counts["due"],
+        "paid_payments": payment_counts["paid"],
+        "open_requests": Request.objects.filter(status="OPEN").count(),
+        "artist_count": Profile.objects.filter(roles__key="ARTIST").distinct().count(),
+        "example_count": Example.objects.count(),
+    }
+
+
+# --- Widgets ------------------------------------------------------------------
+
+
+@dashboard_widget("tasks_summary")
+def _tasks_summary(context):
+    # Gleicher Cache-Eintrag wie ``GET /api/tasks/summary/`` ohne Parameter
+    return cached_summary(
+        "tasks",
+        context.profile,
+        QueryDict(),
+        lambda: aggregate_summary(
+            context.open_tasks,
+            archived=Q(is_archived=True),
+            done=Q(status="DONE"),
+            active=Q(is_archived=False) & ~Q(status="DONE"),
+            by=("status", "task_type"),
+        ),
+    )
+
+
+@dashboard_widget("tasks_overdue")
+def _tasks_overdue(context):
+    return context.serialize_tasks(context.task_lists["overdue"])
+
+
+@dashboard_widget("tasks_upcoming")
+def _tasks_upcoming(context):
+    return context.serialize_tasks(context.task_lists["upcoming"])
+
+
+@dashboard_widget("projects_summary")
+def _projects_summary(context):
+    return cached_summary(
+        "projects",
+        context.profile,
+        QueryDict(),
+        lambda: aggregate_summary(
+            context.projects.filter(is_archived=False).exclude(status="DONE"),
+            archived=Q(is_archived=True),
+            done=Q(status="DONE"),
+            active=~Q(status="DONE"),
+        ),
+    )
+
+
+@dashboard_widget("growpro_summary")
+def _growpro_summary(context):
+    qs = GrowProGoal.objects.all()
+    if not context.is_team:
+        qs = qs.filter(profile=context.profile)
+    return cached_summary(
+        "growpro",
+        context.profile,
+        QueryDict(),
+        lambda: aggregate_summary(
+            qs,
+            archived=Q(status="ARCHIVED"),
+            done=Q(status="DONE"),
+            active=Q(status__in=["ACTIVE", "ON_HOLD"]),
+        ),
+    )
+
+
+@dashboard_widget("notifications_unread")
+def _notifications_unread(context):
+    return {"unread": Notification.objects.filter(recipient=context.profile, is_read=False).count()}
+
+
+@dashboard_widget("stats")
+def _stats(context):
+    return stats_payload(context.profile)
+
+
+@dashboard_widget("analytics_summary", requires="ADMIN")
+def _analytics_summary(context):
+    return analytics_summary_payload()
+
+
+@dashboard_widget("team_points", requires="TEAM")
+def _team_points(context):
+    return build_team_points_payload()
@@ -0,0 +1,251 @@
+"""
+Persistenter E-Mail-Outbox mit gebündelter Zustellung.
+
+Request-Handler legen über ``enqueue_email`` nur Zeilen an (eine pro
+Empfänger, kein gemeinsamer To-Header mehr). Zugestellt wird von
+``deliver_pending_emails`` über eine einzige geöffnete Backend-Verbindung
+(``get_connection`` + ``send_messages``) – entweder im Hintergrund-Thread
+nach dem Commit (``EMAIL_DELIVERY_MODE=thread``), synchron
+(``inline``) oder ausschließlich per ``manage.py deliver_emails``
+(``command``). Fehlgeschlagene Nachrichten werden mit exponentiellem
+Backoff erneut versucht, ``EMAIL_RATE_PER_MINUTE`` deckelt den Durchsatz.
+"""
+
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import EmailOutboxMessage
+
+logger = logging.getLogger(__name__)
+
+SENDING_LEASE = timedelta(minutes=5)
+
+_worker_lock = threading.Lock()
+_worker_thread = None
+_worker_wake = threading.Event()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue_email(subject, message, recipients, *, from_email=None):
+    """
+    Legt pro (deduplizierter) Empfängeradresse eine Outbox-Zeile an und
+    stößt nach dem Commit die Zustellung an.
+
+    Returns:
+        int: Anzahl eingereihter Nachrichten
+    """
+    sender = from_email or _setting("DEFAULT_FROM_EMAIL", "noreply@unyq.app")
+    seen = set()
+    rows = []
+    for recipient in recipients or []:
+        address = (recipient or "").strip()
+        if not address or address.lower() in seen:
+            continue
+        seen.add(address.lower())
+        rows.append(
+            EmailOutboxMessage(
+                subject=(subject or "")[:255],
+                body=message or "",
+                from_email=sender,
+                recipient=address,
+            )
+        )
+    if not rows:
+        return 0
+    EmailOutboxMessage.objects.bulk_create(rows, batch_size=500)
+    transaction.on_commit(kick_email_worker)
+    return len(rows)
+
+
+def kick_email_worker():
+    mode = _setting("EMAIL_DELIVERY_MODE", "thread")
+    if mode == "inline":
+        deliver_pending_emails()
+    elif mode == "thread":
+        _start_worker_thread()
+
+
+def _start_worker_thread():
+    global _worker_thread
+    with _worker_lock:
+        if _worker_thread is not None and _worker_thread.is_alive():
+            _worker_wake.set()
+            return
+        _worker_thread = threading.Thread(target=_worker_loop, name="email-outbox", daemon=True)
+        _worker_thread.start()
+
+
+def _seconds_until_next_attempt():
+    """Wartezeit bis zur nächsten fälligen Nachricht; ``None``, wenn nichts mehr offen ist."""
+    next_attempt_at = (
+        EmailOutboxMessage.objects.filter(status__in=["PENDING", "SENDING"])
+        .order_by("next_attempt_at")
+        .values_list("next_attempt_at", flat=True)
+        .first()
+    )
+    if next_attempt_at is None:
+        return None
+    return max(0.0, (next_attempt_at - timezone.now()).total_seconds())
+
+
+def _worker_loop():
+    """
+    Läuft, solange PENDING/SENDING-Zeilen existieren, und schläft bis zum
+    nächsten ``next_attempt_at`` – so werden auch zurückgestellte
+    Fehlversuche ohne neuen ``enqueue_email`` wiederholt. Neue Kicks wecken
+    den Thread vorzeitig.
+    """
+    global _worker_thread
+    close_old_connections()
+    try:
+        while True:
+            _worker_wake.clear()
+            summary = deliver_pending_emails()
+            wait = 60.0 if summary["rate_limited"] else _seconds_until_next_attempt()
+            if wait is None:
+                with _worker_lock:
+                    # Unter dem Lock erneut prüfen: ein Kick während des Ausstiegs
+                    # startet sonst keinen neuen Thread und die Mail bliebe liegen
+                    if _seconds_until_next_attempt() is None:
+                        _worker_thread = None
+                        return
+                continue
+            if wait > 0:
+                _worker_wake.wait(wait)
+    except Exception:
+        logger.exception("E-Mail-Outbox-Worker abgebrochen")
+        with _worker_lock:
+            if _worker_thread is threading.current_thread():
+                _worker_thread = None
+    finally:
+        close_old_connections()
+
+
+def _retry_delay(attempts):
+    base = max(1, int(_setting("EMAIL_RETRY_BASE_SECONDS", 60)))
+    return timedelta(seconds=min(base * (2 ** max(0, attempts - 1)), 6 * 60 * 60))
+
+
+def _claim_batch(limit):
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            EmailOutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(Q(status="PENDING") | Q(status="SENDING"), next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")
+            .values_list("id", flat=True)[:limit]
+        )
+        if ids:
+            EmailOutboxMessage.objects.filter(id__in=ids).update(
+                status="SENDING",
+                next_attempt_at=now + SENDING_LEASE,
+            )
+    return list(EmailOutboxMessage.objects.filter(id__in=ids).order_by("id"))
+
+
+def _sent_in_last_minute():
+    since = timezone.now() - timedelta(minutes=1)
+    return EmailOutboxMessage.objects.filter(status="SENT", sent_at__gte=since).count()
+
+
+def _mark_sent(items):
+    now = timezone.now()
+    for item in items:
+        item.status = "SENT"
+        item.attempts += 1
+        item.sent_at = now
+        item.last_error = ""
+    EmailOutboxMessage.objects.bulk_update(items, ["status", "attempts", "sent_at", "last_error"])
+
+
+def _mark_failed(item, exc):
+    max_attempts = max(1, int(_setting("EMAIL_MAX_ATTEMPTS", 5)))
+    item.attempts += 1
+    item.last_error = str(exc)[:2000]
+    if item.attempts >= max_attempts:
+        item.status = "FAILED"
+    else:
+        item.status = "PENDING"
+        item.next_attempt_at = timezone.now() + _retry_delay(item.attempts)
+    item.save(update_fields=["status", "attempts", "last_error", "next_attempt_at"])
+
+
+def _close_connection(connection):
+    try:
+        connection.close()
+    except Exception:
+        logger.exception("E-Mail-Verbindung konnte nicht geschlossen werden")
+
+
+def deliver_pending_emails(limit=None):
+    """
+    Stellt fällige Outbox-Nachrichten über eine geöffnete Verbindung zu.
+
+    Returns:
+        dict: ``sent``/``failed`` Zähler und ``rate_limited`` wenn das
+        Minutenlimit erreicht wurde und noch Nachrichten warten.
+    """
+    summary = {"sent": 0, "failed": 0, "rate_limited": False}
+    batch_size = max(1, int(_setting("EMAIL_BATCH_SIZE", 50)))
+    rate = int(_setting("EMAIL_RATE_PER_MINUTE", 0) or 0)
+    remaining = limit
+    connection = None
+    try:
+        while remaining is None or remaining > 0:
+            size = batch_size if remaining is None else min(batch_size, remaining)
+            if rate:
+                budget = rate - _sent_in_last_minute()
+                if budget <= 0:
+                    summary["rate_limited"] = EmailOutboxMessage.objects.filter(
+                        status__in=["PENDING", "SENDING"]
+                    ).exists()
+                    break
+                size = min(size, budget)
+            batch = _claim_batch(size)
+            if not batch:
+                break
+            for index, item in enumerate(batch):
+                if connection is None:
+                    try:
+                        connection = get_connection(fail_silently=False)
+                        connection.open()
+                    except Exception as exc:
+                        logger.exception("E-Mail-Verbindung konnte nicht geöffnet werden")
+                        connection = None
+                        for pending in batch[index:]:
+                            _mark_failed(pending, exc)
+                        summary["failed"] += len(batch) - index
+                        return summary
+                email = EmailMessage(
+                    item.subject, item.body, item.from_email or None, [item.recipient], connection=connection
+                )
+                # Einzeln zustellen und sofort markieren: bricht die Verbindung
+                # mitten im Batch ab, geht keine angenommene Mail doppelt raus
+                try:
+                    connection.send_messages([email])
+                except Exception as exc:
+                    _mark_failed(item, exc)
+                    summary["failed"] += 1
+                    # Verbindungszustand unklar: für den Rest des Batches neu öffnen
+                    _close_connection(connection)
+                    connection = None
+                else:
+                    _mark_sent([item])
+                    summary["sent"] += 1
+            if remaining is not None:
+                remaining -= len(batch)
+    finally:
+        if connection is not None:
+            _close_connection(connection)
+    return summary
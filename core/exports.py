@@ -0,0 +1,139 @@
+"""
+Streaming-Exporte (CSV/ICS).
+
+Statt die komplette Datei in einem ``StringIO`` aufzubauen, erzeugen die
+Writer hier Zeile für Zeile und werden als ``StreamingHttpResponse``
+ausgeliefert. Querysets werden über ``export_iterator`` mit
+``iterator(chunk_size=EXPORT_CHUNK_SIZE)`` gelesen – der Speicherbedarf
+bleibt konstant und die ersten Bytes gehen sofort raus.
+
+Unter ASGI (daphne) würde Django einen synchronen Iterator erst komplett
+per ``sync_to_async(list)`` einsammeln. ``ExportStreamingResponse`` zieht
+stattdessen je Hop einen Chunk Zeilen über ``sync_to_async``.
+"""
+
+import csv
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Macht ``?format=csv`` für DRF-Views gültig; die View liefert die Datei
+    selbst per ``stream_csv`` aus.
+    """
+
+    media_type = "text/csv"
+    format = "csv"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Nur Fehlerantworten (z.B. 403) laufen durch den Renderer
+        if data is None:
+            return b""
+        if isinstance(data, (bytes, str)):
+            return data
+        return json.dumps(data, cls=DjangoJSONEncoder).encode("utf-8")
+
+
+def _chunk_size():
+    return max(1, int(getattr(settings, "EXPORT_CHUNK_SIZE", 2000)))
+
+
+def _next_part(parts, size):
+    return b"".join(islice(parts, size))
+
+
+class ExportStreamingResponse(StreamingHttpResponse):
+    """
+    ``StreamingHttpResponse`` mit echtem Streaming unter ASGI: der
+    synchrone Zeilen-Generator (inkl. ``queryset.iterator``) wird je Hop um
+    bis zu ``EXPORT_CHUNK_SIZE`` Zeilen weitergeschaltet. Unter WSGI bleibt
+    es beim normalen ``__iter__``.
+    """
+
+    async def __aiter__(self):
+        if self.is_async:
+            async for part in super().__aiter__():
+                yield part
+            return
+        parts = self.streaming_content
+        size = _chunk_size()
+        while True:
+            # thread_sensitive: derselbe Thread (und DB-Cursor) wie die View
+            part = await sync_to_async(_next_part)(parts, size)
+            if not part:
+                break
+            yield part
+
+
+class _Echo:
+    """Pseudo-Datei für ``csv.writer``: gibt die geschriebene Zeile zurück."""
+
+    def write(self, value):
+        return value
+
+
+def export_iterator(queryset, chunk_size=None):
+    """
+    Iteriert ``queryset`` in Chunks. ``prefetch_related`` wird von Django
+    dabei pro Chunk ausgeführt.
+    """
+    chunk_size = chunk_size or _chunk_size()
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+def csv_lines(header, rows, delimiter=";"):
+    writer = csv.writer(_Echo(), delimiter=delimiter)
+    if header:
+        yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_csv(filename, header, rows, delimiter=";"):
+    response = ExportStreamingResponse(csv_lines(header, rows, delimiter), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def ics_escape(value):
+    if value is None:
+        return ""
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def ics_lines(events, prodid):
+    """
+    Erzeugt einen VCALENDAR; ``events`` liefert pro Termin eine Liste von
+    Property-Zeilen (ohne BEGIN/END:VEVENT).
+    """
+    yield "\r\n".join(
+        [
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            f"PRODID:{prodid}",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+        ]
+    ) + "\r\n"
+    for properties in events:
+        yield "\r\n".join(["BEGIN:VEVENT", *properties, "END:VEVENT"]) + "\r\n"
+    yield "END:VCALENDAR\r\n"
+
+
+def stream_ics(filename, events, prodid):
+    response = ExportStreamingResponse(ics_lines(events, prodid), content_type="text/calendar; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
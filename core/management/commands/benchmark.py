@@ -0,0 +1,28 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import BENCHMARKS, run_benchmark
+
+
+class Command(BaseCommand):
+    help = "Run a registered performance benchmark inside a rolled-back transaction."
+
+    def add_arguments(self, parser):
+        parser.add_argument("scenario", nargs="?", help="Scenario name; omit to list scenarios.")
+        parser.add_argument("--size", type=int, default=None)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        scenario = options["scenario"]
+        if not scenario:
+            for name, func in sorted(BENCHMARKS.items()):
+                self.stdout.write(f"{name}: {func.description}")
+            return
+        if scenario not in BENCHMARKS:
+            raise CommandError(f"Unknown scenario '{scenario}'. Available: {', '.join(sorted(BENCHMARKS))}")
+        kwargs = {"repeat": max(1, options["repeat"])}
+        if options["size"]:
+            kwargs["size"] = options["size"]
+        result = run_benchmark(scenario, **kwargs)
+        self.stdout.write(json.dumps(result, indent=2, default=str))
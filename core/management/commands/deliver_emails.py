@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.email_outbox import deliver_pending_emails
+
+
+class Command(BaseCommand):
+    help = "Deliver queued notification emails from the email outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=None)
+        parser.add_argument("--loop", action="store_true", default=False)
+        parser.add_argument("--interval", type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        while True:
+            summary = deliver_pending_emails(limit=options["limit"])
+            self.stdout.write(str(summary))
+            if not options["loop"]:
+                break
+            if not summary["sent"] and not summary["failed"]:
+                time.sleep(max(0.5, options["interval"]))
+            elif summary["rate_limited"]:
+                time.sleep(60)
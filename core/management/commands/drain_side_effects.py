@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.side_effects import drain_outbox
+
+
+class Command(BaseCommand):
+    help = "Process queued side-effect jobs (SIDE_EFFECTS_MODE=outbox)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=100)
+        parser.add_argument("--max-attempts", type=int, default=5)
+        parser.add_argument("--loop", action="store_true", default=False)
+        parser.add_argument("--interval", type=float, default=2.0)
+
+    def handle(self, *args, **options):
+        limit = max(1, options["limit"])
+        while True:
+            summary = drain_outbox(limit=limit, max_attempts=max(1, options["max_attempts"]))
+            self.stdout.write(str(summary))
+            if not options["loop"]:
+                break
+            if not summary["done"] and not summary["failed"]:
+                time.sleep(max(0.1, options["interval"]))
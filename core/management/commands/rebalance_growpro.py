@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.assignment import rebalance_growpro_assignments
+
+
+class Command(BaseCommand):
+    help = "Rebalance GrowPro goal assignments across team members."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only print the plan, do not write.")
+
+    def handle(self, *args, **options):
+        result = rebalance_growpro_assignments(dry_run=options["dry_run"])
+        for move in result["plan"]:
+            self.stdout.write(f"goal {move['goal_id']}: {move['from']} -> {move['to']}")
+        self.stdout.write(f"assigned={result['assigned']} rebalanced={result['rebalanced']}")
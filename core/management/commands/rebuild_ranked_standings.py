@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from core.ranking import rebuild_ranked_standings
+
+
+class Command(BaseCommand):
+    help = "Rebuild the RankedStanding ladder of the current season from submissions, votes and battles."
+
+    def handle(self, *args, **options):
+        self.stdout.write(str(rebuild_ranked_standings()))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from core.team_scores import check_team_scores, rebuild_team_scores
+
+
+class Command(BaseCommand):
+    help = "Rebuild the TeamScore ledger from tasks, projects and GrowPro goals (or only check it with --check)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+        parser.add_argument("--check", action="store_true", help="Only report mismatches, do not write.")
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            mismatches = check_team_scores()
+            for item in mismatches:
+                self.stdout.write(str(item))
+            self.stdout.write(f"{len(mismatches)} mismatches")
+            return
+        self.stdout.write(str(rebuild_team_scores(chunk_size=max(1, options["chunk_size"]))))
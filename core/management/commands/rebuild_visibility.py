@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from core.visibility import rebuild_visibility
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized TaskVisibility table from project and task memberships."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        self.stdout.write(str(rebuild_visibility(chunk_size=max(1, options["chunk_size"]))))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.vote_tallies import recount_battle_votes
+
+
+class Command(BaseCommand):
+    help = "Recompute the approved vote counters on all tournament battles."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        changed = recount_battle_votes(chunk_size=max(1, options["chunk_size"]))
+        self.stdout.write(f"{changed} battles updated")
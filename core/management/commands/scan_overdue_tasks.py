@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from core.automation import scan_overdue_tasks
+
+
+class Command(BaseCommand):
+    help = "Log overdue tasks whose due date passed since the last scan."
+
+    def handle(self, *args, **options):
+        self.stdout.write(str(scan_overdue_tasks()))
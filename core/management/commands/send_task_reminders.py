@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 
-from core.automation import send_growpro_reminders, send_task_reminders
+from core.automation import scan_overdue_tasks, send_growpro_reminders, send_task_reminders
+from core.email_outbox import deliver_pending_emails
 
 
 class Command(BaseCommand):
@@ -21,4 +22,18 @@ class Command(BaseCommand):
             dry_run=options["dry_run"],
         )
         growpro_summary = send_growpro_reminders(dry_run=options["dry_run"])
-        self.stdout.write(str({"days": days, "tasks": task_summary, "growpro": growpro_summary}))
+        overdue_summary = None if options["dry_run"] else scan_overdue_tasks()
+        # Der Worker-Thread (EMAIL_DELIVERY_MODE=thread) stirbt mit dem Prozess:
+        # eingereihte Mails hier synchron zustellen, Reste übernimmt deliver_emails
+        email_summary = None if options["dry_run"] else deliver_pending_emails()
+        self.stdout.write(
+            str(
+                {
+                    "days": days,
+                    "tasks": task_summary,
+                    "growpro": growpro_summary,
+                    "overdue_scan": overdue_summary,
+                    "emails": email_summary,
+                }
+            )
+        )
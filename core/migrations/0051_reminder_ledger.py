@@ -0,0 +1,61 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils.dateparse import parse_date
+
+
+REMINDER_EVENT_TYPES = ["task_reminder_due_soon", "task_reminder_overdue", "task_overdue"]
+
+
+def backfill_reminder_ledger(apps, schema_editor):
+    ActivityEntry = apps.get_model("core", "ActivityEntry")
+    ReminderLedger = apps.get_model("core", "ReminderLedger")
+    entries = (
+        ActivityEntry.objects.filter(event_type__in=REMINDER_EVENT_TYPES, task__isnull=False)
+        .values_list("task_id", "event_type", "metadata")
+        .iterator(chunk_size=2000)
+    )
+    batch = []
+    for task_id, event_type, metadata in entries:
+        try:
+            due_date = parse_date(str((metadata or {}).get("due_date") or ""))
+        except ValueError:
+            due_date = None
+        if not due_date:
+            continue
+        batch.append(ReminderLedger(task_id=task_id, event_type=event_type, due_date=due_date))
+        if len(batch) >= 2000:
+            ReminderLedger.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        ReminderLedger.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0050_email_outbox_message'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(max_length=50)),
+                ('due_date', models.DateField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminder_ledger', to='core.task')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['event_type', 'due_date'], name='core_reminder_event_due_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='reminderledger',
+            constraint=models.UniqueConstraint(fields=('task', 'event_type', 'due_date'), name='core_reminder_unique'),
+        ),
+        migrations.RunPython(backfill_reminder_ledger, migrations.RunPython.noop),
+    ]
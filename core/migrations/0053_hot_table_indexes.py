@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0052_job_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activityentry',
+            index=models.Index(fields=['-created_at'], name='core_activity_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activityentry',
+            index=models.Index(fields=['event_type', '-created_at'], name='core_activity_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(fields=['thread', 'created_at'], name='core_chatmsg_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(fields=['thread', 'read'], name='core_chatmsg_read_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', 'is_read', '-created_at'], name='core_notif_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['-created_at'], name='core_task_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['is_archived', 'status', 'due_date'], name='core_task_arch_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_archived', False), models.Q(('status', 'DONE'), _negated=True)), fields=['due_date'], name='core_task_open_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tournamentvote',
+            index=models.Index(fields=['battle', 'voter_ip', 'created_at'], name='core_vote_battle_ip_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_task_visibility(apps, schema_editor):
+    Project = apps.get_model("core", "Project")
+    Task = apps.get_model("core", "Task")
+    TaskVisibility = apps.get_model("core", "TaskVisibility")
+    pairs = set()
+    for through in (Project.owners.through, Project.participants.through):
+        members = {}
+        for project_id, profile_id in through.objects.values_list("project_id", "profile_id").iterator():
+            members.setdefault(project_id, set()).add(profile_id)
+        for task_id, project_id in Task.objects.filter(project_id__in=members.keys()).values_list("id", "project_id").iterator():
+            pairs.update((task_id, profile_id) for profile_id in members[project_id])
+    for through in (Task.assignees.through, Task.stakeholders.through):
+        pairs.update(through.objects.values_list("task_id", "profile_id").iterator())
+    TaskVisibility.objects.bulk_create(
+        [TaskVisibility(task_id=task_id, profile_id=profile_id) for task_id, profile_id in pairs],
+        batch_size=2000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0053_hot_table_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskVisibility',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_visibility', to='core.profile')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='visibility', to='core.task')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='taskvisibility',
+            constraint=models.UniqueConstraint(fields=('profile', 'task'), name='core_taskvisibility_unique'),
+        ),
+        migrations.RunPython(backfill_task_visibility, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+TASK_PRIORITY_SCORE = {"LOW": 1, "MEDIUM": 1, "HIGH": 2, "CRITICAL": 3}
+
+
+def backfill_team_scores(apps, schema_editor):
+    GrowProGoal = apps.get_model("core", "GrowProGoal")
+    Project = apps.get_model("core", "Project")
+    Task = apps.get_model("core", "Task")
+    TeamScore = apps.get_model("core", "TeamScore")
+    scores = {}
+
+    def entry(profile_id):
+        return scores.setdefault(profile_id, {"task_points": 0, "project_points": 0, "goal_points": 0})
+
+    rows = (
+        Task.assignees.through.objects.filter(task__is_archived=False)
+        .exclude(task__status="DONE")
+        .values_list("profile_id", "task__priority")
+        .iterator()
+    )
+    for profile_id, priority in rows:
+        entry(profile_id)["task_points"] += TASK_PRIORITY_SCORE.get(priority, 1)
+    memberships = set()
+    for through in (Project.owners.through, Project.participants.through):
+        memberships.update(
+            through.objects.filter(project__is_archived=False).values_list("profile_id", "project_id").iterator()
+        )
+    for profile_id, _ in memberships:
+        entry(profile_id)["project_points"] += 2
+    goals = GrowProGoal.objects.filter(assigned_team__isnull=False, status__in=["ACTIVE", "ON_HOLD"])
+    for profile_id in goals.values_list("assigned_team_id", flat=True).iterator():
+        entry(profile_id)["goal_points"] += 1
+    TeamScore.objects.bulk_create(
+        [TeamScore(profile_id=profile_id, **values) for profile_id, values in scores.items()],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0054_task_visibility'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_points', models.PositiveIntegerField(default=0)),
+                ('project_points', models.PositiveIntegerField(default=0)),
+                ('goal_points', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='team_score', to='core.profile')),
+            ],
+        ),
+        migrations.RunPython(backfill_team_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0055_team_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankedStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.CharField(max_length=16)),
+                ('tournaments', models.PositiveIntegerField(default=0)),
+                ('wins', models.PositiveIntegerField(default=0)),
+                ('battles', models.PositiveIntegerField(default=0)),
+                ('losses', models.PositiveIntegerField(default=0)),
+                ('submissions', models.PositiveIntegerField(default=0)),
+                ('votes', models.PositiveIntegerField(default=0)),
+                ('ranked_points', models.PositiveIntegerField(default=0)),
+                ('tier_key', models.CharField(default='BRONZE', max_length=16)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ranked_standings', to='core.profile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['season', '-ranked_points', '-wins', '-votes', '-submissions', 'profile'], name='ranked_standing_ladder_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='rankedstanding',
+            constraint=models.UniqueConstraint(fields=('season', 'profile'), name='uniq_ranked_standing_season_profile'),
+        ),
+    ]
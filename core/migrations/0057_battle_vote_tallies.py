@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:54
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_vote_tallies(apps, schema_editor):
+    TournamentBattle = apps.get_model("core", "TournamentBattle")
+    TournamentVote = apps.get_model("core", "TournamentVote")
+    counts = {}
+    rows = (
+        TournamentVote.objects.filter(moderation_status="APPROVED")
+        .values("battle_id", "selected_submission_id")
+        .annotate(c=Count("id"))
+        .values_list("battle_id", "selected_submission_id", "c")
+    )
+    for battle_id, submission_id, count in rows:
+        counts.setdefault(battle_id, {})[submission_id] = count
+    battles = []
+    for battle in TournamentBattle.objects.filter(id__in=counts).only("id", "left_submission_id", "right_submission_id"):
+        per_side = counts[battle.id]
+        battle.votes_left_approved = per_side.get(battle.left_submission_id, 0)
+        battle.votes_right_approved = per_side.get(battle.right_submission_id, 0)
+        battles.append(battle)
+    TournamentBattle.objects.bulk_update(battles, ["votes_left_approved", "votes_right_approved"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0056_ranked_standing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournamentbattle',
+            name='votes_left_approved',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tournamentbattle',
+            name='votes_right_approved',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_vote_tallies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:49
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0058_realtime_revisions'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='sideeffectjob',
+            name='core_sideeffect_status_idx',
+        ),
+        migrations.AddField(
+            model_name='sideeffectjob',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='sideeffectjob',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Offen'), ('RUNNING', 'In Arbeit'), ('DONE', 'Erledigt'), ('FAILED', 'Fehlgeschlagen')], default='PENDING', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='sideeffectjob',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='core_sideeffect_due_idx'),
+        ),
+    ]
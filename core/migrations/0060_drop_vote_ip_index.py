@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:15
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0059_side_effect_job_backoff'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='tournamentvote',
+            name='core_vote_battle_ip_idx',
+        ),
+    ]
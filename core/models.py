@@ -2,6 +2,7 @@ import uuid
 
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 ROLE_CHOICES = [
     ("ADMIN","Administrator"),
@@ -88,13 +89,30 @@ class ChatThread(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
 class ChatMessage(models.Model):
-    class Meta: ordering = ["created_at"]
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["thread", "created_at"], name="core_chatmsg_created_idx"),
+            models.Index(fields=["thread", "read"], name="core_chatmsg_read_idx"),
+        ]
     thread = models.ForeignKey(ChatThread, on_delete=models.CASCADE, related_name="messages")
     sender = models.ForeignKey(Profile, on_delete=models.CASCADE)
     text = models.TextField(blank=True)  # Text
     file = models.FileField(upload_to="chat/", blank=True, null=True)  # Anhang
     read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+def _exclude_from_full_save(instance, kwargs, excluded):
+    # Ein normales save() darf serverseitig gepflegte Felder (Revision, Zähler)
+    # nicht mit einem veralteten Stand überschreiben; zurückgestellte Felder bleiben unberührt
+    if not instance._state.adding and kwargs.get("update_fields") is None:
+        deferred = instance.get_deferred_fields()
+        kwargs["update_fields"] = [
+            field.name
+            for field in instance._meta.concrete_fields
+            if not field.primary_key and field.name not in excluded and field.attname not in deferred
+        ]
+
+
 class Project(models.Model):
     PARTICIPANT_TASK_ACCESS_CHOICES = [
         ("NONE", "Keine Task-Rechte"),
@@ -116,8 +134,17 @@ class Project(models.Model):
         default="NONE",
     )
     review_required = models.BooleanField(default=False)
+    # Realtime-Revision, hochgezählt per F()-Update in core.realtime
+    revision = models.PositiveIntegerField(default=0)
+
+    REVISION_FIELDS = ("revision",)
+
     def __str__(self): return self.title
 
+    def save(self, *args, **kwargs):
+        _exclude_from_full_save(self, kwargs, self.REVISION_FIELDS)
+        super().save(*args, **kwargs)
+
 class Task(models.Model):
     PRIORITY_CHOICES = [
         ("LOW", "Niedrig"),
@@ -167,8 +194,29 @@ class Task(models.Model):
         blank=True,
         related_name="generated_recurrences",
     )
+    # Realtime-Revision, hochgezählt per F()-Update in core.realtime
+    revision = models.PositiveIntegerField(default=0)
+
+    REVISION_FIELDS = ("revision",)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at"], name="core_task_created_idx"),
+            models.Index(fields=["is_archived", "status", "due_date"], name="core_task_arch_status_due_idx"),
+            # Offene Tasks (Listen, Reminder, Overdue-Scan) – partieller Index
+            models.Index(
+                fields=["due_date"],
+                name="core_task_open_due_idx",
+                condition=models.Q(is_archived=False) & ~models.Q(status="DONE"),
+            ),
+        ]
+
     def __str__(self): return self.title
 
+    def save(self, *args, **kwargs):
+        _exclude_from_full_save(self, kwargs, self.REVISION_FIELDS)
+        super().save(*args, **kwargs)
+
 class ProjectAttachment(models.Model):
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="attachments")
     uploaded_by = models.ForeignKey(Profile, on_delete=models.SET_NULL, null=True, blank=True, related_name="project_uploads")
@@ -678,14 +726,23 @@ class TournamentBattle(models.Model):
     ends_at = models.DateTimeField(null=True, blank=True)
     closed_at = models.DateTimeField(null=True, blank=True)
     status = models.CharField(max_length=12, choices=STATUS_CHOICES, default="SCHEDULED")
+    # Freigegebene Votes je Seite, gepflegt per F()-Update in core.vote_tallies
+    votes_left_approved = models.PositiveIntegerField(default=0)
+    votes_right_approved = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    TALLY_FIELDS = ("votes_left_approved", "votes_right_approved")
+
     class Meta:
         ordering = ["-round_number", "-created_at"]
 
     def __str__(self):
         return f"{self.tournament} Battle R{self.round_number}"
 
+    def save(self, *args, **kwargs):
+        _exclude_from_full_save(self, kwargs, self.TALLY_FIELDS)
+        super().save(*args, **kwargs)
+
 
 class TournamentVote(models.Model):
     VERIFICATION_CHOICES = [
@@ -856,6 +913,10 @@ class ActivityEntry(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-created_at"], name="core_activity_created_idx"),
+            models.Index(fields=["event_type", "-created_at"], name="core_activity_type_idx"),
+        ]
 
     def __str__(self): return f"{self.title} ({self.event_type})"
 
@@ -882,6 +943,9 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["recipient", "is_read", "-created_at"], name="core_notif_unread_idx"),
+        ]
 
     def __str__(self):
         return f"{self.recipient} - {self.title}"
@@ -1124,3 +1188,167 @@ class ProfileAchievement(models.Model):
     def __str__(self):
         return f"{self.profile} → {self.achievement}"
 
+
+
+class SideEffectJob(models.Model):
+    STATUS_CHOICES = [
+        ("PENDING", "Offen"),
+        ("RUNNING", "In Arbeit"),
+        ("DONE", "Erledigt"),
+        ("FAILED", "Fehlgeschlagen"),
+    ]
+
+    name = models.CharField(max_length=80)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="PENDING")
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    # PENDING: frühester nächster Versuch; RUNNING: Ablauf der Lease
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="core_sideeffect_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+
+class EmailOutboxMessage(models.Model):
+    STATUS_CHOICES = [
+        ("PENDING", "Offen"),
+        ("SENDING", "In Zustellung"),
+        ("SENT", "Versendet"),
+        ("FAILED", "Fehlgeschlagen"),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254, blank=True)
+    recipient = models.CharField(max_length=254)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="PENDING")
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="core_emailoutbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient}: {self.subject} ({self.status})"
+
+
+class ReminderLedger(models.Model):
+    """Merkt sich versendete Task-Erinnerungen je (Task, Typ, Fälligkeitsdatum)."""
+
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="reminder_ledger")
+    event_type = models.CharField(max_length=50)
+    due_date = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(fields=["task", "event_type", "due_date"], name="core_reminder_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["event_type", "due_date"], name="core_reminder_event_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} {self.event_type} ({self.due_date})"
+
+
+class JobCheckpoint(models.Model):
+    """High-Water-Mark für inkrementelle Hintergrund-Jobs (z.B. Overdue-Scan)."""
+
+    key = models.SlugField(max_length=80, unique=True)
+    value = models.CharField(max_length=64, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.key}={self.value}"
+
+
+class TaskVisibility(models.Model):
+    """
+    Denormalisierte Sichtbarkeit: eine Zeile pro (Profil, Task), das den Task
+    über Projekt-Mitgliedschaft oder direkte Zuordnung sehen darf. Wird von
+    ``core.visibility`` per Signal gepflegt.
+    """
+
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name="task_visibility")
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="visibility")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["profile", "task"], name="core_taskvisibility_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.profile_id} -> {self.task_id}"
+
+
+class TeamScore(models.Model):
+    """
+    Ledger der Auslastungspunkte pro Profil (offene Tasks nach Priorität,
+    aktive Projekt-Mitgliedschaften, zugewiesene GrowPro-Ziele). Wird von
+    ``core.team_scores`` per Signal für die betroffenen Profile nachgeführt.
+    """
+
+    profile = models.OneToOneField(Profile, on_delete=models.CASCADE, related_name="team_score")
+    task_points = models.PositiveIntegerField(default=0)
+    project_points = models.PositiveIntegerField(default=0)
+    goal_points = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def workload(self):
+        """Punkte, die in die Review-Zuweisung einfließen (ohne GrowPro)."""
+        return self.task_points + self.project_points
+
+    def __str__(self):
+        return f"{self.profile_id}: {self.workload}"
+
+
+class RankedStanding(models.Model):
+    """
+    Materialisierte Ranked-Ladder pro Season. ``core.ranking`` hält die
+    Zeilen bei Battle-Abschluss, Vote-Moderation und Submission-Freigabe
+    aktuell; ``ranked-overview`` liest sie nur noch sortiert aus.
+    """
+
+    season = models.CharField(max_length=16)
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name="ranked_standings")
+    tournaments = models.PositiveIntegerField(default=0)
+    wins = models.PositiveIntegerField(default=0)
+    battles = models.PositiveIntegerField(default=0)
+    losses = models.PositiveIntegerField(default=0)
+    submissions = models.PositiveIntegerField(default=0)
+    votes = models.PositiveIntegerField(default=0)
+    ranked_points = models.PositiveIntegerField(default=0)
+    tier_key = models.CharField(max_length=16, default="BRONZE")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["season", "profile"], name="uniq_ranked_standing_season_profile"),
+        ]
+        indexes = [
+            models.Index(
+                fields=["season", "-ranked_points", "-wins", "-votes", "-submissions", "profile"],
+                name="ranked_standing_ladder_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.season} {self.profile_id}: {self.ranked_points}"
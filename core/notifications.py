@@ -1,8 +1,8 @@
 from django.conf import settings
-from django.core.mail import send_mail
 from django.utils import timezone
 import logging
 
+from .email_outbox import enqueue_email
 from .models import Notification
 
 
@@ -11,17 +11,18 @@ logger = logging.getLogger(__name__)
 
 def send_notification_email(subject, message, recipients):
     """
-    Fire-and-forget notification email helper.
-    Relies on Django's configured EMAIL backend.
+    Reiht eine Notification-Mail pro Empfänger in den E-Mail-Outbox ein.
+    Die Zustellung läuft nach dem Commit außerhalb des Requests
+    (siehe ``core.email_outbox``).
     """
     if not recipients:
-        return
-    sender = getattr(settings, "DEFAULT_FROM_EMAIL", "noreply@unyq.app")
+        return 0
     try:
-        send_mail(subject, message, sender, recipients, fail_silently=True)
+        return enqueue_email(subject, message, recipients)
     except Exception:
         # Keep UI flows resilient but make failures visible in logs.
-        logger.exception("Notification email failed for recipients=%s", recipients)
+        logger.exception("Notification email could not be queued for recipients=%s", recipients)
+        return 0
 
 
 def _profile_allows(profile, preference_key=None):
@@ -74,29 +75,41 @@ def notify_profiles(
     metadata=None,
     preference_key=None,
     mark_read=False,
+    batch_size=None,
 ):
-    created = []
+    """
+    Legt In-App-Notifications für mehrere Profile an.
+
+    Empfänger werden in einem Durchlauf dedupliziert und nach
+    ``preference_key`` gefiltert, geschrieben wird per ``bulk_create`` in
+    Chunks von ``NOTIFICATION_BULK_BATCH_SIZE``. Gibt die angelegten Zeilen
+    zurück.
+    """
     seen = set()
+    read_at = timezone.now() if mark_read else None
+    pending = []
     for profile in profiles or []:
         if not profile or profile.id in seen:
             continue
         seen.add(profile.id)
-        notification = create_in_app_notification(
-            profile,
-            title,
-            body,
-            notification_type=notification_type,
-            severity=severity,
-            actor=actor,
-            project=project,
-            task=task,
-            metadata=metadata,
-            preference_key=preference_key,
+        if not _profile_allows(profile, preference_key):
+            continue
+        pending.append(
+            Notification(
+                recipient=profile,
+                actor=actor,
+                notification_type=notification_type,
+                title=title,
+                body=body,
+                severity=severity,
+                project=project,
+                task=task,
+                metadata=metadata or {},
+                is_read=bool(mark_read),
+                read_at=read_at,
+            )
         )
-        if notification and mark_read:
-            notification.is_read = True
-            notification.read_at = timezone.now()
-            notification.save(update_fields=["is_read", "read_at"])
-        if notification:
-            created.append(notification)
-    return created
+    if not pending:
+        return []
+    batch_size = batch_size or getattr(settings, "NOTIFICATION_BULK_BATCH_SIZE", 500)
+    return Notification.objects.bulk_create(pending, batch_size=max(1, int(batch_size)))
@@ -2,7 +2,19 @@
 Standardisierte Pagination für alle API ViewSets
 """
 
+import base64
+import json
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import Q, Value
+from django.db.models.functions import Coalesce
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class OptimizedPagePagination(PageNumberPagination):
@@ -48,3 +60,225 @@ class LargeDatasetPaginationMixin:
     Nutzt Cursor-Pagination für bessere Performance
     """
     pagination_class = OptimizedCursorPagination
+
+
+# Sentinel-Werte, damit NULL-Spalten (z.B. due_date) in Keyset-Vergleichen
+# eine definierte Position am Ende der Liste bekommen.
+_NULL_SENTINELS = {
+    models.DateField: date(9999, 12, 31),
+    models.DateTimeField: datetime(9999, 12, 31, tzinfo=dt_timezone.utc),
+}
+
+
+class KeysetCursorPagination(OptimizedCursorPagination):
+    """
+    Echte Keyset-Pagination über die Ordering des Querysets.
+
+    Anders als ``CursorPagination`` (Position + Offset auf dem ersten
+    Ordering-Feld) enthält der Cursor die Werte *aller* Ordering-Keys; die
+    Folgeseite wird per ``(k1, k2, ...) > (v1, v2, ...)`` ausgewählt und
+    kostet damit unabhängig von der Tiefe nur ``page_size + 1`` Zeilen.
+
+    - Die Ordering kommt aus dem Queryset (z.B. vom ``?ordering=`` der View),
+      als Tie-Break werden ``created_at`` und ``id`` ergänzt.
+    - Annotierte Keys (z.B. ``priority_rank``) werden unterstützt,
+      nullable Date/DateTime-Felder über einen Coalesce-Sentinel sortiert.
+    - Kein ``COUNT(*)``; die Antwort enthält ``next``/``previous``/``results``.
+    """
+
+    page_size = 20
+    tie_breakers = ("created_at", "id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.request = request
+        queryset, self.keys = self._prepare_keys(queryset)
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor["r"])
+
+        ordering = [self._order_term(name, desc != reverse) for name, desc, _ in self.keys]
+        queryset = queryset.order_by(*ordering)
+        if cursor:
+            queryset = queryset.filter(self._after(cursor["v"], reverse))
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+        self.page = results
+
+        if reverse:
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = cursor is not None, has_more
+        if not results:
+            self.has_previous = self.has_next = False
+        return results
+
+    # --- Keys -----------------------------------------------------------
+
+    def _prepare_keys(self, queryset):
+        model = queryset.model
+        ordering = [term for term in (queryset.query.order_by or model._meta.ordering or []) if isinstance(term, str)]
+        if len(ordering) != len(queryset.query.order_by or model._meta.ordering or []):
+            raise ValueError("KeysetCursorPagination unterstützt nur String-Orderings.")
+        names = [term.lstrip("-") for term in ordering]
+        for name in self.tie_breakers:
+            if name not in names and name not in {"pk"} and self._has_field(model, name):
+                ordering.append(f"-{name}")
+                names.append(name)
+        if "id" not in names and "pk" not in names:
+            ordering.append("-id")
+
+        keys = []
+        annotations = {}
+        for term in ordering:
+            desc = term.startswith("-")
+            name = term.lstrip("-")
+            if name == "pk":
+                name = "id"
+            attr = name
+            field = self._get_field(model, name)
+            if field is not None and field.null:
+                sentinel = next(
+                    (value for klass, value in _NULL_SENTINELS.items() if isinstance(field, klass)),
+                    None,
+                )
+                if sentinel is not None:
+                    attr = f"_keyset_{name.replace('__', '_')}"
+                    annotations[attr] = Coalesce(name, Value(sentinel, output_field=field.__class__()))
+            keys.append((attr, desc, field))
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        return queryset, keys
+
+    @staticmethod
+    def _has_field(model, name):
+        try:
+            model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return False
+        return True
+
+    @staticmethod
+    def _get_field(model, name):
+        parts = name.split("__")
+        field = None
+        for part in parts:
+            try:
+                field = model._meta.get_field(part)
+            except FieldDoesNotExist:
+                return None
+            if field.is_relation and field.related_model is not None and part != parts[-1]:
+                model = field.related_model
+        return field
+
+    @staticmethod
+    def _order_term(name, desc):
+        return f"-{name}" if desc else name
+
+    def _after(self, values, reverse):
+        if len(values) != len(self.keys):
+            raise NotFound(self.invalid_cursor_message)
+        condition = Q()
+        prefix = Q()
+        for (attr, desc, field), value in zip(self.keys, values):
+            value = self._parse_value(value, field)
+            lookup = "lt" if desc != reverse else "gt"
+            condition |= prefix & Q(**{f"{attr}__{lookup}": value})
+            prefix &= Q(**{attr: value})
+        return condition
+
+    @staticmethod
+    def _parse_value(value, field):
+        if value is None or field is None:
+            return value
+        if isinstance(field, models.DateTimeField):
+            return parse_datetime(value) or value
+        if isinstance(field, models.DateField):
+            return parse_date(value) or value
+        return value
+
+    @staticmethod
+    def _value(obj, attr):
+        value = obj
+        for part in attr.split("__"):
+            value = getattr(value, part, None)
+            if value is None:
+                break
+        if hasattr(value, "pk") and isinstance(value, models.Model):
+            value = value.pk
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        return value
+
+    # --- Cursor ---------------------------------------------------------
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+            return {"v": list(data["v"]), "r": bool(data.get("r"))}
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, values, reverse=False):
+        raw = json.dumps({"v": values, "r": 1 if reverse else 0}, separators=(",", ":"))
+        token = base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def _row_values(self, obj):
+        return [self._value(obj, attr) for attr, _, _ in self.keys]
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self._row_values(self.page[-1]))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self._row_values(self.page[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+
+def wants_cursor_pagination(request):
+    """Opt-in: ``?cursor=...`` oder ``?pagination=cursor``."""
+    params = request.query_params
+    return bool(params.get("cursor")) or params.get("pagination") == "cursor"
+
+
+class KeysetPaginationMixin:
+    """
+    Mixin für ViewSets: Standardmäßig bleibt die bisherige Seiten-Pagination
+    (``pagination_class``) aktiv, per Query-Param wird auf
+    ``KeysetCursorPagination`` umgeschaltet.
+    """
+
+    cursor_pagination_class = KeysetCursorPagination
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            if self.request is not None and wants_cursor_pagination(self.request):
+                self._paginator = self.cursor_pagination_class()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
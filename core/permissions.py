@@ -1,8 +1,11 @@
 from rest_framework.permissions import SAFE_METHODS, BasePermission
 
+from .access import get_access_context
+
 
 def has_role(profile, *role_keys):
-    return bool(profile and profile.roles.filter(key__in=role_keys).exists())
+    context = get_access_context(profile)
+    return bool(context and context.has_role(*role_keys))
 
 
 def is_admin_profile(profile):
@@ -20,17 +23,16 @@ def is_team_profile(profile):
 def can_view_project(profile, project):
     if not profile or not project:
         return False
-    return (
-        is_team_profile(profile)
-        or project.owners.filter(id=profile.id).exists()
-        or project.participants.filter(id=profile.id).exists()
-    )
+    if is_team_profile(profile):
+        return True
+    context = get_access_context(profile)
+    return context.owns(project.id) or context.participates(project.id)
 
 
 def can_manage_project(profile, project):
     if not profile or not project:
         return False
-    return is_team_profile(profile) or project.owners.filter(id=profile.id).exists()
+    return is_team_profile(profile) or get_access_context(profile).owns(project.id)
 
 
 def can_manage_project_tasks(profile, project):
@@ -40,12 +42,10 @@ def can_manage_project_tasks(profile, project):
         return True
     if not project:
         return False
-    if project.owners.filter(id=profile.id).exists():
+    context = get_access_context(profile)
+    if context.owns(project.id):
         return True
-    return (
-        project.participants.filter(id=profile.id).exists()
-        and project.participant_task_access == "EDIT"
-    )
+    return context.participates(project.id) and project.participant_task_access == "EDIT"
 
 
 def can_comment_on_project_tasks(profile, project):
@@ -54,7 +54,7 @@ def can_comment_on_project_tasks(profile, project):
     if not profile or not project:
         return False
     return (
-        project.participants.filter(id=profile.id).exists()
+        get_access_context(profile).participates(project.id)
         and project.participant_task_access in {"COMMENT", "EDIT"}
     )
 
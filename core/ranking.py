@@ -0,0 +1,485 @@
+"""
+Ranked-Ladder: Tier-Konfiguration, Punkteformel und das
+``RankedStanding``-Ledger.
+
+Die Kennzahlen eines Profils (Siege, Battles, Niederlagen, freigegebene
+Submissions und erhaltene Votes) werden mit wenigen gruppierten Queries
+je Quelltabelle berechnet statt über einen großen Multi-Join auf
+``Profile``. ``refresh_ranked_standings`` schreibt sie für die betroffenen
+Profile in die Zeilen der aktuellen Season; die Signal-Receiver in
+``core.signals`` rufen es bei Battle-Abschluss, Vote-Moderation und
+Submission-Freigabe auf; neue Votes laufen gebündelt über
+``schedule_ranked_refresh``. ``ranked_overview_payload`` liest die Ladder
+danach sortiert über den Index ``ranked_standing_ladder_idx``.
+"""
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import (
+    RankedSeasonSettings,
+    RankedStanding,
+    RankTierConfig,
+    TournamentBattle,
+    TournamentSubmission,
+    TournamentVote,
+)
+from .side_effects import dispatch, on_commit_batch
+
+DEFAULT_RANK_TIERS = [
+    {
+        "tier_key": "BRONZE",
+        "display_name": "Bronze",
+        "accent": "#9a6b42",
+        "min_points": 0,
+        "max_points": 799,
+        "win_points": 140,
+        "vote_points": 2,
+        "submission_points": 32,
+        "battle_points": 10,
+        "loss_penalty": 15,
+        "max_losses_without_penalty": 1,
+    },
+    {
+        "tier_key": "SILBER",
+        "display_name": "Silber",
+        "accent": "#8f98a3",
+        "min_points": 800,
+        "max_points": 1599,
+        "win_points": 145,
+        "vote_points": 2,
+        "submission_points": 34,
+        "battle_points": 12,
+        "loss_penalty": 18,
+        "max_losses_without_penalty": 1,
+    },
+    {
+        "tier_key": "GOLD",
+        "display_name": "Gold",
+        "accent": "#c89a2b",
+        "min_points": 1600,
+        "max_points": 2799,
+        "win_points": 150,
+        "vote_points": 3,
+        "submission_points": 36,
+        "battle_points": 14,
+        "loss_penalty": 20,
+        "max_losses_without_penalty": 1,
+    },
+    {
+        "tier_key": "PLATIN",
+        "display_name": "Platin",
+        "accent": "#42b7b7",
+        "min_points": 2800,
+        "max_points": 4199,
+        "win_points": 160,
+        "vote_points": 3,
+        "submission_points": 38,
+        "battle_points": 16,
+        "loss_penalty": 24,
+        "max_losses_without_penalty": 0,
+    },
+    {
+        "tier_key": "LEGENDAER",
+        "display_name": "Legendär",
+        "accent": "#ff1493",
+        "min_points": 4200,
+        "max_points": None,
+        "win_points": 170,
+        "vote_points": 4,
+        "submission_points": 40,
+        "battle_points": 18,
+        "loss_penalty": 28,
+        "max_losses_without_penalty": 0,
+    },
+]
+
+STAT_FIELDS = ("tournaments", "wins", "battles", "losses", "submissions", "votes", "ranked_points", "tier_key")
+# Sortierung der Ladder, passend zu ``ranked_standing_ladder_idx``
+LADDER_ORDER = ("-ranked_points", "-wins", "-votes", "-submissions", "profile_id")
+REFRESH_CHUNK_SIZE = 500
+REFRESH_PENDING_PREFIX = "ranked-refresh-pending"
+
+
+def ensure_ranked_defaults():
+    existing = set(RankTierConfig.objects.values_list("tier_key", flat=True))
+    for row in DEFAULT_RANK_TIERS:
+        if row["tier_key"] not in existing:
+            RankTierConfig.objects.get_or_create(
+                tier_key=row["tier_key"],
+                defaults=row,
+            )
+    settings_obj, _ = RankedSeasonSettings.objects.get_or_create(
+        id=1,
+        defaults={"duration_months": 3, "seasons_per_year": 4},
+    )
+    return settings_obj
+
+
+def tier_configs():
+    ensure_ranked_defaults()
+    return list(RankTierConfig.objects.all().order_by("min_points", "id"))
+
+
+def _ranked_context():
+    """Aktuelle Season und Tier-Zeilen mit einem einzigen Defaults-Check."""
+    settings_obj = ensure_ranked_defaults()
+    tier_rows = list(RankTierConfig.objects.all().order_by("min_points", "id"))
+    return season_payload(settings_obj)["label"], tier_rows
+
+
+def tier_payload(tier):
+    return {
+        "key": tier.tier_key,
+        "label": tier.display_name,
+        "accent": tier.accent,
+        "min": tier.min_points,
+        "max": tier.max_points,
+        "loss_penalty": tier.loss_penalty,
+        "max_losses_without_penalty": tier.max_losses_without_penalty,
+        "win_points": tier.win_points,
+        "vote_points": tier.vote_points,
+        "submission_points": tier.submission_points,
+        "battle_points": tier.battle_points,
+    }
+
+
+def rank_tier_for_points(points, tier_rows=None):
+    tiers = tier_rows or tier_configs()
+    for idx, tier in enumerate(tiers):
+        max_points = tier.max_points
+        if max_points is None or points <= max_points:
+            next_tier = tiers[idx + 1] if idx + 1 < len(tiers) else None
+            tier_span = ((max_points - tier.min_points) + 1) if max_points is not None else None
+            progress = 100
+            if tier_span:
+                progress = int(max(0, min(100, ((points - tier.min_points) / tier_span) * 100)))
+            return {
+                "key": tier.tier_key,
+                "label": tier.display_name,
+                "accent": tier.accent,
+                "range_min": tier.min_points,
+                "range_max": max_points,
+                "progress_percent": progress,
+                "next_tier": next_tier.tier_key if next_tier else None,
+                "next_tier_label": next_tier.display_name if next_tier else None,
+                "next_tier_points": next_tier.min_points if next_tier else None,
+                "loss_penalty": tier.loss_penalty,
+                "max_losses_without_penalty": tier.max_losses_without_penalty,
+            }
+    return {
+        "key": "BRONZE",
+        "label": "Bronze",
+        "accent": "#9a6b42",
+        "range_min": 0,
+        "range_max": 799,
+        "progress_percent": 0,
+        "next_tier": "SILBER",
+        "next_tier_label": "Silber",
+        "next_tier_points": 800,
+        "loss_penalty": 15,
+        "max_losses_without_penalty": 1,
+    }
+
+
+def rank_points(wins, approved_votes, battles, approved_submissions, losses, tier_rows=None):
+    tiers = tier_rows or tier_configs()
+    bronze = tiers[0] if tiers else None
+    if not bronze:
+        base = (wins * 140) + (approved_votes * 2) + (approved_submissions * 32) + (battles * 10)
+        return max(0, base - (losses * 15))
+
+    base = (
+        (wins * int(bronze.win_points or 0))
+        + (approved_votes * int(bronze.vote_points or 0))
+        + (approved_submissions * int(bronze.submission_points or 0))
+        + (battles * int(bronze.battle_points or 0))
+    )
+    initial_tier = rank_tier_for_points(base, tier_rows=tiers)
+    current_tier = next((row for row in tiers if row.tier_key == initial_tier["key"]), bronze)
+    free_losses = int(current_tier.max_losses_without_penalty or 0)
+    penalized_losses = max(0, int(losses) - free_losses)
+    penalty = penalized_losses * int(current_tier.loss_penalty or 0)
+    score = base - penalty
+    return max(0, score)
+
+
+def season_payload(settings_obj=None):
+    if settings_obj is None:
+        settings_obj = ensure_ranked_defaults()
+    duration = max(1, int(settings_obj.duration_months or 3))
+    seasons_per_year = max(1, int(settings_obj.seasons_per_year or 4))
+
+    now = timezone.now()
+    month_index = max(0, now.month - 1)
+    season_index = (month_index // duration) + 1
+    season_start_month = ((season_index - 1) * duration) + 1
+
+    return {
+        "duration_months": duration,
+        "seasons_per_year": seasons_per_year,
+        "year": now.year,
+        "season_index": season_index,
+        "label": f"S{season_index} {now.year}",
+        "season_start_month": season_start_month,
+    }
+
+
+def _grouped(queryset, key):
+    return queryset.values(key).annotate(c=Count("id")).values_list(key, "c")
+
+
+def compute_player_stats(profile_ids=None):
+    """
+    Rohkennzahlen je Profil aus Submissions, Votes und geschlossenen
+    Battles. ``profile_ids=None`` berechnet alle Profile mit Submissions.
+    """
+    submissions = TournamentSubmission.objects.all()
+    votes = TournamentVote.objects.filter(moderation_status="APPROVED")
+    battles = TournamentBattle.objects.filter(status="CLOSED")
+    if profile_ids is not None:
+        submissions = submissions.filter(profile_id__in=profile_ids)
+        votes = votes.filter(selected_submission__profile_id__in=profile_ids)
+
+    stats = defaultdict(lambda: defaultdict(int))
+    for profile_id, count in submissions.values("profile_id").annotate(
+        c=Count("tournament", distinct=True)
+    ).values_list("profile_id", "c"):
+        stats[profile_id]["tournaments"] = count
+    for profile_id, count in _grouped(submissions.filter(status="APPROVED"), "profile_id"):
+        stats[profile_id]["submissions"] = count
+    for profile_id, count in _grouped(votes, "selected_submission__profile_id"):
+        stats[profile_id]["votes"] = count
+
+    # Battles/Siege getrennt nach No-Loss-Turnieren, die nicht in die Niederlagen zählen
+    for side, key in (("left", "battles"), ("right", "battles"), ("winner", "wins")):
+        side_battles = battles.filter(**{f"{side}_submission__isnull": False})
+        if profile_ids is not None:
+            side_battles = side_battles.filter(**{f"{side}_submission__profile_id__in": profile_ids})
+        rows = (
+            side_battles
+            .values(f"{side}_submission__profile_id", "tournament__is_no_loss")
+            .annotate(c=Count("id"))
+            .values_list(f"{side}_submission__profile_id", "tournament__is_no_loss", "c")
+        )
+        for profile_id, is_no_loss, count in rows:
+            stats[profile_id][key] += count
+            if not is_no_loss:
+                stats[profile_id][f"ranked_{key}"] += count
+
+    if profile_ids is not None:
+        return {profile_id: stats[profile_id] for profile_id in profile_ids}
+    return dict(stats)
+
+
+def standing_values(raw, tier_rows):
+    """Rechnet Rohkennzahlen in eine Ladder-Zeile um; ``None`` = nicht gelistet."""
+    wins = raw.get("wins", 0)
+    battles = raw.get("battles", 0)
+    votes = raw.get("votes", 0)
+    submissions = raw.get("submissions", 0)
+    if wins == 0 and votes == 0 and submissions == 0 and battles == 0:
+        return None
+    losses = max(0, raw.get("ranked_battles", 0) - raw.get("ranked_wins", 0))
+    points = rank_points(
+        wins=wins,
+        approved_votes=votes,
+        battles=battles,
+        approved_submissions=submissions,
+        losses=losses,
+        tier_rows=tier_rows,
+    )
+    return {
+        "tournaments": raw.get("tournaments", 0),
+        "wins": wins,
+        "battles": battles,
+        "losses": losses,
+        "submissions": submissions,
+        "votes": votes,
+        "ranked_points": points,
+        "tier_key": rank_tier_for_points(points, tier_rows=tier_rows)["key"],
+    }
+
+
+def _write_standings(season, stats, tier_rows, profile_ids):
+    existing = {
+        row.profile_id: row for row in RankedStanding.objects.filter(season=season, profile_id__in=profile_ids)
+    }
+    missing = []
+    changed = []
+    stale = []
+    now = timezone.now()
+    for profile_id in profile_ids:
+        values = standing_values(stats.get(profile_id) or {}, tier_rows)
+        row = existing.get(profile_id)
+        if values is None:
+            if row is not None:
+                stale.append(row.id)
+            continue
+        if row is None:
+            missing.append(RankedStanding(season=season, profile_id=profile_id, **values))
+        elif any(getattr(row, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(row, field, value)
+            row.updated_at = now
+            changed.append(row)
+    if stale:
+        RankedStanding.objects.filter(id__in=stale).delete()
+    if missing:
+        RankedStanding.objects.bulk_create(missing, ignore_conflicts=True)
+    if changed:
+        RankedStanding.objects.bulk_update(changed, [*STAT_FIELDS, "updated_at"])
+    return len(stale) + len(missing) + len(changed)
+
+
+def rebuild_ranked_standings():
+    """Baut die Ladder der aktuellen Season komplett neu auf."""
+    season, tier_rows = _ranked_context()
+    return _rebuild(season, tier_rows)
+
+
+def _rebuild(season, tier_rows):
+    stats = compute_player_stats()
+    profile_ids = sorted(
+        set(stats) | set(RankedStanding.objects.filter(season=season).values_list("profile_id", flat=True))
+    )
+    profile_ids = [profile_id for profile_id in profile_ids if profile_id]
+    updated = 0
+    with transaction.atomic():
+        for offset in range(0, len(profile_ids), REFRESH_CHUNK_SIZE):
+            chunk = profile_ids[offset:offset + REFRESH_CHUNK_SIZE]
+            updated += _write_standings(season, stats, tier_rows, chunk)
+    return {"season": season, "profiles": len(profile_ids), "updated": updated}
+
+
+def refresh_ranked_standings(profile_ids):
+    """Berechnet die Ladder-Zeilen der übergebenen Profile neu."""
+    profile_ids = sorted({profile_id for profile_id in profile_ids if profile_id})
+    if not profile_ids:
+        return 0
+    season, tier_rows = _ranked_context()
+    # Neue Season: erst komplett aufbauen, sonst fehlen alle übrigen Profile
+    if not RankedStanding.objects.filter(season=season).exists():
+        return _rebuild(season, tier_rows)["updated"]
+    updated = 0
+    for offset in range(0, len(profile_ids), REFRESH_CHUNK_SIZE):
+        chunk = profile_ids[offset:offset + REFRESH_CHUNK_SIZE]
+        updated += _write_standings(season, compute_player_stats(chunk), tier_rows, chunk)
+    return updated
+
+
+def _pending_key(profile_id):
+    return f"{REFRESH_PENDING_PREFIX}:{profile_id}"
+
+
+def schedule_ranked_refresh(profile_ids):
+    """
+    Plant die Neuberechnung nach dem Commit. Für Profile mit ausstehendem
+    Lauf wird nichts erneut eingeplant – ein Vote-Ansturm auf eine Battle
+    ergibt so nur wenige Läufe.
+    """
+    profile_ids = {profile_id for profile_id in profile_ids if profile_id}
+    if profile_ids:
+        on_commit_batch(_claim_ranked_refresh, profile_ids)
+
+
+def _claim_ranked_refresh(profile_ids):
+    # Sperren erst nach dem Commit: ein Rollback blockiert sonst spätere Läufe
+    timeout = max(1, int(getattr(settings, "RANKED_REFRESH_DEBOUNCE_SECONDS", 60)))
+    pending = [
+        profile_id
+        for profile_id in sorted(profile_ids)
+        if cache.add(_pending_key(profile_id), 1, timeout=timeout)
+    ]
+    if pending:
+        dispatch("ranked_standings_refresh", {"profile_ids": pending})
+
+
+def release_ranked_refresh(profile_ids):
+    cache.delete_many([_pending_key(profile_id) for profile_id in profile_ids])
+
+
+def _ahead_of(standing):
+    """Filter für alle Zeilen, die in ``LADDER_ORDER`` vor ``standing`` liegen."""
+    points = standing.ranked_points
+    wins = standing.wins
+    votes = standing.votes
+    submissions = standing.submissions
+    return (
+        Q(ranked_points__gt=points)
+        | Q(ranked_points=points, wins__gt=wins)
+        | Q(ranked_points=points, wins=wins, votes__gt=votes)
+        | Q(ranked_points=points, wins=wins, votes=votes, submissions__gt=submissions)
+        | Q(ranked_points=points, wins=wins, votes=votes, submissions=submissions, profile_id__lt=standing.profile_id)
+    )
+
+
+def rank_of(standing):
+    """Platz von ``standing`` per Index-Count statt linearer Suche."""
+    return RankedStanding.objects.filter(_ahead_of(standing), season=standing.season).count() + 1
+
+
+def ranked_overview_payload(me=None, limit=None):
+    season, tier_rows = _ranked_context()
+    standings = RankedStanding.objects.filter(season=season)
+    if not standings.exists():
+        _rebuild(season, tier_rows)
+
+    ladder = standings.select_related("profile__user").prefetch_related("profile__roles").order_by(*LADDER_ORDER)
+    if limit:
+        ladder = ladder[:limit]
+    rows = []
+    for idx, standing in enumerate(ladder):
+        profile = standing.profile
+        roles = list(profile.roles.all())
+        rows.append(
+            {
+                "profile_id": profile.id,
+                "name": profile.name or profile.user.username,
+                "role_keys": [role.key for role in roles],
+                "roles": [role.get_key_display() for role in roles],
+                "tournaments": standing.tournaments,
+                "wins": standing.wins,
+                "battles": standing.battles,
+                "losses": standing.losses,
+                "submissions": standing.submissions,
+                "votes": standing.votes,
+                "ranked_points": standing.ranked_points,
+                "tier": rank_tier_for_points(standing.ranked_points, tier_rows=tier_rows),
+                "rank": idx + 1,
+            }
+        )
+
+    my_rank = None
+    if me:
+        mine = next((row for row in rows if row["profile_id"] == me.id), None)
+        if mine:
+            my_rank = mine["rank"]
+        elif limit:
+            standing = standings.filter(profile=me).first()
+            my_rank = rank_of(standing) if standing else None
+
+    distribution = {tier.tier_key: 0 for tier in tier_rows}
+    if limit:
+        total_players = standings.count()
+        for tier_key, count in _grouped(standings, "tier_key"):
+            distribution[tier_key] = distribution.get(tier_key, 0) + count
+    else:
+        total_players = len(rows)
+        for row in rows:
+            distribution[row["tier"]["key"]] = distribution.get(row["tier"]["key"], 0) + 1
+
+    return {
+        "season": season,
+        "total_players": total_players,
+        "rank_distribution": distribution,
+        "tiers": [tier_payload(tier) for tier in tier_rows],
+        "my_profile_id": me.id if me else None,
+        "my_rank": my_rank,
+        "rows": rows,
+    }
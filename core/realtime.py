@@ -1,7 +1,85 @@
+"""
+Realtime-Broadcasts für Tasks, Projekte und Battles.
+
+Task- und Projekt-Updates tragen nur die geänderten Felder (``changes``)
+und die neue ``revision`` der Entität – vergeben im Schreibpfad, in der
+Transaktion des Saves, nicht erst im Side-Effect-Handler. Ein Client wendet das Delta an,
+wenn seine lokale Revision genau ``revision - 1`` ist, und lädt das
+Objekt sonst per REST nach. Nur ``created`` sendet die volle
+Serialisierung mit. Task- und Projekt-Events laufen über den Coalescer
+(``core.coalescer``) und gehen gebündelt als ``updates.batch`` raus; jeder
+Frame trägt eine Sequenznummer für den Replay nach Reconnects
+(``core.replay``).
+
+Gruppen:
+
+- ``projects_all`` / ``tasks_all``: alle Projekt- bzw. Task-Events,
+- ``project_<id>``: Projekt- und Task-Events genau dieses Projekts,
+- ``battle_<id>``: Live-Stand einer Battle,
+- ``chat_<id>``: Nachrichten eines Chat-Threads (``ChatConsumer``).
+"""
+
+import logging
+from datetime import date, datetime
+
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
+from django.db import transaction
+from django.db.models import F
+from rest_framework import serializers
+
+from .coalescer import get_coalescer
+from .models import Profile, Project
+from .replay import get_replay_buffer
+from .serializers import ProfileMiniSerializer, ProjectSerializer, TaskSerializer
+
+TASK_DELTA_FIELDS = (
+    "project",
+    "title",
+    "status",
+    "review_required",
+    "review_status",
+    "priority",
+    "due_date",
+    "task_type",
+    "recurrence_pattern",
+    "recurrence_interval",
+    "recurrence_generated",
+    "updated_by",
+    "completed_at",
+    "reviewed_at",
+    "is_archived",
+    "archived_at",
+)
+TASK_MEMBER_FIELDS = ("assignees", "stakeholders")
+PROJECT_DELTA_FIELDS = (
+    "title",
+    "color",
+    "description",
+    "status",
+    "review_required",
+    "participant_task_access",
+    "is_archived",
+    "archived_at",
+)
+PROJECT_MEMBER_FIELDS = ("participants", "owners")
+
+logger = logging.getLogger(__name__)
 
-from .serializers import ProjectSerializer, TaskSerializer
+_date_field = serializers.DateField()
+_datetime_field = serializers.DateTimeField()
+
+
+def project_group(project_id):
+    return f"project_{project_id}"
+
+
+def battle_group(battle_id):
+    return f"battle_{battle_id}"
+
+
+def chat_group(thread_id):
+    return f"chat_{thread_id}"
 
 
 def _broadcast(group, payload):
@@ -14,25 +92,206 @@ def _broadcast(group, payload):
     )
 
 
-def notify_project_event(project, action):
-    data = ProjectSerializer(project, context={"request": None}).data
-    _broadcast(
-        "projects_all",
-        {
-            "entity": "project",
-            "action": action,
-            "data": data,
-        },
-    )
+def _json_value(value):
+    if isinstance(value, datetime):
+        return _datetime_field.to_representation(value)
+    if isinstance(value, date):
+        return _date_field.to_representation(value)
+    return value
+
+
+def _entity_state(instance, fields, member_fields):
+    meta = instance._meta
+    state = {field: _json_value(getattr(instance, meta.get_field(field).attname)) for field in fields}
+    for field in member_fields:
+        state[field] = sorted(getattr(instance, field).values_list("id", flat=True))
+    return state
+
+
+def task_state(task):
+    """JSON-fähiger Stand der Delta-Felder einer Task inkl. Mitglieder-IDs."""
+    return _entity_state(task, TASK_DELTA_FIELDS, TASK_MEMBER_FIELDS)
+
+
+def project_state(project):
+    """JSON-fähiger Stand der Delta-Felder eines Projekts inkl. Mitglieder-IDs."""
+    return _entity_state(project, PROJECT_DELTA_FIELDS, PROJECT_MEMBER_FIELDS)
+
+
+def field_changes(instance, fields):
+    """Delta für gezielt gesetzte Felder, z.B. beim Archivieren."""
+    return {field: _json_value(getattr(instance, instance._meta.get_field(field).attname)) for field in fields}
+
+
+def state_changes(previous, current):
+    """Geänderte Felder zwischen zwei Ständen; ``None``, wenn kein Vorzustand bekannt ist."""
+    if previous is None or current is None:
+        return None
+    return {field: value for field, value in current.items() if field in previous and previous[field] != value}
+
+
+def _profiles_by_id(ids):
+    return {profile.id: profile for profile in Profile.objects.filter(id__in=ids).select_related("user")}
+
 
+def _expand_task_changes(changes):
+    """Bringt IDs im Delta in die Form des ``TaskSerializer``."""
+    profile_ids = set()
+    for field in TASK_MEMBER_FIELDS:
+        profile_ids.update(changes.get(field) or [])
+    if changes.get("updated_by"):
+        profile_ids.add(changes["updated_by"])
+    profiles = _profiles_by_id(profile_ids) if profile_ids else {}
+    for field in TASK_MEMBER_FIELDS:
+        if field in changes:
+            changes[field] = ProfileMiniSerializer(
+                [profiles[pid] for pid in changes[field] if pid in profiles], many=True
+            ).data
+    if "updated_by" in changes:
+        profile = profiles.get(changes["updated_by"])
+        changes["updated_by"] = ProfileMiniSerializer(profile).data if profile else None
+    if "project" in changes:
+        changes["project_title"] = (
+            Project.objects.filter(id=changes["project"]).values_list("title", flat=True).first()
+            if changes["project"]
+            else None
+        )
+    return changes
 
-def notify_task_event(task, action):
-    data = TaskSerializer(task, context={"request": None}).data
+
+def _expand_project_changes(changes):
+    """Mitglieder wie ``ProjectSerializer.get_participants``/``get_owners``."""
+    profile_ids = set()
+    for field in PROJECT_MEMBER_FIELDS:
+        profile_ids.update(changes.get(field) or [])
+    profiles = _profiles_by_id(profile_ids) if profile_ids else {}
+    for field in PROJECT_MEMBER_FIELDS:
+        if field in changes:
+            changes[field] = [
+                {"id": pid, "name": profiles[pid].name or profiles[pid].user.username}
+                for pid in changes[field]
+                if pid in profiles
+            ]
+    return changes
+
+
+def bump_revision(instance):
+    """Zählt die Revision atomar hoch und liefert den neuen Wert."""
+    model = type(instance)
+    # Eine Transaktion: die Zeilensperre des UPDATE hält parallele Bumps bis
+    # nach dem Zurücklesen auf, jeder Aufruf sieht also seinen eigenen Wert
+    with transaction.atomic():
+        model.objects.filter(pk=instance.pk).update(revision=F("revision") + 1)
+        revision = model.objects.filter(pk=instance.pk).values_list("revision", flat=True).first()
+    if revision is not None:
+        instance.revision = revision
+    return revision
+
+
+def _send_batch(group, events):
+    channel_layer = get_channel_layer()
+    if not channel_layer:
+        return
+    try:
+        seq = get_replay_buffer().append(group, events)
+    except Exception:
+        # Ohne Sequenz geht der Frame trotzdem raus; Clients laden beim nächsten Reconnect neu
+        logger.exception("Replay-Puffer für %s nicht erreichbar", group)
+        seq = None
+    async_to_sync(channel_layer.group_send)(group, {"type": "updates.batch", "seq": seq, "events": events})
+
+
+def _deliver_batch(group, events):
+    # Späte Bindung, damit der prozessweite Coalescer immer den aktuellen Sender nutzt
+    _send_batch(group, events)
+
+
+def _emit(groups, payload):
+    payload["base_revision"] = payload["revision"] - 1 if payload["revision"] else 0
+    get_coalescer(_deliver_batch).add(groups, payload)
+
+
+def flush_realtime():
+    """Sendet gepufferte Events sofort (Tests, Management-Commands)."""
+    get_coalescer(_deliver_batch).flush()
+
+
+def realtime_metrics():
+    """Zähler des Coalescers: Events rein, zusammengeführt, Frames raus."""
+    return get_coalescer(_deliver_batch).snapshot()
+
+
+def notify_project_event(project, action, changes=None, revision=None):
+    """
+    ``created`` sendet das volle Projekt, ``deleted`` nur die ID, alle
+    anderen Aktionen das Delta. ``changes=None`` heißt "Stand unbekannt" –
+    Clients laden nach. Ein leeres Delta wird nicht gesendet.
+
+    ``revision`` stammt aus dem Schreibpfad (siehe ``bump_revision``);
+    ohne Angabe wird hier hochgezählt. Handler laufen parallel im Pool und
+    würden älteren Deltas sonst eine höhere Revision geben.
+    """
+    if action not in ("created", "deleted") and changes == {}:
+        return
+    payload = {
+        "entity": "project",
+        "action": action,
+        "id": project.id,
+        "revision": revision if revision is not None else bump_revision(project),
+    }
+    if action == "created":
+        payload["data"] = ProjectSerializer(project, context={"request": None}).data
+    elif action != "deleted":
+        payload["changes"] = _expand_project_changes(dict(changes)) if changes is not None else None
+    _emit(["projects_all", project_group(project.id)], payload)
+
+
+def notify_task_event(task, action, changes=None, previous_project_id=None, revision=None):
+    """
+    Wie ``notify_project_event``; geht an ``tasks_all`` und die Gruppe des
+    Projekts – bei einem Projektwechsel auch an die des alten Projekts.
+    """
+    if action not in ("created", "deleted") and changes == {}:
+        return
+    payload = {
+        "entity": "task",
+        "action": action,
+        "id": task.id,
+        "project": task.project_id,
+        "revision": revision if revision is not None else bump_revision(task),
+    }
+    if action == "created":
+        payload["data"] = TaskSerializer(task, context={"request": None}).data
+    elif action != "deleted":
+        payload["changes"] = _expand_task_changes(dict(changes)) if changes is not None else None
+    groups = ["tasks_all"]
+    for project_id in dict.fromkeys([task.project_id, previous_project_id]):
+        if project_id:
+            groups.append(project_group(project_id))
+    _emit(groups, payload)
+
+
+def notify_battle_tally(battle_id, tally):
     _broadcast(
-        "tasks_all",
+        battle_group(battle_id),
         {
-            "entity": "task",
-            "action": action,
-            "data": data,
+            "entity": "battle_tally",
+            "action": "updated",
+            "data": {
+                "battle": battle_id,
+                "votes_left": tally["votes_left_approved"],
+                "votes_right": tally["votes_right_approved"],
+            },
         },
     )
+
+
+def notify_chat_unread(thread_id, sender_id):
+    """
+    Meldet offenen Sockets eines Threads eine per REST angelegte Nachricht,
+    damit ihr nächster Read-Frame wieder die DB fragt.
+    """
+    channel_layer = get_channel_layer()
+    if not channel_layer:
+        return
+    async_to_sync(channel_layer.group_send)(chat_group(thread_id), {"type": "chat.unread", "profile": sender_id})
@@ -0,0 +1,156 @@
+"""
+Replay-Puffer für den Update-Stream.
+
+Jeder ``updates.batch``-Frame bekommt eine prozessübergreifend steigende
+Sequenznummer (``seq``) und landet in einem begrenzten Ringpuffer je
+Gruppe. Ein Client, der mit ``?since=<seq>`` neu verbindet, bekommt nur
+die verpassten Frames nachgeliefert – oder ``resync``, wenn die Lücke
+größer als der Puffer ist.
+
+Jeder Eintrag merkt sich die ``seq`` seines Vorgängers in derselben
+Gruppe (``prev``). Hat der älteste noch gehaltene Eintrag ``prev > since``,
+wurde dazwischen etwas verdrängt und der Client muss neu laden.
+
+- ``RedisReplayBuffer``: ein Redis-Stream je Gruppe unter
+  ``REALTIME_REPLAY_REDIS_URL`` (Default: ``CHANNEL_REDIS_URL``).
+- ``LocalReplayBuffer``: prozesslokal, passend zum InMemory-Channel-Layer.
+
+Größe je Gruppe: ``REALTIME_REPLAY_SIZE`` (Default 1000).
+"""
+
+import json
+import threading
+from collections import deque
+
+from django.conf import settings
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+# INCR, Vorgänger tauschen und XADD in einem Schritt, damit die Reihenfolge
+# im Stream der Sequenz entspricht
+_APPEND_SCRIPT = """
+local seq = redis.call('INCR', KEYS[1])
+local prev = redis.call('GETSET', KEYS[2], seq)
+if not prev then prev = 0 end
+redis.call('XADD', KEYS[3], 'MAXLEN', ARGV[2], '*', 'seq', seq, 'prev', prev, 'frame', ARGV[1])
+return seq
+"""
+
+
+def _replay_size():
+    return max(1, int(getattr(settings, "REALTIME_REPLAY_SIZE", 1000)))
+
+
+class BaseReplayBuffer:
+    def append(self, group, events):
+        """Legt einen Frame ab und liefert seine Sequenznummer."""
+        raise NotImplementedError
+
+    def current(self):
+        """Zuletzt vergebene Sequenznummer."""
+        raise NotImplementedError
+
+    def since(self, group, since):
+        """
+        Frames der Gruppe nach ``since`` als ``[(seq, events), ...]`` und ob
+        die Lücke vollständig geschlossen werden kann.
+        """
+        entries, current, last = self._entries(group)
+        if since > current:
+            # Sequenz wurde zurückgesetzt (Neustart ohne Redis)
+            return [], False
+        # Ältester Eintrag hat einen Vorgänger nach ``since`` bzw. Stream ist weg
+        oldest_prev = entries[0][1] if entries else last
+        if oldest_prev > since:
+            return [], False
+        return [(seq, events) for seq, _, events in entries if seq > since], True
+
+    def _entries(self, group):
+        """``([(seq, prev, events), ...], aktuelle seq, letzte seq der Gruppe)``"""
+        raise NotImplementedError
+
+
+class RedisReplayBuffer(BaseReplayBuffer):
+    def __init__(self, url, prefix="replay"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._append = self.client.register_script(_APPEND_SCRIPT)
+
+    def append(self, group, events):
+        keys = [f"{self.prefix}:seq", f"{self.prefix}:last:{group}", f"{self.prefix}:{group}"]
+        return int(self._append(keys=keys, args=[json.dumps(events), _replay_size()]))
+
+    def current(self):
+        return int(self.client.get(f"{self.prefix}:seq") or 0)
+
+    def _entries(self, group):
+        pipe = self.client.pipeline()
+        pipe.xrange(f"{self.prefix}:{group}")
+        pipe.get(f"{self.prefix}:seq")
+        pipe.get(f"{self.prefix}:last:{group}")
+        rows, current, last = pipe.execute()
+        entries = [
+            (int(fields[b"seq"]), int(fields[b"prev"]), json.loads(fields[b"frame"]))
+            for _, fields in rows
+        ]
+        return entries, int(current or 0), int(last or 0)
+
+
+class LocalReplayBuffer(BaseReplayBuffer):
+    def __init__(self):
+        self._seq = 0
+        self._streams = {}
+        self._last = {}
+        self._lock = threading.Lock()
+
+    def append(self, group, events):
+        with self._lock:
+            self._seq += 1
+            stream = self._streams.get(group)
+            if stream is None or stream.maxlen != _replay_size():
+                stream = self._streams[group] = deque(stream or (), maxlen=_replay_size())
+            stream.append((self._seq, self._last.get(group, 0), events))
+            self._last[group] = self._seq
+            return self._seq
+
+    def current(self):
+        with self._lock:
+            return self._seq
+
+    def _entries(self, group):
+        with self._lock:
+            return list(self._streams.get(group, ())), self._seq, self._last.get(group, 0)
+
+
+def get_replay_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                url = getattr(settings, "REALTIME_REPLAY_REDIS_URL", None)
+                _buffer = RedisReplayBuffer(url) if url else LocalReplayBuffer()
+    return _buffer
+
+
+def reset_replay_buffer():
+    global _buffer
+    with _buffer_lock:
+        _buffer = None
+
+
+def missed_frames(groups, since):
+    """
+    Verpasste Frames aller ``groups`` nach Sequenz sortiert, oder ``None``,
+    wenn mindestens eine Gruppe die Lücke nicht mehr abdeckt.
+    """
+    buffer = get_replay_buffer()
+    frames = []
+    for group in groups:
+        group_frames, complete = buffer.since(group, since)
+        if not complete:
+            return None
+        frames.extend(group_frames)
+    return sorted(frames, key=lambda frame: frame[0])
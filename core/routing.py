@@ -1,7 +1,8 @@
 from django.urls import re_path
-from .consumers import ChatConsumer, UpdatesConsumer
+from .consumers import BattleTallyConsumer, ChatConsumer, UpdatesConsumer
 
 websocket_urlpatterns = [
     re_path(r"^ws/chat/(?P<thread_id>\d+)/?$", ChatConsumer.as_asgi()),
     re_path(r"^ws/updates/?$", UpdatesConsumer.as_asgi()),
+    re_path(r"^ws/battles/(?P<battle_id>\d+)/?$", BattleTallyConsumer.as_asgi()),
 ]
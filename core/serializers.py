@@ -59,6 +59,7 @@ from .models import (
     TournamentVote,
 )
 from .file_validators import validate_audio_file
+from .permissions import has_role, is_team_profile
 from .platform_registry import is_system_platform
 
 
@@ -340,7 +341,7 @@ class ProfileSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
         if roles is not None and request:
             requester_profile = getattr(request.user, "profile", None)
-            is_admin = bool(requester_profile and requester_profile.roles.filter(key="ADMIN").exists())
+            is_admin = bool(requester_profile and has_role(requester_profile, "ADMIN"))
             if not is_admin:
                 roles = [role for role in roles if role.key not in {"TEAM", "ADMIN"}]
                 validated_data["roles"] = roles
@@ -353,7 +354,7 @@ class ProfileSerializer(serializers.ModelSerializer):
         return not user.is_active
 
     def get_is_team_member(self, obj):
-        return obj.roles.filter(key__in=["TEAM", "ADMIN"]).exists()
+        return is_team_profile(obj)
 
     def get_avatar_url(self, obj):
         avatar = getattr(obj, "avatar", None)
@@ -367,7 +368,7 @@ class ProfileSerializer(serializers.ModelSerializer):
     def get_email(self, obj):
         request = self.context.get("request")
         me = getattr(getattr(request, "user", None), "profile", None) if request else None
-        if not me or not me.roles.filter(key__in=["TEAM", "ADMIN"]).exists():
+        if not me or not is_team_profile(me):
             return None
         return getattr(obj.user, "email", "")
 
@@ -496,8 +497,9 @@ class ProjectSerializer(serializers.ModelSerializer):
             "participant_task_access",
             "is_archived",
             "archived_at",
+            "revision",
         ]
-        read_only_fields = ["id", "created_at", "participants", "owners", "is_archived", "archived_at"]
+        read_only_fields = ["id", "created_at", "participants", "owners", "is_archived", "archived_at", "revision"]
 
     def get_participants(self, obj):
         return [
@@ -581,10 +583,12 @@ class TaskSerializer(serializers.ModelSerializer):
             "reviewed_at",
             "is_archived",
             "archived_at",
+            "revision",
         ]
         read_only_fields = [
             "is_archived",
             "archived_at",
+            "revision",
             "created_at",
             "completed_at",
             "reviewed_at",
@@ -804,7 +808,7 @@ class SongSerializer(serializers.ModelSerializer):
         me = getattr(getattr(request, "user", None), "profile", None) if request else None
         if not me:
             return attrs
-        is_team = me.roles.filter(key__in=["TEAM", "ADMIN"]).exists()
+        is_team = is_team_profile(me)
         if not is_team:
             if "project" in attrs:
                 raise serializers.ValidationError({"project": "Nur Team darf Projekte zuweisen"})
@@ -871,7 +875,7 @@ class AlbumSerializer(serializers.ModelSerializer):
             return attrs
         # Ensure user only adds their own songs to an album
         songs = attrs.get("songs", [])
-        is_team = me.roles.filter(key__in=["TEAM", "ADMIN"]).exists()
+        is_team = is_team_profile(me)
         if not is_team:
             for song in songs:
                 if song.profile_id != me.id:
@@ -925,12 +929,12 @@ class GrowProGoalSerializer(serializers.ModelSerializer):
         me = getattr(getattr(request, "user", None), "profile", None) if request else None
         if not me:
             return attrs
-        is_team = me.roles.filter(key__in=["TEAM", "ADMIN"]).exists()
+        is_team = is_team_profile(me)
         if not is_team:
             attrs["profile"] = me
             attrs.pop("assigned_team", None)
         assigned_team = attrs.get("assigned_team")
-        if assigned_team and not assigned_team.roles.filter(key__in=["TEAM", "ADMIN"]).exists():
+        if assigned_team and not is_team_profile(assigned_team):
             raise serializers.ValidationError({"assigned_team_id": "Nur Team-Mitglieder können zugewiesen werden."})
         if self.instance is None and not attrs.get("metric"):
             title = (attrs.get("title") or "").strip()
@@ -1855,10 +1859,10 @@ class TournamentBattleSerializer(serializers.ModelSerializer):
         return profile or username
 
     def get_votes_left(self, obj):
-        return obj.votes.filter(selected_submission=obj.left_submission, moderation_status="APPROVED").count()
+        return obj.votes_left_approved
 
     def get_votes_right(self, obj):
-        return obj.votes.filter(selected_submission=obj.right_submission, moderation_status="APPROVED").count()
+        return obj.votes_right_approved
 
     def get_winner_profile_name(self, obj):
         if not obj.winner_submission:
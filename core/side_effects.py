@@ -0,0 +1,178 @@
+"""
+Post-Commit Side-Effect Pipeline.
+
+Views speichern nur die eigentliche Zeile und reichen alles Weitere
+(Activity-Log, Realtime-Broadcast, Automationen, E-Mails, Notifications)
+per ``defer(name, **payload)`` weiter. Die Handler laufen erst nach dem
+Commit der umgebenden Transaktion und – je nach ``SIDE_EFFECTS_MODE`` –
+
+- ``thread``: in einem prozessweiten Worker-Pool (Default),
+- ``inline``: synchron im aufrufenden Thread (Tests, Debugging),
+- ``outbox``: als ``SideEffectJob``-Zeile, abgearbeitet von
+  ``manage.py drain_side_effects``. Jobs werden per
+  ``select_for_update(skip_locked=True)`` mit Lease geclaimt, mehrere
+  Drainer laufen also nebeneinander; Fehlschläge warten mit Backoff.
+
+Payloads müssen JSON-serialisierbar sein (IDs statt Model-Instanzen).
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import SideEffectJob
+
+logger = logging.getLogger(__name__)
+
+# Geclaimte Jobs gelten danach als verwaist und werden erneut vergeben
+RUNNING_LEASE = timedelta(minutes=5)
+
+_HANDLERS = {}
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def register(name):
+    """Decorator: registriert einen Handler unter ``name``."""
+
+    def decorator(func):
+        _HANDLERS[name] = func
+        return func
+
+    return decorator
+
+
+def _mode():
+    return getattr(settings, "SIDE_EFFECTS_MODE", "thread")
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = max(1, int(getattr(settings, "SIDE_EFFECTS_WORKERS", 4)))
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="side-effects")
+    return _executor
+
+
+def run_handler(name, payload):
+    """Führt einen Handler aus. Fehler werden geloggt und weitergereicht."""
+    handler = _HANDLERS.get(name)
+    if handler is None:
+        raise LookupError(f"Unbekannter Side-Effect: {name}")
+    return handler(**payload)
+
+
+def _run_in_worker(name, payload):
+    close_old_connections()
+    try:
+        run_handler(name, payload)
+    except Exception:
+        logger.exception("Side-Effect %s fehlgeschlagen", name)
+    finally:
+        close_old_connections()
+
+
+def dispatch(name, payload):
+    mode = _mode()
+    if mode == "inline":
+        try:
+            run_handler(name, payload)
+        except Exception:
+            logger.exception("Side-Effect %s fehlgeschlagen", name)
+    elif mode == "outbox":
+        SideEffectJob.objects.create(name=name, payload=payload)
+    else:
+        _get_executor().submit(_run_in_worker, name, payload)
+
+
+def defer(name, **payload):
+    """Plant einen Side-Effect für den Commit der aktuellen Transaktion ein."""
+    if name not in _HANDLERS:
+        raise LookupError(f"Unbekannter Side-Effect: {name}")
+    transaction.on_commit(lambda: dispatch(name, payload))
+
+
+class _CommitBatch:
+    def __init__(self, func, items):
+        self.func = func
+        self.items = set(items)
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        self.func(self.items)
+
+
+def on_commit_batch(func, items=()):
+    """
+    Ruft ``func(items)`` einmal nach dem Commit der aktuellen Transaktion
+    auf. Weitere Aufrufe mit derselben ``func`` in derselben Transaktion
+    ergänzen nur ``items`` – Sperren o. Ä. nimmt ``func`` erst nach dem
+    Commit, ein Rollback hinterlässt also nichts.
+    """
+    connection = transaction.get_connection()
+    if connection.in_atomic_block:
+        for _, callback, *_ in connection.run_on_commit:
+            # Bereits gelaufene Batches (z. B. captureOnCommitCallbacks in Tests) nicht mehr ergänzen
+            if isinstance(callback, _CommitBatch) and callback.func is func and not callback.done:
+                callback.items.update(items)
+                return
+    transaction.on_commit(_CommitBatch(func, items))
+
+
+def _retry_delay(attempts):
+    base = max(1, int(getattr(settings, "SIDE_EFFECTS_RETRY_BASE_SECONDS", 30)))
+    return timedelta(seconds=min(base * (2 ** max(0, attempts - 1)), 6 * 60 * 60))
+
+
+def _claim_jobs(limit, max_attempts):
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            SideEffectJob.objects.select_for_update(skip_locked=True)
+            .filter(status__in=["PENDING", "RUNNING"], attempts__lt=max_attempts, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")
+            .values_list("id", flat=True)[:limit]
+        )
+        if ids:
+            SideEffectJob.objects.filter(id__in=ids).update(status="RUNNING", next_attempt_at=now + RUNNING_LEASE)
+    return list(SideEffectJob.objects.filter(id__in=ids).order_by("id"))
+
+
+def drain_outbox(limit=100, max_attempts=5):
+    """
+    Arbeitet fällige ``SideEffectJob``-Zeilen ab. Fehlgeschlagene Jobs
+    werden mit exponentiellem Backoff (``SIDE_EFFECTS_RETRY_BASE_SECONDS``)
+    erneut eingeplant, nach ``max_attempts`` Versuchen auf ``FAILED`` gesetzt.
+
+    Returns:
+        dict: Anzahl erledigter und fehlgeschlagener Jobs
+    """
+    summary = {"done": 0, "failed": 0}
+    for job in _claim_jobs(limit, max_attempts):
+        job.attempts += 1
+        try:
+            run_handler(job.name, job.payload)
+        except Exception as exc:
+            logger.exception("Side-Effect-Job %s fehlgeschlagen", job.id)
+            job.last_error = str(exc)[:2000]
+            if job.attempts >= max_attempts:
+                job.status = "FAILED"
+            else:
+                job.status = "PENDING"
+                job.next_attempt_at = timezone.now() + _retry_delay(job.attempts)
+            summary["failed"] += 1
+        else:
+            job.status = "DONE"
+            job.last_error = ""
+            summary["done"] += 1
+        job.processed_at = timezone.now()
+        job.save(update_fields=["status", "attempts", "last_error", "next_attempt_at", "processed_at"])
+    return summary
@@ -0,0 +1,439 @@
+"""
+Signal-Receiver für abgeleitete Daten (Caches, Zähler).
+Wird in ``CoreConfig.ready`` importiert.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from .access import invalidate_access_contexts
+from .models import (
+    GrowProGoal,
+    Profile,
+    Project,
+    Task,
+    Tournament,
+    TournamentBattle,
+    TournamentSubmission,
+    TournamentVote,
+)
+from .ranking import refresh_ranked_standings, schedule_ranked_refresh
+from .summaries import bump_summary_version
+from .team_scores import refresh_team_scores
+from .visibility import sync_project_visibility, sync_task_visibility
+from .vote_ingest import invalidate_battle_vote_config
+from .vote_tallies import apply_vote_delta, recount_battle_votes
+from .ws_auth import invalidate_ws_principals
+
+
+@receiver(m2m_changed, sender=Profile.roles.through)
+@receiver(m2m_changed, sender=Project.owners.through)
+@receiver(m2m_changed, sender=Project.participants.through)
+def _invalidate_access_on_membership_change(sender, action, **kwargs):
+    if action in {"post_add", "post_remove", "post_clear"}:
+        invalidate_access_contexts()
+
+
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Profile)
+def _invalidate_access_on_delete(sender, **kwargs):
+    invalidate_access_contexts()
+
+
+# --- TaskVisibility ---------------------------------------------------------
+
+
+def _affected_ids(instance, action, reverse, pk_set, stash_attr):
+    """
+    Liefert die IDs der betroffenen "Haupt"-Objekte (Task bzw. Projekt) eines
+    m2m_changed-Signals – sowohl für die Vorwärts- (``task.assignees.add``)
+    als auch die Rückwärtsrichtung (``profile.assigned_tasks.add``).
+    """
+    if not reverse:
+        return {instance.pk}
+    if action == "pre_clear":
+        return None
+    if action == "post_clear":
+        return instance.__dict__.pop(stash_attr, set())
+    return set(pk_set or [])
+
+
+@receiver(m2m_changed, sender=Task.assignees.through)
+@receiver(m2m_changed, sender=Task.stakeholders.through)
+def _sync_visibility_on_task_members(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == "pre_clear":
+        field = "assigned_tasks" if sender is Task.assignees.through else "task_stakeholder"
+        instance.__dict__["_visibility_clear_tasks"] = set(getattr(instance, field).values_list("id", flat=True))
+        return
+    if action not in {"post_add", "post_remove", "post_clear"}:
+        return
+    task_ids = _affected_ids(instance, action, reverse, pk_set, "_visibility_clear_tasks")
+    if task_ids:
+        sync_task_visibility(task_ids)
+
+
+@receiver(m2m_changed, sender=Project.owners.through)
+@receiver(m2m_changed, sender=Project.participants.through)
+def _sync_visibility_on_project_members(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == "pre_clear":
+        field = "owned_projects" if sender is Project.owners.through else "projects"
+        related = getattr(instance, field, None)
+        instance.__dict__["_visibility_clear_projects"] = (
+            set(related.values_list("id", flat=True)) if related is not None else set()
+        )
+        return
+    if action not in {"post_add", "post_remove", "post_clear"}:
+        return
+    project_ids = _affected_ids(instance, action, reverse, pk_set, "_visibility_clear_projects")
+    if project_ids:
+        sync_project_visibility(project_ids)
+
+
+@receiver(post_init, sender=Task)
+def _remember_task_project(sender, instance, **kwargs):
+    # __dict__ statt Attributzugriff: bei .only()/.defer() keine Nachlade-Query
+    instance._visibility_project_id = instance.__dict__.get("project_id")
+
+
+@receiver(post_save, sender=Task)
+def _sync_visibility_on_task_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    project_id = instance.__dict__.get("project_id")
+    if created or project_id != getattr(instance, "_visibility_project_id", project_id):
+        sync_task_visibility([instance.pk])
+    instance._visibility_project_id = project_id
+
+
+# --- Summary-Cache ----------------------------------------------------------
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def _bump_task_summaries(sender, raw=False, **kwargs):
+    if not raw:
+        bump_summary_version("tasks")
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def _bump_project_summaries(sender, raw=False, **kwargs):
+    if not raw:
+        bump_summary_version("projects", "tasks")
+
+
+@receiver(post_save, sender=GrowProGoal)
+@receiver(post_delete, sender=GrowProGoal)
+def _bump_growpro_summaries(sender, raw=False, **kwargs):
+    if not raw:
+        bump_summary_version("growpro")
+
+
+@receiver(m2m_changed, sender=Task.assignees.through)
+@receiver(m2m_changed, sender=Task.stakeholders.through)
+@receiver(m2m_changed, sender=Project.owners.through)
+@receiver(m2m_changed, sender=Project.participants.through)
+@receiver(m2m_changed, sender=Profile.roles.through)
+def _bump_summaries_on_membership_change(sender, action, **kwargs):
+    # Sichtbarkeit (und damit die Zählungen) hängt an Mitgliedschaften und Rollen
+    if action in {"post_add", "post_remove", "post_clear"}:
+        bump_summary_version()
+
+
+# --- TeamScore --------------------------------------------------------------
+
+
+def _member_ids(through, **filters):
+    return set(through.objects.filter(**filters).values_list("profile_id", flat=True))
+
+
+def _project_member_ids(project_id):
+    return _member_ids(Project.owners.through, project_id=project_id) | _member_ids(
+        Project.participants.through, project_id=project_id
+    )
+
+
+@receiver(m2m_changed, sender=Task.assignees.through)
+@receiver(m2m_changed, sender=Project.owners.through)
+@receiver(m2m_changed, sender=Project.participants.through)
+def _refresh_scores_on_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        if action in {"post_add", "post_remove", "post_clear"}:
+            refresh_team_scores([instance.pk])
+        return
+    if action == "pre_clear":
+        key = "task_id" if sender is Task.assignees.through else "project_id"
+        instance.__dict__["_score_clear_profiles"] = _member_ids(sender, **{key: instance.pk})
+    elif action in {"post_add", "post_remove"}:
+        refresh_team_scores(pk_set or [])
+    elif action == "post_clear":
+        refresh_team_scores(instance.__dict__.pop("_score_clear_profiles", set()))
+
+
+def _score_state(instance, fields):
+    return tuple(instance.__dict__.get(field) for field in fields)
+
+
+TASK_SCORE_FIELDS = ("priority", "status", "is_archived")
+GOAL_SCORE_FIELDS = ("assigned_team_id", "status")
+
+
+@receiver(post_init, sender=Task)
+def _remember_task_score_state(sender, instance, **kwargs):
+    instance._score_state = _score_state(instance, TASK_SCORE_FIELDS)
+
+
+@receiver(post_save, sender=Task)
+def _refresh_scores_on_task_save(sender, instance, created, raw=False, **kwargs):
+    state = _score_state(instance, TASK_SCORE_FIELDS)
+    # Neue Tasks haben noch keine Assignees – die kommen per m2m_changed
+    if not raw and not created and state != getattr(instance, "_score_state", state):
+        refresh_team_scores(_member_ids(Task.assignees.through, task_id=instance.pk))
+    instance._score_state = state
+
+
+@receiver(pre_delete, sender=Task)
+def _remember_task_score_members(sender, instance, **kwargs):
+    instance._score_profiles = _member_ids(Task.assignees.through, task_id=instance.pk)
+
+
+@receiver(post_delete, sender=Task)
+def _refresh_scores_on_task_delete(sender, instance, **kwargs):
+    refresh_team_scores(getattr(instance, "_score_profiles", set()))
+
+
+@receiver(post_init, sender=Project)
+def _remember_project_score_state(sender, instance, **kwargs):
+    instance._score_archived = instance.__dict__.get("is_archived")
+
+
+@receiver(post_save, sender=Project)
+def _refresh_scores_on_project_save(sender, instance, created, raw=False, **kwargs):
+    archived = instance.__dict__.get("is_archived")
+    if not raw and not created and archived != getattr(instance, "_score_archived", archived):
+        refresh_team_scores(_project_member_ids(instance.pk))
+    instance._score_archived = archived
+
+
+@receiver(pre_delete, sender=Project)
+def _remember_project_score_members(sender, instance, **kwargs):
+    instance._score_profiles = _project_member_ids(instance.pk)
+
+
+@receiver(post_delete, sender=Project)
+def _refresh_scores_on_project_delete(sender, instance, **kwargs):
+    refresh_team_scores(getattr(instance, "_score_profiles", set()))
+
+
+@receiver(post_init, sender=GrowProGoal)
+def _remember_goal_score_state(sender, instance, **kwargs):
+    instance._score_state = _score_state(instance, GOAL_SCORE_FIELDS)
+
+
+@receiver(post_save, sender=GrowProGoal)
+def _refresh_scores_on_goal_save(sender, instance, created, raw=False, **kwargs):
+    state = _score_state(instance, GOAL_SCORE_FIELDS)
+    previous = getattr(instance, "_score_state", state)
+    if not raw and (created or state != previous):
+        refresh_team_scores({state[0], previous[0]})
+    instance._score_state = state
+
+
+@receiver(post_delete, sender=GrowProGoal)
+def _refresh_scores_on_goal_delete(sender, instance, **kwargs):
+    refresh_team_scores([instance.assigned_team_id])
+
+
+# --- RankedStanding ---------------------------------------------------------
+
+
+def _submission_profile_ids(*submission_ids):
+    ids = {submission_id for submission_id in submission_ids if submission_id}
+    if not ids:
+        return set()
+    return set(TournamentSubmission.objects.filter(id__in=ids).values_list("profile_id", flat=True))
+
+
+BATTLE_RANK_FIELDS = ("status", "winner_submission_id", "left_submission_id", "right_submission_id")
+VOTE_RANK_FIELDS = ("moderation_status", "selected_submission_id")
+
+
+def _battle_profile_ids(*states):
+    submission_ids = set()
+    for state in states:
+        _, *sides = state
+        submission_ids.update(sides)
+    return _submission_profile_ids(*submission_ids)
+
+
+@receiver(post_init, sender=TournamentSubmission)
+def _remember_submission_rank_state(sender, instance, **kwargs):
+    instance._rank_status = instance.__dict__.get("status")
+
+
+@receiver(post_save, sender=TournamentSubmission)
+def _refresh_ranking_on_submission_save(sender, instance, created, raw=False, **kwargs):
+    status = instance.__dict__.get("status")
+    if not raw and (created or status != getattr(instance, "_rank_status", status)):
+        refresh_ranked_standings([instance.profile_id])
+    instance._rank_status = status
+
+
+@receiver(post_delete, sender=TournamentSubmission)
+def _refresh_ranking_on_submission_delete(sender, instance, **kwargs):
+    refresh_ranked_standings([instance.profile_id])
+
+
+@receiver(post_init, sender=TournamentBattle)
+def _remember_battle_rank_state(sender, instance, **kwargs):
+    instance._rank_state = _score_state(instance, BATTLE_RANK_FIELDS)
+
+
+@receiver(post_save, sender=TournamentBattle)
+def _refresh_ranking_on_battle_save(sender, instance, created, raw=False, **kwargs):
+    state = _score_state(instance, BATTLE_RANK_FIELDS)
+    previous = getattr(instance, "_rank_state", state)
+    # Nur geschlossene Battles zählen – Änderungen an offenen sind egal
+    if not raw and "CLOSED" in (state[0], previous[0]) and (created or state != previous):
+        refresh_ranked_standings(_battle_profile_ids(state, previous))
+    instance._rank_state = state
+
+
+@receiver(pre_delete, sender=TournamentBattle)
+def _remember_battle_rank_profiles(sender, instance, **kwargs):
+    state = _score_state(instance, BATTLE_RANK_FIELDS)
+    instance._rank_profiles = _battle_profile_ids(state) if state[0] == "CLOSED" else set()
+
+
+@receiver(post_delete, sender=TournamentBattle)
+def _refresh_ranking_on_battle_delete(sender, instance, **kwargs):
+    refresh_ranked_standings(getattr(instance, "_rank_profiles", set()))
+
+
+@receiver(post_init, sender=TournamentVote)
+def _remember_vote_rank_state(sender, instance, **kwargs):
+    instance._rank_state = _score_state(instance, VOTE_RANK_FIELDS)
+
+
+@receiver(post_save, sender=TournamentVote)
+def _refresh_ranking_on_vote_save(sender, instance, created, raw=False, **kwargs):
+    state = _score_state(instance, VOTE_RANK_FIELDS)
+    previous = getattr(instance, "_rank_state", state)
+    instance._rank_state = state
+    if raw:
+        return
+    if created:
+        # Neue Votes kommen in Spitzen – gebündelt nach dem Commit
+        if state[0] == "APPROVED":
+            schedule_ranked_refresh(_submission_profile_ids(state[1]))
+    elif state != previous and "APPROVED" in (state[0], previous[0]):
+        refresh_ranked_standings(_submission_profile_ids(state[1], previous[1]))
+
+
+@receiver(pre_delete, sender=TournamentVote)
+def _remember_vote_rank_profiles(sender, instance, **kwargs):
+    approved = instance.moderation_status == "APPROVED"
+    instance._rank_profiles = _submission_profile_ids(instance.selected_submission_id) if approved else set()
+
+
+@receiver(post_delete, sender=TournamentVote)
+def _refresh_ranking_on_vote_delete(sender, instance, **kwargs):
+    schedule_ranked_refresh(getattr(instance, "_rank_profiles", set()))
+
+
+@receiver(post_init, sender=Tournament)
+def _remember_tournament_no_loss(sender, instance, **kwargs):
+    instance._rank_no_loss = instance.__dict__.get("is_no_loss")
+
+
+@receiver(post_save, sender=Tournament)
+def _refresh_ranking_on_no_loss_change(sender, instance, created, raw=False, **kwargs):
+    no_loss = instance.__dict__.get("is_no_loss")
+    if not raw and not created and no_loss != getattr(instance, "_rank_no_loss", no_loss):
+        refresh_ranked_standings(
+            set(TournamentSubmission.objects.filter(tournament=instance).values_list("profile_id", flat=True))
+        )
+    instance._rank_no_loss = no_loss
+
+
+# --- Battle-Vote-Zähler -----------------------------------------------------
+
+VOTE_TALLY_FIELDS = ("battle_id", "selected_submission_id", "moderation_status")
+
+
+@receiver(post_init, sender=TournamentVote)
+def _remember_vote_tally_state(sender, instance, **kwargs):
+    instance._tally_state = _score_state(instance, VOTE_TALLY_FIELDS)
+
+
+@receiver(post_save, sender=TournamentVote)
+def _update_tallies_on_vote_save(sender, instance, created, raw=False, **kwargs):
+    state = _score_state(instance, VOTE_TALLY_FIELDS)
+    previous = None if created else getattr(instance, "_tally_state", state)
+    instance._tally_state = state
+    if raw or state == previous:
+        return
+    if previous and previous[2] == "APPROVED":
+        apply_vote_delta(previous[0], previous[1], -1)
+    if state[2] == "APPROVED":
+        apply_vote_delta(state[0], state[1], 1)
+
+
+@receiver(post_delete, sender=TournamentVote)
+def _update_tallies_on_vote_delete(sender, instance, **kwargs):
+    if instance.moderation_status == "APPROVED":
+        apply_vote_delta(instance.battle_id, instance.selected_submission_id, -1)
+
+
+@receiver(post_init, sender=TournamentBattle)
+def _remember_battle_sides(sender, instance, **kwargs):
+    instance._tally_sides = (instance.__dict__.get("left_submission_id"), instance.__dict__.get("right_submission_id"))
+
+
+@receiver(post_save, sender=TournamentBattle)
+def _recount_tallies_on_side_change(sender, instance, created, raw=False, **kwargs):
+    sides = (instance.left_submission_id, instance.right_submission_id)
+    if not raw and not created and sides != getattr(instance, "_tally_sides", sides):
+        recount_battle_votes([instance.pk])
+    instance._tally_sides = sides
+
+
+# --- Vote-Konfiguration -----------------------------------------------------
+
+
+@receiver(post_save, sender=TournamentBattle)
+@receiver(post_delete, sender=TournamentBattle)
+def _invalidate_vote_config_on_battle_change(sender, instance, raw=False, **kwargs):
+    invalidate_battle_vote_config([instance.pk])
+
+
+@receiver(post_save, sender=Tournament)
+def _invalidate_vote_config_on_tournament_change(sender, instance, created, raw=False, **kwargs):
+    if not created:
+        invalidate_battle_vote_config(TournamentBattle.objects.filter(tournament=instance).values_list("id", flat=True))
+
+
+# --- WS-Principal -----------------------------------------------------------
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def _invalidate_ws_principal_on_user_change(sender, instance, **kwargs):
+    invalidate_ws_principals(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def _invalidate_ws_principal_on_profile_change(sender, instance, **kwargs):
+    invalidate_ws_principals(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Profile.roles.through)
+def _invalidate_ws_principals_on_role_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in {"post_add", "post_remove", "post_clear"}:
+        return
+    if not reverse:
+        invalidate_ws_principals(instance.user_id)
+    else:
+        invalidate_ws_principals()
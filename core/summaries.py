@@ -0,0 +1,104 @@
+"""
+Aggregierte Zusammenfassungen (``/summary``-Endpunkte) in einer Query.
+
+``aggregate_summary`` gruppiert nach den Status-/Typ-Feldern und zählt
+archived/done/active per ``Count(filter=...)`` in derselben Query; die
+Gesamtzahlen werden in Python aufsummiert. ``cached_summary`` legt das
+Ergebnis optional pro Profil und Query-Parametern für
+``SUMMARY_CACHE_TTL`` Sekunden im Cache ab. Der Schlüssel enthält einen
+Versionszähler je Bereich (``tasks``/``projects``/``growpro``), den die
+Signal-Receiver in ``core.signals`` bei Änderungen nach dem Commit hochzählen.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from .side_effects import on_commit_batch
+
+SUMMARY_SCOPES = ("tasks", "projects", "growpro")
+
+
+def aggregate_summary(qs, *, archived, done, active, by=("status",)):
+    """
+    Berechnet total/archived/done/active und je ein ``by_<feld>``-dict in
+    einem Round Trip.
+
+    Args:
+        archived, done, active: ``Q``-Objekte für die bedingten Zähler
+        by: Felder für die Gruppierung; ``status`` → ``by_status``,
+            ``task_type`` → ``by_type``
+    """
+    rows = (
+        qs.order_by()
+        .select_related(None)
+        .prefetch_related(None)
+        .values(*by)
+        .annotate(
+            c=Count("id"),
+            archived_c=Count("id", filter=archived),
+            done_c=Count("id", filter=done),
+            active_c=Count("id", filter=active),
+        )
+    )
+    result = {"total": 0, "archived": 0, "done": 0, "active": 0}
+    groups = {field: {} for field in by}
+    for row in rows:
+        result["total"] += row["c"]
+        result["archived"] += row["archived_c"]
+        result["done"] += row["done_c"]
+        result["active"] += row["active_c"]
+        for field in by:
+            bucket = groups[field]
+            bucket[row[field]] = bucket.get(row[field], 0) + row["c"]
+    for field in by:
+        key = "by_type" if field == "task_type" else f"by_{field}"
+        result[key] = groups[field]
+    return result
+
+
+def _version_key(scope):
+    return f"summary-version:{scope}"
+
+
+def summary_version(scope):
+    # Startwert zeitbasiert, damit nach einer Cache-Eviction keine alten Einträge wiederverwendet werden
+    return cache.get_or_set(_version_key(scope), lambda: int(time.time() * 1000), timeout=None)
+
+
+def bump_summary_version(*scopes):
+    """
+    Zählt die Versionen nach dem Commit hoch – vorher könnte ein paralleler
+    Read den alten Stand unter der neuen Version cachen. Mehrere Aufrufe in
+    einer Transaktion ergeben einen Callback.
+    """
+    on_commit_batch(_incr_summary_versions, scopes or SUMMARY_SCOPES)
+
+
+def _incr_summary_versions(scopes):
+    for scope in sorted(scopes):
+        try:
+            cache.incr(_version_key(scope))
+        except ValueError:
+            cache.set(_version_key(scope), int(time.time() * 1000), timeout=None)
+
+
+def cached_summary(scope, profile, params, compute):
+    """
+    Liefert ``compute()`` – bei ``SUMMARY_CACHE_TTL > 0`` aus dem Cache,
+    gekoppelt an Profil, Query-Parameter und Versionszähler des Bereichs.
+    """
+    ttl = int(getattr(settings, "SUMMARY_CACHE_TTL", 0) or 0)
+    if ttl <= 0 or profile is None:
+        return compute()
+    raw = "&".join(f"{key}={value}" for key, value in sorted(params.lists()) if key != "format")
+    digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+    key = f"summary:{scope}:{summary_version(scope)}:{profile.id}:{digest}"
+    data = cache.get(key)
+    if data is None:
+        data = compute()
+        cache.set(key, data, ttl)
+    return data
@@ -0,0 +1,335 @@
+"""
+Side-Effect-Handler für Task- und Projekt-Writes.
+
+Die ViewSets speichern nur die Zeile und planen die Folgearbeit über
+``core.side_effects.defer`` ein; die Handler hier laden den aktuellen Stand
+per ID nach und erledigen Activity-Log, Realtime-Broadcast, Automationen,
+E-Mails, In-App-Notifications und wiederkehrende Tasks. Außerdem läuft
+hier das per ``schedule_growpro_rebalance`` gebündelte GrowPro-Rebalancing
+und die per ``schedule_ranked_refresh`` gebündelte Ranked-Ladder.
+"""
+
+from calendar import monthrange
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .assignment import REBALANCE_PENDING_KEY, rebalance_growpro_assignments
+from .automation import (
+    _profile_emails,
+    log_overdue_tasks,
+    run_automation_rules_for_project,
+    run_automation_rules_for_task,
+)
+from .models import Profile, Project, Task
+from .notifications import notify_profiles, send_notification_email
+from .ranking import refresh_ranked_standings, release_ranked_refresh
+from .realtime import notify_project_event, notify_task_event, project_state, state_changes, task_state
+from .side_effects import register
+from .utils import log_activity
+
+
+def _load_actor(actor_id):
+    if not actor_id:
+        return None
+    return Profile.objects.filter(id=actor_id).first()
+
+
+def _load_task(task_id):
+    return Task.objects.select_related("project").filter(id=task_id).first()
+
+
+def task_snapshot(task):
+    """JSON-fähiger Schnappschuss für Handler-Logik und Realtime-Delta."""
+    return task_state(task)
+
+
+def project_snapshot(project):
+    return project_state(project)
+
+
+def shift_task_due_date(base_date, pattern, interval):
+    if not base_date or pattern == "NONE":
+        return None
+    interval = max(1, int(interval or 1))
+    if pattern == "DAILY":
+        return base_date + timedelta(days=interval)
+    if pattern == "WEEKLY":
+        return base_date + timedelta(weeks=interval)
+    if pattern == "MONTHLY":
+        month_index = (base_date.month - 1) + interval
+        year = base_date.year + month_index // 12
+        month = month_index % 12 + 1
+        day = min(base_date.day, monthrange(year, month)[1])
+        return base_date.replace(year=year, month=month, day=day)
+    return None
+
+
+def generate_recurring_task(task, actor=None):
+    if not task or task.recurrence_pattern == "NONE" or task.recurrence_generated or not task.due_date:
+        return None
+    next_due_date = shift_task_due_date(task.due_date, task.recurrence_pattern, task.recurrence_interval)
+    if not next_due_date:
+        return None
+    template = task.recurrence_parent or task
+    next_task = Task.objects.create(
+        project=task.project,
+        title=task.title,
+        status="OPEN",
+        due_date=next_due_date,
+        priority=task.priority,
+        task_type=task.task_type,
+        review_status=None,
+        created_by=actor,
+        updated_by=actor,
+        recurrence_pattern=task.recurrence_pattern,
+        recurrence_interval=task.recurrence_interval,
+        recurrence_parent=template,
+    )
+    next_task.assignees.set(task.assignees.all())
+    next_task.stakeholders.set(task.stakeholders.all())
+    task.recurrence_generated = True
+    task.save(update_fields=["recurrence_generated"])
+    log_activity(
+        "task_recurring_generated",
+        f"Wiederkehrende Task erstellt: {next_task.title}",
+        description=f"Nächster Termin: {next_due_date}",
+        actor=actor,
+        severity="INFO",
+        task=next_task,
+        project=next_task.project,
+        metadata={"source_task_id": task.id},
+    )
+    recipients = list(next_task.assignees.exclude(id=getattr(actor, "id", None)).select_related("user"))
+    notify_profiles(
+        recipients,
+        f"Wiederkehrende Task: {next_task.title}",
+        f"Eine neue wiederkehrende Aufgabe wurde für {next_due_date} erstellt.",
+        notification_type="task_recurring_generated",
+        actor=actor,
+        severity="INFO",
+        project=next_task.project,
+        task=next_task,
+        metadata={"source_task_id": task.id},
+        preference_key="task_assigned",
+    )
+    return next_task
+
+
+def log_task_overdue_if_needed(task):
+    if not task.due_date or task.status == "DONE" or task.is_archived:
+        return
+    if task.due_date >= timezone.now().date():
+        return
+    log_overdue_tasks(Task.objects.filter(id=task.id))
+
+
+def _notify_new_assignees(previous_assignees, task, actor):
+    current_ids = set(task.assignees.values_list("id", flat=True))
+    new_ids = current_ids - set(previous_assignees or [])
+    if not new_ids:
+        return
+    new_profiles = list(
+        task.assignees.filter(id__in=new_ids).exclude(id=getattr(actor, "id", None)).select_related("user")
+    )
+    recipients = _profile_emails(new_profiles, exclude_ids={getattr(actor, "id", None)})
+    if not recipients:
+        return
+    send_notification_email(
+        f"Neuer Task: {task.title}",
+        f"Dir wurde ein Task zugewiesen.\n\nTitel: {task.title}\nStatus: {task.status}\nFällig: {task.due_date or 'Kein Termin'}",
+        recipients,
+    )
+
+    notify_profiles(
+        new_profiles,
+        f"Neuer Task: {task.title}",
+        f"Dir wurde ein Task zugewiesen. Faellig: {task.due_date or 'Kein Termin'}.",
+        notification_type="task_assigned",
+        actor=actor,
+        severity="INFO",
+        project=task.project,
+        task=task,
+        preference_key="task_assigned",
+    )
+
+
+@register("task_created")
+def handle_task_created(task_id, actor_id=None):
+    task = _load_task(task_id)
+    if task is None:
+        return
+    actor = _load_actor(actor_id)
+    log_activity(
+        "task_created",
+        f"Task erstellt: {task.title}",
+        actor=actor,
+        severity="INFO",
+        task=task,
+        project=task.project,
+    )
+    log_task_overdue_if_needed(task)
+    notify_task_event(task, "created")
+    if task.status:
+        run_automation_rules_for_task(task, "TASK_STATUS", actor=actor)
+    if task.due_date:
+        run_automation_rules_for_task(task, "TASK_DUE", actor=actor)
+    assignees = list(task.assignees.exclude(id=getattr(actor, "id", None)).select_related("user"))
+    recipients = _profile_emails(assignees)
+    if recipients:
+        send_notification_email(
+            f"Neuer Task: {task.title}",
+            f"Dir wurde ein neuer Task zugewiesen.\n\nTitel: {task.title}\nProjekt: {task.project.title if task.project else 'Kein Projekt'}\nStatus: {task.status}",
+            recipients,
+        )
+        notify_profiles(
+            assignees,
+            f"Neuer Task: {task.title}",
+            f"Dir wurde ein neuer Task zugewiesen. Status: {task.status}.",
+            notification_type="task_assigned",
+            actor=actor,
+            severity="INFO",
+            project=task.project,
+            task=task,
+            preference_key="task_assigned",
+        )
+    if task.status == "DONE":
+        generate_recurring_task(task, actor=actor)
+
+
+@register("task_updated")
+def handle_task_updated(task_id, previous, current, previous_assignees=None, actor_id=None, revision=None):
+    task = _load_task(task_id)
+    if task is None:
+        return
+    actor = _load_actor(actor_id)
+    prev_status = previous["status"]
+    status = current["status"]
+    if prev_status != status:
+        severity = "SUCCESS" if status == "DONE" else "INFO"
+        event = "task_completed" if status == "DONE" else "task_status_updated"
+        log_activity(
+            event,
+            f"Taskstatus aktualisiert: {task.title}",
+            description=f"{prev_status} -> {status}",
+            actor=actor,
+            severity=severity,
+            task=task,
+            project=task.project,
+        )
+    if previous["review_status"] != current["review_status"] and status == "DONE":
+        log_activity(
+            "task_review_status",
+            f"Review-Status: {task.title}",
+            description=f"{previous['review_status'] or 'unset'} -> {current['review_status']}",
+            actor=actor,
+            severity="INFO",
+            task=task,
+            project=task.project,
+        )
+    if previous["priority"] != current["priority"]:
+        log_activity(
+            "task_priority_updated",
+            f"Priorität geändert: {task.title}",
+            description=f"{previous['priority']} -> {current['priority']}",
+            actor=actor,
+            severity="INFO",
+            task=task,
+            project=task.project,
+        )
+    _notify_new_assignees(previous_assignees, task, actor)
+    log_task_overdue_if_needed(task)
+    notify_task_event(
+        task,
+        "updated",
+        changes=state_changes(previous, current),
+        previous_project_id=previous.get("project"),
+        revision=revision,
+    )
+    if prev_status != status:
+        run_automation_rules_for_task(task, "TASK_STATUS", actor=actor)
+    if previous["due_date"] != current["due_date"]:
+        run_automation_rules_for_task(task, "TASK_DUE", actor=actor)
+    if prev_status != "DONE" and status == "DONE":
+        generate_recurring_task(task, actor=actor)
+
+
+def _project_recipients(project, actor):
+    return list(
+        project.participants.exclude(id=getattr(actor, "id", None)).select_related("user")
+    ) + list(
+        project.owners.exclude(id=getattr(actor, "id", None)).select_related("user")
+    )
+
+
+@register("project_created")
+def handle_project_created(project_id, actor_id=None):
+    project = Project.objects.filter(id=project_id).first()
+    if project is None:
+        return
+    actor = _load_actor(actor_id)
+    log_activity(
+        "project_created",
+        f"Projekt erstellt: {project.title}",
+        actor=actor,
+        severity="INFO",
+        project=project,
+    )
+    notify_profiles(
+        _project_recipients(project, actor),
+        f"Neues Projekt: {project.title}",
+        project.description or "Du wurdest einem neuen Projekt zugeordnet.",
+        notification_type="project_created",
+        actor=actor,
+        severity="INFO",
+        project=project,
+        preference_key="project_updates",
+    )
+    notify_project_event(project, "created")
+
+
+@register("project_updated")
+def handle_project_updated(
+    project_id, previous_status, status, actor_id=None, previous=None, current=None, revision=None
+):
+    project = Project.objects.filter(id=project_id).first()
+    if project is None:
+        return
+    actor = _load_actor(actor_id)
+    if previous_status != status:
+        severity = "SUCCESS" if status == "DONE" else "INFO"
+        log_activity(
+            "project_status_updated",
+            f"Projektstatus aktualisiert: {project.title}",
+            description=f"{previous_status} -> {status}",
+            actor=actor,
+            severity=severity,
+            project=project,
+        )
+        notify_profiles(
+            _project_recipients(project, actor),
+            f"Projekt-Update: {project.title}",
+            f"Der Projektstatus wurde von {previous_status} auf {status} geändert.",
+            notification_type="project_status_updated",
+            actor=actor,
+            severity=severity,
+            project=project,
+            metadata={"previous_status": previous_status, "status": status},
+            preference_key="project_updates",
+        )
+        run_automation_rules_for_project(project, "PROJECT_STATUS", actor=actor)
+    notify_project_event(project, "updated", changes=state_changes(previous, current), revision=revision)
+
+
+@register("growpro_rebalance")
+def handle_growpro_rebalance():
+    # Sperre vor dem Lauf lösen: Änderungen ab jetzt planen einen neuen Lauf
+    cache.delete(REBALANCE_PENDING_KEY)
+    rebalance_growpro_assignments()
+
+
+@register("ranked_standings_refresh")
+def handle_ranked_standings_refresh(profile_ids):
+    release_ranked_refresh(profile_ids)
+    refresh_ranked_standings(profile_ids)
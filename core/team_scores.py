@@ -0,0 +1,154 @@
+"""
+Pflege des ``TeamScore``-Ledgers.
+
+Die Punkte eines Profils ergeben sich aus offenen, nicht archivierten Tasks
+(``TASK_PRIORITY_SCORE`` je Priorität), aktiven Projekten als Owner oder
+Teilnehmer (2 Punkte) und aktiven GrowPro-Zielen (1 Punkt).
+``refresh_team_scores`` berechnet sie für eine Menge Profile mit drei
+gruppierten Queries neu und schreibt nur geänderte Zeilen. Die
+Signal-Receiver in ``core.signals`` rufen es für die betroffenen Profile
+auf. ``rebuild_team_scores`` baut das Ledger komplett neu auf, und
+``check_team_scores`` meldet Abweichungen ohne zu schreiben – etwa nach
+``QuerySet.update``, das keine Signale auslöst.
+"""
+
+from collections import defaultdict
+
+from django.db.models import Case, Count, IntegerField, Sum, Value, When
+from django.utils import timezone
+
+from .models import GrowProGoal, Profile, Project, Task, TeamScore
+
+TASK_PRIORITY_SCORE = {
+    "LOW": 1,
+    "MEDIUM": 1,
+    "HIGH": 2,
+    "CRITICAL": 3,
+}
+PROJECT_POINTS = 2
+GOAL_POINTS = 1
+ACTIVE_GOAL_STATUSES = ("ACTIVE", "ON_HOLD")
+
+REFRESH_CHUNK_SIZE = 500
+SCORE_FIELDS = ("task_points", "project_points", "goal_points")
+
+
+def task_points_expression(prefix=""):
+    """``Case/When`` mit den Punkten je Task-Priorität (Default 1)."""
+    return Case(
+        *[When(**{f"{prefix}priority": key}, then=Value(points)) for key, points in TASK_PRIORITY_SCORE.items()],
+        default=Value(1),
+        output_field=IntegerField(),
+    )
+
+
+def compute_scores(profile_ids):
+    """Berechnet die Ledger-Werte direkt aus den Quelltabellen."""
+    scores = {profile_id: dict.fromkeys(SCORE_FIELDS, 0) for profile_id in profile_ids}
+    if not scores:
+        return scores
+    task_rows = (
+        Task.assignees.through.objects.filter(
+            profile_id__in=profile_ids,
+            task__is_archived=False,
+        )
+        .exclude(task__status="DONE")
+        .values("profile_id")
+        .annotate(points=Sum(task_points_expression("task__")))
+    )
+    for row in task_rows:
+        scores[row["profile_id"]]["task_points"] = row["points"] or 0
+
+    memberships = defaultdict(set)
+    for through in (Project.owners.through, Project.participants.through):
+        rows = through.objects.filter(profile_id__in=profile_ids, project__is_archived=False).values_list(
+            "profile_id", "project_id"
+        )
+        for profile_id, project_id in rows:
+            memberships[profile_id].add(project_id)
+    for profile_id, project_ids in memberships.items():
+        scores[profile_id]["project_points"] = len(project_ids) * PROJECT_POINTS
+
+    goal_rows = (
+        GrowProGoal.objects.filter(assigned_team_id__in=profile_ids, status__in=ACTIVE_GOAL_STATUSES)
+        .values("assigned_team_id")
+        .annotate(c=Count("id"))
+    )
+    for row in goal_rows:
+        scores[row["assigned_team_id"]]["goal_points"] = row["c"] * GOAL_POINTS
+    return scores
+
+
+def _refresh_chunk(profile_ids):
+    desired = compute_scores(profile_ids)
+    existing = {row.profile_id: row for row in TeamScore.objects.filter(profile_id__in=profile_ids)}
+    changed = []
+    missing = []
+    now = timezone.now()
+    for profile_id, values in desired.items():
+        row = existing.get(profile_id)
+        if row is None:
+            missing.append(TeamScore(profile_id=profile_id, **values))
+            continue
+        if any(getattr(row, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(row, field, value)
+            row.updated_at = now
+            changed.append(row)
+    if missing:
+        TeamScore.objects.bulk_create(missing, ignore_conflicts=True)
+    if changed:
+        TeamScore.objects.bulk_update(changed, [*SCORE_FIELDS, "updated_at"])
+    return len(missing) + len(changed)
+
+
+def refresh_team_scores(profile_ids):
+    """Berechnet das Ledger für die übergebenen Profile neu."""
+    profile_ids = sorted(
+        set(Profile.objects.filter(id__in={pid for pid in profile_ids if pid}).values_list("id", flat=True))
+    )
+    updated = 0
+    for offset in range(0, len(profile_ids), REFRESH_CHUNK_SIZE):
+        updated += _refresh_chunk(profile_ids[offset:offset + REFRESH_CHUNK_SIZE])
+    return updated
+
+
+def rebuild_team_scores(chunk_size=REFRESH_CHUNK_SIZE):
+    summary = {"profiles": 0, "updated": 0}
+    last_id = 0
+    while True:
+        profile_ids = list(
+            Profile.objects.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:chunk_size]
+        )
+        if not profile_ids:
+            break
+        summary["profiles"] += len(profile_ids)
+        summary["updated"] += _refresh_chunk(profile_ids)
+        last_id = profile_ids[-1]
+    return summary
+
+
+def check_team_scores(profile_ids=None):
+    """
+    Vergleicht Ledger und Quelltabellen.
+
+    Returns:
+        list: ``{"profile_id", "field", "ledger", "actual"}`` je Abweichung
+    """
+    if profile_ids is None:
+        profile_ids = list(Profile.objects.values_list("id", flat=True))
+    mismatches = []
+    for offset in range(0, len(profile_ids), REFRESH_CHUNK_SIZE):
+        chunk = profile_ids[offset:offset + REFRESH_CHUNK_SIZE]
+        ledger = {
+            row["profile_id"]: row
+            for row in TeamScore.objects.filter(profile_id__in=chunk).values("profile_id", *SCORE_FIELDS)
+        }
+        for profile_id, values in compute_scores(chunk).items():
+            row = ledger.get(profile_id) or dict.fromkeys(SCORE_FIELDS, 0)
+            for field, actual in values.items():
+                if row[field] != actual:
+                    mismatches.append(
+                        {"profile_id": profile_id, "field": field, "ledger": row[field], "actual": actual}
+                    )
+    return mismatches
@@ -0,0 +1,60 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.access import ProjectAccessValidator, get_access_context
+from core.models import Profile, Project, Role
+from core.permissions import (
+    can_comment_on_project_tasks,
+    can_manage_project_tasks,
+    can_view_project,
+    is_team_profile,
+)
+
+
+class AccessContextTests(TestCase):
+    def setUp(self):
+        self.team_role, _ = Role.objects.get_or_create(key="TEAM")
+        self.artist_role, _ = Role.objects.get_or_create(key="ARTIST")
+
+        self.artist_user = User.objects.create_user(username="artist-access", password="pw123456")
+        self.artist = Profile.objects.create(user=self.artist_user, name="Artist Access")
+        self.artist.roles.add(self.artist_role)
+
+        self.owned = Project.objects.create(title="Owned")
+        self.owned.owners.add(self.artist)
+        self.joined = Project.objects.create(title="Joined", participant_task_access="COMMENT")
+        self.joined.participants.add(self.artist)
+        self.foreign = Project.objects.create(title="Foreign")
+
+    def test_checks_are_answered_from_cache(self):
+        profile = Profile.objects.get(id=self.artist.id)
+        with CaptureQueriesContext(connection) as ctx:
+            for _ in range(3):
+                self.assertFalse(is_team_profile(profile))
+                self.assertTrue(can_view_project(profile, self.owned))
+                self.assertTrue(can_manage_project_tasks(profile, self.owned))
+                self.assertTrue(can_view_project(profile, self.joined))
+                self.assertFalse(can_manage_project_tasks(profile, self.joined))
+                self.assertTrue(can_comment_on_project_tasks(profile, self.joined))
+                self.assertFalse(can_view_project(profile, self.foreign))
+        self.assertEqual(len(ctx.captured_queries), 3)
+
+    def test_membership_change_invalidates_context(self):
+        profile = Profile.objects.get(id=self.artist.id)
+        self.assertFalse(can_view_project(profile, self.foreign))
+        self.foreign.participants.add(self.artist)
+        self.assertTrue(can_view_project(profile, self.foreign))
+
+        self.assertFalse(is_team_profile(profile))
+        self.artist.roles.add(self.team_role)
+        self.assertTrue(is_team_profile(profile))
+
+    def test_validator_uses_same_context(self):
+        profile = Profile.objects.get(id=self.artist.id)
+        self.assertEqual(ProjectAccessValidator.get_access_level(profile, self.owned), "owner")
+        self.assertEqual(ProjectAccessValidator.get_access_level(profile, self.joined), "participant")
+        self.assertFalse(ProjectAccessValidator.can_manage(profile, self.joined))
+        self.assertFalse(ProjectAccessValidator.can_view(profile, self.foreign))
+        self.assertIs(get_access_context(profile), get_access_context(profile))
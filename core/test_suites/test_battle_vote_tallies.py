@@ -0,0 +1,116 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.models import Profile, Role, Tournament, TournamentBattle, TournamentSubmission, TournamentVote
+from core.vote_tallies import recount_battle_votes
+
+
+class BattleVoteTallyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        team_role, _ = Role.objects.get_or_create(key="TEAM")
+        self.team = Profile.objects.create(user=User.objects.create_user(username="tally-team"), name="Team")
+        self.team.roles.add(team_role)
+        self.client.force_authenticate(user=self.team.user)
+        self.tournament = Tournament.objects.create(created_by=self.team, title="Tally Cup", status="BATTLES")
+        self.battles = []
+        for idx in range(4):
+            left = TournamentSubmission.objects.create(
+                tournament=self.tournament,
+                profile=Profile.objects.create(user=User.objects.create_user(username=f"tally-l{idx}"), name=""),
+                status="APPROVED",
+            )
+            right = TournamentSubmission.objects.create(
+                tournament=self.tournament,
+                profile=Profile.objects.create(user=User.objects.create_user(username=f"tally-r{idx}"), name=""),
+                status="APPROVED",
+            )
+            self.battles.append(
+                TournamentBattle.objects.create(
+                    tournament=self.tournament, left_submission=left, right_submission=right, status="LIVE"
+                )
+            )
+
+    def _voter(self, name):
+        return Profile.objects.create(user=User.objects.create_user(username=name), name=name)
+
+    def _tallies(self, battle):
+        battle.refresh_from_db()
+        return battle.votes_left_approved, battle.votes_right_approved
+
+    def test_counters_follow_create_change_moderation_and_delete(self):
+        battle = self.battles[0]
+        first = TournamentVote.objects.create(
+            battle=battle, voter=self._voter("v1"), selected_submission=battle.left_submission
+        )
+        TournamentVote.objects.create(battle=battle, voter=self._voter("v2"), selected_submission=battle.left_submission)
+        flagged = TournamentVote.objects.create(
+            battle=battle,
+            voter=self._voter("v3"),
+            selected_submission=battle.right_submission,
+            moderation_status="PENDING_REVIEW",
+        )
+        self.assertEqual(self._tallies(battle), (2, 0))
+
+        first.selected_submission = battle.right_submission
+        first.save()
+        self.assertEqual(self._tallies(battle), (1, 1))
+
+        flagged.moderation_status = "APPROVED"
+        flagged.save(update_fields=["moderation_status"])
+        self.assertEqual(self._tallies(battle), (1, 2))
+
+        first.delete()
+        self.assertEqual(self._tallies(battle), (1, 1))
+
+        # Ein save() der Battle mit veraltetem Stand überschreibt die Zähler nicht
+        stale = TournamentBattle.objects.get(id=battle.id)
+        TournamentVote.objects.create(battle=battle, voter=self._voter("v4"), selected_submission=battle.left_submission)
+        stale.round_number = 2
+        stale.save()
+        self.assertEqual(self._tallies(battle), (2, 1))
+        self.assertEqual(recount_battle_votes(), 0)
+
+    def test_save_of_partial_instance_skips_deferred_fields(self):
+        battle = self.battles[0]
+        partial = TournamentBattle.objects.only("id", "round_number").get(id=battle.id)
+        partial.round_number = 3
+        with CaptureQueriesContext(connection) as ctx:
+            partial.save()
+        # Keine Nachlade-Query, das UPDATE setzt nur das geladene Feld
+        updates = [query["sql"] for query in ctx.captured_queries if query["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn("status", updates[0].split(" WHERE ")[0])
+        battle.refresh_from_db()
+        self.assertEqual((battle.round_number, battle.status), (3, "LIVE"))
+
+    def test_bracket_and_battle_list_use_counters(self):
+        for idx, battle in enumerate(self.battles):
+            for vote_idx in range(idx + 1):
+                TournamentVote.objects.create(
+                    battle=battle,
+                    voter=self._voter(f"b{idx}-{vote_idx}"),
+                    selected_submission=battle.left_submission,
+                )
+
+        with self.assertNumQueries(2):
+            res = self.client.get(f"/api/tournaments/{self.tournament.id}/bracket/")
+        self.assertEqual(res.status_code, 200)
+        rows = {row["id"]: row for row in res.json()["rounds"][0]["battles"]}
+        self.assertEqual([rows[battle.id]["votes_left"] for battle in self.battles], [1, 2, 3, 4])
+
+        battles = self.client.get(f"/api/tournament-battles/?tournament={self.tournament.id}").json()
+        battles = battles.get("results", battles) if isinstance(battles, dict) else battles
+        self.assertEqual(sorted(row["votes_left"] for row in battles), [1, 2, 3, 4])
+
+    def test_recount_repairs_drift(self):
+        battle = self.battles[1]
+        TournamentVote.objects.create(battle=battle, voter=self._voter("d1"), selected_submission=battle.right_submission)
+        TournamentBattle.objects.filter(id=battle.id).update(votes_right_approved=7)
+        self.assertEqual(recount_battle_votes(), 1)
+        self.assertEqual(self._tallies(battle), (0, 1))
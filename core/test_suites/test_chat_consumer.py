@@ -0,0 +1,98 @@
+import json
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.benchmarks import run_benchmark
+from core.models import ChatMessage, ChatThread, Profile
+from core.routing import websocket_urlpatterns
+from core.ws_auth import JWTAuthMiddleware, invalidate_ws_principals
+
+
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+class ChatConsumerTests(TestCase):
+    def setUp(self):
+        invalidate_ws_principals()
+        self.addCleanup(invalidate_ws_principals)
+        # close_old_connections würde die Test-Transaktion abbrechen
+        patcher = mock.patch("channels.db.close_old_connections")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.application = JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+        self.a, self.b, self.outsider = [
+            Profile.objects.create(user=User.objects.create_user(username=f"chat-{name}"), name=name)
+            for name in ("A", "B", "Outsider")
+        ]
+        self.thread = ChatThread.objects.create(a=self.a, b=self.b)
+
+    def _socket(self, profile):
+        token = AccessToken.for_user(profile.user)
+        return WebsocketCommunicator(self.application, f"/ws/chat/{self.thread.id}/?token={token}")
+
+    def test_non_member_is_rejected(self):
+        async def scenario():
+            socket = self._socket(self.outsider)
+            connected, code = await socket.connect()
+            return connected, code
+
+        self.assertEqual(async_to_sync(scenario)(), (False, 4403))
+
+    def test_read_frames_are_short_circuited_until_peer_writes(self):
+        ChatMessage.objects.create(thread=self.thread, sender=self.b, text="Hallo")
+
+        async def scenario():
+            socket = self._socket(self.a)
+            await socket.connect()
+            await socket.send_to(text_data=json.dumps({"type": "read"}))
+            first = json.loads(await socket.receive_from())
+            await socket.send_to(text_data=json.dumps({"type": "read"}))
+            await socket.send_to(text_data=json.dumps({"text": "Ping"}))
+            echo = json.loads(await socket.receive_from())
+            # Neue Nachricht des Gegenübers: der nächste Read fragt wieder die DB
+            peer = self._socket(self.b)
+            await peer.connect()
+            await peer.send_to(text_data=json.dumps({"text": "Neu"}))
+            await socket.receive_from()
+            await socket.send_to(text_data=json.dumps({"type": "read"}))
+            await socket.send_to(text_data=json.dumps({"text": "Pong"}))
+            await socket.receive_from()
+            await peer.disconnect()
+            await socket.disconnect()
+            return first, echo
+
+        with mock.patch("core.consumers._mark_thread_read", new_callable=mock.AsyncMock) as mark_read:
+            mark_read.side_effect = [[1], []]
+            first, echo = async_to_sync(scenario)()
+        self.assertEqual((first["event"], first["message_ids"]), ("read", [1]))
+        self.assertEqual(echo["event"], "message")
+        self.assertEqual(mark_read.call_count, 2)
+
+    def test_typing_state_change_bypasses_rate_limit(self):
+        async def scenario():
+            sender, receiver = self._socket(self.a), self._socket(self.b)
+            await sender.connect()
+            await receiver.connect()
+            for is_typing in (True, True, False):
+                await sender.send_to(text_data=json.dumps({"type": "typing", "is_typing": is_typing}))
+            frames = [json.loads(await receiver.receive_from()) for _ in range(2)]
+            nothing_else = await receiver.receive_nothing()
+            await sender.disconnect()
+            await receiver.disconnect()
+            return frames, nothing_else
+
+        frames, nothing_else = async_to_sync(scenario)()
+        self.assertEqual([frame["is_typing"] for frame in frames], [True, False])
+        self.assertTrue(nothing_else)
+
+    def test_chat_throughput_benchmark_costs_one_insert_and_send_per_message(self):
+        result = run_benchmark("chat_throughput", size=20, repeat=2)
+        cold, warm = result["rounds"]
+        self.assertEqual((cold["inserts"], cold["group_sends"]), (20, 20))
+        # Principal (2 Queries je User) und Mitgliedschaft je Socket; warm nur noch die Mitgliedschaft
+        self.assertEqual((cold["connect_queries"], warm["connect_queries"]), (6, 2))
+        self.assertFalse(ChatMessage.objects.filter(thread_id=result["thread"]).exists())
@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import ActivityEntry, Notification, Profile, Project, Role, Task
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        team_role, _ = Role.objects.get_or_create(key="TEAM")
+        self.user = User.objects.create_user(username="cursor-team", password="pw123456")
+        self.profile = Profile.objects.create(user=self.user, name="Cursor")
+        self.profile.roles.add(team_role)
+        self.client.force_authenticate(user=self.user)
+
+        project = Project.objects.create(title="Cursor")
+        today = timezone.now().date()
+        for idx in range(23):
+            Task.objects.create(
+                title=f"Task {idx}",
+                project=project,
+                priority=["LOW", "MEDIUM", "HIGH", "CRITICAL"][idx % 4],
+                due_date=None if idx % 5 == 0 else today + timedelta(days=idx % 3),
+            )
+        # Gleicher Zeitstempel erzwingt den Tie-Break über die id
+        Task.objects.update(created_at=timezone.now())
+
+    def _walk(self, url):
+        ids = []
+        pages = 0
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, 200, res.content)
+            payload = res.json()
+            self.assertNotIn("count", payload)
+            ids.extend(item["id"] for item in payload["results"])
+            url = payload["next"]
+            pages += 1
+        return ids, pages
+
+    def test_task_cursor_pages_cover_all_rows_once(self):
+        ids, pages = self._walk("/api/tasks/?pagination=cursor&page_size=5")
+        self.assertEqual(pages, 5)
+        self.assertEqual(ids, list(Task.objects.order_by("-created_at", "-id").values_list("id", flat=True)))
+
+    def test_task_cursor_respects_ordering_with_nulls(self):
+        for ordering in ("due_date", "-due_date", "priority", "-priority"):
+            ids, _ = self._walk(f"/api/tasks/?pagination=cursor&page_size=4&ordering={ordering}")
+            self.assertEqual(len(ids), 23, ordering)
+            self.assertEqual(len(set(ids)), 23, ordering)
+
+    def test_previous_link_returns_prior_page(self):
+        first = self.client.get("/api/tasks/?pagination=cursor&page_size=5").json()
+        second = self.client.get(first["next"]).json()
+        back = self.client.get(second["previous"]).json()
+        self.assertEqual([item["id"] for item in back["results"]], [item["id"] for item in first["results"]])
+
+    def test_default_pagination_unchanged(self):
+        payload = self.client.get("/api/tasks/").json()
+        self.assertEqual(payload["count"], 23)
+
+    def test_notifications_and_activity_feed_support_cursor(self):
+        Notification.objects.bulk_create(Notification(recipient=self.profile, title=f"N {idx}") for idx in range(7))
+        ids, pages = self._walk("/api/notifications/?pagination=cursor&page_size=3")
+        self.assertEqual((len(ids), pages), (7, 3))
+
+        ActivityEntry.objects.bulk_create(ActivityEntry(event_type="test", title=f"A {idx}") for idx in range(9))
+        ids, pages = self._walk("/api/activity-feed/?pagination=cursor&limit=4")
+        self.assertEqual((len(ids), pages), (9, 3))
+        self.assertIsInstance(self.client.get("/api/activity-feed/").json(), list)
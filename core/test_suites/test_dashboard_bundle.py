@@ -0,0 +1,79 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import Notification, Profile, Project, Role, Task
+
+
+class DashboardBundleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.team_role, _ = Role.objects.get_or_create(key="TEAM")
+        self.user = User.objects.create_user(username="bundle-team", password="pw123456")
+        self.profile = Profile.objects.create(user=self.user, name="Bundle")
+        self.profile.roles.add(self.team_role)
+        self.client.force_authenticate(user=self.user)
+
+        today = timezone.now().date()
+        project = Project.objects.create(title="Bundle")
+        Task.objects.create(title="Overdue", project=project, due_date=today - timedelta(days=2))
+        Task.objects.create(title="Soon", project=project, due_date=today + timedelta(days=2))
+        Task.objects.create(title="Done", project=project, status="DONE")
+        Notification.objects.create(recipient=self.profile, title="Hallo")
+
+    def _save_layout(self, widgets):
+        res = self.client.put(
+            "/api/dashboard/layouts/",
+            {"layouts": [{"id": "main", "name": "Main", "widgets": widgets}], "active_layout_id": "main"},
+            format="json",
+        )
+        self.assertEqual(res.status_code, 200, res.content)
+
+    def test_bundle_matches_single_endpoints(self):
+        self._save_layout(
+            [
+                {"id": "tasks_summary", "size": "m"},
+                {"id": "tasks_overdue", "size": "l"},
+                {"id": "tasks_upcoming", "size": "m"},
+                {"id": "notifications_unread", "size": "s"},
+                {"id": "team_points", "size": "l"},
+            ]
+        )
+        res = self.client.get("/api/dashboard/bundle/?layout=main")
+        self.assertEqual(res.status_code, 200, res.content)
+        payload = res.json()
+        self.assertEqual(payload["layout"], {"id": "main", "name": "Main"})
+        widgets = {row["id"]: row for row in payload["widgets"]}
+        for row in payload["widgets"]:
+            self.assertIn("ms", row)
+            self.assertIn("data", row, row)
+
+        self.assertEqual(widgets["tasks_summary"]["data"], self.client.get("/api/tasks/summary/").json())
+        self.assertEqual(
+            [task["id"] for task in widgets["tasks_overdue"]["data"]],
+            [task["id"] for task in self.client.get("/api/tasks/overdue/").json()],
+        )
+        self.assertEqual(
+            [task["id"] for task in widgets["tasks_upcoming"]["data"]],
+            [task["id"] for task in self.client.get("/api/tasks/upcoming/").json()],
+        )
+        self.assertEqual(widgets["notifications_unread"]["data"], {"unread": 1})
+        self.assertEqual(widgets["team_points"]["data"], self.client.get("/api/team-points/").json())
+
+    def test_bundle_reports_forbidden_and_unknown_widgets(self):
+        self.profile.roles.remove(self.team_role)
+        self._save_layout([{"id": "team_points"}, {"id": "does_not_exist"}, {"id": "stats"}])
+        payload = self.client.get("/api/dashboard/bundle/").json()
+        errors = {row["id"]: row.get("error") for row in payload["widgets"]}
+        self.assertEqual(errors, {"team_points": "forbidden", "does_not_exist": "unknown_widget", "stats": None})
+
+    def test_default_widgets_and_unknown_layout(self):
+        payload = self.client.get("/api/dashboard/bundle/").json()
+        self.assertIsNone(payload["layout"])
+        self.assertTrue(all("data" in row for row in payload["widgets"]))
+        self.assertEqual(self.client.get("/api/dashboard/bundle/?layout=missing").status_code, 404)
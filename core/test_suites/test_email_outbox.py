@@ -0,0 +1,117 @@
+from unittest import mock
+
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import email_outbox
+from core.email_outbox import deliver_pending_emails
+from core.models import EmailOutboxMessage
+from core.notifications import send_notification_email
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError("smtp down")
+
+
+class FlakyBackend(BaseEmailBackend):
+    """Nimmt Nachrichten an, bis ``fail_for`` als Empfänger kommt."""
+
+    fail_for = "b@example.com"
+    opened = 0
+
+    def open(self):
+        FlakyBackend.opened += 1
+
+    def send_messages(self, email_messages):
+        for message in email_messages:
+            if message.to == [self.fail_for]:
+                raise ConnectionError("connection reset")
+            mail.outbox.append(message)
+        return len(email_messages)
+
+
+@override_settings(EMAIL_DELIVERY_MODE="command", EMAIL_RATE_PER_MINUTE=0)
+class EmailOutboxTests(TestCase):
+    def test_request_path_only_enqueues_per_recipient(self):
+        queued = send_notification_email("Hallo", "Text", ["a@example.com", "B@example.com", "a@example.com"])
+        self.assertEqual(queued, 2)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(EmailOutboxMessage.objects.filter(status="PENDING").count(), 2)
+
+    def test_delivery_sends_one_message_per_recipient(self):
+        send_notification_email("Hallo", "Text", ["a@example.com", "b@example.com"])
+        summary = deliver_pending_emails()
+        self.assertEqual(summary["sent"], 2)
+        self.assertEqual([message.to for message in mail.outbox], [["a@example.com"], ["b@example.com"]])
+        self.assertFalse(EmailOutboxMessage.objects.exclude(status="SENT").exists())
+
+    @override_settings(EMAIL_BACKEND="core.test_suites.test_email_outbox.FailingBackend", EMAIL_MAX_ATTEMPTS=2)
+    def test_failures_back_off_and_give_up(self):
+        send_notification_email("Hallo", "Text", ["a@example.com"])
+        self.assertEqual(deliver_pending_emails()["failed"], 1)
+        item = EmailOutboxMessage.objects.get()
+        self.assertEqual(item.status, "PENDING")
+        self.assertGreater(item.next_attempt_at, timezone.now())
+
+        self.assertEqual(deliver_pending_emails()["failed"], 0)
+        EmailOutboxMessage.objects.update(next_attempt_at=timezone.now())
+        deliver_pending_emails()
+        item.refresh_from_db()
+        self.assertEqual(item.status, "FAILED")
+        self.assertEqual(item.attempts, 2)
+
+    @override_settings(EMAIL_BACKEND="core.test_suites.test_email_outbox.FlakyBackend")
+    def test_failure_mid_batch_does_not_resend_accepted_mail(self):
+        FlakyBackend.opened = 0
+        send_notification_email("Hallo", "Text", ["a@example.com", "b@example.com", "c@example.com"])
+        summary = deliver_pending_emails()
+        self.assertEqual((summary["sent"], summary["failed"]), (2, 1))
+        self.assertEqual([message.to for message in mail.outbox], [["a@example.com"], ["c@example.com"]])
+        statuses = dict(EmailOutboxMessage.objects.values_list("recipient", "status"))
+        self.assertEqual(statuses, {"a@example.com": "SENT", "b@example.com": "PENDING", "c@example.com": "SENT"})
+        # Nach dem Fehler wird die Verbindung für den Rest neu geöffnet
+        self.assertEqual(FlakyBackend.opened, 2)
+
+    @override_settings(EMAIL_RATE_PER_MINUTE=1)
+    def test_rate_cap_limits_each_minute(self):
+        send_notification_email("Hallo", "Text", ["a@example.com", "b@example.com"])
+        summary = deliver_pending_emails()
+        self.assertEqual(summary["sent"], 1)
+        self.assertTrue(summary["rate_limited"])
+
+
+class EmailWorkerLoopTests(TestCase):
+    def setUp(self):
+        # close_old_connections würde die Test-Transaktion abbrechen
+        patcher = mock.patch("core.email_outbox.close_old_connections")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run(self, waits):
+        summary = {"sent": 0, "failed": 0, "rate_limited": False}
+        with mock.patch("core.email_outbox.deliver_pending_emails", return_value=summary) as deliver, mock.patch(
+            "core.email_outbox._seconds_until_next_attempt", side_effect=waits
+        ), mock.patch.object(email_outbox._worker_wake, "wait") as wait:
+            email_outbox._worker_loop()
+        return deliver.call_count, [call.args[0] for call in wait.call_args_list]
+
+    def test_worker_sleeps_until_backed_off_retry(self):
+        deliveries, waits = self._run([30.0, None, None])
+        self.assertEqual((deliveries, waits), (2, [30.0]))
+        self.assertIsNone(email_outbox._worker_thread)
+
+    def test_rows_queued_while_exiting_are_delivered(self):
+        # Erste Prüfung leer, die Prüfung unter dem Lock sieht die neue Mail
+        deliveries, waits = self._run([None, 0.0, None, None])
+        self.assertEqual((deliveries, waits), (2, []))
+
+    @override_settings(EMAIL_DELIVERY_MODE="command")
+    def test_next_attempt_ignores_finished_rows(self):
+        self.assertIsNone(email_outbox._seconds_until_next_attempt())
+        send_notification_email("Hallo", "Text", ["a@example.com"])
+        self.assertEqual(email_outbox._seconds_until_next_attempt(), 0.0)
+        EmailOutboxMessage.objects.update(status="SENT")
+        self.assertIsNone(email_outbox._seconds_until_next_attempt())
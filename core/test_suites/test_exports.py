@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.exports import stream_csv
+from core.models import Profile, Project, Role, Task
+
+
+class StreamingExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        team_role, _ = Role.objects.get_or_create(key="TEAM")
+        self.user = User.objects.create_user(username="export-team", password="pw123456")
+        self.profile = Profile.objects.create(user=self.user, name="Export")
+        self.profile.roles.add(team_role)
+        self.client.force_authenticate(user=self.user)
+
+        members = [
+            Profile.objects.create(user=User.objects.create_user(username=f"member-{idx}"), name="")
+            for idx in range(3)
+        ]
+        today = timezone.now().date()
+        for idx in range(12):
+            project = Project.objects.create(title=f"Projekt {idx}")
+            project.participants.set(members)
+            Task.objects.create(title=f"Task; {idx}", project=project, due_date=today + timedelta(days=idx))
+
+    def _body(self, response):
+        self.assertIsInstance(response, StreamingHttpResponse)
+        return b"".join(response.streaming_content).decode("utf-8")
+
+    def test_project_export_streams_without_per_project_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get("/api/projects/export/")
+            body = self._body(res)
+        self.assertEqual(res.status_code, 200)
+        lines = body.strip().splitlines()
+        self.assertEqual(lines[0], "Projekt;Status;Teilnehmer;Erstellt am")
+        self.assertEqual(len(lines), 13)
+        self.assertIn("member-0, member-1, member-2", lines[1])
+        participant_queries = [q for q in ctx.captured_queries if "core_project_participants" in q["sql"]]
+        self.assertEqual(len(participant_queries), 1)
+
+    def test_task_calendar_export_is_valid_ics(self):
+        body = self._body(self.client.get("/api/tasks/calendar-export/"))
+        self.assertTrue(body.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertTrue(body.endswith("END:VCALENDAR\r\n"))
+        self.assertEqual(body.count("BEGIN:VEVENT"), 12)
+        self.assertIn("SUMMARY:Task\\; 0", body)
+
+        legacy = self._body(self.client.get("/api/calendar/export/"))
+        self.assertEqual(legacy.count("BEGIN:VEVENT"), 12)
+        self.assertNotIn("UID=", legacy)
+
+    def test_team_points_csv_streams(self):
+        body = self._body(self.client.get("/api/team-points/?format=csv"))
+        self.assertTrue(body.startswith("Name;Username;Total"))
+        self.assertIn("Export;export-team", body)
+
+    @override_settings(EXPORT_CHUNK_SIZE=5)
+    def test_asgi_iteration_pulls_rows_chunk_by_chunk(self):
+        produced = []
+
+        def rows():
+            for idx in range(12):
+                produced.append(idx)
+                yield [idx]
+
+        response = stream_csv("rows.csv", ["Nr"], rows())
+
+        async def consume():
+            parts = []
+            async for part in response:
+                # Beim ersten Chunk darf der Generator noch nicht erschöpft sein
+                parts.append((part, len(produced)))
+            return parts
+
+        parts = async_to_sync(consume)()
+        self.assertEqual([seen for _, seen in parts], [4, 9, 12])
+        self.assertEqual(b"".join(part for part, _ in parts).decode().split("\r\n")[:3], ["Nr", "0", "1"])
+
+    def test_project_export_streams_under_asgi(self):
+        response = self.client.get("/api/projects/export/")
+
+        async def consume():
+            return [part async for part in response]
+
+        body = b"".join(async_to_sync(consume)()).decode("utf-8")
+        self.assertEqual(len(body.strip().splitlines()), 13)
@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.assignment import rebalance_growpro_assignments, schedule_growpro_rebalance
+from core.models import GrowProGoal, Profile, Role, TeamScore
+
+
+class GrowProRebalanceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.team_role, _ = Role.objects.get_or_create(key="TEAM")
+        self.members = []
+        for idx in range(3):
+            profile = Profile.objects.create(user=User.objects.create_user(username=f"rebalance-{idx}"), name=f"M{idx}")
+            profile.roles.add(self.team_role)
+            self.members.append(profile)
+        self.artist = Profile.objects.create(user=User.objects.create_user(username="rebalance-artist"), name="Artist")
+
+    def _goal(self, idx, assigned_team=None):
+        return GrowProGoal.objects.create(
+            profile=self.artist,
+            title=f"Ziel {idx}",
+            metric="Hörer",
+            assigned_team=assigned_team,
+            due_date=timezone.now().date() + timedelta(days=idx),
+        )
+
+    def _loads(self):
+        return {
+            member.id: GrowProGoal.objects.filter(assigned_team=member, status__in=["ACTIVE", "ON_HOLD"]).count()
+            for member in self.members
+        }
+
+    def test_unassigned_goals_spread_and_overloaded_member_rebalanced(self):
+        for idx in range(7):
+            self._goal(idx, assigned_team=self.members[0])
+        for idx in range(7, 10):
+            self._goal(idx)
+
+        with CaptureQueriesContext(connection) as ctx:
+            result = rebalance_growpro_assignments()
+        goal_updates = [q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "core_growprogoal"')]
+        self.assertEqual(len(goal_updates), 1)
+        loads = self._loads()
+        self.assertEqual(sum(loads.values()), 10)
+        self.assertLessEqual(max(loads.values()) - min(loads.values()), 2)
+        self.assertEqual(result["assigned"], 3)
+        self.assertGreater(result["rebalanced"], 0)
+        for member in self.members:
+            self.assertEqual(TeamScore.objects.get(profile=member).goal_points, loads[member.id])
+
+    def test_dry_run_returns_plan_without_writing(self):
+        goals = [self._goal(idx) for idx in range(4)]
+        result = rebalance_growpro_assignments(dry_run=True)
+        self.assertEqual(len(result["plan"]), 4)
+        self.assertEqual({move["goal_id"] for move in result["plan"]}, {goal.id for goal in goals})
+        self.assertFalse(GrowProGoal.objects.filter(assigned_team__isnull=False).exists())
+        # Erste Zuweisung geht an das Mitglied mit der geringsten Last (niedrigste ID bei Gleichstand)
+        self.assertEqual(result["plan"][0]["to"], self.members[0].id)
+
+    @override_settings(SIDE_EFFECTS_MODE="inline")
+    def test_view_writes_schedule_one_debounced_run(self):
+        client = APIClient()
+        client.force_authenticate(user=self.members[0].user)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for idx in range(3):
+                res = client.post(
+                    "/api/growpro/",
+                    {"title": f"Neu {idx}", "metric": "Streams", "profile_id": self.artist.id},
+                    format="json",
+                )
+                self.assertEqual(res.status_code, 201, res.content)
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(GrowProGoal.objects.filter(assigned_team__isnull=True).exists())
+        self.assertIsNone(cache.get("growpro-rebalance-pending"))
+
+    def test_rollback_does_not_hold_the_debounce_lock(self):
+        # Ohne Commit laufen die Callbacks nicht: es darf keine Sperre zurückbleiben
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            schedule_growpro_rebalance()
+        self.assertEqual(len(callbacks), 1)
+        self.assertIsNone(cache.get("growpro-rebalance-pending"))
@@ -0,0 +1,36 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from core.models import Notification, Profile
+from core.notifications import notify_profiles
+
+
+class NotifyProfilesTests(TestCase):
+    def setUp(self):
+        self.profiles = []
+        for idx in range(6):
+            user = User.objects.create_user(username=f"notify-{idx}", password="pw123456")
+            settings_map = {"task_assigned": idx % 3 != 0}
+            self.profiles.append(Profile.objects.create(user=user, name=f"Notify {idx}", notification_settings=settings_map))
+
+    def test_fan_out_filters_preferences_and_writes_in_batches(self):
+        with self.assertNumQueries(2):
+            created = notify_profiles(
+                self.profiles + self.profiles[:2],
+                "Neuer Task",
+                notification_type="task_assigned",
+                preference_key="task_assigned",
+                batch_size=2,
+            )
+        self.assertEqual(len(created), 4)
+        self.assertTrue(all(item.pk for item in created))
+        self.assertEqual(
+            set(Notification.objects.values_list("recipient_id", flat=True)),
+            {profile.id for idx, profile in enumerate(self.profiles) if idx % 3 != 0},
+        )
+
+    def test_mark_read_is_set_up_front(self):
+        created = notify_profiles(self.profiles[:2], "Info", mark_read=True)
+        self.assertEqual(len(created), 2)
+        self.assertFalse(Notification.objects.filter(is_read=False).exists())
+        self.assertFalse(Notification.objects.filter(read_at__isnull=True).exists())
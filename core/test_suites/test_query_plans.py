@@ -0,0 +1,86 @@
+import re
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.models import ActivityEntry, ChatMessage, Notification, Profile, Project, Role, Task
+from core.views import ActivityFeedView, NotificationViewSet, TaskViewSet
+
+
+class HotQueryPlanTests(TestCase):
+    """
+    Stellt sicher, dass die Listen-Queries der heißen Tabellen über Indizes
+    laufen und nicht auf sequentielle Scans zurückfallen. Geprüft werden die
+    Querysets der Views selbst, nicht nachgebaute.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username="plans", password="pw123456")
+        cls.profile = Profile.objects.create(user=user, name="Plans")
+        team_role, _ = Role.objects.get_or_create(key="TEAM")
+        cls.profile.roles.add(team_role)
+        project = Project.objects.create(title="Plans")
+        today = timezone.now().date()
+        Task.objects.bulk_create(
+            Task(
+                title=f"Task {idx}",
+                project=project,
+                status="DONE" if idx % 4 == 0 else "OPEN",
+                is_archived=idx % 10 == 0,
+                due_date=today + timedelta(days=idx % 30 - 15),
+            )
+            for idx in range(400)
+        )
+        Notification.objects.bulk_create(
+            Notification(recipient=cls.profile, title=f"N {idx}", is_read=idx % 2 == 0) for idx in range(200)
+        )
+        ActivityEntry.objects.bulk_create(
+            ActivityEntry(event_type="task_created" if idx % 3 else "task_overdue", title=f"A {idx}")
+            for idx in range(300)
+        )
+
+    def _plan(self, queryset):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def assertUsesIndex(self, queryset, table):
+        plan = self._plan(queryset)
+        if connection.vendor == "postgresql":
+            self.assertNotIn(f"Seq Scan on {table}", plan, plan)
+        elif connection.vendor == "sqlite":
+            self.assertIsNone(re.search(rf"SCAN {table}(?! USING)", plan), plan)
+
+    def _view_queryset(self, view_class, params=None, action="list"):
+        request = APIRequestFactory().get("/", params or {})
+        force_authenticate(request, user=self.profile.user)
+        view = view_class()
+        view.action_map = {"get": action}
+        view.kwargs = {}
+        view.format_kwarg = None
+        view.request = view.initialize_request(request)
+        return view.get_queryset()
+
+    def test_task_list_uses_index(self):
+        today = timezone.now().date()
+        self.assertUsesIndex(self._view_queryset(TaskViewSet)[:20], "core_task")
+        qs = self._view_queryset(TaskViewSet, {"due_before": str(today), "ordering": "due_date"})
+        self.assertUsesIndex(qs[:20], "core_task")
+
+    def test_notification_unread_uses_index(self):
+        qs = self._view_queryset(NotificationViewSet, {"unread": "true"})
+        self.assertUsesIndex(qs[:20], "core_notification")
+
+    def test_activity_feed_uses_index(self):
+        self.assertUsesIndex(self._view_queryset(ActivityFeedView)[:100], "core_activityentry")
+        qs = self._view_queryset(ActivityFeedView, {"types": "task_overdue"})
+        self.assertUsesIndex(qs[:100], "core_activityentry")
+
+    def test_chat_unread_uses_index(self):
+        self.assertUsesIndex(ChatMessage.objects.filter(thread_id=1, read=False), "core_chatmessage")
@@ -0,0 +1,117 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import Profile, RankedStanding, Role, Tournament, TournamentBattle, TournamentSubmission, TournamentVote
+from core.ranking import rank_of, rebuild_ranked_standings, schedule_ranked_refresh
+
+
+class RankedStandingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        team_role, _ = Role.objects.get_or_create(key="TEAM")
+        self.team = Profile.objects.create(user=User.objects.create_user(username="ranked-team"), name="Team")
+        self.team.roles.add(team_role)
+        self.left = Profile.objects.create(user=User.objects.create_user(username="ranked-left"), name="Left")
+        self.right = Profile.objects.create(user=User.objects.create_user(username="ranked-right"), name="Right")
+        self.tournament = Tournament.objects.create(created_by=self.team, title="Cup", status="BATTLES")
+        self.left_sub = TournamentSubmission.objects.create(tournament=self.tournament, profile=self.left, title="L")
+        self.right_sub = TournamentSubmission.objects.create(tournament=self.tournament, profile=self.right, title="R")
+
+    def _standing(self, profile):
+        return RankedStanding.objects.filter(profile=profile).first()
+
+    def _snapshot(self):
+        return sorted(
+            RankedStanding.objects.values_list(
+                "profile_id", "wins", "battles", "losses", "submissions", "votes", "ranked_points"
+            )
+        )
+
+    def test_standings_follow_approval_moderation_and_battle_close(self):
+        self.client.force_authenticate(user=self.team.user)
+        res = self.client.post(
+            f"/api/tournaments/{self.tournament.id}/submissions/bulk-decision/",
+            {"decision": "APPROVED"},
+            format="json",
+        )
+        self.assertEqual(res.status_code, 200, res.content)
+        self.assertEqual(self._standing(self.left).submissions, 1)
+
+        battle = TournamentBattle.objects.create(
+            tournament=self.tournament, left_submission=self.left_sub, right_submission=self.right_sub, status="LIVE"
+        )
+        voter = Profile.objects.create(user=User.objects.create_user(username="ranked-voter"), name="Voter")
+        vote = TournamentVote.objects.create(
+            battle=battle, voter=voter, selected_submission=self.left_sub, moderation_status="PENDING_REVIEW"
+        )
+        vote.moderation_status = "APPROVED"
+        vote.save(update_fields=["moderation_status"])
+        self.assertEqual(self._standing(self.left).votes, 1)
+
+        res = self.client.post(f"/api/tournament-battles/{battle.id}/close/", {}, format="json")
+        self.assertEqual(res.status_code, 200, res.content)
+        left, right = self._standing(self.left), self._standing(self.right)
+        self.assertEqual((left.wins, left.battles, right.battles, right.losses), (1, 1, 1, 1))
+        self.assertGreater(left.ranked_points, right.ranked_points)
+
+        snapshot = self._snapshot()
+        rebuild_ranked_standings()
+        self.assertEqual(self._snapshot(), snapshot)
+
+    def test_ladder_read_does_not_scale_with_players(self):
+        TournamentSubmission.objects.filter(tournament=self.tournament).update(status="APPROVED")
+        for idx in range(15):
+            profile = Profile.objects.create(user=User.objects.create_user(username=f"ranked-{idx}"), name=f"P{idx}")
+            TournamentSubmission.objects.create(
+                tournament=self.tournament, profile=profile, title=f"S{idx}", status="APPROVED"
+            )
+        rebuild_ranked_standings()
+        self.client.force_authenticate(user=self.left.user)
+
+        with CaptureQueriesContext(connection) as ctx:
+            payload = self.client.get("/api/tournaments/ranked-overview/").json()
+        self.assertEqual(payload["total_players"], 17)
+        self.assertEqual([row["rank"] for row in payload["rows"]], list(range(1, 18)))
+        my_row = next(row for row in payload["rows"] if row["profile_id"] == self.left.id)
+        self.assertEqual(payload["my_rank"], my_row["rank"])
+        standing_reads = [q for q in ctx.captured_queries if 'FROM "core_rankedstanding"' in q["sql"]]
+        self.assertEqual(len(standing_reads), 2)
+
+        limited = self.client.get("/api/tournaments/ranked-overview/?limit=3").json()
+        self.assertEqual(len(limited["rows"]), 3)
+        self.assertEqual(limited["total_players"], 17)
+        self.assertEqual(limited["my_rank"], payload["my_rank"])
+        self.assertEqual(rank_of(self._standing(self.left)), payload["my_rank"])
+
+    @override_settings(SIDE_EFFECTS_MODE="inline")
+    def test_new_votes_schedule_one_debounced_refresh(self):
+        TournamentSubmission.objects.filter(tournament=self.tournament).update(status="APPROVED")
+        rebuild_ranked_standings()
+        battle = TournamentBattle.objects.create(
+            tournament=self.tournament,
+            left_submission=self.left_sub,
+            right_submission=self.right_sub,
+            status="LIVE",
+            starts_at=timezone.now(),
+        )
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for idx in range(5):
+                voter = Profile.objects.create(user=User.objects.create_user(username=f"spike-{idx}"), name="")
+                TournamentVote.objects.create(battle=battle, voter=voter, selected_submission=self.left_sub)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self._standing(self.left).votes, 5)
+
+    def test_rollback_does_not_hold_refresh_locks(self):
+        # Ohne Commit laufen die Callbacks nicht: es dürfen keine Sperren zurückbleiben
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            schedule_ranked_refresh([self.left.id])
+            schedule_ranked_refresh([self.left.id, self.right.id])
+        self.assertEqual(len(callbacks), 1)
+        keys = [f"ranked-refresh-pending:{profile.id}" for profile in (self.left, self.right)]
+        self.assertEqual(cache.get_many(keys), {})
@@ -0,0 +1,96 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from core.benchmarks import run_benchmark
+from core.coalescer import RealtimeCoalescer, merge_events
+from core.models import Profile, Project, Role, Task
+from core.realtime import flush_realtime
+
+
+def _event(task_id, revision, action="updated", changes=None, **extra):
+    return dict(
+        entity="task",
+        action=action,
+        id=task_id,
+        revision=revision,
+        base_revision=revision - 1,
+        changes=changes,
+        **extra,
+    )
+
+
+class MergeEventsTests(SimpleTestCase):
+    def test_updates_merge_changes_and_keep_first_base_revision(self):
+        merged = merge_events(_event(1, 4, changes={"status": "OPEN"}), _event(1, 5, changes={"priority": "HIGH"}))
+        self.assertEqual((merged["revision"], merged["base_revision"]), (5, 3))
+        self.assertEqual(merged["changes"], {"status": "OPEN", "priority": "HIGH"})
+
+        unknown = merge_events(merged, _event(1, 6, changes=None))
+        self.assertIsNone(unknown["changes"])
+
+    def test_created_absorbs_updates_and_delete_wins(self):
+        created = _event(1, 1, action="created", data={"id": 1, "status": "OPEN", "revision": 1})
+        created.pop("changes")
+        merged = merge_events(created, _event(1, 2, changes={"status": "DONE"}))
+        self.assertEqual(merged["action"], "created")
+        self.assertEqual(merged["data"], {"id": 1, "status": "DONE", "revision": 2})
+        self.assertEqual(merge_events(merged, _event(1, 3, action="deleted"))["action"], "deleted")
+
+
+class RealtimeCoalescerTests(TestCase):
+    def test_burst_is_flushed_as_one_frame_per_group(self):
+        frames = []
+        coalescer = RealtimeCoalescer(lambda group, events: frames.append((group, events)), window_ms=0)
+        with self.captureOnCommitCallbacks(execute=True):
+            for revision in range(1, 6):
+                coalescer.add(["tasks_all", "project_1"], _event(1, revision, changes={"title": f"v{revision}"}))
+            coalescer.add(["tasks_all", "project_1"], _event(2, 1, changes={"status": "DONE"}))
+            self.assertEqual(frames, [])
+        self.assertEqual([group for group, _ in frames], ["tasks_all", "project_1"])
+        events = frames[0][1]
+        self.assertEqual([(event["id"], event["revision"], event["base_revision"]) for event in events], [(1, 5, 0), (2, 1, 0)])
+        self.assertEqual(events[0]["changes"], {"title": "v5"})
+        metrics = coalescer.snapshot()
+        self.assertEqual(
+            (metrics["events_in"], metrics["events_merged"], metrics["events_out"], metrics["frames_out"]),
+            (6, 4, 4, 2),
+        )
+
+    def test_timer_window_flushes_once(self):
+        frames = []
+        coalescer = RealtimeCoalescer(lambda group, events: frames.append((group, events)), window_ms=50)
+        with mock.patch("core.coalescer.threading.Timer") as timer:
+            coalescer.add(["tasks_all"], _event(1, 1, changes={}))
+            coalescer.add(["tasks_all"], _event(1, 2, changes={}))
+        self.assertEqual(timer.call_count, 1)
+        coalescer.flush()
+        self.assertEqual(len(frames), 1)
+
+    @override_settings(SIDE_EFFECTS_MODE="inline", EMAIL_DELIVERY_MODE="command", REALTIME_COALESCE_MS=0)
+    def test_repeated_api_updates_reach_clients_as_one_event(self):
+        flush_realtime()
+        client = APIClient()
+        team_role, _ = Role.objects.get_or_create(key="TEAM")
+        profile = Profile.objects.create(user=User.objects.create_user(username="burst-team"), name="Burst")
+        profile.roles.add(team_role)
+        client.force_authenticate(user=profile.user)
+        task = Task.objects.create(title="Mix", project=Project.objects.create(title="Board"), updated_by=profile)
+
+        with mock.patch("core.realtime._send_batch") as send_batch:
+            with self.captureOnCommitCallbacks(execute=True):
+                for status_value in ("IN_PROGRESS", "REVIEW", "DONE"):
+                    res = client.patch(f"/api/tasks/{task.id}/", {"status": status_value}, format="json")
+                    self.assertEqual(res.status_code, 200, res.content)
+        self.assertEqual(send_batch.call_count, 2)
+        (event,) = send_batch.call_args_list[0].args[1]
+        self.assertEqual((event["revision"], event["base_revision"]), (3, 0))
+        self.assertEqual(event["changes"]["status"], "DONE")
+
+    def test_realtime_burst_benchmark_reports_metrics(self):
+        result = run_benchmark("realtime_burst", size=200, repeat=1, tasks=20)
+        self.assertEqual(result["metrics"]["events_in"], 200)
+        # tasks_all + 10 Projektgruppen
+        self.assertEqual(result["metrics"]["frames_out"], 11)
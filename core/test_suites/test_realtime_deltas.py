@@ -0,0 +1,116 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.models import Profile, Project, Role, SideEffectJob, Task
+from core.realtime import bump_revision, flush_realtime
+from core.side_effects import run_handler
+
+
+@override_settings(SIDE_EFFECTS_MODE="inline", EMAIL_DELIVERY_MODE="command", REALTIME_COALESCE_MS=0)
+class RealtimeDeltaTests(TestCase):
+    def setUp(self):
+        flush_realtime()
+        self.client = APIClient()
+        team_role, _ = Role.objects.get_or_create(key="TEAM")
+        self.team = Profile.objects.create(user=User.objects.create_user(username="delta-team"), name="Delta")
+        self.team.roles.add(team_role)
+        self.client.force_authenticate(user=self.team.user)
+        self.project = Project.objects.create(title="Board")
+        self.other_project = Project.objects.create(title="Backlog")
+        self.task = Task.objects.create(title="Mix", project=self.project, updated_by=self.team)
+
+    def _broadcasts(self, request):
+        with mock.patch("core.realtime._send_batch") as send_batch:
+            with self.captureOnCommitCallbacks(execute=True):
+                res = request()
+        self.assertIn(res.status_code, (200, 201), res.content)
+        return [(call.args[0], event) for call in send_batch.call_args_list for event in call.args[1]]
+
+    def test_update_sends_changed_fields_with_revision(self):
+        sent = self._broadcasts(
+            lambda: self.client.patch(f"/api/tasks/{self.task.id}/", {"status": "IN_PROGRESS"}, format="json")
+        )
+        self.assertEqual([group for group, _ in sent], ["tasks_all", f"project_{self.project.id}"])
+        payload = sent[0][1]
+        self.assertEqual((payload["action"], payload["revision"]), ("updated", 1))
+        self.assertEqual(payload["changes"], {"status": "IN_PROGRESS"})
+        self.assertNotIn("data", payload)
+
+        sent = self._broadcasts(
+            lambda: self.client.patch(f"/api/tasks/{self.task.id}/", {"status": "IN_PROGRESS"}, format="json")
+        )
+        self.assertEqual(sent, [])
+        sent = self._broadcasts(
+            lambda: self.client.patch(f"/api/tasks/{self.task.id}/", {"priority": "HIGH"}, format="json")
+        )
+        self.assertEqual((sent[0][1]["revision"], sent[0][1]["changes"]), (2, {"priority": "HIGH"}))
+        self.assertEqual(self.client.get(f"/api/tasks/{self.task.id}/").json()["revision"], 2)
+
+    def test_project_move_and_members_reach_both_project_groups(self):
+        sent = self._broadcasts(
+            lambda: self.client.patch(
+                f"/api/tasks/{self.task.id}/",
+                {"project": self.other_project.id, "assignee_ids": [self.team.id]},
+                format="json",
+            )
+        )
+        self.assertEqual(
+            [group for group, _ in sent],
+            ["tasks_all", f"project_{self.other_project.id}", f"project_{self.project.id}"],
+        )
+        changes = sent[0][1]["changes"]
+        self.assertEqual((changes["project"], changes["project_title"]), (self.other_project.id, "Backlog"))
+        self.assertEqual(changes["assignees"], [{"id": self.team.id, "name": "Delta", "username": "delta-team"}])
+
+    def test_created_event_carries_full_payload(self):
+        sent = self._broadcasts(
+            lambda: self.client.post("/api/tasks/", {"title": "Master", "project": self.project.id}, format="json")
+        )
+        payload = sent[0][1]
+        self.assertEqual((payload["action"], payload["revision"], payload["data"]["title"]), ("created", 1, "Master"))
+
+    def test_stale_full_save_keeps_revision(self):
+        stale = Task.objects.get(id=self.task.id)
+        self._broadcasts(lambda: self.client.patch(f"/api/tasks/{self.task.id}/", {"title": "Mix 2"}, format="json"))
+        stale.priority = "LOW"
+        stale.save()
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.revision, self.task.priority), (1, "LOW"))
+
+    @override_settings(SIDE_EFFECTS_MODE="outbox")
+    def test_revision_follows_write_order_not_handler_order(self):
+        for data in ({"status": "IN_PROGRESS"}, {"priority": "HIGH"}):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.patch(f"/api/tasks/{self.task.id}/", data, format="json")
+        jobs = list(SideEffectJob.objects.filter(name="task_updated").order_by("-id"))
+        # Der Pool arbeitet die Handler in umgekehrter Reihenfolge ab
+        sent = []
+        for job in jobs:
+            with mock.patch("core.realtime._send_batch") as send_batch:
+                with self.captureOnCommitCallbacks(execute=True):
+                    run_handler(job.name, job.payload)
+            sent += [event for call in send_batch.call_args_list if call.args[0] == "tasks_all" for event in call.args[1]]
+        self.assertEqual(
+            [(event["revision"], event["changes"]) for event in sent],
+            [(2, {"priority": "HIGH"}), (1, {"status": "IN_PROGRESS"})],
+        )
+
+    def test_bump_reads_back_inside_its_transaction(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(bump_revision(self.task), 1)
+        statements = [query["sql"].split()[0] for query in ctx.captured_queries]
+        # UPDATE und Zurücklesen im selben (Savepoint-)Block
+        self.assertEqual(statements, ["SAVEPOINT", "UPDATE", "SELECT", "RELEASE"])
+        self.assertEqual(bump_revision(self.task), 2)
+
+    def test_project_update_sends_delta(self):
+        sent = self._broadcasts(
+            lambda: self.client.patch(f"/api/projects/{self.project.id}/", {"status": "DONE"}, format="json")
+        )
+        self.assertEqual([group for group, _ in sent], ["projects_all", f"project_{self.project.id}"])
+        self.assertEqual(sent[0][1]["changes"], {"status": "DONE"})
@@ -0,0 +1,102 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase, override_settings
+
+from core.consumers import UpdatesConsumer
+from core.realtime import _send_batch
+from core.replay import LocalReplayBuffer, get_replay_buffer, missed_frames, reset_replay_buffer
+
+
+def _events(task_id):
+    return [{"entity": "task", "action": "updated", "id": task_id, "revision": 1}]
+
+
+@override_settings(REALTIME_REPLAY_REDIS_URL=None, REALTIME_REPLAY_SIZE=3)
+class ReplayBufferTests(SimpleTestCase):
+    def setUp(self):
+        reset_replay_buffer()
+        self.addCleanup(reset_replay_buffer)
+
+    def test_since_returns_only_missed_frames_of_group(self):
+        buffer = LocalReplayBuffer()
+        first = buffer.append("tasks_all", _events(1))
+        buffer.append("project_1", _events(1))
+        third = buffer.append("tasks_all", _events(2))
+        frames, complete = buffer.since("tasks_all", first)
+        self.assertTrue(complete)
+        self.assertEqual(frames, [(third, _events(2))])
+        # Fremde Gruppen verdrängen nichts aus "tasks_all"
+        for idx in range(5):
+            buffer.append("project_1", _events(idx))
+        self.assertEqual(buffer.since("tasks_all", 0), ([(first, _events(1)), (third, _events(2))], True))
+
+    def test_gap_beyond_buffer_or_unknown_sequence_requires_resync(self):
+        buffer = LocalReplayBuffer()
+        seqs = [buffer.append("tasks_all", _events(idx)) for idx in range(5)]
+        self.assertEqual(buffer.since("tasks_all", seqs[0]), ([], False))
+        frames, complete = buffer.since("tasks_all", seqs[1])
+        self.assertTrue(complete)
+        self.assertEqual([seq for seq, _ in frames], seqs[2:])
+        self.assertEqual(buffer.since("tasks_all", seqs[-1] + 10), ([], False))
+
+    def test_missed_frames_merges_groups_by_sequence(self):
+        buffer = get_replay_buffer()
+        buffer.append("projects_all", _events(1))
+        buffer.append("tasks_all", _events(2))
+        buffer.append("projects_all", _events(3))
+        frames = missed_frames(["projects_all", "tasks_all"], 1)
+        self.assertEqual([seq for seq, _ in frames], [2, 3])
+        for idx in range(4):
+            buffer.append("tasks_all", _events(idx))
+        self.assertIsNone(missed_frames(["projects_all", "tasks_all"], 1))
+
+    def test_send_batch_stamps_sequence(self):
+        layer = mock.Mock(group_send=mock.AsyncMock())
+        with mock.patch("core.realtime.get_channel_layer", return_value=layer):
+            _send_batch("tasks_all", _events(1))
+            _send_batch("tasks_all", _events(2))
+        messages = [call.args[1] for call in layer.group_send.call_args_list]
+        self.assertEqual([message["seq"] for message in messages], [1, 2])
+        self.assertEqual(get_replay_buffer().since("tasks_all", 1), ([(2, _events(2))], True))
+
+
+@override_settings(REALTIME_REPLAY_REDIS_URL=None, REALTIME_REPLAY_SIZE=3)
+class UpdatesConsumerReplayTests(SimpleTestCase):
+    def setUp(self):
+        reset_replay_buffer()
+        self.addCleanup(reset_replay_buffer)
+        self.consumer = UpdatesConsumer()
+        self.consumer.groups = ["projects_all", "tasks_all"]
+        self.consumer.send_json = mock.AsyncMock()
+
+    def _sent(self):
+        return [call.args[0] for call in self.consumer.send_json.call_args_list]
+
+    def test_reconnect_replays_missed_frames_once(self):
+        buffer = get_replay_buffer()
+        seen = buffer.append("tasks_all", _events(1))
+        missed = buffer.append("tasks_all", _events(2))
+        buffer.append("project_9", _events(3))
+        async_to_sync(self.consumer._replay)(seen)
+        self.assertEqual(
+            self._sent(),
+            [{"event": "batch", "seq": missed, "events": _events(2)}, {"event": "ready", "seq": 3}],
+        )
+        # Derselbe Frame kommt live noch einmal an und wird verworfen
+        async_to_sync(self.consumer.updates_batch)({"seq": missed, "events": _events(2)})
+        async_to_sync(self.consumer.updates_batch)({"seq": 4, "events": _events(4)})
+        self.assertEqual(self._sent()[-1], {"event": "batch", "seq": 4, "events": _events(4)})
+        self.assertEqual(len(self._sent()), 3)
+
+    def test_reconnect_beyond_buffer_signals_resync(self):
+        buffer = get_replay_buffer()
+        for idx in range(5):
+            buffer.append("tasks_all", _events(idx))
+        async_to_sync(self.consumer._replay)(1)
+        self.assertEqual(self._sent(), [{"event": "resync", "seq": 5}])
+
+    def test_fresh_connect_reports_current_sequence(self):
+        get_replay_buffer().append("tasks_all", _events(1))
+        async_to_sync(self.consumer._replay)(None)
+        self.assertEqual(self._sent(), [{"event": "ready", "seq": 1}])
@@ -0,0 +1,68 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.models import GrowProGoal, Profile, Project, Role, Task
+
+
+class SummaryAggregationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        team_role, _ = Role.objects.get_or_create(key="TEAM")
+        self.user = User.objects.create_user(username="summary-team", password="pw123456")
+        self.profile = Profile.objects.create(user=self.user, name="Summary")
+        self.client.force_authenticate(user=self.user)
+
+        # Wie nach einem echten Commit: die Versionszähler laufen im on_commit-Callback
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.roles.add(team_role)
+            self.project = Project.objects.create(title="Summary", status="ACTIVE")
+            Project.objects.create(title="Archiv", status="DONE", is_archived=True)
+            Task.objects.create(title="A", project=self.project, status="OPEN", task_type="EXTERNAL")
+            Task.objects.create(title="B", project=self.project, status="DONE", task_type="INTERNAL")
+            Task.objects.create(title="C", project=self.project, status="OPEN", is_archived=True)
+            Task.objects.create(title="D", project=self.project, status="REVIEW")
+
+    def test_task_summary_counts_in_single_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get("/api/tasks/summary/?include_archived=1&include_done=1")
+        self.assertEqual(res.status_code, 200, res.content)
+        data = res.json()
+        self.assertEqual(data["total"], 4)
+        self.assertEqual(data["archived"], 1)
+        self.assertEqual(data["done"], 1)
+        self.assertEqual(data["active"], 2)
+        self.assertEqual(data["by_status"], {"OPEN": 2, "DONE": 1, "REVIEW": 1})
+        self.assertEqual(sum(data["by_type"].values()), 4)
+        self.assertEqual(data["by_type"]["EXTERNAL"], 3)
+        task_queries = [q for q in ctx.captured_queries if 'FROM "core_task"' in q["sql"]]
+        self.assertEqual(len(task_queries), 1)
+
+    def test_project_and_growpro_summaries(self):
+        data = self.client.get("/api/projects/summary/?include_archived=1&include_done=1").json()
+        self.assertEqual((data["total"], data["archived"], data["done"], data["active"]), (2, 1, 1, 1))
+        GrowProGoal.objects.create(profile=self.profile, title="Hörer", metric="Hörer", status="ACTIVE")
+        GrowProGoal.objects.create(profile=self.profile, title="Alt", metric="Streams", status="ARCHIVED")
+        data = self.client.get("/api/growpro/summary/").json()
+        self.assertEqual((data["total"], data["archived"], data["active"]), (2, 1, 1))
+
+    @override_settings(SUMMARY_CACHE_TTL=60)
+    def test_cached_summary_invalidated_by_task_write(self):
+        first = self.client.get("/api/tasks/summary/").json()
+        with CaptureQueriesContext(connection) as ctx:
+            cached = self.client.get("/api/tasks/summary/").json()
+        self.assertEqual(cached, first)
+        self.assertFalse([q for q in ctx.captured_queries if 'FROM "core_task"' in q["sql"]])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(title="E", project=self.project, status="OPEN")
+            # Vor dem Commit bleibt die Version stehen: ein Read cacht nichts unter der neuen
+            self.assertEqual(self.client.get("/api/tasks/summary/").json(), first)
+        fresh = self.client.get("/api/tasks/summary/").json()
+        self.assertEqual(fresh["total"], first["total"] + 1)
+        filtered = self.client.get("/api/tasks/summary/?status=DONE&include_done=1").json()
+        self.assertEqual(filtered["total"], 1)
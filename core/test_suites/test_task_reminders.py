@@ -0,0 +1,103 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.automation import log_overdue_tasks, scan_overdue_tasks, send_task_reminders
+from core.models import ActivityEntry, EmailOutboxMessage, Profile, Project, ReminderLedger, Role, Task
+
+
+@override_settings(EMAIL_DELIVERY_MODE="command")
+class TaskReminderTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="reminder", password="pw123456", email="reminder@example.com")
+        self.assignee = Profile.objects.create(user=user, name="Reminder")
+        self.project = Project.objects.create(title="Reminders")
+        today = timezone.now().date()
+        self.due_soon = Task.objects.create(title="Soon", project=self.project, due_date=today + timedelta(days=1))
+        self.overdue = Task.objects.create(title="Late", project=self.project, due_date=today - timedelta(days=2))
+        for task in (self.due_soon, self.overdue):
+            task.assignees.add(self.assignee)
+
+    def test_second_run_skips_already_reminded_tasks(self):
+        first = send_task_reminders(days=3)
+        self.assertEqual(first["tasks_notified"], 2)
+        self.assertEqual(ReminderLedger.objects.count(), 2)
+
+        second = send_task_reminders(days=3)
+        self.assertEqual(second["tasks_notified"], 0)
+        self.assertEqual(second["skipped"], 2)
+        self.assertEqual(EmailOutboxMessage.objects.count(), 2)
+
+    def test_new_due_date_is_reminded_again(self):
+        send_task_reminders(days=3)
+        self.due_soon.due_date = self.due_soon.due_date + timedelta(days=1)
+        self.due_soon.save(update_fields=["due_date"])
+        self.assertEqual(send_task_reminders(days=3, include_overdue=False)["tasks_notified"], 1)
+
+    def test_aborted_run_keeps_ledger_of_sent_reminders(self):
+        with mock.patch("core.automation.send_notification_email", side_effect=[None, RuntimeError("SMTP")]):
+            with self.assertRaises(RuntimeError):
+                send_task_reminders(days=3)
+        self.assertEqual(list(ReminderLedger.objects.values_list("task_id", flat=True)), [self.due_soon.id])
+        # Wiederholter Lauf erinnert nur noch an die übrige Task
+        self.assertEqual(send_task_reminders(days=3)["tasks_notified"], 1)
+
+    def test_command_delivers_queued_mail_before_exit(self):
+        call_command("send_task_reminders", days=3, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertFalse(EmailOutboxMessage.objects.exclude(status="SENT").exists())
+
+    def test_dry_run_does_not_record(self):
+        summary = send_task_reminders(days=3, dry_run=True)
+        self.assertEqual(summary["tasks_notified"], 2)
+        self.assertFalse(ReminderLedger.objects.exists())
+
+    def test_candidate_lookup_does_not_scale_with_activity_log(self):
+        ActivityEntry.objects.bulk_create(
+            ActivityEntry(event_type="task_overdue", title="noise", task=self.overdue, metadata={"due_date": "2000-01-01"})
+            for _ in range(50)
+        )
+        with self.assertNumQueries(3):
+            self.assertEqual(log_overdue_tasks(), 1)
+        with self.assertNumQueries(1):
+            self.assertEqual(log_overdue_tasks(), 0)
+
+
+class OverdueScanTests(TestCase):
+    def setUp(self):
+        self.today = timezone.now().date()
+        self.project = Project.objects.create(title="Overdue")
+
+    def test_scan_only_processes_window_since_last_run(self):
+        Task.objects.create(title="Old", project=self.project, due_date=self.today - timedelta(days=10))
+        first = scan_overdue_tasks(today=self.today - timedelta(days=2))
+        self.assertEqual(first["logged"], 1)
+
+        Task.objects.create(title="Fresh", project=self.project, due_date=self.today - timedelta(days=1))
+        Task.objects.create(title="Backdated", project=self.project, due_date=self.today - timedelta(days=20))
+        second = scan_overdue_tasks(today=self.today)
+        self.assertEqual(second["scanned_from"], (self.today - timedelta(days=2)).isoformat())
+        self.assertEqual(second["logged"], 1)
+        self.assertEqual(
+            set(ActivityEntry.objects.filter(event_type="task_overdue").values_list("task__title", flat=True)),
+            {"Old", "Fresh"},
+        )
+
+    def test_activity_feed_does_not_backfill(self):
+        Task.objects.create(title="Late", project=self.project, due_date=self.today - timedelta(days=1))
+        team_role, _ = Role.objects.get_or_create(key="TEAM")
+        user = User.objects.create_user(username="feed-team", password="pw123456")
+        profile = Profile.objects.create(user=user, name="Feed")
+        profile.roles.add(team_role)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        res = client.get("/api/activity-feed/")
+        self.assertEqual(res.status_code, 200)
+        self.assertFalse(ActivityEntry.objects.filter(event_type="task_overdue").exists())
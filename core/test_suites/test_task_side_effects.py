@@ -0,0 +1,95 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import ActivityEntry, Notification, Profile, Project, Role, SideEffectJob, Task
+from core.side_effects import drain_outbox
+
+
+class TaskSideEffectTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        team_role, _ = Role.objects.get_or_create(key="TEAM")
+
+        self.team_user = User.objects.create_user(username="team-effects", password="pw123456")
+        self.team_profile = Profile.objects.create(user=self.team_user, name="Team Effects")
+        self.team_profile.roles.add(team_role)
+
+        self.assignee_user = User.objects.create_user(
+            username="assignee-effects", password="pw123456", email="assignee@example.com"
+        )
+        self.assignee = Profile.objects.create(user=self.assignee_user, name="Assignee")
+
+        self.project = Project.objects.create(title="Effects")
+        self.client.force_authenticate(user=self.team_user)
+
+    def _create_task(self, **extra):
+        payload = {"title": "Mix", "project": self.project.id, "assignee_ids": [self.assignee.id]}
+        payload.update(extra)
+        return self.client.post("/api/tasks/", payload, format="json")
+
+    @override_settings(SIDE_EFFECTS_MODE="inline", EMAIL_DELIVERY_MODE="command")
+    def test_side_effects_run_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            res = self._create_task()
+        self.assertEqual(res.status_code, 201, res.content)
+        self.assertFalse(ActivityEntry.objects.filter(event_type="task_created").exists())
+        self.assertEqual(len(callbacks), 1)
+
+        callbacks[0]()
+        task = Task.objects.get(id=res.json()["id"])
+        self.assertTrue(ActivityEntry.objects.filter(event_type="task_created", task=task).exists())
+        self.assertTrue(Notification.objects.filter(recipient=self.assignee, task=task).exists())
+
+    @override_settings(SIDE_EFFECTS_MODE="inline", EMAIL_DELIVERY_MODE="command")
+    def test_update_uses_snapshot_of_previous_state(self):
+        task = Task.objects.create(title="Master", project=self.project, priority="LOW")
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.patch(f"/api/tasks/{task.id}/", {"priority": "HIGH"}, format="json")
+        self.assertEqual(res.status_code, 200, res.content)
+        entry = ActivityEntry.objects.get(event_type="task_priority_updated", task=task)
+        self.assertEqual(entry.description, "LOW -> HIGH")
+
+    @override_settings(SIDE_EFFECTS_MODE="outbox")
+    def test_outbox_jobs_are_drained(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self._create_task()
+        self.assertEqual(res.status_code, 201, res.content)
+        job = SideEffectJob.objects.get()
+        self.assertEqual(job.name, "task_created")
+        self.assertFalse(ActivityEntry.objects.filter(event_type="task_created").exists())
+
+        self.assertEqual(drain_outbox(), {"done": 1, "failed": 0})
+        job.refresh_from_db()
+        self.assertEqual(job.status, "DONE")
+        self.assertTrue(ActivityEntry.objects.filter(event_type="task_created").exists())
+
+    def test_failed_job_is_retried_with_backoff(self):
+        job = SideEffectJob.objects.create(name="task_created", payload={})
+        with mock.patch("core.side_effects.run_handler", side_effect=RuntimeError("kaputt")):
+            self.assertEqual(drain_outbox(max_attempts=2), {"done": 0, "failed": 1})
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), ("PENDING", 1))
+            self.assertGreater(job.next_attempt_at, timezone.now())
+            # Vor Ablauf des Backoffs wird der Job nicht erneut versucht
+            self.assertEqual(drain_outbox(max_attempts=2), {"done": 0, "failed": 0})
+
+            SideEffectJob.objects.filter(id=job.id).update(next_attempt_at=timezone.now())
+            self.assertEqual(drain_outbox(max_attempts=2), {"done": 0, "failed": 1})
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("FAILED", 2))
+
+    def test_claimed_jobs_are_skipped_until_lease_expires(self):
+        job = SideEffectJob.objects.create(
+            name="task_created", payload={}, status="RUNNING", next_attempt_at=timezone.now() + timedelta(minutes=1)
+        )
+        with mock.patch("core.side_effects.run_handler") as run_handler:
+            self.assertEqual(drain_outbox(), {"done": 0, "failed": 0})
+            # Verwaiste Lease: ein anderer Drainer übernimmt den Job
+            SideEffectJob.objects.filter(id=job.id).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+            self.assertEqual(drain_outbox(), {"done": 1, "failed": 0})
+        run_handler.assert_called_once_with("task_created", {})
@@ -0,0 +1,104 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.access import task_visibility_q
+from core.benchmarks import run_benchmark
+from core.models import Profile, Project, Task, TaskVisibility
+from core.visibility import rebuild_visibility
+
+
+class TaskVisibilityTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="visibility", password="pw123456")
+        self.profile = Profile.objects.create(user=self.user, name="Visibility")
+        self.client.force_authenticate(user=self.user)
+
+        joined = Project.objects.create(title="Joined")
+        joined.participants.add(self.profile)
+        joined.owners.add(self.profile)
+        foreign = Project.objects.create(title="Foreign")
+
+        self.via_project = Task.objects.create(title="Via project", project=joined)
+        self.via_project.assignees.add(self.profile)
+        self.via_project.stakeholders.add(self.profile)
+        self.via_assignee = Task.objects.create(title="Via assignee", project=foreign)
+        self.via_assignee.assignees.add(self.profile)
+        self.via_stakeholder = Task.objects.create(title="Via stakeholder", project=foreign)
+        self.via_stakeholder.stakeholders.add(self.profile)
+        Task.objects.create(title="Hidden", project=foreign)
+
+    def test_non_team_sees_each_visible_task_once(self):
+        res = self.client.get("/api/tasks/")
+        self.assertEqual(res.status_code, 200, res.content)
+        payload = res.json()
+        self.assertEqual(payload["count"], 3)
+        self.assertEqual(
+            {item["id"] for item in payload["results"]},
+            {self.via_project.id, self.via_assignee.id, self.via_stakeholder.id},
+        )
+
+    def test_assignee_filter_does_not_duplicate_rows(self):
+        other = Profile.objects.create(user=User.objects.create_user(username="other-vis"), name="Other")
+        self.via_project.assignees.add(other)
+        res = self.client.get(f"/api/tasks/?assignee={self.profile.id},{other.id}")
+        self.assertEqual(res.json()["count"], 2)
+
+    def test_project_list_without_distinct(self):
+        res = self.client.get("/api/projects/")
+        self.assertEqual(res.status_code, 200, res.content)
+        payload = res.json()
+        results = payload.get("results", payload)
+        self.assertEqual([item["title"] for item in results], ["Joined"])
+
+    def test_visibility_benchmark_rolls_back(self):
+        before = Task.objects.count()
+        result = run_benchmark("task_visibility", size=200, repeat=1)
+        self.assertEqual(result["or_distinct"]["rows"], result["subquery"]["rows"])
+        self.assertEqual(Task.objects.count(), before)
+
+
+class TaskVisibilitySyncTests(TestCase):
+    def setUp(self):
+        self.profile = Profile.objects.create(user=User.objects.create_user(username="sync-vis"), name="Sync")
+        self.project = Project.objects.create(title="Sync")
+        self.other_project = Project.objects.create(title="Other")
+        self.task = Task.objects.create(title="Sync task", project=self.project)
+
+    def _visible(self):
+        return set(TaskVisibility.objects.filter(profile=self.profile).values_list("task_id", flat=True))
+
+    def test_membership_changes_keep_table_in_sync(self):
+        self.project.participants.add(self.profile)
+        self.assertEqual(self._visible(), {self.task.id})
+
+        self.task.assignees.add(self.profile)
+        self.project.participants.remove(self.profile)
+        self.assertEqual(self._visible(), {self.task.id})
+
+        self.task.assignees.clear()
+        self.assertEqual(self._visible(), set())
+
+        self.profile.task_stakeholder.add(self.task)
+        self.assertEqual(self._visible(), {self.task.id})
+        self.profile.task_stakeholder.clear()
+        self.assertEqual(self._visible(), set())
+
+    def test_moving_task_to_other_project_updates_visibility(self):
+        self.profile.owned_projects.add(self.project)
+        new_task = Task.objects.create(title="Created later", project=self.project)
+        self.assertEqual(self._visible(), {self.task.id, new_task.id})
+
+        self.task.project = self.other_project
+        self.task.save()
+        self.assertEqual(self._visible(), {new_task.id})
+
+    def test_rebuild_matches_reference_rules(self):
+        Project.participants.through.objects.bulk_create(
+            [Project.participants.through(project_id=self.project.id, profile_id=self.profile.id)]
+        )
+        self.assertEqual(self._visible(), set())
+        self.assertEqual(rebuild_visibility()["added"], 1)
+        reference = set(Task.objects.filter(task_visibility_q(self.profile)).values_list("id", flat=True))
+        self.assertEqual(self._visible(), reference)
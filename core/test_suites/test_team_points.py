@@ -0,0 +1,98 @@
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.assignment import build_team_points_daily
+from core.team_scores import TASK_PRIORITY_SCORE
+from core.benchmarks import run_benchmark
+from core.models import GrowProGoal, Profile, Project, Role, Task
+
+
+class TeamPointsAggregationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        team_role, _ = Role.objects.get_or_create(key="TEAM")
+        self.alice = Profile.objects.create(user=User.objects.create_user(username="points-alice"), name="Alice")
+        self.bob = Profile.objects.create(user=User.objects.create_user(username="points-bob"), name="Bob")
+        for profile in (self.alice, self.bob):
+            profile.roles.add(team_role)
+        self.artist = Profile.objects.create(user=User.objects.create_user(username="points-artist"), name="Artist")
+        self.client.force_authenticate(user=self.alice.user)
+
+        self.project = Project.objects.create(title="Album")
+        self.project.owners.add(self.alice)
+        self.project.participants.add(self.alice, self.bob)
+        high = Task.objects.create(title="Mix", project=self.project, priority="HIGH")
+        high.assignees.add(self.alice)
+        low = Task.objects.create(title="Cover", project=self.project, priority="LOW")
+        low.assignees.add(self.alice, self.bob)
+        done = Task.objects.create(title="Master", project=self.project, priority="CRITICAL")
+        done.assignees.add(self.bob)
+        done.status = "DONE"
+        done.completed_at = timezone.now()
+        done.save()
+        GrowProGoal.objects.create(profile=self.artist, title="Hörer", metric="Hörer", assigned_team=self.alice)
+
+    def _members(self):
+        res = self.client.get("/api/team-points/")
+        self.assertEqual(res.status_code, 200)
+        return {member["profile"]["id"]: member for member in res.json()["members"]}
+
+    def test_totals_and_daily_values_come_from_aggregates(self):
+        members = self._members()
+        alice = members[self.alice.id]
+        self.assertEqual(
+            (alice["task_points"], alice["project_points"], alice["goal_points"], alice["total"]),
+            (3, 2, 1, 6),
+        )
+        self.assertNotIn("tasks", alice)
+        bob = members[self.bob.id]
+        self.assertEqual(bob["total"], 3)
+        # Heute: Cover + Master angelegt (1 + 3), Projekt (2); Master erledigt (3)
+        self.assertEqual((bob["daily"]["today_plus"], bob["daily"]["today_minus"]), (6, 3))
+        self.assertEqual(alice["daily"]["today_plus"], 2 + 1 + 2 + 1)
+        self.assertEqual(alice["daily"]["avg_daily_net"], round(6 / 7, 2))
+
+    def test_daily_values_use_local_date_after_midnight(self):
+        carol = Profile.objects.create(user=User.objects.create_user(username="points-carol"), name="Carol")
+        # 23:30 UTC ist in Berlin schon der nächste Tag
+        late = datetime(2026, 10, 18, 23, 30, tzinfo=dt_timezone.utc)
+        with mock.patch("django.utils.timezone.now", return_value=late):
+            Task.objects.create(title="Nacht", project=self.project, priority="HIGH").assignees.add(carol)
+            daily = build_team_points_daily([carol])
+        self.assertEqual(daily[carol.id]["today_plus"], TASK_PRIORITY_SCORE["HIGH"])
+
+    def test_member_drill_down_lists_items(self):
+        res = self.client.get(f"/api/team-points/?member={self.alice.id}")
+        self.assertEqual(res.status_code, 200)
+        data = res.json()
+        self.assertEqual({task["title"]: task["points"] for task in data["tasks"]}, {"Mix": 2, "Cover": 1})
+        self.assertEqual([project["title"] for project in data["projects"]], ["Album"])
+        self.assertEqual([goal["title"] for goal in data["growpro"]], ["Hörer"])
+        self.assertEqual(sum(item["points"] for item in data["today_plus_details"]), 6)
+
+        bob = self.client.get(f"/api/team-points/?member={self.bob.id}").json()
+        self.assertEqual([item["title"] for item in bob["today_minus_details"]], ["Master"])
+        self.assertEqual(self.client.get(f"/api/team-points/?member={self.artist.id}").status_code, 404)
+        self.assertEqual(self.client.get("/api/team-points/?member=abc").status_code, 404)
+
+    def test_query_count_does_not_grow_with_tasks(self):
+        profiles = [self.alice, self.bob]
+        with self.assertNumQueries(5):
+            build_team_points_daily(profiles)
+        for idx in range(20):
+            task = Task.objects.create(title=f"Extra {idx}", project=self.project)
+            task.assignees.add(self.alice, self.bob)
+        with self.assertNumQueries(5):
+            build_team_points_daily(profiles)
+
+    def test_team_points_benchmark_rolls_back(self):
+        tasks_before = Task.objects.count()
+        result = run_benchmark("team_points", size=200, repeat=1, members=5)
+        self.assertEqual(result["members"], 5)
+        self.assertIn("median_ms", result["breakdown"])
+        self.assertEqual(Task.objects.count(), tasks_before)
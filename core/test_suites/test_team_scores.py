@@ -0,0 +1,83 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.assignment import assign_task_for_review, compute_team_scores
+from core.models import GrowProGoal, Profile, Project, Role, Task, TeamScore
+from core.team_scores import check_team_scores
+
+
+class TeamScoreLedgerTests(TestCase):
+    def setUp(self):
+        team_role, _ = Role.objects.get_or_create(key="TEAM")
+        self.alice = Profile.objects.create(user=User.objects.create_user(username="score-alice"), name="Alice")
+        self.bob = Profile.objects.create(user=User.objects.create_user(username="score-bob"), name="Bob")
+        for profile in (self.alice, self.bob):
+            profile.roles.add(team_role)
+        self.project = Project.objects.create(title="Score")
+
+    def _points(self, profile):
+        return TeamScore.objects.get(profile=profile)
+
+    def test_ledger_follows_task_project_and_goal_changes(self):
+        task = Task.objects.create(title="T", project=self.project, priority="HIGH")
+        task.assignees.add(self.alice)
+        self.assertEqual(self._points(self.alice).task_points, 2)
+
+        task.priority = "CRITICAL"
+        task.save()
+        self.assertEqual(self._points(self.alice).task_points, 3)
+
+        self.project.participants.add(self.alice)
+        self.project.owners.add(self.alice, self.bob)
+        self.assertEqual(self._points(self.alice).project_points, 2)
+        self.assertEqual(self._points(self.bob).project_points, 2)
+
+        goal = GrowProGoal.objects.create(profile=self.bob, title="G", metric="Hörer", assigned_team=self.alice)
+        self.assertEqual(self._points(self.alice).goal_points, 1)
+        goal.assigned_team = self.bob
+        goal.save()
+        self.assertEqual(self._points(self.alice).goal_points, 0)
+        self.assertEqual(self._points(self.bob).goal_points, 1)
+
+        task.status = "DONE"
+        task.save()
+        self.assertEqual(self._points(self.alice).task_points, 0)
+
+        self.project.is_archived = True
+        self.project.save()
+        self.assertEqual(self._points(self.bob).project_points, 0)
+        self.assertEqual(check_team_scores(), [])
+
+    def test_clear_and_delete_release_points(self):
+        task = Task.objects.create(title="T", project=self.project, priority="MEDIUM")
+        task.assignees.add(self.alice, self.bob)
+        task.assignees.clear()
+        self.assertEqual(self._points(self.bob).task_points, 0)
+
+        other = Task.objects.create(title="U", project=self.project, priority="HIGH")
+        self.bob.assigned_tasks.add(other)
+        self.assertEqual(self._points(self.bob).task_points, 2)
+        other.delete()
+        self.assertEqual(self._points(self.bob).task_points, 0)
+        self.assertEqual(check_team_scores(), [])
+
+    def test_review_assignment_reads_ledger(self):
+        busy = Task.objects.create(title="Busy", project=self.project, priority="CRITICAL")
+        busy.assignees.add(self.alice)
+        review = Task.objects.create(title="Review", project=self.project)
+        with self.assertNumQueries(2):
+            scores = compute_team_scores()
+        self.assertEqual(scores, {self.alice.id: 3, self.bob.id: 0})
+        self.assertEqual(assign_task_for_review(review), self.bob.id)
+
+    def test_rebuild_command_repairs_drift(self):
+        task = Task.objects.create(title="T", project=self.project, priority="HIGH")
+        task.assignees.add(self.alice)
+        Task.objects.filter(id=task.id).update(priority="LOW")
+        self.assertEqual(len(check_team_scores()), 1)
+        call_command("rebuild_team_scores", stdout=StringIO())
+        self.assertEqual(check_team_scores(), [])
+        self.assertEqual(self._points(self.alice).task_points, 1)
@@ -6,6 +6,7 @@ from django.test import TestCase
 from django.utils import timezone
 from rest_framework.test import APIClient
 
+from core.counters import reset_counter_backend
 from core.models import (
     Profile,
     Role,
@@ -19,6 +20,7 @@ from core.models import (
 class TournamentVotingRulesTests(TestCase):
     def setUp(self):
         cache.clear()
+        reset_counter_backend()
         self.client = APIClient()
 
         self.team_role, _ = Role.objects.get_or_create(key="TEAM")
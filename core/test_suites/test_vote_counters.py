@@ -0,0 +1,104 @@
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.counters import LocalCounterBackend, reset_counter_backend
+from core.models import Profile, Role, Tournament, TournamentBattle, TournamentSubmission, TournamentVote
+
+
+class SlidingWindowCounterTests(SimpleTestCase):
+    def test_previous_window_decays_linearly(self):
+        backend = LocalCounterBackend()
+        with mock.patch("core.counters.time.time", return_value=1000.0):
+            for _ in range(4):
+                backend.hit("k", 100)
+        # Halbzeit des nächsten Fensters: 4 * 0.5 aus dem alten + 1 neuer Treffer
+        with mock.patch("core.counters.time.time", return_value=1150.0):
+            self.assertEqual(backend.hit("k", 100), 3)
+            self.assertEqual(backend.peek("k", 100), 3)
+        with mock.patch("core.counters.time.time", return_value=1300.0):
+            self.assertEqual(backend.peek("k", 100), 0)
+
+    def test_concurrent_hits_are_not_lost(self):
+        backend = LocalCounterBackend()
+        threads = [threading.Thread(target=lambda: [backend.hit("burst", 3600) for _ in range(200)]) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertGreaterEqual(backend.peek("burst", 3600), 1600)
+
+    def test_expired_buckets_are_pruned(self):
+        backend = LocalCounterBackend()
+        backend.PRUNE_EVERY = 10
+        with mock.patch("core.counters.time.time", return_value=1000.0):
+            for idx in range(9):
+                backend.hit(f"ip:{idx}", 60)
+        self.assertEqual(len(backend._values), 9)
+        # Zwei Fenster später sind alle Buckets abgelaufen; der zehnte Treffer räumt auf
+        with mock.patch("core.counters.time.time", return_value=1200.0):
+            backend.hit("ip:new", 60)
+        self.assertEqual(list(backend._values), ["ip:new:20"])
+
+
+class VoteIpCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_counter_backend()
+        self.client = APIClient()
+        team_role, _ = Role.objects.get_or_create(key="TEAM")
+        team = Profile.objects.create(user=User.objects.create_user(username="counter-team"), name="Team")
+        team.roles.add(team_role)
+        self.tournament = Tournament.objects.create(
+            created_by=team, title="Counter Cup", status="BATTLES", max_votes_per_ip_per_hour=20
+        )
+        left = TournamentSubmission.objects.create(tournament=self.tournament, profile=team, status="APPROVED")
+        right = TournamentSubmission.objects.create(
+            tournament=self.tournament,
+            profile=Profile.objects.create(user=User.objects.create_user(username="counter-right"), name=""),
+            status="APPROVED",
+        )
+        self.battle = TournamentBattle.objects.create(
+            tournament=self.tournament, left_submission=left, right_submission=right, status="LIVE"
+        )
+        self.artist_role, _ = Role.objects.get_or_create(key="ARTIST")
+
+    def _vote(self, idx, submission=None):
+        user = User.objects.filter(username=f"counter-voter-{idx}").first()
+        if user is None:
+            user = User.objects.create_user(
+                username=f"counter-voter-{idx}", date_joined=timezone.now() - timedelta(days=2)
+            )
+            Profile.objects.create(user=user, name=f"V{idx}").roles.add(self.artist_role)
+        self.client.force_authenticate(user=user)
+        return self.client.post(
+            "/api/tournament-votes/",
+            {"battle": self.battle.id, "selected_submission": (submission or self.battle.left_submission).id},
+            format="json",
+        )
+
+    def test_same_ip_accounts_flagged_without_querying_votes(self):
+        for idx in range(10):
+            self.assertEqual(self._vote(idx).status_code, 201)
+        flagged = list(TournamentVote.objects.order_by("id").values_list("is_flagged", flat=True))
+        # Schwelle: max(2, 20 * 0.5) = 10 andere Accounts derselben IP
+        self.assertFalse(any(flagged))
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self._vote(10).status_code, 201)
+        self.assertFalse([q for q in ctx.captured_queries if "COUNT(" in q["sql"] and "voter_ip" in q["sql"]])
+        self.assertTrue(TournamentVote.objects.order_by("-id").first().is_flagged)
+
+    def test_vote_change_does_not_count_against_limit(self):
+        self.tournament.max_votes_per_ip_per_hour = 1
+        self.tournament.save()
+        self.assertEqual(self._vote(0).status_code, 201)
+        self.assertEqual(self._vote(0, self.battle.right_submission).status_code, 200)
+        self.assertEqual(self._vote(1).status_code, 429)
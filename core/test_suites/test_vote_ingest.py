@@ -0,0 +1,161 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.benchmarks import run_benchmark
+from core.counters import get_counter_backend, reset_counter_backend
+from core.models import Profile, Role, Tournament, TournamentBattle, TournamentSubmission, TournamentVote
+from core import vote_ingest
+from core.vote_ingest import battle_vote_config
+
+
+class VoteIngestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_counter_backend()
+        self.client = APIClient()
+        team_role, _ = Role.objects.get_or_create(key="TEAM")
+        self.artist_role, _ = Role.objects.get_or_create(key="ARTIST")
+        team = Profile.objects.create(user=User.objects.create_user(username="ingest-team"), name="Team")
+        team.roles.add(team_role)
+        self.tournament = Tournament.objects.create(created_by=team, title="Ingest Cup", status="BATTLES")
+        self.left = TournamentSubmission.objects.create(tournament=self.tournament, profile=team, status="APPROVED")
+        self.right = TournamentSubmission.objects.create(
+            tournament=self.tournament,
+            profile=Profile.objects.create(user=User.objects.create_user(username="ingest-right"), name=""),
+            status="APPROVED",
+        )
+        self.battle = TournamentBattle.objects.create(
+            tournament=self.tournament,
+            left_submission=self.left,
+            right_submission=self.right,
+            status="LIVE",
+            ends_at=timezone.now() + timedelta(minutes=10),
+        )
+
+    def _vote(self, idx, submission=None, ip="10.0.0.1"):
+        user = User.objects.filter(username=f"ingest-voter-{idx}").first()
+        if user is None:
+            user = User.objects.create_user(
+                username=f"ingest-voter-{idx}", date_joined=timezone.now() - timedelta(days=2)
+            )
+            Profile.objects.create(user=user, name=f"V{idx}").roles.add(self.artist_role)
+        self.client.force_authenticate(user=user)
+        return self.client.post(
+            "/api/tournament-votes/",
+            {"battle": self.battle.id, "selected_submission": (submission or self.left).id},
+            format="json",
+            REMOTE_ADDR=ip,
+        )
+
+    def _tallies(self):
+        self.battle.refresh_from_db()
+        return self.battle.votes_left_approved, self.battle.votes_right_approved
+
+    def test_vote_uses_cached_config_and_single_upsert(self):
+        self.assertEqual(self._vote(0).status_code, 201)
+        with CaptureQueriesContext(connection) as ctx:
+            res = self._vote(1, ip="10.0.0.2")
+        self.assertEqual(res.status_code, 201, res.content)
+        sql = [q["sql"] for q in ctx.captured_queries]
+        self.assertFalse([q for q in sql if 'FROM "core_tournament"' in q or 'FROM "core_tournamentsubmission"' in q])
+        self.assertEqual(len([q for q in sql if "ON CONFLICT" in q]), 1)
+        data = res.json()
+        self.assertEqual((data["tournament"], data["battle"], data["voter"]["name"]), (self.tournament.id, self.battle.id, "V1"))
+        self.assertEqual(self._tallies(), (2, 0))
+
+    def test_vote_change_updates_row_and_tallies(self):
+        self.assertEqual(self._vote(0).status_code, 201)
+        created_at = TournamentVote.objects.get().created_at
+        res = self._vote(0, self.right)
+        self.assertEqual(res.status_code, 200, res.content)
+        vote = TournamentVote.objects.get()
+        self.assertEqual((vote.selected_submission_id, vote.created_at), (self.right.id, created_at))
+        self.assertEqual(self._tallies(), (0, 1))
+
+        self.tournament.allow_vote_change = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tournament.save()
+        self.assertEqual(self._vote(0).status_code, 400)
+        self.assertEqual(TournamentVote.objects.get().selected_submission_id, self.right.id)
+
+    def test_concurrent_duplicate_vote_is_recounted_not_added(self):
+        self.assertEqual(self._vote(0).status_code, 201)
+        real_upsert = vote_ingest._upsert
+
+        def upsert_after_concurrent_commit(*args):
+            # Wie PostgreSQL, wenn die Zeile erst nach dem Snapshot committet wurde
+            vote_id, _, _ = real_upsert(*args)
+            return vote_id, None, False
+
+        with mock.patch("core.vote_ingest._upsert", side_effect=upsert_after_concurrent_commit):
+            res = self._vote(0, self.right)
+        self.assertEqual(res.status_code, 200, res.content)
+        self.assertEqual(self._tallies(), (0, 1))
+        # Der doppelte Vote zählt nicht gegen das IP-Limit
+        self.assertEqual(get_counter_backend().peek(f"tournament_vote_ip:{self.battle.id}:10.0.0.1", 3600), 1)
+
+    def test_battle_changes_invalidate_cached_config(self):
+        self.assertEqual(self._vote(0).status_code, 201)
+        self.battle.status = "CLOSED"
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.battle.save()
+        # Vor dem Commit bleibt der alte Eintrag stehen
+        self.assertIsNotNone(cache.get(f"battle-vote-config:{self.battle.id}"))
+        for callback in callbacks:
+            callback()
+        res = self._vote(1)
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("geschlossen", res.json()["detail"])
+
+    @override_settings(VOTE_CONFIG_CACHE_SECONDS=5)
+    def test_config_ttl_is_capped(self):
+        with mock.patch("core.vote_ingest.cache.set") as cache_set:
+            battle_vote_config(self.battle.id)
+        self.assertEqual(cache_set.call_args.kwargs["timeout"], 5)
+
+    @override_settings(SIDE_EFFECTS_MODE="inline", VOTE_TALLY_PUSH_INTERVAL_MS=250)
+    def test_tally_pushes_are_coalesced_by_timer(self):
+        with mock.patch("core.vote_ingest.notify_battle_tally") as notify, mock.patch(
+            "core.vote_ingest.threading.Timer"
+        ) as timer, mock.patch("core.vote_ingest.time.sleep") as sleep:
+            with self.captureOnCommitCallbacks(execute=True):
+                for idx in range(5):
+                    self.assertEqual(self._vote(idx, ip=f"10.0.1.{idx}").status_code, 201)
+            # Ein Timer für alle Votes des Intervalls, kein Warten im Request
+            self.assertEqual(timer.call_count, 1)
+            self.assertEqual(notify.call_count, 0)
+            sleep.assert_not_called()
+            push, args = timer.call_args.args[1], timer.call_args.kwargs["args"]
+            with mock.patch("core.vote_ingest.close_old_connections"):
+                push(*args)
+            battle_id, tally = notify.call_args.args
+            self.assertEqual((battle_id, tally["votes_left_approved"]), (self.battle.id, 5))
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(self._vote(0, self.right, ip="10.0.1.0").status_code, 200)
+            self.assertEqual(timer.call_count, 2)
+
+    @override_settings(SIDE_EFFECTS_MODE="inline", VOTE_TALLY_PUSH_INTERVAL_MS=250)
+    def test_rolled_back_vote_does_not_block_pushes(self):
+        with mock.patch("core.vote_ingest.threading.Timer") as timer:
+            with self.captureOnCommitCallbacks(execute=False):
+                self.assertEqual(self._vote(0).status_code, 201)
+            self.assertIsNone(cache.get(f"battle-tally-push:{self.battle.id}"))
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(self._vote(1, ip="10.0.0.2").status_code, 201)
+            self.assertEqual(timer.call_count, 1)
+
+    def test_vote_spike_benchmark_rolls_back(self):
+        votes_before = TournamentVote.objects.count()
+        result = run_benchmark("vote_spike", size=30, repeat=2)
+        self.assertEqual([row["votes"] for row in result["rounds"]], [30, 30])
+        self.assertEqual(result["tally"], [0, 30])
+        self.assertEqual(TournamentVote.objects.count(), votes_before)
@@ -0,0 +1,54 @@
+import time
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.benchmarks import run_benchmark
+from core.models import Profile, Role
+from core.ws_auth import get_principal, invalidate_ws_principals
+
+
+class WsPrincipalTests(TestCase):
+    def setUp(self):
+        invalidate_ws_principals()
+        self.addCleanup(invalidate_ws_principals)
+        self.team_role, _ = Role.objects.get_or_create(key="TEAM")
+        self.profile = Profile.objects.create(user=User.objects.create_user(username="ws-team"), name="WS")
+        self.profile.roles.add(self.team_role)
+        self.expires_at = time.time() + 300
+
+    def _principal(self, expires_at=None):
+        return async_to_sync(get_principal)(self.profile.user_id, expires_at or self.expires_at)
+
+    def test_principal_is_loaded_once_and_cached(self):
+        with CaptureQueriesContext(connection) as ctx:
+            first = self._principal()
+            second = self._principal()
+        self.assertIs(first, second)
+        self.assertEqual(len(ctx), 2)
+        self.assertEqual((first.profile.id, first.is_team), (self.profile.id, True))
+
+    def test_role_and_profile_changes_invalidate(self):
+        self.assertTrue(self._principal().is_team)
+        self.profile.roles.remove(self.team_role)
+        self.assertFalse(self._principal().is_team)
+
+        self.profile.name = "Renamed"
+        self.profile.save()
+        self.assertEqual(self._principal().profile.name, "Renamed")
+
+    def test_expired_token_is_not_cached(self):
+        self._principal(expires_at=time.time() - 1)
+        with CaptureQueriesContext(connection) as ctx:
+            self._principal()
+        self.assertEqual(len(ctx), 2)
+
+    def test_reconnect_storm_benchmark_hits_cache_after_first_round(self):
+        result = run_benchmark("ws_reconnect_storm", size=20, repeat=2, users=5)
+        self.assertEqual([row["connected"] for row in result["rounds"]], [20, 20])
+        # Kalte Runde: ein Hop (zwei Queries) je User, warme Runde ohne DB
+        self.assertEqual([row["queries"] for row in result["rounds"]], [10, 0])
+        self.assertIn("p99_ms", result["rounds"][0])
@@ -1,5 +1,3 @@
-import csv
-import io
 import os
 import logging
 from calendar import monthrange
@@ -17,7 +15,7 @@ from django.contrib.auth.tokens import default_token_generator
 from django.http import HttpResponse, HttpResponseRedirect
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
-from django.db.models import Case, Count, IntegerField, Max, Q, When
+from django.db.models import Case, Count, IntegerField, Max, Prefetch, Q, When
 from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.utils.encoding import force_bytes, force_str
@@ -29,6 +27,7 @@ from rest_framework.exceptions import PermissionDenied
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.parsers import FormParser, MultiPartParser, JSONParser
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
 from .models import (
@@ -85,6 +84,8 @@ from .models import (
     Album,
 )
 from .serializers import _monthly_amount, _debt_monthly_amount
+from .access import get_access_context, visible_projects, visible_tasks
+from .pagination import KeysetCursorPagination, KeysetPaginationMixin, wants_cursor_pagination
 from .permissions import (
     IsAdmin,
     IsTeam,
@@ -92,6 +93,7 @@ from .permissions import (
     can_comment_on_project_tasks,
     can_manage_project_tasks,
     can_view_project,
+    has_role,
     is_team_profile,
 )
 from .serializers import (
@@ -145,10 +147,36 @@ from .serializers import (
     TournamentSubmissionSerializer,
     TournamentVoteSerializer,
 )
-from .assignment import assign_task_for_review, build_team_points_breakdown, build_team_points_daily, rebalance_growpro_assignments
+from .assignment import (
+    assign_task_for_review,
+    build_team_points_member_detail,
+    build_team_points_payload,
+    schedule_growpro_rebalance,
+)
 from .utils import log_activity
 from .notifications import create_in_app_notification, notify_profiles, send_notification_email
-from .realtime import notify_project_event, notify_task_event
+from .realtime import (
+    bump_revision,
+    field_changes,
+    notify_chat_unread,
+    notify_project_event,
+    notify_task_event,
+    state_changes,
+)
+from .dashboard import analytics_summary_payload, build_dashboard_bundle, stats_payload
+from .counters import get_counter_backend
+from .exports import CSVRenderer, export_iterator, ics_escape, stream_csv, stream_ics
+from .ranking import (
+    ensure_ranked_defaults,
+    ranked_overview_payload,
+    rebuild_ranked_standings,
+    refresh_ranked_standings,
+    season_payload,
+)
+from .side_effects import defer
+from .summaries import aggregate_summary, cached_summary
+from .task_effects import project_snapshot, task_snapshot
+from .vote_ingest import battle_vote_config, record_vote, schedule_tally_push
 from .automation import (
     _profile_emails,
     run_automation_rules_for_project,
@@ -280,6 +308,18 @@ def dashboard_layouts(request):
         }
     )
 
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated])
+def dashboard_bundle(request):
+    if not getattr(request.user, "profile", None):
+        return Response({"detail": "Profil nicht gefunden."}, status=status.HTTP_404_NOT_FOUND)
+    layout_id = (request.query_params.get("layout") or "").strip() or None
+    try:
+        payload = build_dashboard_bundle(request, layout_id)
+    except LookupError:
+        return Response({"detail": "Layout nicht gefunden."}, status=status.HTTP_404_NOT_FOUND)
+    return Response(payload)
+
 # --- Testing ---
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated, IsTeam])
@@ -683,7 +723,7 @@ class ProfileViewSet(viewsets.ModelViewSet):
             profile.roles.add(team_role)
         else:
             profile.roles.remove(team_role)
-        return Response({"is_team_member": profile.roles.filter(key__in=["TEAM", "ADMIN"]).exists()})
+        return Response({"is_team_member": is_team_profile(profile)})
 
     @action(detail=False, methods=["POST"], url_path="me/avatar", permission_classes=[permissions.IsAuthenticated])
     def me_avatar(self, request):
@@ -814,6 +854,7 @@ class ChatThreadViewSet(viewsets.ModelViewSet):
         thread = self.get_object()
         data = {"thread": thread.id, "text": request.data.get("text","")}
         msg = ChatMessage.objects.create(thread=thread, sender=me, text=data["text"])
+        transaction.on_commit(lambda: notify_chat_unread(thread.id, me.id))
         ser = ChatMessageSerializer(msg)
         return Response(ser.data)
     @action(detail=False, methods=["post"], url_path="ensure")
@@ -838,6 +879,7 @@ class ChatMessageViewSet(viewsets.ModelViewSet):
         if instance.sender_id == me.id and not instance.read:
             instance.read = True
             instance.save(update_fields=["read"])
+        transaction.on_commit(lambda: notify_chat_unread(instance.thread_id, me.id))
 # --- Team only ---
 def _bool_param(value, default=False):
     if value is None:
@@ -858,36 +900,11 @@ def _parse_date_param(value):
     return dt
 
 
-def _profile_emails(profiles, exclude_ids=None):
-    emails = []
-    exclude_ids = set(exclude_ids or [])
-    for profile in profiles:
-        if profile.id in exclude_ids:
-            continue
-        user = getattr(profile, "user", None)
-        email = getattr(user, "email", None)
-        if email:
-            emails.append(email)
-    return emails
-
-
-def _project_queryset_for_profile(profile, queryset=None):
-    qs = queryset or Project.objects.all()
-    if is_team_profile(profile):
-        return qs
-    return qs.filter(Q(participants=profile) | Q(owners=profile)).distinct()
-
-
-def _task_queryset_for_profile(profile, queryset=None):
-    qs = queryset or Task.objects.all()
-    if is_team_profile(profile):
-        return qs
-    return qs.filter(
-        Q(project__participants=profile)
-        | Q(project__owners=profile)
-        | Q(assignees=profile)
-        | Q(stakeholders=profile)
-    ).distinct()
+def _task_has_member(task, relation, profile):
+    prefetched = getattr(task, "_prefetched_objects_cache", {})
+    if relation in prefetched:
+        return any(member.id == profile.id for member in prefetched[relation])
+    return getattr(task, relation).filter(id=profile.id).exists()
 
 
 def _can_view_task(profile, task):
@@ -895,7 +912,7 @@ def _can_view_task(profile, task):
         return False
     if is_team_profile(profile):
         return True
-    if task.assignees.filter(id=profile.id).exists() or task.stakeholders.filter(id=profile.id).exists():
+    if _task_has_member(task, "assignees", profile) or _task_has_member(task, "stakeholders", profile):
         return True
     return can_view_project(profile, task.project)
 
@@ -907,116 +924,11 @@ def _require_task_access(profile, task, *, comment_only=False):
         return
     if can_manage_project_tasks(profile, task.project):
         return
-    if comment_only and task.assignees.filter(id=profile.id).exists():
+    if comment_only and _task_has_member(task, "assignees", profile):
         return
     raise PermissionDenied("Keine Berechtigung für diese Task.")
 
 
-def _shift_task_due_date(base_date, pattern, interval):
-    if not base_date or pattern == "NONE":
-        return None
-    interval = max(1, int(interval or 1))
-    if pattern == "DAILY":
-        return base_date + timedelta(days=interval)
-    if pattern == "WEEKLY":
-        return base_date + timedelta(weeks=interval)
-    if pattern == "MONTHLY":
-        month_index = (base_date.month - 1) + interval
-        year = base_date.year + month_index // 12
-        month = month_index % 12 + 1
-        day = min(base_date.day, monthrange(year, month)[1])
-        return base_date.replace(year=year, month=month, day=day)
-    return None
-
-
-def _generate_recurring_task(task, actor=None):
-    if not task or task.recurrence_pattern == "NONE" or task.recurrence_generated or not task.due_date:
-        return None
-    next_due_date = _shift_task_due_date(task.due_date, task.recurrence_pattern, task.recurrence_interval)
-    if not next_due_date:
-        return None
-    template = task.recurrence_parent or task
-    next_task = Task.objects.create(
-        project=task.project,
-        title=task.title,
-        status="OPEN",
-        due_date=next_due_date,
-        priority=task.priority,
-        task_type=task.task_type,
-        review_status=None,
-        created_by=actor,
-        updated_by=actor,
-        recurrence_pattern=task.recurrence_pattern,
-        recurrence_interval=task.recurrence_interval,
-        recurrence_parent=template,
-    )
-    next_task.assignees.set(task.assignees.all())
-    next_task.stakeholders.set(task.stakeholders.all())
-    task.recurrence_generated = True
-    task.save(update_fields=["recurrence_generated"])
-    log_activity(
-        "task_recurring_generated",
-        f"Wiederkehrende Task erstellt: {next_task.title}",
-        description=f"Nächster Termin: {next_due_date}",
-        actor=actor,
-        severity="INFO",
-        task=next_task,
-        project=next_task.project,
-        metadata={"source_task_id": task.id},
-    )
-    recipients = list(next_task.assignees.exclude(id=getattr(actor, "id", None)).select_related("user"))
-    notify_profiles(
-        recipients,
-        f"Wiederkehrende Task: {next_task.title}",
-        f"Eine neue wiederkehrende Aufgabe wurde für {next_due_date} erstellt.",
-        notification_type="task_recurring_generated",
-        actor=actor,
-        severity="INFO",
-        project=next_task.project,
-        task=next_task,
-        metadata={"source_task_id": task.id},
-        preference_key="task_assigned",
-    )
-    return next_task
-
-
-def _ics_escape(value):
-    if value is None:
-        return ""
-    return (
-        str(value)
-        .replace("\\", "\\\\")
-        .replace(";", "\\;")
-        .replace(",", "\\,")
-        .replace("\n", "\\n")
-    )
-
-
-def _ensure_task_overdue_entries():
-    today = timezone.now().date()
-    overdue_tasks = (
-        Task.objects.select_related("project")
-        .filter(is_archived=False, due_date__lt=today)
-        .exclude(status="DONE")
-    )
-    for task in overdue_tasks:
-        exists = ActivityEntry.objects.filter(
-            event_type="task_overdue",
-            task=task,
-            metadata__due_date=str(task.due_date),
-        ).exists()
-        if not exists:
-            log_activity(
-                "task_overdue",
-                f"Deadline verpasst: {task.title}",
-                description=f"Fällig am {task.due_date}",
-                severity="DANGER",
-                task=task,
-                project=task.project,
-                metadata={"due_date": str(task.due_date)},
-            )
-
-
 class ProjectViewSet(viewsets.ModelViewSet):
     queryset = Project.objects.prefetch_related("participants", "owners").order_by("-created_at")
     serializer_class=ProjectSerializer
@@ -1030,7 +942,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
     def _base_queryset(self):
         qs = Project.objects.prefetch_related("participants", "owners").order_by("-created_at")
         me = self.request.user.profile
-        return _project_queryset_for_profile(me, qs)
+        return visible_projects(me, qs)
 
     def _apply_visibility_filters(self, qs):
         include_archived = _bool_param(self.request.query_params.get("include_archived"))
@@ -1050,10 +962,12 @@ class ProjectViewSet(viewsets.ModelViewSet):
             qs = qs.filter(Q(title__icontains=search) | Q(description__icontains=search))
         participant = self.request.query_params.get("participant")
         if participant:
-            qs = qs.filter(participants__id=participant)
+            qs = qs.filter(
+                id__in=Project.participants.through.objects.filter(profile_id=participant).values("project_id")
+            )
         owner = self.request.query_params.get("owner")
         if owner:
-            qs = qs.filter(owners__id=owner)
+            qs = qs.filter(id__in=Project.owners.through.objects.filter(profile_id=owner).values("project_id"))
         status = self.request.query_params.get("status")
         if status:
             statuses = [s.strip().upper() for s in status.split(",") if s.strip()]
@@ -1069,68 +983,32 @@ class ProjectViewSet(viewsets.ModelViewSet):
         qs = self._base_queryset()
         qs = self._apply_visibility_filters(qs)
         qs = self._apply_search_filters(qs)
-        return qs.distinct()
+        return qs
 
     def perform_create(self, serializer):
         project = serializer.save()
         actor = getattr(self.request.user, "profile", None)
-        log_activity(
-            "project_created",
-            f"Projekt erstellt: {project.title}",
-            actor=actor,
-            severity="INFO",
-            project=project,
-        )
-        recipients = list(
-            project.participants.exclude(id=getattr(actor, "id", None)).select_related("user")
-        ) + list(
-            project.owners.exclude(id=getattr(actor, "id", None)).select_related("user")
-        )
-        notify_profiles(
-            recipients,
-            f"Neues Projekt: {project.title}",
-            project.description or "Du wurdest einem neuen Projekt zugeordnet.",
-            notification_type="project_created",
-            actor=actor,
-            severity="INFO",
-            project=project,
-            preference_key="project_updates",
-        )
-        notify_project_event(project, "created")
+        defer("project_created", project_id=project.id, actor_id=getattr(actor, "id", None))
 
+    @transaction.atomic
     def perform_update(self, serializer):
         instance = self.get_object()
         previous_status = instance.status
+        previous = project_snapshot(instance)
         project = serializer.save()
         actor = getattr(self.request.user, "profile", None)
-        if previous_status != project.status:
-            severity = "SUCCESS" if project.status == "DONE" else "INFO"
-            log_activity(
-                "project_status_updated",
-                f"Projektstatus aktualisiert: {project.title}",
-                description=f"{previous_status} -> {project.status}",
-                actor=actor,
-                severity=severity,
-                project=project,
-            )
-            recipients = list(
-                project.participants.exclude(id=getattr(actor, "id", None)).select_related("user")
-            ) + list(
-                project.owners.exclude(id=getattr(actor, "id", None)).select_related("user")
-            )
-            notify_profiles(
-                recipients,
-                f"Projekt-Update: {project.title}",
-                f"Der Projektstatus wurde von {previous_status} auf {project.status} geändert.",
-                notification_type="project_status_updated",
-                actor=actor,
-                severity=severity,
-                project=project,
-                metadata={"previous_status": previous_status, "status": project.status},
-                preference_key="project_updates",
-            )
-            run_automation_rules_for_project(project, "PROJECT_STATUS", actor=actor)
-        notify_project_event(project, "updated")
+        current = project_snapshot(project)
+        defer(
+            "project_updated",
+            project_id=project.id,
+            previous_status=previous_status,
+            status=project.status,
+            actor_id=getattr(actor, "id", None),
+            previous=previous,
+            current=current,
+            # Revision in derselben Transaktion: Handler im Pool können sich überholen
+            revision=bump_revision(project) if state_changes(previous, current) else None,
+        )
 
     def perform_destroy(self, instance):
         actor = getattr(self.request.user, "profile", None)
@@ -1159,7 +1037,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
                 severity="WARNING",
                 project=project,
             )
-            notify_project_event(project, "archived")
+            notify_project_event(project, "archived", changes=field_changes(project, ["is_archived", "archived_at"]))
         serializer = self.get_serializer(project)
         return Response(serializer.data)
 
@@ -1184,23 +1062,18 @@ class ProjectViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["GET"], url_path="summary")
     def summary(self, request):
         qs = self.get_queryset()
-        total = qs.count()
-        archived = qs.filter(is_archived=True).count()
-        completed = qs.filter(status="DONE").count()
-        active = qs.exclude(status="DONE").count()
-        by_status = {
-            row["status"]: row["c"]
-            for row in qs.values("status").annotate(c=Count("id"))
-        }
-        return Response(
-            {
-                "total": total,
-                "archived": archived,
-                "done": completed,
-                "active": active,
-                "by_status": by_status,
-            }
+        data = cached_summary(
+            "projects",
+            getattr(request.user, "profile", None),
+            request.query_params,
+            lambda: aggregate_summary(
+                qs,
+                archived=Q(is_archived=True),
+                done=Q(status="DONE"),
+                active=~Q(status="DONE"),
+            ),
         )
+        return Response(data)
 
     @action(detail=True, methods=["GET"], url_path="health")
     def health(self, request, pk=None):
@@ -1230,20 +1103,23 @@ class ProjectViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=["GET"], url_path="export")
     def export(self, request):
-        qs = self._apply_search_filters(self._apply_visibility_filters(self._base_queryset()))
-        buffer = io.StringIO()
-        writer = csv.writer(buffer, delimiter=";")
-        writer.writerow(["Projekt", "Status", "Teilnehmer", "Erstellt am"])
-        for project in qs:
-            participants = ", ".join(
-                getattr(p, "name", "") or p.user.username for p in project.participants.all()
-            )
-            writer.writerow([project.title, project.status, participants, project.created_at.isoformat()])
-        response = HttpResponse(buffer.getvalue(), content_type="text/csv")
-        response["Content-Disposition"] = 'attachment; filename="projects.csv"'
-        return response
+        qs = self._apply_search_filters(self._apply_visibility_filters(self._base_queryset())).prefetch_related(
+            None
+        ).prefetch_related(
+            Prefetch("participants", queryset=Profile.objects.select_related("user").only("id", "name", "user__username"))
+        )
+        rows = (
+            [
+                project.title,
+                project.status,
+                ", ".join(p.name or p.user.username for p in project.participants.all()),
+                project.created_at.isoformat(),
+            ]
+            for project in export_iterator(qs)
+        )
+        return stream_csv("projects.csv", ["Projekt", "Status", "Teilnehmer", "Erstellt am"], rows)
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset=Task.objects.all().order_by("-created_at")
     serializer_class=TaskSerializer
     permission_classes=[permissions.IsAuthenticated]
@@ -1256,7 +1132,7 @@ class TaskViewSet(viewsets.ModelViewSet):
             .order_by("-created_at")
         )
         me = getattr(self.request.user, "profile", None)
-        return _task_queryset_for_profile(me, qs)
+        return visible_tasks(me, qs)
 
     def _apply_visibility_filters(self, qs):
         include_archived = _bool_param(self.request.query_params.get("include_archived"))
@@ -1287,10 +1163,12 @@ class TaskViewSet(viewsets.ModelViewSet):
         if assignee:
             ids = [pk.strip() for pk in str(assignee).split(",") if pk.strip()]
             if ids:
-                qs = qs.filter(assignees__id__in=ids)
+                qs = qs.filter(id__in=Task.assignees.through.objects.filter(profile_id__in=ids).values("task_id"))
         stakeholder = self.request.query_params.get("stakeholder")
         if stakeholder:
-            qs = qs.filter(stakeholders__id=stakeholder)
+            qs = qs.filter(
+                id__in=Task.stakeholders.through.objects.filter(profile_id=stakeholder).values("task_id")
+            )
         priority = self.request.query_params.get("priority")
         if priority:
             priorities = [p.strip().upper() for p in priority.split(",") if p.strip()]
@@ -1336,7 +1214,7 @@ class TaskViewSet(viewsets.ModelViewSet):
                     qs = qs.order_by("-priority_rank", "due_date", "-created_at")
             else:
                 qs = qs.order_by(ordering)
-        return self._apply_visibility_filters(qs).distinct()
+        return self._apply_visibility_filters(qs)
 
     def get_object(self):
         """Override get_object to allow accessing DONE tasks for updates without include_done parameter."""
@@ -1361,27 +1239,6 @@ class TaskViewSet(viewsets.ModelViewSet):
         if not project or not can_manage_project_tasks(actor, project):
             raise PermissionDenied("Keine Berechtigung fuer diese Task-Aktion.")
 
-    def _log_overdue_if_needed(self, task):
-        if not task.due_date or task.status == "DONE":
-            return
-        if task.due_date >= timezone.now().date():
-            return
-        exists = ActivityEntry.objects.filter(
-            event_type="task_overdue",
-            task=task,
-            metadata__due_date=str(task.due_date),
-        ).exists()
-        if not exists:
-            log_activity(
-                "task_overdue",
-                f"Deadline verpasst: {task.title}",
-                description=f"Fällig am {task.due_date}",
-                severity="DANGER",
-                task=task,
-                project=task.project,
-                metadata={"due_date": str(task.due_date)},
-            )
-
     def perform_create(self, serializer):
         actor = getattr(self.request.user, "profile", None)
         project = serializer.validated_data.get("project")
@@ -1413,50 +1270,15 @@ class TaskViewSet(viewsets.ModelViewSet):
                     update_fields.append("reviewed_at")
             if update_fields:
                 task.save(update_fields=update_fields)
-        log_activity(
-            "task_created",
-            f"Task erstellt: {task.title}",
-            actor=actor,
-            severity="INFO",
-            task=task,
-            project=task.project,
-        )
-        self._log_overdue_if_needed(task)
-        notify_task_event(task, "created")
-        if task.status:
-            run_automation_rules_for_task(task, "TASK_STATUS", actor=actor)
-        if task.due_date:
-            run_automation_rules_for_task(task, "TASK_DUE", actor=actor)
-        assignees = list(task.assignees.exclude(id=getattr(actor, "id", None)).select_related("user"))
-        recipients = _profile_emails(assignees)
-        if recipients:
-            send_notification_email(
-                f"Neuer Task: {task.title}",
-                f"Dir wurde ein neuer Task zugewiesen.\n\nTitel: {task.title}\nProjekt: {task.project.title if task.project else 'Kein Projekt'}\nStatus: {task.status}",
-                recipients,
-            )
-            notify_profiles(
-                assignees,
-                f"Neuer Task: {task.title}",
-                f"Dir wurde ein neuer Task zugewiesen. Status: {task.status}.",
-                notification_type="task_assigned",
-                actor=actor,
-                severity="INFO",
-                project=task.project,
-                task=task,
-                preference_key="task_assigned",
-            )
-        if task.status == "DONE":
-            _generate_recurring_task(task, actor=actor)
+        defer("task_created", task_id=task.id, actor_id=getattr(actor, "id", None))
 
+    @transaction.atomic
     def perform_update(self, serializer):
         instance = self.get_object()
+        previous = task_snapshot(instance)
         prev_status = instance.status
-        prev_review_status = instance.review_status
         prev_review_required = instance.review_required
-        prev_priority = instance.priority
-        prev_due_date = instance.due_date
-        previous_assignees = set(instance.assignees.values_list("id", flat=True))
+        previous_assignees = previous["assignees"]
         actor = getattr(self.request.user, "profile", None)
         target_project = serializer.validated_data.get("project", instance.project)
         self._ensure_project_task_access(target_project)
@@ -1506,47 +1328,18 @@ class TaskViewSet(viewsets.ModelViewSet):
                 review_fields.append("reviewed_at")
         if review_fields:
             task.save(update_fields=list(set(review_fields)))
-        if prev_status != task.status:
-            severity = "SUCCESS" if task.status == "DONE" else "INFO"
-            event = "task_completed" if task.status == "DONE" else "task_status_updated"
-            log_activity(
-                event,
-                f"Taskstatus aktualisiert: {task.title}",
-                description=f"{prev_status} -> {task.status}",
-                actor=actor,
-                severity=severity,
-                task=task,
-                project=task.project,
-            )
-        if prev_review_status != task.review_status and task.status == "DONE":
-            log_activity(
-                "task_review_status",
-                f"Review-Status: {task.title}",
-                description=f"{prev_review_status or 'unset'} -> {task.review_status}",
-                actor=actor,
-                severity="INFO",
-                task=task,
-                project=task.project,
-            )
-        if prev_priority != task.priority:
-            log_activity(
-                "task_priority_updated",
-                f"Priorität geändert: {task.title}",
-                description=f"{prev_priority} -> {task.priority}",
-                actor=actor,
-                severity="INFO",
-                task=task,
-                project=task.project,
-            )
-        self._notify_new_assignees(previous_assignees, task, actor)
-        self._log_overdue_if_needed(task)
-        notify_task_event(task, "updated")
-        if prev_status != task.status:
-            run_automation_rules_for_task(task, "TASK_STATUS", actor=actor)
-        if prev_due_date != task.due_date:
-            run_automation_rules_for_task(task, "TASK_DUE", actor=actor)
-        if prev_status != "DONE" and task.status == "DONE":
-            _generate_recurring_task(task, actor=actor)
+        current = task_snapshot(task)
+        defer(
+            "task_updated",
+            task_id=task.id,
+            previous=previous,
+            current=current,
+            previous_assignees=previous_assignees,
+            actor_id=getattr(actor, "id", None),
+            # Revision in derselben Transaktion: Handler im Pool können sich überholen
+            revision=bump_revision(task) if state_changes(previous, current) else None,
+        )
+
     def perform_destroy(self, instance):
         actor = getattr(self.request.user, "profile", None)
         self._ensure_project_task_access(instance.project)
@@ -1578,7 +1371,7 @@ class TaskViewSet(viewsets.ModelViewSet):
                 task=task,
                 project=task.project,
             )
-        notify_task_event(task, "archived")
+            notify_task_event(task, "archived", changes=field_changes(task, ["is_archived", "archived_at"]))
         serializer = self.get_serializer(task)
         return Response(serializer.data)
 
@@ -1588,35 +1381,6 @@ class TaskViewSet(viewsets.ModelViewSet):
         self.perform_destroy(task)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-    def _notify_new_assignees(self, previous_assignees, task, actor):
-        current_ids = set(task.assignees.values_list("id", flat=True))
-        new_ids = current_ids - set(previous_assignees or [])
-        if not new_ids:
-            return
-        new_profiles = list(
-            task.assignees.filter(id__in=new_ids).exclude(id=getattr(actor, "id", None)).select_related("user")
-        )
-        recipients = _profile_emails(new_profiles, exclude_ids={getattr(actor, "id", None)})
-        if not recipients:
-            return
-        send_notification_email(
-            f"Neuer Task: {task.title}",
-            f"Dir wurde ein Task zugewiesen.\n\nTitel: {task.title}\nStatus: {task.status}\nFällig: {task.due_date or 'Kein Termin'}",
-            recipients,
-        )
-
-        notify_profiles(
-            new_profiles,
-            f"Neuer Task: {task.title}",
-            f"Dir wurde ein Task zugewiesen. Faellig: {task.due_date or 'Kein Termin'}.",
-            notification_type="task_assigned",
-            actor=actor,
-            severity="INFO",
-            project=task.project,
-            task=task,
-            preference_key="task_assigned",
-        )
-
     @action(detail=False, methods=["GET"], url_path="calendar")
     def calendar(self, request):
         start = _parse_date_param(request.query_params.get("start")) or timezone.now().date()
@@ -1635,62 +1399,43 @@ class TaskViewSet(viewsets.ModelViewSet):
         qs = (
             self.get_queryset()
             .filter(due_date__isnull=False, due_date__gte=start, due_date__lte=end_param)
+            .select_related(None)
+            .select_related("project")
+            .prefetch_related(None)
             .order_by("due_date", "title")
         )
         now_stamp = timezone.now().strftime("%Y%m%dT%H%M%SZ")
-        lines = [
-            "BEGIN:VCALENDAR",
-            "VERSION:2.0",
-            "PRODID:-//UNYQ//Tasks Calendar//DE",
-            "CALSCALE:GREGORIAN",
-            "METHOD:PUBLISH",
-        ]
-        for task in qs:
-            due_value = task.due_date.strftime("%Y%m%d")
-            end_value = (task.due_date + timedelta(days=1)).strftime("%Y%m%d")
-            project_title = task.project.title if task.project else "Kein Projekt"
-            description = f"Status: {task.status} | Projekt: {project_title}"
-            lines.extend(
-                [
-                    "BEGIN:VEVENT",
+
+        def events():
+            for task in export_iterator(qs):
+                project_title = task.project.title if task.project else "Kein Projekt"
+                description = f"Status: {task.status} | Projekt: {project_title}"
+                yield [
                     f"UID:task-{task.id}@unyq.local",
                     f"DTSTAMP:{now_stamp}",
-                    f"DTSTART;VALUE=DATE:{due_value}",
-                    f"DTEND;VALUE=DATE:{end_value}",
-                    f"SUMMARY:{_ics_escape(task.title)}",
-                    f"DESCRIPTION:{_ics_escape(description)}",
-                    "END:VEVENT",
+                    f"DTSTART;VALUE=DATE:{task.due_date.strftime('%Y%m%d')}",
+                    f"DTEND;VALUE=DATE:{(task.due_date + timedelta(days=1)).strftime('%Y%m%d')}",
+                    f"SUMMARY:{ics_escape(task.title)}",
+                    f"DESCRIPTION:{ics_escape(description)}",
                 ]
-            )
-        lines.append("END:VCALENDAR")
-        response = HttpResponse("\r\n".join(lines), content_type="text/calendar; charset=utf-8")
-        response["Content-Disposition"] = 'attachment; filename="tasks.ics"'
-        return response
+
+        return stream_ics("tasks.ics", events(), "-//UNYQ//Tasks Calendar//DE")
     @action(detail=False, methods=["GET"], url_path="summary")
     def summary(self, request):
         qs = self.get_queryset()
-        total = qs.count()
-        archived = qs.filter(is_archived=True).count()
-        completed = qs.filter(status="DONE").count()
-        active = qs.filter(is_archived=False).exclude(status="DONE").count()
-        by_status = {
-            row["status"]: row["c"]
-            for row in qs.values("status").annotate(c=Count("id"))
-        }
-        by_type = {
-            row["task_type"]: row["c"]
-            for row in qs.values("task_type").annotate(c=Count("id"))
-        }
-        return Response(
-            {
-                "total": total,
-                "archived": archived,
-                "done": completed,
-                "active": active,
-                "by_status": by_status,
-                "by_type": by_type,
-            }
+        data = cached_summary(
+            "tasks",
+            getattr(request.user, "profile", None),
+            request.query_params,
+            lambda: aggregate_summary(
+                qs,
+                archived=Q(is_archived=True),
+                done=Q(status="DONE"),
+                active=Q(is_archived=False) & ~Q(status="DONE"),
+                by=("status", "task_type"),
+            ),
         )
+        return Response(data)
 
     @action(detail=False, methods=["GET"], url_path="overdue")
     def overdue(self, request):
@@ -1732,7 +1477,7 @@ class ProjectAttachmentViewSet(viewsets.ModelViewSet):
         if project_id:
             qs = qs.filter(project_id=project_id)
         me = getattr(self.request.user, "profile", None)
-        if me and not me.roles.filter(key__in=["TEAM", "ADMIN"]).exists():
+        if me and not is_team_profile(me):
             qs = qs.filter(project__participants=me)
         return qs
 
@@ -1770,7 +1515,7 @@ class TaskAttachmentViewSet(viewsets.ModelViewSet):
         task_id = self.request.query_params.get("task")
         if task_id:
             qs = qs.filter(task_id=task_id)
-        allowed_tasks = _task_queryset_for_profile(getattr(self.request.user, "profile", None), Task.objects.all())
+        allowed_tasks = visible_tasks(getattr(self.request.user, "profile", None), Task.objects.all())
         qs = qs.filter(task__in=allowed_tasks)
         return qs
 
@@ -1812,7 +1557,7 @@ class TaskCommentViewSet(viewsets.ModelViewSet):
         task_id = self.request.query_params.get("task")
         if task_id:
             qs = qs.filter(task_id=task_id)
-        allowed_tasks = _task_queryset_for_profile(getattr(self.request.user, "profile", None), Task.objects.all())
+        allowed_tasks = visible_tasks(getattr(self.request.user, "profile", None), Task.objects.all())
         qs = qs.filter(task__in=allowed_tasks)
         return qs.order_by("-created_at")
 
@@ -1869,7 +1614,7 @@ class SongViewSet(viewsets.ModelViewSet):
             statuses = [s.strip().upper() for s in status_param.split(",") if s.strip()]
             if statuses and "ALL" not in statuses:
                 qs = qs.filter(status__in=statuses)
-        if me and not me.roles.filter(key__in=["TEAM", "ADMIN"]).exists():
+        if me and not is_team_profile(me):
             qs = qs.filter(profile=me)
         profile_id = self.request.query_params.get("profile")
         if profile_id:
@@ -1919,7 +1664,7 @@ class SongViewSet(viewsets.ModelViewSet):
         instance = self.get_object()
         me = self.request.user.profile
         data = serializer.validated_data
-        if not me.roles.filter(key__in=["TEAM", "ADMIN"]).exists():
+        if not is_team_profile(me):
             data.pop("project", None)
         song = serializer.save()
         log_activity(
@@ -1943,14 +1688,14 @@ class SongViewSet(viewsets.ModelViewSet):
     def update(self, request, *args, **kwargs):
         song = self.get_object()
         me = request.user.profile
-        if song.profile_id != me.id and not me.roles.filter(key__in=["TEAM", "ADMIN"]).exists():
+        if song.profile_id != me.id and not is_team_profile(me):
             return Response({"detail": "Nicht erlaubt"}, status=403)
         return super().update(request, *args, **kwargs)
 
     def destroy(self, request, *args, **kwargs):
         song = self.get_object()
         me = request.user.profile
-        if song.profile_id != me.id and not me.roles.filter(key__in=["TEAM", "ADMIN"]).exists():
+        if song.profile_id != me.id and not is_team_profile(me):
             return Response({"detail": "Nicht erlaubt"}, status=403)
         return super().destroy(request, *args, **kwargs)
 
@@ -1977,7 +1722,7 @@ class SongVersionViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         song = serializer.validated_data["song"]
         me = self.request.user.profile
-        if song.profile_id != me.id and not me.roles.filter(key__in=["TEAM", "ADMIN"]).exists():
+        if song.profile_id != me.id and not is_team_profile(me):
             raise PermissionDenied("Nicht erlaubt")
         version = serializer.save()
         log_activity(
@@ -2000,7 +1745,7 @@ class AlbumViewSet(viewsets.ModelViewSet):
         qs = Album.objects.select_related("profile__user").prefetch_related("songs")
         if not me:
             return qs.none()
-        is_team = me.roles.filter(key__in=["TEAM", "ADMIN"]).exists()
+        is_team = is_team_profile(me)
         if not is_team:
             qs = qs.filter(profile=me)
         search = self.request.query_params.get("search")
@@ -2017,14 +1762,14 @@ class AlbumViewSet(viewsets.ModelViewSet):
     def update(self, request, *args, **kwargs):
         album = self.get_object()
         me = request.user.profile
-        if album.profile_id != me.id and not me.roles.filter(key__in=["TEAM", "ADMIN"]).exists():
+        if album.profile_id != me.id and not is_team_profile(me):
             return Response({"detail": "Nicht erlaubt"}, status=403)
         return super().update(request, *args, **kwargs)
 
     def destroy(self, request, *args, **kwargs):
         album = self.get_object()
         me = request.user.profile
-        if album.profile_id != me.id and not me.roles.filter(key__in=["TEAM", "ADMIN"]).exists():
+        if album.profile_id != me.id and not is_team_profile(me):
             return Response({"detail": "Nicht erlaubt"}, status=403)
         return super().destroy(request, *args, **kwargs)
 
@@ -2041,7 +1786,7 @@ class GrowProGoalViewSet(viewsets.ModelViewSet):
             "assigned_team__user",
         ).prefetch_related("updates__created_by__user")
         me = self.request.user.profile
-        if not me.roles.filter(key__in=["TEAM", "ADMIN"]).exists():
+        if not is_team_profile(me):
             qs = qs.filter(profile=me)
         return qs
 
@@ -2084,7 +1829,7 @@ class GrowProGoalViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         me = self.request.user.profile
         data = serializer.validated_data
-        if not me.roles.filter(key__in=["TEAM", "ADMIN"]).exists():
+        if not is_team_profile(me):
             data["profile"] = me
             data["created_by"] = me
         goal = serializer.save(created_by=me)
@@ -2095,7 +1840,7 @@ class GrowProGoalViewSet(viewsets.ModelViewSet):
             severity="INFO",
             project=goal.profile.projects.first() if goal.profile else None,
         )
-        rebalance_growpro_assignments()
+        schedule_growpro_rebalance()
 
     def perform_update(self, serializer):
         goal = serializer.save()
@@ -2105,13 +1850,13 @@ class GrowProGoalViewSet(viewsets.ModelViewSet):
             actor=getattr(self.request.user, "profile", None),
             severity="INFO",
         )
-        rebalance_growpro_assignments()
+        schedule_growpro_rebalance()
 
     @action(detail=True, methods=["POST"], url_path="log", permission_classes=[permissions.IsAuthenticated])
     def log_value(self, request, pk=None):
         goal = self.get_object()
         me = request.user.profile
-        if goal.profile_id != me.id and not me.roles.filter(key__in=["TEAM", "ADMIN"]).exists():
+        if goal.profile_id != me.id and not is_team_profile(me):
             return Response({"detail": "Nicht erlaubt"}, status=403)
         try:
             value = float(request.data.get("value"))
@@ -2137,23 +1882,18 @@ class GrowProGoalViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["GET"], url_path="summary")
     def summary(self, request):
         qs = self._base_queryset()
-        total = qs.count()
-        archived = qs.filter(status="ARCHIVED").count()
-        completed = qs.filter(status="DONE").count()
-        active = qs.filter(status__in=["ACTIVE", "ON_HOLD"]).count()
-        by_status = {
-            row["status"]: row["c"]
-            for row in qs.values("status").annotate(c=Count("id"))
-        }
-        return Response(
-            {
-                "total": total,
-                "archived": archived,
-                "done": completed,
-                "active": active,
-                "by_status": by_status,
-            }
+        data = cached_summary(
+            "growpro",
+            getattr(request.user, "profile", None),
+            request.query_params,
+            lambda: aggregate_summary(
+                qs,
+                archived=Q(status="ARCHIVED"),
+                done=Q(status="DONE"),
+                active=Q(status__in=["ACTIVE", "ON_HOLD"]),
+            ),
         )
+        return Response(data)
 
 class ContractViewSet(viewsets.ModelViewSet):
     queryset=Contract.objects.all(); serializer_class=ContractSerializer
@@ -2371,28 +2111,23 @@ class FinanceProjectViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["GET"], url_path="export-overview")
     def export_overview(self, request, pk=None):
         project = self.get_object()
-        # Generate CSV for current overview
-        import csv
-        from io import StringIO
-
-        output = StringIO()
-        writer = csv.writer(output, delimiter=';')
-        writer.writerow(['Kategorie', 'Betrag'])
-
         overview = self.get_serializer(project).data['overview']
-        writer.writerow(['Einnahmen', overview['monthly_income']])
-        writer.writerow(['Fixkosten', overview['monthly_fixed_costs']])
-        writer.writerow(['Abos', overview.get('monthly_subscriptions', 0)])
-        writer.writerow(['Variable Ausgaben', overview['monthly_variable_costs']])
-        writer.writerow(['Schuldenzahlungen', overview['monthly_debt']])
-        writer.writerow(['Sparen', overview['monthly_savings']])
-        writer.writerow(['Gesamt Ausgaben', overview['monthly_outflow']])
-        writer.writerow(['Frei pro Monat', overview['monthly_left']])
-        writer.writerow(['Verbleibende Schulden', overview['total_remaining_debt']])
-
-        response = HttpResponse(output.getvalue(), content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="finance_overview_{project.title}_{overview["snapshot_month"]}.csv"'
-        return response
+        rows = [
+            ['Einnahmen', overview['monthly_income']],
+            ['Fixkosten', overview['monthly_fixed_costs']],
+            ['Abos', overview.get('monthly_subscriptions', 0)],
+            ['Variable Ausgaben', overview['monthly_variable_costs']],
+            ['Schuldenzahlungen', overview['monthly_debt']],
+            ['Sparen', overview['monthly_savings']],
+            ['Gesamt Ausgaben', overview['monthly_outflow']],
+            ['Frei pro Monat', overview['monthly_left']],
+            ['Verbleibende Schulden', overview['total_remaining_debt']],
+        ]
+        return stream_csv(
+            f'finance_overview_{project.title}_{overview["snapshot_month"]}.csv',
+            ['Kategorie', 'Betrag'],
+            rows,
+        )
 
 
 class FinanceMemberViewSet(viewsets.ModelViewSet):
@@ -2837,20 +2572,20 @@ class BookingViewSet(viewsets.ModelViewSet):
         me = getattr(self.request.user, "profile", None)
         if not me:
             return qs.none()
-        if me.roles.filter(key__in=["TEAM", "ADMIN"]).exists():
+        if is_team_profile(me):
             return qs
         return qs.filter(profile=me)
 
     def perform_create(self, serializer):
         me = self.request.user.profile
-        if me.roles.filter(key__in=["TEAM", "ADMIN"]).exists():
+        if is_team_profile(me):
             serializer.save()
             return
         serializer.save(profile=me)
 
     def perform_update(self, serializer):
         me = self.request.user.profile
-        if me.roles.filter(key__in=["TEAM", "ADMIN"]).exists():
+        if is_team_profile(me):
             serializer.save()
             return
         serializer.save(profile=me)
@@ -2860,189 +2595,6 @@ class TournamentViewSet(viewsets.ModelViewSet):
     serializer_class = TournamentSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-    DEFAULT_RANK_TIERS = [
-        {
-            "tier_key": "BRONZE",
-            "display_name": "Bronze",
-            "accent": "#9a6b42",
-            "min_points": 0,
-            "max_points": 799,
-            "win_points": 140,
-            "vote_points": 2,
-            "submission_points": 32,
-            "battle_points": 10,
-            "loss_penalty": 15,
-            "max_losses_without_penalty": 1,
-        },
-        {
-            "tier_key": "SILBER",
-            "display_name": "Silber",
-            "accent": "#8f98a3",
-            "min_points": 800,
-            "max_points": 1599,
-            "win_points": 145,
-            "vote_points": 2,
-            "submission_points": 34,
-            "battle_points": 12,
-            "loss_penalty": 18,
-            "max_losses_without_penalty": 1,
-        },
-        {
-            "tier_key": "GOLD",
-            "display_name": "Gold",
-            "accent": "#c89a2b",
-            "min_points": 1600,
-            "max_points": 2799,
-            "win_points": 150,
-            "vote_points": 3,
-            "submission_points": 36,
-            "battle_points": 14,
-            "loss_penalty": 20,
-            "max_losses_without_penalty": 1,
-        },
-        {
-            "tier_key": "PLATIN",
-            "display_name": "Platin",
-            "accent": "#42b7b7",
-            "min_points": 2800,
-            "max_points": 4199,
-            "win_points": 160,
-            "vote_points": 3,
-            "submission_points": 38,
-            "battle_points": 16,
-            "loss_penalty": 24,
-            "max_losses_without_penalty": 0,
-        },
-        {
-            "tier_key": "LEGENDAER",
-            "display_name": "Legendär",
-            "accent": "#ff1493",
-            "min_points": 4200,
-            "max_points": None,
-            "win_points": 170,
-            "vote_points": 4,
-            "submission_points": 40,
-            "battle_points": 18,
-            "loss_penalty": 28,
-            "max_losses_without_penalty": 0,
-        },
-    ]
-
-    @classmethod
-    def _ensure_ranked_defaults(cls):
-        for row in cls.DEFAULT_RANK_TIERS:
-            RankTierConfig.objects.get_or_create(
-                tier_key=row["tier_key"],
-                defaults=row,
-            )
-        RankedSeasonSettings.objects.get_or_create(
-            id=1,
-            defaults={"duration_months": 3, "seasons_per_year": 4},
-        )
-
-    @classmethod
-    def _tier_configs(cls):
-        cls._ensure_ranked_defaults()
-        rows = list(RankTierConfig.objects.all().order_by("min_points", "id"))
-        return rows or []
-
-    @classmethod
-    def _tier_payload(cls, tier):
-        return {
-            "key": tier.tier_key,
-            "label": tier.display_name,
-            "accent": tier.accent,
-            "min": tier.min_points,
-            "max": tier.max_points,
-            "loss_penalty": tier.loss_penalty,
-            "max_losses_without_penalty": tier.max_losses_without_penalty,
-            "win_points": tier.win_points,
-            "vote_points": tier.vote_points,
-            "submission_points": tier.submission_points,
-            "battle_points": tier.battle_points,
-        }
-
-    @classmethod
-    def _rank_tier_for_points(cls, points, tier_rows=None):
-        tiers = tier_rows or cls._tier_configs()
-        for idx, tier in enumerate(tiers):
-            max_points = tier.max_points
-            if max_points is None or points <= max_points:
-                next_tier = tiers[idx + 1] if idx + 1 < len(tiers) else None
-                tier_span = ((max_points - tier.min_points) + 1) if max_points is not None else None
-                progress = 100
-                if tier_span:
-                    progress = int(max(0, min(100, ((points - tier.min_points) / tier_span) * 100)))
-                return {
-                    "key": tier.tier_key,
-                    "label": tier.display_name,
-                    "accent": tier.accent,
-                    "range_min": tier.min_points,
-                    "range_max": max_points,
-                    "progress_percent": progress,
-                    "next_tier": next_tier.tier_key if next_tier else None,
-                    "next_tier_label": next_tier.display_name if next_tier else None,
-                    "next_tier_points": next_tier.min_points if next_tier else None,
-                    "loss_penalty": tier.loss_penalty,
-                    "max_losses_without_penalty": tier.max_losses_without_penalty,
-                }
-        return {
-            "key": "BRONZE",
-            "label": "Bronze",
-            "accent": "#9a6b42",
-            "range_min": 0,
-            "range_max": 799,
-            "progress_percent": 0,
-            "next_tier": "SILBER",
-            "next_tier_label": "Silber",
-            "next_tier_points": 800,
-            "loss_penalty": 15,
-            "max_losses_without_penalty": 1,
-        }
-
-    @classmethod
-    def _rank_points(cls, wins, approved_votes, battles, approved_submissions, losses, tier_rows=None):
-        tiers = tier_rows or cls._tier_configs()
-        bronze = tiers[0] if tiers else None
-        if not bronze:
-            base = (wins * 140) + (approved_votes * 2) + (approved_submissions * 32) + (battles * 10)
-            return max(0, base - (losses * 15))
-
-        base = (
-            (wins * int(bronze.win_points or 0))
-            + (approved_votes * int(bronze.vote_points or 0))
-            + (approved_submissions * int(bronze.submission_points or 0))
-            + (battles * int(bronze.battle_points or 0))
-        )
-        initial_tier = cls._rank_tier_for_points(base, tier_rows=tiers)
-        current_tier = next((row for row in tiers if row.tier_key == initial_tier["key"]), bronze)
-        free_losses = int(current_tier.max_losses_without_penalty or 0)
-        penalized_losses = max(0, int(losses) - free_losses)
-        penalty = penalized_losses * int(current_tier.loss_penalty or 0)
-        score = base - penalty
-        return max(0, score)
-
-    @classmethod
-    def _season_payload(cls):
-        cls._ensure_ranked_defaults()
-        settings_obj = RankedSeasonSettings.objects.get(id=1)
-        duration = max(1, int(settings_obj.duration_months or 3))
-        seasons_per_year = max(1, int(settings_obj.seasons_per_year or 4))
-
-        now = timezone.now()
-        month_index = max(0, now.month - 1)
-        season_index = (month_index // duration) + 1
-        season_start_month = ((season_index - 1) * duration) + 1
-
-        return {
-            "duration_months": duration,
-            "seasons_per_year": seasons_per_year,
-            "year": now.year,
-            "season_index": season_index,
-            "label": f"S{season_index} {now.year}",
-            "season_start_month": season_start_month,
-        }
-
     def get_permissions(self):
         if self.request.method in permissions.SAFE_METHODS:
             return [permissions.IsAuthenticated()]
@@ -3068,7 +2620,7 @@ class TournamentViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=["GET", "PATCH"], url_path="ranked-config")
     def ranked_config(self, request):
-        self._ensure_ranked_defaults()
+        ensure_ranked_defaults()
         if request.method == "PATCH" and not is_team_profile(request.user.profile):
             raise PermissionDenied("Nur Team/Admin kann Ranked-Einstellungen aendern.")
 
@@ -3076,9 +2628,9 @@ class TournamentViewSet(viewsets.ModelViewSet):
         tiers = list(RankTierConfig.objects.all().order_by("min_points", "id"))
 
         if request.method == "PATCH":
-            season_payload = request.data.get("season") or {}
-            if isinstance(season_payload, dict) and season_payload:
-                season_serializer = RankedSeasonSettingsSerializer(settings_obj, data=season_payload, partial=True)
+            season_data = request.data.get("season") or {}
+            if isinstance(season_data, dict) and season_data:
+                season_serializer = RankedSeasonSettingsSerializer(settings_obj, data=season_data, partial=True)
                 season_serializer.is_valid(raise_exception=True)
                 instance = season_serializer.save()
                 if instance.duration_months:
@@ -3095,13 +2647,15 @@ class TournamentViewSet(viewsets.ModelViewSet):
                     serializer = RankTierConfigSerializer(by_key[key], data=payload, partial=True)
                     serializer.is_valid(raise_exception=True)
                     serializer.save()
+                # Punkte und Tiers hängen an der Konfiguration
+                rebuild_ranked_standings()
 
             settings_obj = RankedSeasonSettings.objects.get(id=1)
             tiers = list(RankTierConfig.objects.all().order_by("min_points", "id"))
 
         return Response(
             {
-                "season": {**self._season_payload(), **RankedSeasonSettingsSerializer(settings_obj).data},
+                "season": {**season_payload(settings_obj), **RankedSeasonSettingsSerializer(settings_obj).data},
                 "tiers": RankTierConfigSerializer(tiers, many=True).data,
             }
         )
@@ -3165,134 +2719,11 @@ class TournamentViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["GET"], url_path="ranked-overview")
     def ranked_overview(self, request):
         me = getattr(request.user, "profile", None)
-        participant_rows = []
-        tier_rows = self._tier_configs()
-
-        profiles = (
-            Profile.objects.select_related("user")
-            .prefetch_related("roles")
-            .annotate(
-                approved_submissions=Count(
-                    "tournament_submissions",
-                    filter=Q(tournament_submissions__status="APPROVED"),
-                    distinct=True,
-                ),
-                approved_votes_received=Count(
-                    "tournament_submissions__votes",
-                    filter=Q(tournament_submissions__votes__moderation_status="APPROVED"),
-                    distinct=True,
-                ),
-                wins=Count(
-                    "tournament_submissions__won_battles",
-                    filter=Q(tournament_submissions__won_battles__status="CLOSED"),
-                    distinct=True,
-                ),
-                battles_left=Count(
-                    "tournament_submissions__battles_as_left",
-                    filter=Q(tournament_submissions__battles_as_left__status="CLOSED"),
-                    distinct=True,
-                ),
-                battles_right=Count(
-                    "tournament_submissions__battles_as_right",
-                    filter=Q(tournament_submissions__battles_as_right__status="CLOSED"),
-                    distinct=True,
-                ),
-                ranked_wins=Count(
-                    "tournament_submissions__won_battles",
-                    filter=Q(
-                        tournament_submissions__won_battles__status="CLOSED",
-                        tournament_submissions__won_battles__tournament__is_no_loss=False,
-                    ),
-                    distinct=True,
-                ),
-                ranked_battles_left=Count(
-                    "tournament_submissions__battles_as_left",
-                    filter=Q(
-                        tournament_submissions__battles_as_left__status="CLOSED",
-                        tournament_submissions__battles_as_left__tournament__is_no_loss=False,
-                    ),
-                    distinct=True,
-                ),
-                ranked_battles_right=Count(
-                    "tournament_submissions__battles_as_right",
-                    filter=Q(
-                        tournament_submissions__battles_as_right__status="CLOSED",
-                        tournament_submissions__battles_as_right__tournament__is_no_loss=False,
-                    ),
-                    distinct=True,
-                ),
-                active_tournaments=Count("tournament_submissions__tournament", distinct=True),
-            )
-        )
-
-        for profile in profiles:
-            wins = int(profile.wins or 0)
-            approved_votes = int(profile.approved_votes_received or 0)
-            approved_submissions = int(profile.approved_submissions or 0)
-            battles = int(profile.battles_left or 0) + int(profile.battles_right or 0)
-            ranked_battles = int(profile.ranked_battles_left or 0) + int(profile.ranked_battles_right or 0)
-            ranked_wins = int(profile.ranked_wins or 0)
-            ranked_losses = max(0, ranked_battles - ranked_wins)
-            active_tournaments = int(profile.active_tournaments or 0)
-
-            if wins == 0 and approved_votes == 0 and approved_submissions == 0 and battles == 0:
-                continue
-
-            role_keys = list(profile.roles.values_list("key", flat=True))
-            role_labels = [role.get_key_display() for role in profile.roles.all()]
-            ranked_points = self._rank_points(
-                wins=wins,
-                approved_votes=approved_votes,
-                battles=battles,
-                approved_submissions=approved_submissions,
-                losses=ranked_losses,
-                tier_rows=tier_rows,
-            )
-            tier = self._rank_tier_for_points(ranked_points, tier_rows=tier_rows)
-
-            participant_rows.append(
-                {
-                    "profile_id": profile.id,
-                    "name": profile.name or profile.user.username,
-                    "role_keys": role_keys,
-                    "roles": role_labels,
-                    "tournaments": active_tournaments,
-                    "wins": wins,
-                    "battles": battles,
-                    "losses": ranked_losses,
-                    "submissions": approved_submissions,
-                    "votes": approved_votes,
-                    "ranked_points": ranked_points,
-                    "tier": tier,
-                }
-            )
-
-        participant_rows.sort(
-            key=lambda item: (item["ranked_points"], item["wins"], item["votes"], item["submissions"]),
-            reverse=True,
-        )
-
-        my_rank = None
-        for idx, row in enumerate(participant_rows):
-            row["rank"] = idx + 1
-            if me and row["profile_id"] == me.id:
-                my_rank = idx + 1
-
-        distribution = {tier.tier_key: 0 for tier in tier_rows}
-        for row in participant_rows:
-            distribution[row["tier"]["key"]] += 1
-
-        return Response(
-            {
-                "season": self._season_payload()["label"],
-                "total_players": len(participant_rows),
-                "rank_distribution": distribution,
-                "tiers": [self._tier_payload(tier) for tier in tier_rows],
-                "my_profile_id": me.id if me else None,
-                "my_rank": my_rank,
-                "rows": participant_rows,
-            }
-        )
+        try:
+            limit = max(int(request.query_params.get("limit") or 0), 0)
+        except (TypeError, ValueError):
+            limit = 0
+        return Response(ranked_overview_payload(me=me, limit=limit or None))
 
     @action(detail=True, methods=["GET"], url_path="leaderboard")
     def leaderboard(self, request, pk=None):
@@ -3388,14 +2819,6 @@ class TournamentViewSet(viewsets.ModelViewSet):
 
         by_round = {}
         for battle in battles:
-            left_votes = battle.votes.filter(
-                selected_submission=battle.left_submission,
-                moderation_status="APPROVED",
-            ).count()
-            right_votes = battle.votes.filter(
-                selected_submission=battle.right_submission,
-                moderation_status="APPROVED",
-            ).count()
             row = {
                 "id": battle.id,
                 "status": battle.status,
@@ -3403,8 +2826,8 @@ class TournamentViewSet(viewsets.ModelViewSet):
                 "right_submission": battle.right_submission_id,
                 "left_name": battle.left_submission.profile.name or battle.left_submission.profile.user.username,
                 "right_name": battle.right_submission.profile.name or battle.right_submission.profile.user.username,
-                "votes_left": left_votes,
-                "votes_right": right_votes,
+                "votes_left": battle.votes_left_approved,
+                "votes_right": battle.votes_right_approved,
                 "winner_submission": battle.winner_submission_id,
                 "winner_name": (
                     (battle.winner_submission.profile.name or battle.winner_submission.profile.user.username)
@@ -3478,7 +2901,10 @@ class TournamentViewSet(viewsets.ModelViewSet):
 
         pending_count = pending_qs.count()
         if pending_count:
+            profile_ids = set(pending_qs.values_list("profile_id", flat=True))
             pending_qs.update(status=decision)
+            # QuerySet.update löst keine Signale aus
+            refresh_ranked_standings(profile_ids)
 
         return Response(
             {
@@ -3609,8 +3035,8 @@ class TournamentBattleViewSet(viewsets.ModelViewSet):
             if winner_submission.id not in {battle.left_submission_id, battle.right_submission_id}:
                 return Response({"detail": "winner_submission gehoert nicht zu dieser Battle."}, status=status.HTTP_400_BAD_REQUEST)
         else:
-            left_votes = battle.votes.filter(selected_submission=battle.left_submission, moderation_status="APPROVED").count()
-            right_votes = battle.votes.filter(selected_submission=battle.right_submission, moderation_status="APPROVED").count()
+            left_votes = battle.votes_left_approved
+            right_votes = battle.votes_right_approved
             if left_votes == right_votes:
                 return Response(
                     {"detail": "Bei Gleichstand muss winner_submission explizit gesetzt werden."},
@@ -3664,6 +3090,9 @@ class TournamentBattleViewSet(viewsets.ModelViewSet):
             )
 
 
+VOTE_IP_WINDOW_SECONDS = 3600
+
+
 class TournamentVoteViewSet(viewsets.ModelViewSet):
     serializer_class = TournamentVoteSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -3690,33 +3119,25 @@ class TournamentVoteViewSet(viewsets.ModelViewSet):
             return forwarded.split(",")[0].strip()
         return request.META.get("REMOTE_ADDR", "unknown")
 
-    def _vote_risk(self, request, tournament, battle, me, phone_number):
+    def _vote_risk(self, request, config, me, phone_number, recent_other_ip_votes):
         reasons = []
         account_age_hours = (timezone.now() - request.user.date_joined).total_seconds() / 3600
         if account_age_hours < 24:
             reasons.append("Neuer Account (<24h)")
 
-        client_ip = self._client_ip(request)
-        recent_cutoff = timezone.now() - timedelta(hours=1)
-        recent_other_ip_votes = TournamentVote.objects.filter(
-            battle=battle,
-            voter_ip=client_ip,
-            created_at__gte=recent_cutoff,
-        ).exclude(voter=me).count()
-        ip_flag_threshold = max(2, int((tournament.max_votes_per_ip_per_hour or 1) * 0.5))
+        ip_flag_threshold = max(2, int((config["max_votes_per_ip_per_hour"] or 1) * 0.5))
         if recent_other_ip_votes >= ip_flag_threshold:
             reasons.append("Viele Accounts mit gleicher IP")
 
-        if tournament.require_phone_vote_verification and not phone_number:
+        if config["require_phone_vote_verification"] and not phone_number:
             reasons.append("Telefonnummer fehlt")
 
-        if not me.roles.exists():
+        if not get_access_context(me).role_keys:
             reasons.append("Profil ohne Rollen")
 
         return {
             "is_flagged": bool(reasons),
             "flag_reason": "; ".join(reasons),
-            "client_ip": client_ip,
         }
 
     @action(detail=False, methods=["GET"], url_path="flags", permission_classes=[permissions.IsAuthenticated, IsTeam])
@@ -3738,35 +3159,40 @@ class TournamentVoteViewSet(viewsets.ModelViewSet):
         vote.moderated_by = request.user.profile
         vote.moderated_at = timezone.now()
         vote.save(update_fields=["moderation_status", "moderated_by", "moderated_at"])
+        schedule_tally_push(vote.battle_id)
         return Response(self.get_serializer(vote).data)
 
     def create(self, request, *args, **kwargs):
-        serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        # Heißer Pfad während Live-Battles: Regeln aus dem Cache, ein Upsert, kein Serializer-Load
+        try:
+            battle_id = int(request.data.get("battle"))
+            selected_submission_id = int(request.data.get("selected_submission"))
+        except (TypeError, ValueError):
+            return Response(
+                {"detail": "battle und selected_submission sind erforderlich."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        phone_number = str(request.data.get("phone_number") or "").strip()
+        if len(phone_number) > TournamentVote._meta.get_field("phone_number").max_length:
+            return Response({"detail": "Telefonnummer ist zu lang."}, status=status.HTTP_400_BAD_REQUEST)
+
+        config = battle_vote_config(battle_id)
+        if config is None:
+            return Response({"detail": "Battle nicht gefunden."}, status=status.HTTP_400_BAD_REQUEST)
         me = request.user.profile
-        battle = serializer.validated_data["battle"]
-        tournament = battle.tournament
-        selected_submission = serializer.validated_data["selected_submission"]
-        phone_number = (serializer.validated_data.get("phone_number") or "").strip()
 
-        if selected_submission.id not in {battle.left_submission_id, battle.right_submission_id}:
+        if selected_submission_id not in config["submission_profiles"]:
             return Response({"detail": "Ungültige Auswahl für diese Battle."}, status=status.HTTP_400_BAD_REQUEST)
 
-        if tournament.voting_mode == "JURY_ONLY" and not is_team_profile(me):
+        if config["voting_mode"] == "JURY_ONLY" and not is_team_profile(me):
             return Response({"detail": "Dieses Turnier erlaubt nur Jury-Votes."}, status=status.HTTP_403_FORBIDDEN)
 
-        if tournament.status != "BATTLES":
+        if config["tournament_status"] != "BATTLES":
             return Response({"detail": "Voting ist nur im Status 'Battles laufen' erlaubt."}, status=status.HTTP_400_BAD_REQUEST)
 
-        if battle.status == "CLOSED":
+        if config["status"] == "CLOSED":
             return Response({"detail": "Voting ist bereits geschlossen."}, status=status.HTTP_400_BAD_REQUEST)
 
-        existing_vote = TournamentVote.objects.filter(battle=battle, voter=me).first()
-
-        if existing_vote and not tournament.allow_vote_change:
-            return Response({"detail": "Vote-Änderungen sind für dieses Turnier deaktiviert."}, status=status.HTTP_400_BAD_REQUEST)
-
-        min_age_hours = int(tournament.min_account_age_hours or 0)
+        min_age_hours = config["min_account_age_hours"]
         if min_age_hours > 0:
             min_created_at = timezone.now() - timedelta(hours=min_age_hours)
             if request.user.date_joined > min_created_at:
@@ -3775,36 +3201,43 @@ class TournamentVoteViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_403_FORBIDDEN,
                 )
 
-        risk = self._vote_risk(request, tournament, battle, me, phone_number)
-        client_ip = risk["client_ip"]
-        max_ip_votes = int(tournament.max_votes_per_ip_per_hour or 0)
-        if max_ip_votes > 0 and not existing_vote:
-            hour_bucket = timezone.now().strftime("%Y%m%d%H")
-            ip_key = f"tournament_vote_ip:{battle.id}:{client_ip}:{hour_bucket}"
-            current_ip_votes = int(cache.get(ip_key, 0))
-            if current_ip_votes >= max_ip_votes:
+        # Votes je Battle und IP im gleitenden Stundenfenster – atomar über alle Worker.
+        # Gezählt wird vor dem Upsert; war es nur eine Vote-Änderung, wird der Treffer zurückgenommen.
+        client_ip = self._client_ip(request)
+        counters = get_counter_backend()
+        ip_key = f"tournament_vote_ip:{battle_id}:{client_ip}"
+        ip_votes = counters.hit(ip_key, VOTE_IP_WINDOW_SECONDS)
+        max_ip_votes = config["max_votes_per_ip_per_hour"]
+        if max_ip_votes > 0 and ip_votes > max_ip_votes:
+            if not TournamentVote.objects.filter(battle_id=battle_id, voter=me).exists():
+                counters.hit(ip_key, VOTE_IP_WINDOW_SECONDS, amount=-1)
                 return Response(
                     {"detail": "Zu viele Votes von dieser IP in kurzer Zeit. Bitte später erneut versuchen."},
                     status=status.HTTP_429_TOO_MANY_REQUESTS,
                 )
 
-        verification_status = "PENDING_PHONE" if tournament.require_phone_vote_verification else "NONE"
-        vote, created = TournamentVote.objects.update_or_create(
-            battle=battle,
-            voter=me,
-            defaults={
-                "selected_submission": selected_submission,
+        risk = self._vote_risk(request, config, me, phone_number, max(0, ip_votes - 1))
+        result = record_vote(
+            config,
+            me.id,
+            {
+                "selected_submission": selected_submission_id,
                 "phone_number": phone_number,
                 "voter_ip": client_ip,
                 "voter_user_agent": (request.META.get("HTTP_USER_AGENT") or "")[:255],
                 "is_flagged": risk["is_flagged"],
                 "flag_reason": risk["flag_reason"],
                 "moderation_status": "PENDING_REVIEW" if risk["is_flagged"] else "APPROVED",
-                "verification_status": verification_status,
+                "verification_status": "PENDING_PHONE" if config["require_phone_vote_verification"] else "NONE",
             },
         )
-        if created and max_ip_votes > 0:
-            cache.set(ip_key, current_ip_votes + 1, timeout=3600)
+        if result is None or not result[1]:
+            counters.hit(ip_key, VOTE_IP_WINDOW_SECONDS, amount=-1)
+        if result is None:
+            return Response({"detail": "Vote-Änderungen sind für dieses Turnier deaktiviert."}, status=status.HTTP_400_BAD_REQUEST)
+
+        vote, created = result
+        vote.voter = me
         output = self.get_serializer(vote)
         response_status = status.HTTP_201_CREATED if created else status.HTTP_200_OK
         return Response(output.data, status=response_status)
@@ -3819,7 +3252,7 @@ class PluginGuideViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         qs = super().get_queryset()
         me = getattr(self.request.user, "profile", None)
-        if not me or not me.roles.filter(key__in=["TEAM", "ADMIN"]).exists():
+        if not me or not is_team_profile(me):
             qs = qs.filter(is_published=True)
         return qs
 
@@ -4093,8 +3526,8 @@ class ManagedPlatformViewSet(viewsets.ModelViewSet):
         self._sync_platform_catalog()
         me = getattr(request.user, "profile", None)
         is_team_user = is_team_profile(me)
-        is_admin_user = bool(me and (me.roles.filter(key="ADMIN").exists() or getattr(request.user, "is_superuser", False)))
-        role_keys = set(me.roles.values_list("key", flat=True)) if me else set()
+        is_admin_user = bool(me and (has_role(me, "ADMIN") or getattr(request.user, "is_superuser", False)))
+        role_keys = set(get_access_context(me).role_keys) if me else set()
         if not role_keys:
             role_keys = {"MEMBER"}
         if is_admin_user:
@@ -4155,7 +3588,7 @@ class NewsPostViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         qs = super().get_queryset()
         me = getattr(self.request.user, "profile", None)
-        if not me or not me.roles.filter(key__in=["TEAM", "ADMIN"]).exists():
+        if not me or not is_team_profile(me):
             qs = qs.filter(is_published=True)
         return qs
 
@@ -4168,12 +3601,14 @@ class NewsPostViewSet(viewsets.ModelViewSet):
         recipients = []
         emails = []
         seen_emails = set()
-        for profile in Profile.objects.select_related("user").all():
-            if actor and profile.id == actor.id:
-                continue
-            settings_map = profile.notification_settings or {}
-            if not settings_map.get("news_updates", False):
-                continue
+        qs = (
+            Profile.objects.filter(notification_settings__news_updates=True)
+            .select_related("user")
+            .only("id", "notification_settings", "user__email")
+        )
+        if actor:
+            qs = qs.exclude(id=actor.id)
+        for profile in qs.iterator(chunk_size=1000):
             recipients.append(profile)
             email = (getattr(profile.user, "email", "") or "").strip().lower()
             if email and email not in seen_emails:
@@ -4238,7 +3673,7 @@ class FinanceTipViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         qs = super().get_queryset()
         me = getattr(self.request.user, "profile", None)
-        if not me or not me.roles.filter(key__in=["TEAM", "ADMIN"]).exists():
+        if not me or not is_team_profile(me):
             qs = qs.filter(is_published=True)
         return qs
 
@@ -4259,7 +3694,7 @@ class FinanceTipViewSet(viewsets.ModelViewSet):
         return Response({"is_published": publish})
 
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = Notification.objects.select_related("recipient__user", "actor__user", "project", "task").order_by("-created_at")
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -4296,20 +3731,29 @@ class NotificationViewSet(viewsets.ModelViewSet):
 class ActivityFeedView(APIView):
     permission_classes = [permissions.IsAuthenticated, IsTeam]
 
-    def get(self, request):
-        limit = int(request.query_params.get("limit", 100))
-        limit = max(1, min(limit, 200))
-        types_param = request.query_params.get("types")
+    def get_queryset(self):
+        types_param = self.request.query_params.get("types")
         types = None
         if types_param:
             types = [t.strip() for t in types_param.split(",") if t.strip()]
-        _ensure_task_overdue_entries()
         qs = (
             ActivityEntry.objects.select_related("actor__user", "project", "task")
             .order_by("-created_at")
         )
         if types:
             qs = qs.filter(event_type__in=types)
+        return qs
+
+    def get(self, request):
+        limit = int(request.query_params.get("limit", 100))
+        limit = max(1, min(limit, 200))
+        qs = self.get_queryset()
+        if wants_cursor_pagination(request):
+            paginator = KeysetCursorPagination()
+            paginator.page_size = limit
+            page = paginator.paginate_queryset(qs, request, view=self)
+            serializer = ActivityEntrySerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
         qs = qs[:limit]
         serializer = ActivityEntrySerializer(qs, many=True)
         return Response(serializer.data)
@@ -4461,19 +3905,7 @@ class ProfileAchievementViewSet(viewsets.ModelViewSet):
 @api_view(["GET"])
 @permission_classes([permissions.IsAuthenticated])
 def stats(request):
-    counts = {k:0 for k,_ in ROLE_CHOICES}
-    for row in Role.objects.annotate(c=Count("profile")).values("key","c"):
-        counts[row["key"]] = row["c"]
-    me = request.user.profile
-    if me.roles.filter(key__in=["TEAM", "ADMIN"]).exists():
-        open_requests = Request.objects.filter(status="OPEN").count()
-        active_contracts = Contract.objects.filter(status="ACTIVE").count()
-        due_payments = Payment.objects.filter(status="DUE").count()
-    else:
-        open_requests = Request.objects.filter(Q(sender=me)|Q(receiver=me), status="OPEN").count()
-        active_contracts = Contract.objects.filter(profile=me, status="ACTIVE").count()
-        due_payments = Payment.objects.filter(profile=me, status="DUE").count()
-    return Response({"roles":counts,"open_requests":open_requests,"active_contracts":active_contracts,"due_payments":due_payments})
+    return Response(stats_payload(request.user.profile))
 
 @api_view(["GET"])
 @permission_classes([permissions.IsAuthenticated, IsAdmin])
@@ -4504,86 +3936,66 @@ def admin_overview(request):
 @api_view(["GET"])
 @permission_classes([permissions.IsAuthenticated, IsAdmin])
 def analytics_summary(request):
-    today = timezone.now().date()
     soon_days = int(request.query_params.get("soon_days", 7) or 7)
     soon_days = max(1, min(30, soon_days))
-    base_tasks = Task.objects.filter(is_archived=False).exclude(status="DONE")
-    active_tasks = base_tasks.count()
-    overdue_tasks = base_tasks.filter(due_date__isnull=False, due_date__lt=today).count()
-    due_soon_tasks = base_tasks.filter(
-        due_date__isnull=False,
-        due_date__gte=today,
-        due_date__lte=today + timedelta(days=soon_days),
-    ).count()
-    completed_last_7_days = Task.objects.filter(
-        completed_at__isnull=False,
-        completed_at__gte=timezone.now() - timedelta(days=7),
-    ).count()
-    return Response(
-        {
-            "active_tasks": active_tasks,
-            "overdue_tasks": overdue_tasks,
-            "due_soon_tasks": due_soon_tasks,
-            "completed_last_7_days": completed_last_7_days,
-            "active_contracts": Contract.objects.filter(status="ACTIVE").count(),
-            "due_payments": Payment.objects.filter(status="DUE").count(),
-            "paid_payments": Payment.objects.filter(status="PAID").count(),
-            "open_requests": Request.objects.filter(status="OPEN").count(),
-            "artist_count": Profile.objects.filter(roles__key="ARTIST").distinct().count(),
-            "example_count": Example.objects.count(),
-        }
-    )
+    return Response(analytics_summary_payload(soon_days))
 
 
 class TeamPointsView(APIView):
     permission_classes = [permissions.IsAuthenticated, IsTeam]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, CSVRenderer]
 
     def get(self, request):
-        members = build_team_points_breakdown()
-        daily = build_team_points_daily()
-        for member in members:
-            member["daily"] = daily.get(member["profile"]["id"], {})
+        member_id = request.query_params.get("member")
+        if member_id:
+            profile = None
+            if member_id.isdigit():
+                profile = (
+                    Profile.objects.filter(id=int(member_id), roles__key__in=["TEAM", "ADMIN"])
+                    .select_related("user")
+                    .first()
+                )
+            if not profile:
+                return Response({"detail": "Profil nicht gefunden."}, status=status.HTTP_404_NOT_FOUND)
+            return Response(build_team_points_member_detail(profile))
+
+        payload = build_team_points_payload()
+        members = payload["members"]
 
         if request.query_params.get("format") == "csv":
-            buffer = io.StringIO()
-            writer = csv.writer(buffer, delimiter=";")
-            writer.writerow(
+            rows = (
                 [
-                    "Name",
-                    "Username",
-                    "Total",
-                    "Heute +",
-                    "Heute -",
-                    "Heute Netto",
-                    "Avg + (7d)",
-                    "Avg - (7d)",
-                    "Avg Netto (7d)",
+                    member["profile"]["name"],
+                    member["profile"]["username"],
+                    member["total"],
+                    (member.get("daily") or {}).get("today_plus", 0),
+                    (member.get("daily") or {}).get("today_minus", 0),
+                    (member.get("daily") or {}).get("today_net", 0),
+                    (member.get("daily") or {}).get("avg_daily_plus", 0),
+                    (member.get("daily") or {}).get("avg_daily_minus", 0),
+                    (member.get("daily") or {}).get("avg_daily_net", 0),
                 ]
+                for member in members
             )
-            for member in members:
-                daily_stats = member.get("daily") or {}
-                writer.writerow(
-                    [
-                        member["profile"]["name"],
-                        member["profile"]["username"],
-                        member["total"],
-                        daily_stats.get("today_plus", 0),
-                        daily_stats.get("today_minus", 0),
-                        daily_stats.get("today_net", 0),
-                        daily_stats.get("avg_daily_plus", 0),
-                        daily_stats.get("avg_daily_minus", 0),
-                        daily_stats.get("avg_daily_net", 0),
-                    ]
-                )
-            response = HttpResponse(buffer.getvalue(), content_type="text/csv")
-            response["Content-Disposition"] = 'attachment; filename="team_points.csv"'
-            return response
+            header = [
+                "Name",
+                "Username",
+                "Total",
+                "Heute +",
+                "Heute -",
+                "Heute Netto",
+                "Avg + (7d)",
+                "Avg - (7d)",
+                "Avg Netto (7d)",
+            ]
+            return stream_csv("team_points.csv", header, rows)
 
-        return Response({"members": members, "rules": {"tasks": {"LOW": 1, "MEDIUM": 1, "HIGH": 2, "CRITICAL": 3}, "project_participation": 2, "growpro_assignment": 1}})
+        return Response(payload)
 
 
 class ArtistEngagementView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, CSVRenderer]
 
     def get(self, request):
         artist_profiles = Profile.objects.filter(roles__key="ARTIST").distinct().select_related("user")
@@ -4614,11 +4026,8 @@ class ArtistEngagementView(APIView):
             )
         results.sort(key=lambda item: (-item["total"], item["profile"]["name"]))
         if request.query_params.get("format") == "csv":
-            buffer = io.StringIO()
-            writer = csv.writer(buffer, delimiter=";")
-            writer.writerow(["Name", "Username", "Total", "Tasks", "Projekte", "Beispiele", "Songs", "GrowPro", "Kommentare"])
-            for item in results:
-                writer.writerow([
+            rows = (
+                [
                     item["profile"]["name"],
                     item["profile"]["username"],
                     item["total"],
@@ -4628,10 +4037,11 @@ class ArtistEngagementView(APIView):
                     item["song_count"],
                     item["growpro_count"],
                     item["comment_count"],
-                ])
-            response = HttpResponse(buffer.getvalue(), content_type="text/csv")
-            response["Content-Disposition"] = 'attachment; filename="artist_engagement.csv"'
-            return response
+                ]
+                for item in results
+            )
+            header = ["Name", "Username", "Total", "Tasks", "Projekte", "Beispiele", "Songs", "GrowPro", "Kommentare"]
+            return stream_csv("artist_engagement.csv", header, rows)
         return Response({"artists": results})
 
 
@@ -4639,38 +4049,28 @@ class ArtistEngagementView(APIView):
 @permission_classes([permissions.IsAuthenticated])
 def calendar_export(request):
     me = request.user.profile
-    today = timezone.now().date()
-    if me.roles.filter(key__in=["TEAM", "ADMIN"]).exists():
-        tasks = Task.objects.filter(is_archived=False, due_date__isnull=False).order_by("due_date")[:200]
-    else:
-        tasks = Task.objects.filter(
-            is_archived=False,
-            due_date__isnull=False,
-        ).filter(
-            Q(assignees=me) | Q(stakeholders=me) | Q(created_by=me)
-        ).order_by("due_date")[:200]
-    lines = [
-        "BEGIN:VCALENDAR",
-        "VERSION:2.0",
-        "PRODID:-//ProArtist//Kalender-Export//DE",
-        "CALSCALE:GREGORIAN",
-        "METHOD:PUBLISH",
-    ]
-    for task in tasks:
-        dt = task.due_date.strftime("%Y%m%d")
-        lines += [
-            "BEGIN:VEVENT",
-            f"UID=task-{task.id}@proartist.local",
-            f"DTSTAMP={timezone.now().strftime('%Y%m%dT%H%M%SZ')}",
-            f"DTSTART;VALUE=DATE:{dt}",
-            f"SUMMARY={task.title}",
-            f"DESCRIPTION={task.project.title if task.project else 'Task'} - Status: {task.status}",
-            "END:VEVENT",
-        ]
-    lines.append("END:VCALENDAR")
-    response = HttpResponse("\r\n".join(lines), content_type="text/calendar; charset=utf-8")
-    response["Content-Disposition"] = 'attachment; filename="proartist_calendar.ics"'
-    return response
+    tasks = Task.objects.filter(is_archived=False, due_date__isnull=False).select_related("project")
+    if not is_team_profile(me):
+        tasks = tasks.filter(
+            Q(id__in=Task.assignees.through.objects.filter(profile_id=me.id).values("task_id"))
+            | Q(id__in=Task.stakeholders.through.objects.filter(profile_id=me.id).values("task_id"))
+            | Q(created_by=me)
+        )
+    tasks = tasks.order_by("due_date")[:200]
+    now_stamp = timezone.now().strftime("%Y%m%dT%H%M%SZ")
+
+    def events():
+        for task in export_iterator(tasks):
+            description = f"{task.project.title if task.project else 'Task'} - Status: {task.status}"
+            yield [
+                f"UID:task-{task.id}@proartist.local",
+                f"DTSTAMP:{now_stamp}",
+                f"DTSTART;VALUE=DATE:{task.due_date.strftime('%Y%m%d')}",
+                f"SUMMARY:{ics_escape(task.title)}",
+                f"DESCRIPTION:{ics_escape(description)}",
+            ]
+
+    return stream_ics("proartist_calendar.ics", events(), "-//ProArtist//Kalender-Export//DE")
 
 
 @api_view(["POST"])
@@ -0,0 +1,89 @@
+"""
+Pflege der denormalisierten ``TaskVisibility``-Tabelle.
+
+Ein Profil sieht einen Task, wenn es Owner/Teilnehmer des Projekts oder
+Assignee/Stakeholder des Tasks ist. ``sync_task_visibility`` berechnet die
+Zeilen für eine Menge Tasks set-basiert neu (4 Lese-Queries pro Chunk) und
+schreibt nur die Differenz. Die Signal-Receiver in ``core.signals`` rufen
+es für die jeweils betroffenen Tasks auf; ``rebuild_visibility`` baut die
+Tabelle komplett neu auf (z.B. nach ``QuerySet.update``/``bulk_create``,
+die keine Signale auslösen).
+"""
+
+from collections import defaultdict
+
+from .models import Project, Task, TaskVisibility
+
+SYNC_CHUNK_SIZE = 500
+
+
+def _desired_pairs(task_ids):
+    desired = set()
+    task_projects = dict(
+        Task.objects.filter(id__in=task_ids, project__isnull=False).values_list("id", "project_id")
+    )
+    if task_projects:
+        members = defaultdict(set)
+        project_ids = set(task_projects.values())
+        for through in (Project.owners.through, Project.participants.through):
+            for project_id, profile_id in through.objects.filter(project_id__in=project_ids).values_list(
+                "project_id", "profile_id"
+            ):
+                members[project_id].add(profile_id)
+        for task_id, project_id in task_projects.items():
+            desired.update((task_id, profile_id) for profile_id in members[project_id])
+    for through in (Task.assignees.through, Task.stakeholders.through):
+        desired.update(through.objects.filter(task_id__in=task_ids).values_list("task_id", "profile_id"))
+    return desired
+
+
+def _sync_chunk(task_ids):
+    desired = _desired_pairs(task_ids)
+    existing = set(TaskVisibility.objects.filter(task_id__in=task_ids).values_list("task_id", "profile_id"))
+    stale = defaultdict(list)
+    for task_id, profile_id in existing - desired:
+        stale[task_id].append(profile_id)
+    for task_id, profile_ids in stale.items():
+        TaskVisibility.objects.filter(task_id=task_id, profile_id__in=profile_ids).delete()
+    missing = desired - existing
+    if missing:
+        TaskVisibility.objects.bulk_create(
+            [TaskVisibility(task_id=task_id, profile_id=profile_id) for task_id, profile_id in missing],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+    return len(missing), sum(len(ids) for ids in stale.values())
+
+
+def sync_task_visibility(task_ids):
+    """Gleicht die Sichtbarkeitszeilen der übergebenen Tasks ab."""
+    task_ids = sorted({task_id for task_id in task_ids if task_id})
+    added = removed = 0
+    for offset in range(0, len(task_ids), SYNC_CHUNK_SIZE):
+        chunk_added, chunk_removed = _sync_chunk(task_ids[offset:offset + SYNC_CHUNK_SIZE])
+        added += chunk_added
+        removed += chunk_removed
+    return {"added": added, "removed": removed}
+
+
+def sync_project_visibility(project_ids):
+    task_ids = Task.objects.filter(project_id__in=project_ids).values_list("id", flat=True)
+    return sync_task_visibility(list(task_ids))
+
+
+def rebuild_visibility(chunk_size=SYNC_CHUNK_SIZE):
+    """Baut die komplette Tabelle neu auf und entfernt verwaiste Zeilen."""
+    summary = {"tasks": 0, "added": 0, "removed": 0}
+    last_id = 0
+    while True:
+        task_ids = list(
+            Task.objects.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:chunk_size]
+        )
+        if not task_ids:
+            break
+        result = sync_task_visibility(task_ids)
+        summary["tasks"] += len(task_ids)
+        summary["added"] += result["added"]
+        summary["removed"] += result["removed"]
+        last_id = task_ids[-1]
+    return summary
@@ -0,0 +1,306 @@
+"""
+Schreibpfad für Battle-Votes während einer Live-Battle.
+
+- ``battle_vote_config``: Battle- und Turnierregeln als dict im Cache,
+  höchstens ``VOTE_CONFIG_CACHE_SECONDS`` und nie über ``ends_at`` hinaus.
+  Die Signale in ``core.signals`` verwerfen den Eintrag nach dem Commit,
+  sobald Battle oder Turnier gespeichert werden; die TTL begrenzt, wie
+  lange andere Worker ohne gemeinsamen Cache einen alten Status sehen.
+- ``record_vote``: ein ``INSERT … ON CONFLICT (battle_id, voter_id)``. Auf
+  PostgreSQL liest ein CTE den vorherigen Stand in derselben Anweisung,
+  auf anderen Backends geht ein Lookup über den Unique-Index voraus. Da
+  dabei keine Model-Signale feuern, pflegt ``record_vote`` Battle-Zähler
+  und Ranked-Ladder selbst. Trifft der Upsert eine Zeile, die eine
+  parallele Transaktion erst nach dem Snapshot committet hat, ist der
+  Vorzustand unbekannt – dann wird die Battle neu gezählt.
+- ``schedule_tally_push``: Live-Stand an die Gruppe ``battle_<id>``,
+  höchstens ein Push je ``VOTE_TALLY_PUSH_INTERVAL_MS``. Der nachlaufende
+  Push läuft über einen ``threading.Timer`` (wie ``core.coalescer``) und
+  belegt weder einen Side-Effect-Worker noch den Vote-Request.
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .models import TournamentBattle, TournamentVote
+from .ranking import schedule_ranked_refresh
+from .realtime import notify_battle_tally
+from .vote_tallies import apply_vote_delta, recount_battle_votes
+
+INSERT_FIELDS = (
+    "battle",
+    "voter",
+    "selected_submission",
+    "phone_number",
+    "voter_ip",
+    "voter_user_agent",
+    "is_flagged",
+    "flag_reason",
+    "moderation_status",
+    "verification_status",
+    "created_at",
+)
+# Bei einer Vote-Änderung bleiben Battle, Voter, Moderation und created_at stehen
+UPDATE_FIELDS = INSERT_FIELDS[2:-1]
+PREVIOUS_FIELDS = ("id", "selected_submission_id", "moderation_status", "created_at", "moderated_by_id", "moderated_at")
+
+# Sicherheitsnetz, falls ein geplanter Push nie läuft
+TALLY_PUSH_GUARD_SECONDS = 5
+
+logger = logging.getLogger(__name__)
+
+
+def _config_key(battle_id):
+    return f"battle-vote-config:{battle_id}"
+
+
+def _push_key(battle_id):
+    return f"battle-tally-push:{battle_id}"
+
+
+def _config_timeout(ends_at):
+    timeout = max(1, int(getattr(settings, "VOTE_CONFIG_CACHE_SECONDS", 300)))
+    if ends_at:
+        remaining = int((ends_at - timezone.now()).total_seconds())
+        if remaining > 0:
+            return min(remaining, timeout)
+    return timeout
+
+
+def _load_config(battle_id):
+    row = (
+        TournamentBattle.objects.filter(id=battle_id)
+        .values(
+            "id",
+            "round_number",
+            "status",
+            "ends_at",
+            "left_submission_id",
+            "right_submission_id",
+            "left_submission__profile_id",
+            "right_submission__profile_id",
+            "tournament_id",
+            "tournament__status",
+            "tournament__voting_mode",
+            "tournament__allow_vote_change",
+            "tournament__min_account_age_hours",
+            "tournament__max_votes_per_ip_per_hour",
+            "tournament__require_phone_vote_verification",
+        )
+        .first()
+    )
+    if row is None:
+        return None, None
+    config = {
+        "battle_id": row["id"],
+        "round_number": row["round_number"],
+        "status": row["status"],
+        "tournament_id": row["tournament_id"],
+        "tournament_status": row["tournament__status"],
+        "voting_mode": row["tournament__voting_mode"],
+        "allow_vote_change": row["tournament__allow_vote_change"],
+        "min_account_age_hours": int(row["tournament__min_account_age_hours"] or 0),
+        "max_votes_per_ip_per_hour": int(row["tournament__max_votes_per_ip_per_hour"] or 0),
+        "require_phone_vote_verification": row["tournament__require_phone_vote_verification"],
+        "submission_profiles": {
+            row["left_submission_id"]: row["left_submission__profile_id"],
+            row["right_submission_id"]: row["right_submission__profile_id"],
+        },
+    }
+    return config, row["ends_at"]
+
+
+def battle_vote_config(battle_id):
+    """Regeln einer Battle aus dem Cache; ``None`` für unbekannte Battles."""
+    key = _config_key(battle_id)
+    config = cache.get(key)
+    if config is None:
+        config, ends_at = _load_config(battle_id)
+        if config is not None:
+            cache.set(key, config, timeout=_config_timeout(ends_at))
+    return config
+
+
+def invalidate_battle_vote_config(battle_ids):
+    """
+    Verwirft die Regeln nach dem Commit – vorher könnte ein paralleler Read
+    den noch alten Stand sofort wieder cachen.
+    """
+    keys = [_config_key(battle_id) for battle_id in battle_ids]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _columns(fields):
+    meta = TournamentVote._meta
+    return [meta.get_field(field).column for field in fields]
+
+
+def _upsert_sql(allow_change, returning=None):
+    qn = connection.ops.quote_name
+    table = qn(TournamentVote._meta.db_table)
+    battle_column, voter_column = (qn(column) for column in _columns(("battle", "voter")))
+    if allow_change:
+        assignments = ", ".join(f"{column} = EXCLUDED.{column}" for column in map(qn, _columns(UPDATE_FIELDS)))
+        conflict = f"DO UPDATE SET {assignments}"
+    else:
+        conflict = "DO NOTHING"
+    return (
+        f"INSERT INTO {table} ({', '.join(map(qn, _columns(INSERT_FIELDS)))}) "
+        f"VALUES ({', '.join(['%s'] * len(INSERT_FIELDS))}) "
+        f"ON CONFLICT ({battle_column}, {voter_column}) {conflict} RETURNING {returning or qn('id')}"
+    )
+
+
+def _upsert_with_previous_sql(allow_change):
+    """PostgreSQL: vorheriger Stand und Upsert in einer Anweisung (gleicher Snapshot)."""
+    qn = connection.ops.quote_name
+    table = qn(TournamentVote._meta.db_table)
+    battle_column, voter_column = (qn(column) for column in _columns(("battle", "voter")))
+    previous_columns = ", ".join(map(qn, PREVIOUS_FIELDS))
+    selected = ", ".join(f"prior_vote.{qn(column)}" for column in PREVIOUS_FIELDS)
+    # xmax = 0 nur bei frisch eingefügten Zeilen (nicht per ON CONFLICT aktualisiert)
+    upsert = _upsert_sql(allow_change, returning=f"{qn('id')}, (xmax = 0) AS inserted")
+    return (
+        f"WITH prior_vote AS (SELECT {previous_columns} FROM {table} "
+        f"WHERE {battle_column} = %s AND {voter_column} = %s), "
+        f"written_vote AS ({upsert}) "
+        f"SELECT written_vote.{qn('id')}, written_vote.inserted, {selected} FROM written_vote "
+        f"LEFT JOIN prior_vote ON prior_vote.{qn('id')} = written_vote.{qn('id')}"
+    )
+
+
+def _upsert(config, voter_id, values):
+    """
+    Schreibt den Vote und liefert ``(vote_id, previous, inserted)`` –
+    ``previous`` ist der Stand vor dem Schreiben als dict oder ``None``.
+    ``inserted`` ist falsch, wenn eine bestehende Zeile aktualisiert wurde;
+    auf PostgreSQL kann ``previous`` dann trotzdem ``None`` sein (Zeile nach
+    dem Snapshot von einer parallelen Transaktion committet).
+    Liefert ``None``, wenn ein Vote existiert und Änderungen gesperrt sind.
+    """
+    battle_id = config["battle_id"]
+    allow_change = config["allow_vote_change"]
+    params = [battle_id, voter_id] + [values[field] for field in INSERT_FIELDS[2:-1]]
+    params.append(connection.ops.adapt_datetimefield_value(values["created_at"]))
+
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(_upsert_with_previous_sql(allow_change), [battle_id, voter_id] + params)
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        previous = dict(zip(PREVIOUS_FIELDS, row[2:])) if row[2] is not None else None
+        return row[0], previous, row[1]
+
+    with transaction.atomic():
+        previous = (
+            TournamentVote.objects.filter(battle_id=battle_id, voter_id=voter_id).values(*PREVIOUS_FIELDS).first()
+        )
+        if previous and not allow_change:
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(_upsert_sql(allow_change), params)
+            vote_id = cursor.fetchone()[0]
+    return vote_id, previous, previous is None
+
+
+def record_vote(config, voter_id, values):
+    """
+    Upsert eines Votes samt Zählern, Ranked-Refresh und Live-Push.
+
+    ``values`` enthält die Spalten aus ``INSERT_FIELDS`` ohne Battle/Voter.
+    Liefert ``(vote, created)`` mit einer ungespeicherten ``TournamentVote``-
+    Instanz für die Antwort oder ``None`` (siehe ``_upsert``).
+    """
+    values = dict(values, created_at=timezone.now())
+    result = _upsert(config, voter_id, values)
+    if result is None:
+        return None
+    vote_id, previous, inserted = result
+
+    before = (previous["selected_submission_id"], previous["moderation_status"]) if previous else None
+    after = (values["selected_submission"], values["moderation_status"])
+    if previous is None and not inserted:
+        # Doppelt abgeschickter Vote: der Vorzustand ist unbekannt, also neu zählen statt Delta
+        previous = TournamentVote.objects.filter(id=vote_id).values(*PREVIOUS_FIELDS).first()
+        _recount_battle(config["battle_id"])
+        schedule_ranked_refresh(list(config["submission_profiles"].values()))
+        schedule_tally_push(config["battle_id"])
+    elif before != after:
+        approved = [submission_id for submission_id, state in (before or (None, None), after) if state == "APPROVED"]
+        if before and before[1] == "APPROVED":
+            apply_vote_delta(config["battle_id"], before[0], -1)
+        if after[1] == "APPROVED":
+            apply_vote_delta(config["battle_id"], after[0], 1)
+        if approved:
+            profiles = config["submission_profiles"]
+            schedule_ranked_refresh([profiles.get(submission_id) for submission_id in approved])
+            schedule_tally_push(config["battle_id"])
+
+    vote = TournamentVote(
+        id=vote_id,
+        battle=TournamentBattle(
+            id=config["battle_id"], tournament_id=config["tournament_id"], round_number=config["round_number"]
+        ),
+        voter_id=voter_id,
+        selected_submission_id=values["selected_submission"],
+        **{field: values[field] for field in UPDATE_FIELDS[1:]},
+        created_at=previous["created_at"] if previous else values["created_at"],
+        moderated_by_id=previous["moderated_by_id"] if previous else None,
+        moderated_at=previous["moderated_at"] if previous else None,
+    )
+    return vote, inserted
+
+
+def _recount_battle(battle_id):
+    with transaction.atomic():
+        # Battle-Zeile sperren: parallele Deltas landen vor oder nach dem Zählen, nie dazwischen
+        list(TournamentBattle.objects.select_for_update().filter(id=battle_id).values_list("id", flat=True))
+        recount_battle_votes([battle_id])
+
+
+def schedule_tally_push(battle_id):
+    """Plant einen Live-Push nach dem Commit; weitere Votes im selben Intervall fallen mit hinein."""
+    # Slot erst nach dem Commit belegen: ein Rollback soll keine Pushes unterdrücken
+    transaction.on_commit(lambda: _start_tally_push(battle_id))
+
+
+def _start_tally_push(battle_id):
+    if not cache.add(_push_key(battle_id), time.time(), timeout=TALLY_PUSH_GUARD_SECONDS):
+        return
+    interval = max(0, int(getattr(settings, "VOTE_TALLY_PUSH_INTERVAL_MS", 250))) / 1000
+    if interval <= 0:
+        push_battle_tally(battle_id)
+        return
+    timer = threading.Timer(interval, _timed_tally_push, args=(battle_id,))
+    timer.daemon = True
+    timer.start()
+
+
+def _timed_tally_push(battle_id):
+    close_old_connections()
+    try:
+        push_battle_tally(battle_id)
+    except Exception:
+        logger.exception("Live-Push für Battle %s fehlgeschlagen", battle_id)
+    finally:
+        close_old_connections()
+
+
+def push_battle_tally(battle_id):
+    """Gibt den Slot frei und sendet den aktuellen Stand inkl. aller Votes des Intervalls."""
+    cache.delete(_push_key(battle_id))
+    tally = (
+        TournamentBattle.objects.filter(id=battle_id)
+        .values(*TournamentBattle.TALLY_FIELDS)
+        .first()
+    )
+    if tally is not None:
+        notify_battle_tally(battle_id, tally)
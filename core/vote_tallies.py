@@ -0,0 +1,71 @@
+"""
+Vote-Zähler auf ``TournamentBattle``.
+
+``votes_left_approved``/``votes_right_approved`` werden bei jedem
+Vote-Write atomar per ``F()``-Update angepasst (Signal-Receiver in
+``core.signals``), sodass Bracket und Battle-Serializer keine Votes mehr
+zählen müssen. ``recount_battle_votes`` berechnet die Zähler mit einer
+gruppierten Query neu – nach Seitenwechseln einer Battle oder um Drift
+nach ``QuerySet.update`` zu beheben.
+"""
+
+from django.db.models import Case, Count, F, PositiveIntegerField, When
+
+from .models import TournamentBattle, TournamentVote
+
+
+def _side_counter(field, submission_field, submission_id, delta):
+    return Case(
+        When(**{submission_field: submission_id}, then=F(field) + delta),
+        default=F(field),
+        output_field=PositiveIntegerField(),
+    )
+
+
+def apply_vote_delta(battle_id, submission_id, delta):
+    """Addiert ``delta`` auf die Seite der Battle, zu der ``submission_id`` gehört."""
+    if not battle_id or not submission_id or not delta:
+        return 0
+    return TournamentBattle.objects.filter(id=battle_id).update(
+        votes_left_approved=_side_counter("votes_left_approved", "left_submission_id", submission_id, delta),
+        votes_right_approved=_side_counter("votes_right_approved", "right_submission_id", submission_id, delta),
+    )
+
+
+def battle_vote_counts(battle_ids):
+    """``{battle_id: {submission_id: count}}`` freigegebener Votes in einer Query."""
+    counts = {}
+    rows = (
+        TournamentVote.objects.filter(battle_id__in=battle_ids, moderation_status="APPROVED")
+        .values("battle_id", "selected_submission_id")
+        .annotate(c=Count("id"))
+        .values_list("battle_id", "selected_submission_id", "c")
+    )
+    for battle_id, submission_id, count in rows:
+        counts.setdefault(battle_id, {})[submission_id] = count
+    return counts
+
+
+def recount_battle_votes(battle_ids=None, chunk_size=500):
+    """Setzt die Zähler aus den Votes neu; liefert die Zahl geänderter Battles."""
+    battles = TournamentBattle.objects.only(
+        "id", "left_submission_id", "right_submission_id", *TournamentBattle.TALLY_FIELDS
+    ).order_by("id")
+    if battle_ids is not None:
+        battles = battles.filter(id__in=battle_ids)
+    changed = []
+    battle_list = list(battles)
+    for offset in range(0, len(battle_list), chunk_size):
+        chunk = battle_list[offset:offset + chunk_size]
+        counts = battle_vote_counts([battle.id for battle in chunk])
+        for battle in chunk:
+            per_side = counts.get(battle.id, {})
+            left = per_side.get(battle.left_submission_id, 0)
+            right = per_side.get(battle.right_submission_id, 0)
+            if (battle.votes_left_approved, battle.votes_right_approved) != (left, right):
+                battle.votes_left_approved = left
+                battle.votes_right_approved = right
+                changed.append(battle)
+    if changed:
+        TournamentBattle.objects.bulk_update(changed, list(TournamentBattle.TALLY_FIELDS), batch_size=chunk_size)
+    return len(changed)
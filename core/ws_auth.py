@@ -1,13 +1,145 @@
 # core/ws_auth.py
+"""
+JWT-Auth für Websockets.
+
+Pro Connect wird ein ``WsPrincipal`` (User, Profil, Rollen-Keys) in einem
+einzigen Threadpool-Hop geladen und prozesslokal gecacht – höchstens bis
+zum Ablauf des Access-Tokens bzw. ``WS_PRINCIPAL_CACHE_SECONDS``. Bei
+Reconnect-Stürmen nach einem Deploy antworten die Consumer damit ohne
+weitere DB-Hops. Änderungen an User, Profil oder Rollen verwerfen die
+Einträge (siehe ``core.signals``).
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+from collections import OrderedDict
 from urllib.parse import parse_qs
-from channels.middleware import BaseMiddleware   # ✅ richtiger Import für Channels 4
-from rest_framework_simplejwt.tokens import AccessToken
-from django.contrib.auth.models import AnonymousUser
+
 from asgiref.sync import sync_to_async
+from channels.middleware import BaseMiddleware   # ✅ richtiger Import für Channels 4
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .access import TEAM_ROLE_KEYS
+from .models import Profile
 
 User = get_user_model()
 
+MAX_CACHED_PRINCIPALS = 10_000
+
+_principals = OrderedDict()
+_principals_lock = threading.Lock()
+# Laufende Ladevorgänge je (Event-Loop, User): gleichzeitige Connects teilen sich einen Hop
+_inflight = {}
+_generation_counter = itertools.count(1)
+_generation = 0
+
+
+class WsPrincipal:
+    """User, Profil und Rollen-Keys eines Sockets."""
+
+    def __init__(self, user, profile, role_keys):
+        self.user = user
+        self.profile = profile
+        self.role_keys = frozenset(role_keys)
+
+    def has_role(self, *role_keys):
+        return bool(self.role_keys.intersection(role_keys))
+
+    @property
+    def is_team(self):
+        return self.has_role(*TEAM_ROLE_KEYS)
+
+
+def load_principal(user_id):
+    """Lädt User, Profil und Rollen-Keys (zwei Queries, ein Hop)."""
+    user = User.objects.select_related("profile").get(id=user_id)
+    profile = getattr(user, "profile", None)
+    role_keys = ()
+    if profile is not None:
+        role_keys = Profile.roles.through.objects.filter(profile_id=profile.id).values_list("role__key", flat=True)
+    return WsPrincipal(user, profile, role_keys)
+
+
+def invalidate_ws_principals(user_id=None):
+    """Verwirft den Eintrag eines Users bzw. ohne ``user_id`` alle Einträge."""
+    global _generation
+    with _principals_lock:
+        _generation = next(_generation_counter)
+        if user_id is None:
+            _principals.clear()
+        else:
+            _principals.pop(user_id, None)
+
+
+def _cached_principal(user_id, now):
+    with _principals_lock:
+        entry = _principals.get(user_id)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at <= now:
+            _principals.pop(user_id, None)
+            return None
+        _principals.move_to_end(user_id)
+        return principal
+
+
+def _remember_principal(user_id, principal, expires_at, generation):
+    with _principals_lock:
+        # Während des Ladens invalidiert: Stand könnte veraltet sein
+        if generation != _generation:
+            return
+        _principals[user_id] = (expires_at, principal)
+        _principals.move_to_end(user_id)
+        while len(_principals) > MAX_CACHED_PRINCIPALS:
+            _principals.popitem(last=False)
+
+
+async def get_principal(user_id, token_expires_at):
+    """Gecachter Principal; ``token_expires_at`` (Unix-Zeit) begrenzt die Lebensdauer."""
+    now = time.time()
+    principal = _cached_principal(user_id, now)
+    if principal is not None:
+        return principal
+    loop = asyncio.get_running_loop()
+    key = (id(loop), user_id)
+    task = _inflight.get(key)
+    if task is None:
+        task = loop.create_task(_load_and_remember(user_id, token_expires_at))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(task)
+
+
+async def _load_and_remember(user_id, token_expires_at):
+    generation = _generation
+    principal = await sync_to_async(load_principal)(user_id)
+    now = time.time()
+    ttl = max(0, int(getattr(settings, "WS_PRINCIPAL_CACHE_SECONDS", 300)))
+    expires_at = min(token_expires_at, now + ttl)
+    if expires_at > now:
+        _remember_principal(user_id, principal, expires_at, generation)
+    return principal
+
+
+async def scope_principal(scope):
+    """Principal aus dem Scope; ohne ``JWTAuthMiddleware`` ungecacht geladen."""
+    principal = scope.get("principal")
+    if principal is not None:
+        return principal
+    user = scope.get("user")
+    if not user or not user.is_authenticated:
+        return None
+    principal = await sync_to_async(load_principal)(user.id)
+    scope["principal"] = principal
+    return principal
+
+
 class JWTAuthMiddleware(BaseMiddleware):
     async def __call__(self, scope, receive, send):
         try:
@@ -16,8 +148,9 @@ class JWTAuthMiddleware(BaseMiddleware):
             scope["user"] = AnonymousUser()
             if token:
                 access = AccessToken(token)
-                user = await sync_to_async(User.objects.get)(id=access["user_id"])
-                scope["user"] = user
+                principal = await get_principal(access["user_id"], access["exp"])
+                scope["principal"] = principal
+                scope["user"] = principal.user
         except Exception as e:
             print("❌ JWTAuthMiddleware error:", e)
         return await super().__call__(scope, receive, send)
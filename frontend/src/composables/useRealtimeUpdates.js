@@ -1,10 +1,46 @@
 import { ref, onBeforeUnmount } from "vue";
 import api from "../api";
 
-export function useRealtimeUpdates(handler) {
+const ENTITY_ENDPOINTS = { task: "tasks", project: "projects" };
+
+// Events tragen nur Deltas (changes + revision); "created" bringt das volle
+// Objekt mit. Passt die lokale Revision nicht lückenlos, wird das Objekt per
+// REST nachgeladen.
+async function resolveEvent(payload, lookup) {
+  const endpoint = ENTITY_ENDPOINTS[payload.entity];
+  if (!endpoint || payload.data || payload.id == null) return payload;
+  if (payload.action === "deleted") return { ...payload, data: { id: payload.id } };
+  const current = typeof lookup === "function" ? lookup(payload.entity, payload.id) : null;
+  // Nicht geladene Objekte (Filter, Pagination) nicht nachladen
+  if (!current && typeof lookup === "function" && payload.action !== "created") return null;
+  if (current && typeof current.revision === "number") {
+    if (current.revision >= payload.revision) return null;
+    const baseRevision = payload.base_revision ?? payload.revision - 1;
+    if (payload.changes && current.revision === baseRevision) {
+      return { ...payload, data: { ...current, ...payload.changes, revision: payload.revision } };
+    }
+  }
+  try {
+    const { data } = await api.get(`${endpoint}/${payload.id}/`);
+    return { ...payload, data };
+  } catch (err) {
+    if (err?.response?.status === 404) return { ...payload, action: "deleted", data: { id: payload.id } };
+    throw err;
+  }
+}
+
+// Frames tragen eine Sequenznummer; nach einem Reconnect liefert der Server
+// mit ?since=<seq> nur die verpassten Frames nach oder meldet "resync".
+export function useRealtimeUpdates(handler, { lookup, onResync } = {}) {
   const wsRef = ref(null);
   const isReady = ref(false);
   let reconnectTimer = null;
+  let lastSeq = null;
+  let connectedBefore = false;
+
+  function requestResync() {
+    if (typeof onResync === "function") onResync();
+  }
 
   function buildWsUrl() {
     const token = localStorage.getItem("access") || "";
@@ -13,7 +49,8 @@ export function useRealtimeUpdates(handler) {
     const wsHost = base.host;
     const wsPath = base.pathname.replace(/\/api\/?$/, "");
     const cleanedPath = wsPath.endsWith("/") ? wsPath.slice(0, -1) : wsPath;
-    return `${wsProto}//${wsHost}${cleanedPath}/ws/updates/?token=${token}`;
+    const since = lastSeq != null ? `&since=${lastSeq}` : "";
+    return `${wsProto}//${wsHost}${cleanedPath}/ws/updates/?token=${token}${since}`;
   }
 
   function scheduleReconnect() {
@@ -30,6 +67,8 @@ export function useRealtimeUpdates(handler) {
       wsRef.value = null;
     }
     isReady.value = false;
+    // Verbindung ohne bekannte Sequenz: verpasste Events lassen sich nicht nachholen
+    if (connectedBefore && lastSeq == null) requestResync();
     try {
       wsRef.value = new WebSocket(buildWsUrl());
     } catch (err) {
@@ -39,12 +78,32 @@ export function useRealtimeUpdates(handler) {
     }
     wsRef.value.onopen = () => {
       isReady.value = true;
+      connectedBefore = true;
     };
-    wsRef.value.onmessage = (event) => {
+    wsRef.value.onmessage = async (event) => {
       try {
-        const payload = JSON.parse(event.data);
-        if (payload && typeof handler === "function") {
-          handler(payload);
+        const frame = JSON.parse(event.data);
+        if (frame?.event === "ready" || frame?.event === "resync") {
+          if (frame.event === "resync") requestResync();
+          if (frame.event === "resync" || lastSeq == null) lastSeq = frame.seq ?? null;
+          return;
+        }
+        if (frame?.event === "batch") {
+          if (frame.seq == null) {
+            lastSeq = null;
+          } else if (lastSeq != null && frame.seq <= lastSeq) {
+            return;
+          } else {
+            lastSeq = frame.seq;
+          }
+        }
+        // Gebündelte Frames ("batch") enthalten je Entität ein zusammengeführtes Event
+        const events = frame?.event === "batch" ? frame.events || [] : [frame];
+        for (const raw of events) {
+          const payload = await resolveEvent(raw, lookup);
+          if (payload && typeof handler === "function") {
+            handler(payload);
+          }
         }
       } catch (err) {
         console.error("Konnte Echtzeit-Event nicht verarbeiten", err);